@@ -1,12 +1,17 @@
 from backend.forgot_password import forgot_password_bp
-from backend.admin import admin_bp
+from backend.admin import admin_bp, ensure_applicant_analytics_indexes
+from backend.analytics_rollups import ensure_rollup_tables
 from backend.employers import employers_bp, check_expired_employer_documents
-from backend.chat import chat_bp
+from backend.chat import chat_bp, ensure_chat_schema
+from backend.events import events_bp
+from backend.email_outbox import init_email_outbox
+from backend.send_sms import init_sms_dispatcher
+from backend.notifications import init_notification_schema
 from apscheduler.schedulers.background import BackgroundScheduler
 from datetime import datetime
 from backend.applicants import applicants_bp, check_expired_recommendations
 from flask import Flask, jsonify, render_template, request, redirect, url_for, session, flash, send_from_directory, make_response
-from db_connection import create_connection, run_query
+from db_connection import create_connection, run_query, register_db_teardown
 from backend.recaptcha import verify_recaptcha
 from dotenv import load_dotenv
 from pathlib import Path
@@ -46,6 +51,9 @@ app.config["MAIL_DEFAULT_SENDER"] = "samonteralphmatthew@gmail.com"
 
 mail.init_app(app)
 
+# Return request-scoped DB connections (get_db) to the pool on teardown
+register_db_teardown(app)
+
 # =========================================================
 # CUSTOM JINJA FILTER — "timeago"
 # =========================================================
@@ -103,6 +111,18 @@ app.register_blueprint(employers_bp, url_prefix="/employers")
 app.register_blueprint(admin_bp, url_prefix="/admin")
 app.register_blueprint(forgot_password_bp, url_prefix="/forgot-password")
 app.register_blueprint(chat_bp)
+app.register_blueprint(events_bp)
+
+# One-time schema checks (cached for the life of the process)
+with app.app_context():
+    init_notification_schema()
+    ensure_chat_schema()
+    ensure_applicant_analytics_indexes()
+    ensure_rollup_tables()
+
+# Outgoing email and SMS are queued and sent by background workers
+init_email_outbox(app)
+init_sms_dispatcher()
 
 
 # =========================================================
@@ -226,6 +246,85 @@ if __name__ == "__main__":
                 replace_existing=True
             )
 
+            def safe_resync_expiry_schedule():
+                try:
+                    from backend.expiry_engine import refresh_expiry_schedule
+
+                    refresh_expiry_schedule()
+                    print("[v0] ✓ Expiry schedule resynced")
+
+                except Exception as e:
+                    print(f"[v0] ✗ EXPIRY SCHEDULE RESYNC ERROR: {e}")
+
+            # Rebuild at startup; write paths refresh their own rows in between
+            safe_resync_expiry_schedule()
+            scheduler.add_job(
+                safe_resync_expiry_schedule,
+                'interval',
+                minutes=int(os.getenv("EXPIRY_RESYNC_MINUTES", 60)),
+                id='resync_expiry_schedule',
+                replace_existing=True
+            )
+
+            def safe_refresh_rollups():
+                try:
+                    from backend.analytics_rollups import refresh_rollups
+
+                    results = refresh_rollups()
+                    rebuilt = sum(r["days_rebuilt"] for r in results.values() if r)
+                    print(f"[v0] ✓ Analytics rollups refreshed ({rebuilt} days rebuilt)")
+
+                except Exception as e:
+                    print(f"[v0] ✗ ANALYTICS ROLLUP ERROR: {e}")
+
+            # First run right away (in the background; the initial build reads every row once)
+            scheduler.add_job(
+                safe_refresh_rollups,
+                'interval',
+                minutes=int(os.getenv("ANALYTICS_ROLLUP_MINUTES", 10)),
+                next_run_time=datetime.now(),
+                id='refresh_analytics_rollups',
+                replace_existing=True
+            )
+
+            def safe_reconcile_counters():
+                try:
+                    from backend.notification_counters import reconcile_unread_counters
+
+                    with app.app_context():
+                        rows = reconcile_unread_counters()
+
+                    print(f"[v0] ✓ Unread counters reconciled ({rows} rows)")
+
+                except Exception as e:
+                    print(f"[v0] ✗ COUNTER RECONCILE ERROR: {e}")
+
+            scheduler.add_job(
+                safe_reconcile_counters,
+                'interval',
+                minutes=int(os.getenv("NOTIFICATION_COUNTER_RECONCILE_MINUTES", 10)),
+                id='reconcile_unread_counters',
+                replace_existing=True
+            )
+
+            def safe_compact_notifications():
+                try:
+                    from backend.notification_retention import compact_notifications
+
+                    with app.app_context():
+                        compact_notifications()
+
+                except Exception as e:
+                    print(f"[v0] ✗ NOTIFICATION COMPACTION ERROR: {e}")
+
+            scheduler.add_job(
+                safe_compact_notifications,
+                'interval',
+                hours=int(os.getenv("NOTIFICATION_RETENTION_INTERVAL_HOURS", 24)),
+                id='compact_notifications',
+                replace_existing=True
+            )
+
             scheduler.start()
             print("[v0] ✓ Central Scheduler STARTED")
 
@@ -1,18 +1,33 @@
 from flask import Blueprint, render_template, request, redirect, url_for, session, flash, jsonify, send_file
 from werkzeug.security import check_password_hash, generate_password_hash
-from db_connection import create_connection, run_query
-from .notifications import get_notifications, mark_notification_read, get_unread_count, create_notification
+from db_connection import create_connection, get_db, run_query, get_pool_stats
+from .notifications import (get_notifications, get_notifications_page, mark_notification_read,
+                            get_unread_count, create_notification, ADMIN_NOTIFICATION_TYPES)
+from .notification_feed import parse_page_size
+from .notification_dispatcher import enqueue_notification, get_dispatcher_stats
+from .notification_counters import get_unread_total
+from .event_hub import hub
+from .notification_retention import compact_notifications, get_retention_runs, retention_report
 from .recruitment_change_handler import revert_recruitment_type_change
-from extensions import mail
-from flask_mail import Message
+from .email_outbox import get_outbox_stats, queue_template
+from .send_sms import get_sms_stats
+from .sms_broadcast import cancel_broadcast, get_broadcast, list_broadcasts, preview_broadcast, start_broadcast
+from .cached_upstream import CachedUpstream, get_upstream_stats, http_session
+from .analytics_rollups import get_rollup_stats, refresh_rollups, rollup_source
+from .analytics_cache import (cache_get, cache_put, cache_versions, cached_analytics, canonical_args,
+                              get_analytics_cache_stats, invalidate_analytics)
+from .analytics_columnar import columnar_widget, get_columnar_stats, refresh_columnar
+from .analytics_filters import JOB_STATUS_MAPPING, MANILA_INDICATORS, SCHEDULE_MAPPING, date_range, year_range
+from concurrent.futures import ThreadPoolExecutor, wait as wait_futures
 from datetime import datetime, timedelta
+from functools import wraps
+from werkzeug.datastructures import MultiDict
 import secrets
 import json
 import os
 import logging
 import io
 import csv
-import requests
 
 logger = logging.getLogger(__name__)
 
@@ -80,32 +95,77 @@ def _parse_multi(args, key):
     return [x.strip() for x in val.split('|') if x.strip()]
 
 
-def _matches_age_bracket(age, age_brackets):
-    """Check if age matches any of the specified age brackets."""
-    # If no age brackets are selected, include ALL ages
-    if not age_brackets:
-        return True
+# Range predicates used by the applicant analytics filters
+APPLICANT_ANALYTICS_INDEXES = {
+    "idx_applicants_age": "(age)",
+    "idx_applicants_created_at": "(created_at)",
+}
+
+
+def ensure_applicant_analytics_indexes(conn=None):
+    """Create the applicant analytics indexes if missing (startup migration)."""
+    local_conn = conn or create_connection()
+    if not local_conn:
+        return False
+
+    cursor = None
+    try:
+        cursor = local_conn.cursor(dictionary=True, buffered=True)
+        cursor.execute("SHOW INDEX FROM applicants")
+        existing = {row["Key_name"] for row in cursor.fetchall()}
 
-    if not age:
+        for name, columns in APPLICANT_ANALYTICS_INDEXES.items():
+            if name not in existing:
+                print(f"[analytics] Creating index {name}")
+                cursor.execute(f"CREATE INDEX {name} ON applicants {columns}")
+
+        local_conn.commit()
+        return True
+    except Exception as exc:
+        print(f"[analytics] Applicant index migration failed: {exc}")
         return False
+    finally:
+        if cursor:
+            cursor.close()
+        if conn is None:
+            local_conn.close()
 
-    age_int = int(age)
 
+def _age_bracket_clause(age_brackets, alias="a"):
+    """
+    WHERE fragment for age brackets ("18-24", "60+"): an OR of range
+    predicates. Malformed brackets are ignored; if none are valid nothing matches.
+    """
+    ranges = []
+    params = []
     for bracket in age_brackets:
         if bracket == "60+":
-            if age_int >= 60:
-                return True
+            ranges.append(f"{alias}.age >= %s")
+            params.append(60)
         elif '-' in bracket:
             try:
                 start, end = bracket.split('-')
-                start_age = int(start)
-                end_age = int(end)
-                if start_age <= age_int <= end_age:
-                    return True
+                params.extend([int(start), int(end)])
             except ValueError:
                 continue
+            ranges.append(f"{alias}.age BETWEEN %s AND %s")
+
+    if not ranges:
+        return "1=0", []
+    # NULL/0 ages never match a bracket
+    return f"({alias}.age > 0 AND ({' OR '.join(ranges)}))", params
 
-    return False
+
+# Query args read by each build_*_filters(), for the analytics response cache key
+DATE_FILTER_ARGS = ("date_from", "date_to", "quick_range")
+APPLICANT_FILTER_ARGS = DATE_FILTER_ARGS + (
+    "applicant_status", "applicant_is_active", "sex", "education", "is_pwd", "has_work_exp",
+    "applicant_province", "applicant_city", "applicant_barangay", "age_bracket")
+EMPLOYER_FILTER_ARGS = DATE_FILTER_ARGS + (
+    "employer_status", "employer_is_active", "industry", "recruitment_type",
+    "employer_province", "employer_city", "employer_barangay")
+JOB_FILTER_ARGS = DATE_FILTER_ARGS + ("job_status", "work_schedule")
+APPLICATION_FILTER_ARGS = DATE_FILTER_ARGS + ("application_status", "work_schedule")
 
 
 def build_applicants_filters(args, alias="a"):
@@ -114,23 +174,7 @@ def build_applicants_filters(args, alias="a"):
     params = []
 
     # Time period (created_at) - no changes needed
-    date_from = args.get("date_from")
-    date_to = args.get("date_to")
-    quick_range = args.get("quick_range")
-
-    if quick_range and not (date_from or date_to):
-        today = datetime.today().date()
-        if quick_range == "last_30":
-            date_from = (today - timedelta(days=30)).isoformat()
-            date_to = today.isoformat()
-        elif quick_range == "ytd":
-            date_from = f"{today.year}-01-01"
-            date_to = today.isoformat()
-        elif quick_range == "qtd":
-            quarter = (today.month - 1) // 3 + 1
-            start_month = 3 * (quarter - 1) + 1
-            date_from = f"{today.year}-{start_month:02d}-01"
-            date_to = today.isoformat()
+    date_from, date_to = date_range(args)
 
     if date_from:
         clauses.append(f"{alias}.created_at >= %s")
@@ -197,10 +241,12 @@ def build_applicants_filters(args, alias="a"):
         clauses.append(f"UPPER({alias}.barangay) IN ({placeholders})")
         params.extend([barangay.upper() for barangay in barangays])
 
-    # Age bracket filtering - parse the parameter so it's available for post-processing
+    # Age brackets ("18-24", "60+") become range predicates on the age index
     age_brackets = _parse_multi(args, "age_bracket")
-    # Note: Age bracket filtering is applied in Python after SQL query
-    # We just need to ensure the parameter is parsed
+    if age_brackets:
+        age_sql, age_params = _age_bracket_clause(age_brackets, alias)
+        clauses.append(age_sql)
+        params.extend(age_params)
 
     return " AND ".join(clauses), tuple(params)
 
@@ -211,23 +257,7 @@ def build_employers_filters(args, alias="e"):
     params = []
 
     # Time period (created_at) - no changes needed here
-    date_from = args.get("date_from")
-    date_to = args.get("date_to")
-    quick_range = args.get("quick_range")
-
-    if quick_range and not (date_from or date_to):
-        today = datetime.today().date()
-        if quick_range == "last_30":
-            date_from = (today - timedelta(days=30)).isoformat()
-            date_to = today.isoformat()
-        elif quick_range == "ytd":
-            date_from = f"{today.year}-01-01"
-            date_to = today.isoformat()
-        elif quick_range == "qtd":
-            quarter = (today.month - 1) // 3 + 1
-            start_month = 3 * (quarter - 1) + 1
-            date_from = f"{today.year}-{start_month:02d}-01"
-            date_to = today.isoformat()
+    date_from, date_to = date_range(args)
 
     if date_from:
         clauses.append(f"{alias}.created_at >= %s")
@@ -283,9 +313,7 @@ def build_employers_filters(args, alias="e"):
 
     if provinces:
         placeholders = ",".join(["%s"] * len(provinces))
-        manila_indicators = {"MANILA", "METRO MANILA",
-                             "NCR", "NATIONAL CAPITAL REGION"}
-        has_manila = any(p.upper() in manila_indicators for p in provinces)
+        has_manila = any(p.upper() in MANILA_INDICATORS for p in provinces)
 
         if has_manila:
             print("DEBUG - Manila special case triggered")
@@ -315,23 +343,7 @@ def build_jobs_filters(args, alias="j"):
     clauses = ["1=1"]
     params = []
 
-    date_from = args.get("date_from")
-    date_to = args.get("date_to")
-    quick_range = args.get("quick_range")
-
-    if quick_range and not (date_from or date_to):
-        today = datetime.today().date()
-        if quick_range == "last_30":
-            date_from = (today - timedelta(days=30)).isoformat()
-            date_to = today.isoformat()
-        elif quick_range == "ytd":
-            date_from = f"{today.year}-01-01"
-            date_to = today.isoformat()
-        elif quick_range == "qtd":
-            quarter = (today.month - 1) // 3 + 1
-            start_month = 3 * (quarter - 1) + 1
-            date_from = f"{today.year}-{start_month:02d}-01"
-            date_to = today.isoformat()
+    date_from, date_to = date_range(args)
 
     if date_from:
         clauses.append(f"{alias}.created_at >= %s")
@@ -343,13 +355,7 @@ def build_jobs_filters(args, alias="j"):
     job_statuses = _parse_multi(args, "job_status")
     if job_statuses:
         # Map filter values to database values
-        status_mapping = {
-            "Active": "active",
-            "Inactive": "inactive",
-            "Archived": "archived",
-            "Suspended": "suspended"
-        }
-        db_statuses = [status_mapping.get(status, status)
+        db_statuses = [JOB_STATUS_MAPPING.get(status, status)
                        for status in job_statuses]
 
         placeholders = ",".join(["%s"] * len(db_statuses))
@@ -359,13 +365,7 @@ def build_jobs_filters(args, alias="j"):
     work_schedules = _parse_multi(args, "work_schedule")
     if work_schedules:
         # Map user-friendly filter values to actual database values
-        schedule_mapping = {
-            "Full-Time": "full-time",
-            "Part-Time": "part-time",
-            "Contract": "contract",
-            "Freelance": "freelance"
-        }
-        db_schedules = [schedule_mapping.get(
+        db_schedules = [SCHEDULE_MAPPING.get(
             schedule, schedule) for schedule in work_schedules]
 
         placeholders = ",".join(["%s"] * len(db_schedules))
@@ -375,28 +375,16 @@ def build_jobs_filters(args, alias="j"):
     return " AND ".join(clauses), tuple(params)
 
 
-def build_applications_filters(args, alias="a"):
-    """Build WHERE clause + params for application analytics filters."""
+def build_applications_filters(args, alias="a", jobs_alias="j"):
+    """
+    Build WHERE clause + params for application analytics filters.
+    `jobs_alias` is the joined jobs table (the applications rollup keeps
+    work_schedule itself, so pass its own alias there).
+    """
     clauses = ["1=1"]
     params = []
 
-    date_from = args.get("date_from")
-    date_to = args.get("date_to")
-    quick_range = args.get("quick_range")
-
-    if quick_range and not (date_from or date_to):
-        today = datetime.today().date()
-        if quick_range == "last_30":
-            date_from = (today - timedelta(days=30)).isoformat()
-            date_to = today.isoformat()
-        elif quick_range == "ytd":
-            date_from = f"{today.year}-01-01"
-            date_to = today.isoformat()
-        elif quick_range == "qtd":
-            quarter = (today.month - 1) // 3 + 1
-            start_month = 3 * (quarter - 1) + 1
-            date_from = f"{today.year}-{start_month:02d}-01"
-            date_to = today.isoformat()
+    date_from, date_to = date_range(args)
 
     # Use applied_at for applications
     if date_from:
@@ -418,17 +406,11 @@ def build_applications_filters(args, alias="a"):
     work_schedules = _parse_multi(args, "work_schedule")
     if work_schedules:
         # Map user-friendly filter values to actual database values
-        schedule_mapping = {
-            "Full-Time": "full-time",
-            "Part-Time": "part-time",
-            "Contract": "contract",
-            "Freelance": "freelance"
-        }
-        db_schedules = [schedule_mapping.get(
+        db_schedules = [SCHEDULE_MAPPING.get(
             schedule, schedule) for schedule in work_schedules]
 
         placeholders = ",".join(["%s"] * len(db_schedules))
-        clauses.append(f"UPPER(j.work_schedule) IN ({placeholders})")
+        clauses.append(f"UPPER({jobs_alias}.work_schedule) IN ({placeholders})")
         params.extend([schedule.upper() for schedule in db_schedules])
 
     return " AND ".join(clauses), tuple(params)
@@ -475,7 +457,8 @@ def analytics_export():
         def get(self, key, default=None):
             v = self._d.get(key, default)
             if isinstance(v, list):
-                return ",".join(v)
+                # Same separator _parse_multi splits on
+                return "|".join(v)
             return v
 
     args_obj = _Args(filters)
@@ -521,12 +504,6 @@ def analytics_export():
                 fetch="all",
             ) or []
 
-            # Apply age bracket filtering in Python since it's complex for SQL
-            age_brackets = _parse_multi(args_obj, "age_bracket")
-            if age_brackets:
-                rows = [row for row in rows if _matches_age_bracket(
-                    row['age'], age_brackets)]
-
         elif module == "employers":
             where_sql, params = build_employers_filters(args_obj, alias="e")
             rows = run_query(
@@ -760,197 +737,204 @@ def admin_home():
     return render_template("Admin/admin_home.html")
 
 
-@admin_bp.route("/api/analytics/summary", methods=["GET"])
-def admin_analytics_summary():
-
+def _analytics_json(compute, label, failure_message, log_prefix="[analytics]"):
+    """Run compute(conn, request.args) on its own connection and wrap the result as JSON."""
     conn = create_connection()
     if not conn:
         return jsonify({"success": False, "message": "Database connection failed"}), 500
 
     try:
-        applicants_row = run_query(
-            conn, "SELECT COUNT(*) AS total FROM applicants", fetch="one") or {}
-        employers_row = run_query(
-            conn, "SELECT COUNT(*) AS total FROM employers", fetch="one") or {}
-        jobs_row = run_query(
-            conn, "SELECT COUNT(*) AS total FROM jobs WHERE status = 'active'", fetch="one") or {}
-        applications_row = run_query(
-            conn, "SELECT COUNT(*) AS total FROM applications", fetch="one") or {}
-
-        payload = {
-            "totalApplicants": _to_int(applicants_row.get("total")),
-            "totalEmployers": _to_int(employers_row.get("total")),
-            "activeJobs": _to_int(jobs_row.get("total")),
-            "totalApplications": _to_int(applications_row.get("total")),
-        }
-        return jsonify({"success": True, "data": payload})
+        return jsonify({"success": True, "data": compute(conn, request.args)})
     except Exception as exc:
-        print("[analytics] summary error:", exc)
-        return jsonify({"success": False, "message": "Failed to load summary"}), 500
+        print(f"{log_prefix} {label} error:", exc)
+        return jsonify({"success": False, "message": failure_message}), 500
     finally:
         conn.close()
 
 
-@admin_bp.route("/api/analytics/applicants-per-month", methods=["GET"])
-def admin_analytics_applicants_per_month():
-
-    year_filter = request.args.get("year", type=int)
-
-    conn = create_connection()
-    if not conn:
-        return jsonify({"success": False, "message": "Database connection failed"}), 500
+def _columnar(widget):
+    """Answer a data function from the in-memory columnar snapshot when it is loaded (see analytics_columnar)."""
+    def decorator(compute):
+        @wraps(compute)
+        def wrapper(conn, args):
+            data = columnar_widget(widget, args)
+            return compute(conn, args) if data is None else data
+        return wrapper
+    return decorator
 
-    try:
-        where_sql, params = build_applicants_filters(request.args, alias="a")
-        if year_filter:
-            where_sql += " AND YEAR(a.created_at) = %s"
-            params = (*params, year_filter)
 
-        # Get all applicants with their creation month and age
-        rows = run_query(
+@_columnar("summary")
+def _summary_data(conn, args):
+    totals = {}
+    for fact, where_sql in (("applicants", "1=1"), ("employers", "1=1"),
+                            ("jobs", "x.status = 'active'"), ("applications", "1=1")):
+        rollup = rollup_source(fact, {}, conn)
+        row = run_query(
             conn,
-            f"""
-            SELECT
-                DATE_FORMAT(a.created_at, '%Y-%m') AS month_key,
-                DATE_FORMAT(a.created_at, '%b %Y') AS label,
-                MONTH(a.created_at) AS month_num,
-                YEAR(a.created_at) AS year_num,
-                a.age
-            FROM applicants a
-            WHERE {where_sql}
-            ORDER BY year_num ASC, month_num ASC
-            """,
-            params,
-            fetch="all",
-        ) or []
+            f"SELECT {'SUM(x.total)' if rollup else 'COUNT(*)'} AS total "
+            f"FROM {rollup or fact} x WHERE {where_sql}",
+            fetch="one") or {}
+        totals[fact] = _to_int(row.get("total"))
+
+    payload = {
+        "totalApplicants": totals["applicants"],
+        "totalEmployers": totals["employers"],
+        "activeJobs": totals["jobs"],
+        "totalApplications": totals["applications"],
+    }
+    return payload
 
-        # Apply age bracket filtering in Python
-        age_brackets = _parse_multi(request.args, "age_bracket")
-        if age_brackets:
-            rows = [row for row in rows if _matches_age_bracket(
-                row['age'], age_brackets)]
-
-        # Group by month after filtering
-        monthly_counts = {}
-        for row in rows:
-            month_key = row.get("month_key")
-            if month_key not in monthly_counts:
-                monthly_counts[month_key] = {
-                    "month": _to_int(row.get("month_num")),
-                    "year": _to_int(row.get("year_num")),
-                    "label": row.get("label"),
-                    "count": 0
-                }
-            monthly_counts[month_key]["count"] += 1
-
-        data = list(monthly_counts.values())
-        return jsonify({"success": True, "data": data})
-    except Exception as exc:
-        print("[analytics] applicants-per-month error:", exc)
-        return jsonify({"success": False, "message": "Failed to load applicants per month"}), 500
-    finally:
-        conn.close()
 
+@admin_bp.route("/api/analytics/summary", methods=["GET"])
+@cached_analytics(("applicants", "employers", "jobs", "applications"))
+def admin_analytics_summary():
+    return _analytics_json(_summary_data, "summary", "Failed to load summary")
 
-@admin_bp.route("/api/analytics/applications-by-category", methods=["GET"])
-def admin_analytics_applications_by_category():
 
-    month_filter = request.args.get("month", type=int)
-    year_filter = request.args.get("year", type=int)
-    category_filter = request.args.get("category", type=str)
+@_columnar("applicants_trend")
+def _applicants_per_month_data(conn, args):
+    year_filter = args.get("year", type=int)
 
-    conn = create_connection()
-    if not conn:
-        return jsonify({"success": False, "message": "Database connection failed"}), 500
+    rollup = rollup_source("applicants", args, conn)
+    where_sql, params = build_applicants_filters(args, alias="a")
+    if year_filter:
+        # Range instead of YEAR() so the created_at index can be used
+        bounds = year_range(year_filter)
+        if bounds:
+            where_sql += " AND a.created_at >= %s AND a.created_at < %s"
+            params = (*params, *bounds)
+        else:
+            where_sql += " AND 1=0"
+
+    rows = run_query(
+        conn,
+        f"""
+        SELECT
+            YEAR(a.created_at) AS year_num,
+            MONTH(a.created_at) AS month_num,
+            {"SUM(a.total)" if rollup else "COUNT(*)"} AS count
+        FROM {rollup or "applicants"} a
+        WHERE {where_sql}
+        GROUP BY year_num, month_num
+        ORDER BY year_num ASC, month_num ASC
+        """,
+        params,
+        fetch="all",
+    ) or []
+
+    data = [{
+        "month": _to_int(row["month_num"]),
+        "year": _to_int(row["year_num"]),
+        "label": datetime(_to_int(row["year_num"]), _to_int(row["month_num"]), 1).strftime("%b %Y"),
+        "count": _to_int(row["count"]),
+    } for row in rows]
+    return data
 
-    try:
-        query = """
-            SELECT
-                COALESCE(NULLIF(j.work_schedule, ''), 'Unspecified') AS category,
-                COUNT(a.id) AS total
-            FROM applications a
-            JOIN jobs j ON a.job_id = j.job_id
-            WHERE 1=1
-        """
-        params = []
-
-        if month_filter:
-            query += " AND MONTH(a.created_at) = %s"
-            params.append(month_filter)
-        if year_filter:
-            query += " AND YEAR(a.created_at) = %s"
-            params.append(year_filter)
-        if category_filter:
-            query += " AND j.work_schedule = %s"
-            params.append(category_filter)
-
-        query += " GROUP BY category ORDER BY total DESC"
-
-        rows = run_query(conn, query, tuple(params)
-                         if params else None, fetch="all") or []
-
-        data = [
-            {"category": row.get("category"),
-             "count": _to_int(row.get("total"))}
-            for row in rows
-        ]
-        return jsonify({"success": True, "data": data})
-    except Exception as exc:
-        print("[analytics] applications-by-category error:", exc)
-        return jsonify({"success": False, "message": "Failed to load applications by category"}), 500
-    finally:
-        conn.close()
 
+@admin_bp.route("/api/analytics/applicants-per-month", methods=["GET"])
+@cached_analytics(("applicants",), APPLICANT_FILTER_ARGS + ("year",))
+def admin_analytics_applicants_per_month():
+    return _analytics_json(_applicants_per_month_data, "applicants-per-month", "Failed to load applicants per month")
+
+
+@_columnar("applications_by_category")
+def _applications_by_category_data(conn, args):
+    month_filter = args.get("month", type=int)
+    year_filter = args.get("year", type=int)
+    category_filter = args.get("category", type=str)
+
+    query = """
+        SELECT
+            COALESCE(NULLIF(j.work_schedule, ''), 'Unspecified') AS category,
+            COUNT(a.id) AS total
+        FROM applications a
+        JOIN jobs j ON a.job_id = j.job_id
+        WHERE 1=1
+    """
+    params = []
 
-@admin_bp.route("/api/analytics/hiring-ratio", methods=["GET"])
-def admin_analytics_hiring_ratio():
+    if month_filter:
+        query += " AND MONTH(a.created_at) = %s"
+        params.append(month_filter)
+    if year_filter:
+        query += " AND YEAR(a.created_at) = %s"
+        params.append(year_filter)
+    if category_filter:
+        query += " AND j.work_schedule = %s"
+        params.append(category_filter)
+
+    query += " GROUP BY 1 ORDER BY total DESC"
+
+    rows = run_query(conn, query, tuple(params)
+                     if params else None, fetch="all") or []
+
+    data = [
+        {"category": row.get("category"),
+         "count": _to_int(row.get("total"))}
+        for row in rows
+    ]
+    return data
 
-    month_filter = request.args.get("month", type=int)
-    year_filter = request.args.get("year", type=int)
 
-    conn = create_connection()
-    if not conn:
-        return jsonify({"success": False, "message": "Database connection failed"}), 500
+@admin_bp.route("/api/analytics/applications-by-category", methods=["GET"])
+@cached_analytics(("applications", "jobs"), ("month", "year", "category"))
+def admin_analytics_applications_by_category():
+    return _analytics_json(_applications_by_category_data, "applications-by-category", "Failed to load applications by category")
+
+
+@_columnar("hiring_ratio")
+def _hiring_ratio_data(conn, args):
+    month_filter = args.get("month", type=int)
+    year_filter = args.get("year", type=int)
+
+    # The applications rollup is dated by applied_at, which is set with
+    # created_at when the application is submitted
+    rollup = rollup_source("applications", {}, conn)
+    date_col = "applied_at" if rollup else "created_at"
+    query = f"""
+        SELECT COALESCE(status, 'Pending') AS status, {"SUM(total)" if rollup else "COUNT(*)"} AS total
+        FROM {rollup or "applications"}
+        WHERE 1=1
+    """
+    params = []
 
-    try:
-        query = """
-            SELECT COALESCE(status, 'Pending') AS status, COUNT(*) AS total
-            FROM applications
-            WHERE 1=1
-        """
-        params = []
+    if year_filter:
+        # Ranges instead of YEAR()/MONTH() so the date index can be used
+        bounds = year_range(year_filter, month_filter)
+        if bounds:
+            query += f" AND {date_col} >= %s AND {date_col} < %s"
+            params.extend(bounds)
+        else:
+            query += " AND 1=0"
+    elif month_filter:
+        query += f" AND MONTH({date_col}) = %s"
+        params.append(month_filter)
 
-        if month_filter:
-            query += " AND MONTH(created_at) = %s"
-            params.append(month_filter)
-        if year_filter:
-            query += " AND YEAR(created_at) = %s"
-            params.append(year_filter)
+    query += " GROUP BY 1"
 
-        query += " GROUP BY status"
+    rows = run_query(conn, query, tuple(params)
+                     if params else None, fetch="all") or []
 
-        rows = run_query(conn, query, tuple(params)
-                         if params else None, fetch="all") or []
+    breakdown = {
+        row.get("status"): _to_int(row.get("total"))
+        for row in rows
+    }
+    hired = breakdown.get("Hired", 0)
+    total = sum(breakdown.values())
+    not_hired = max(total - hired, 0)
+
+    data = {
+        "hired": hired,
+        "not_hired": not_hired,
+        "breakdown": breakdown,
+    }
+    return data
 
-        breakdown = {
-            row.get("status"): _to_int(row.get("total"))
-            for row in rows
-        }
-        hired = breakdown.get("Hired", 0)
-        total = sum(breakdown.values())
-        not_hired = max(total - hired, 0)
-
-        data = {
-            "hired": hired,
-            "not_hired": not_hired,
-            "breakdown": breakdown,
-        }
-        return jsonify({"success": True, "data": data})
-    except Exception as exc:
-        print("[analytics] hiring-ratio error:", exc)
-        return jsonify({"success": False, "message": "Failed to load hiring ratio"}), 500
-    finally:
-        conn.close()
+
+@admin_bp.route("/api/analytics/hiring-ratio", methods=["GET"])
+@cached_analytics(("applications",), ("month", "year"))
+def admin_analytics_hiring_ratio():
+    return _analytics_json(_hiring_ratio_data, "hiring-ratio", "Failed to load hiring ratio")
 
 
 @admin_bp.route("/api/filters/applicants/locations", methods=["GET"])
@@ -1079,555 +1063,371 @@ def employers_location_filters():
         conn.close()
 
 
-@admin_bp.route("/api/analytics/applicants-by-province", methods=["GET"])
-def admin_analytics_applicants_by_province():
+@_columnar("applicants_by_province")
+def _applicants_by_province_data(conn, args):
+    month_filter = args.get("month", type=int)
+    year_filter = args.get("year", type=int)
 
-    month_filter = request.args.get("month", type=int)
-    year_filter = request.args.get("year", type=int)
+    where_sql, params = build_applicants_filters(args, alias="a")
 
-    conn = create_connection()
-    if not conn:
-        return jsonify({"success": False, "message": "Database connection failed"}), 500
+    # Add month/year filters if provided
+    if month_filter:
+        where_sql += " AND MONTH(a.created_at) = %s"
+        params = (*params, month_filter)
+    if year_filter:
+        where_sql += " AND YEAR(a.created_at) = %s"
+        params = (*params, year_filter)
 
-    try:
-        where_sql, params = build_applicants_filters(request.args, alias="a")
+    rows = run_query(
+        conn,
+        f"""
+        SELECT
+            COALESCE(NULLIF(a.province, ''), 'Unspecified') AS province,
+            COUNT(*) AS total
+        FROM applicants a
+        WHERE {where_sql}
+        GROUP BY 1
+        ORDER BY total DESC
+        """,
+        params,
+        fetch="all",
+    ) or []
+
+    data = [
+        {"province": row["province"], "count": _to_int(row["total"])}
+        for row in rows
+    ]
 
-        # Add month/year filters if provided
-        if month_filter:
-            where_sql += " AND MONTH(a.created_at) = %s"
-            params = (*params, month_filter)
-        if year_filter:
-            where_sql += " AND YEAR(a.created_at) = %s"
-            params = (*params, year_filter)
+    return data
 
-        # Get all applicants with province and age
-        rows = run_query(
-            conn,
-            f"""
-            SELECT
-                COALESCE(NULLIF(a.province, ''), 'Unspecified') AS province,
-                a.age
-            FROM applicants a
-            WHERE {where_sql}
-            """,
-            params,
-            fetch="all",
-        ) or []
 
-        # Apply age bracket filtering in Python
-        age_brackets = _parse_multi(request.args, "age_bracket")
-        if age_brackets:
-            rows = [row for row in rows if _matches_age_bracket(
-                row['age'], age_brackets)]
-
-        # Count by province after filtering
-        province_counts = {}
-        for row in rows:
-            province = row.get("province")
-            province_counts[province] = province_counts.get(province, 0) + 1
-
-        data = [
-            {"province": province, "count": count}
-            for province, count in province_counts.items()
-        ]
-        data.sort(key=lambda x: x["count"], reverse=True)
+@admin_bp.route("/api/analytics/applicants-by-province", methods=["GET"])
+@cached_analytics(("applicants",), APPLICANT_FILTER_ARGS + ("month", "year"))
+def admin_analytics_applicants_by_province():
+    return _analytics_json(_applicants_by_province_data, "applicants-by-province", "Failed to load applicant locations")
 
-        return jsonify({"success": True, "data": data})
-    except Exception as exc:
-        print("[analytics] applicants-by-province error:", exc)
-        return jsonify({"success": False, "message": "Failed to load applicant locations"}), 500
-    finally:
-        conn.close()
+
+@_columnar("employers_by_industry")
+def _employers_by_industry_data(conn, args):
+    rows = run_query(
+        conn,
+        """
+        SELECT
+            COALESCE(NULLIF(industry, ''), 'Unspecified') AS industry,
+            COUNT(*) AS total
+        FROM employers
+        GROUP BY 1
+        ORDER BY total DESC
+        """,
+        fetch="all",
+    ) or []
+
+    data = [
+        {"industry": row.get("industry"),
+         "count": _to_int(row.get("total"))}
+        for row in rows
+    ]
+    return data
 
 
 @admin_bp.route("/api/analytics/employers-by-industry", methods=["GET"])
+@cached_analytics(("employers",))
 def admin_analytics_employers_by_industry():
-
-    conn = create_connection()
-    if not conn:
-        return jsonify({"success": False, "message": "Database connection failed"}), 500
-
-    try:
-        rows = run_query(
-            conn,
-            """
-            SELECT
-                COALESCE(NULLIF(industry, ''), 'Unspecified') AS industry,
-                COUNT(*) AS total
-            FROM employers
-            GROUP BY industry
-            ORDER BY total DESC
-            """,
-            fetch="all",
-        ) or []
-
-        data = [
-            {"industry": row.get("industry"),
-             "count": _to_int(row.get("total"))}
-            for row in rows
-        ]
-        return jsonify({"success": True, "data": data})
-    except Exception as exc:
-        print("[analytics] employers-by-industry error:", exc)
-        return jsonify({"success": False, "message": "Failed to load employer industries"}), 500
-    finally:
-        conn.close()
+    return _analytics_json(_employers_by_industry_data, "employers-by-industry", "Failed to load employer industries")
+
+
+@_columnar("applicants_summary")
+def _applicants_summary_data(conn, args):
+    where_sql, params = build_applicants_filters(args, alias="a")
+
+    counts = run_query(
+        conn,
+        f"""
+        SELECT
+          COUNT(*) AS total_registered,
+          SUM(a.is_active = 1) AS active_count
+        FROM applicants a
+        WHERE {where_sql}
+        """,
+        params,
+        fetch="one",
+    ) or {}
+
+    total_registered = _to_int(counts.get("total_registered"))
+    data = {
+        "total_registered": total_registered,
+        "active_applicants": _to_int(counts.get("active_count")),
+        "new_registrations": total_registered,  # This might need adjustment
+    }
+    return data
 
 
 @admin_bp.route("/api/analytics/applicants/summary", methods=["GET"])
+@cached_analytics(("applicants",), APPLICANT_FILTER_ARGS)
 def applicants_summary():
     """Applicants volume & active count, respecting filters."""
+    return _analytics_json(_applicants_summary_data, "applicants_summary", "Failed to load applicants summary")
+
+
+@_columnar("demographics")
+def _applicants_demographics_data(conn, args):
+    where_sql, params = build_applicants_filters(args, alias="a")
+
+    # One grouped pass; the handful of (sex, education, age group) cells
+    # are folded into the three distributions below
+    groups = run_query(
+        conn,
+        f"""
+        SELECT
+          COALESCE(NULLIF(a.sex, ''), 'Unspecified') AS sex,
+          COALESCE(NULLIF(a.education, ''), 'Unspecified') AS education,
+          CASE
+            WHEN a.age IS NULL OR a.age = 0 THEN 'Unspecified'
+            WHEN a.age < 18 THEN 'Under 18'
+            WHEN a.age <= 24 THEN '18-24'
+            WHEN a.age <= 34 THEN '25-34'
+            WHEN a.age <= 44 THEN '35-44'
+            ELSE '45+'
+          END AS age_group,
+          COUNT(*) AS total
+        FROM applicants a
+        WHERE {where_sql}
+        GROUP BY 1, 2, 3
+        """,
+        params,
+        fetch="all",
+    ) or []
+
+    sex_counts = {}
+    education_counts = {}
+    age_group_counts = {
+        "Under 18": 0,
+        "18-24": 0,
+        "25-34": 0,
+        "35-44": 0,
+        "45+": 0,
+        "Unspecified": 0
+    }
 
-    conn = create_connection()
-    if not conn:
-        return jsonify({"success": False, "message": "Database connection failed"}), 500
-
-    try:
-        where_sql, params = build_applicants_filters(request.args, alias="a")
-
-        # Get all applicants first
-        rows = run_query(
-            conn,
-            f"""
-            SELECT
-              a.applicant_id,
-              a.age
-            FROM applicants a
-            WHERE {where_sql}
-            """,
-            params,
-            fetch="all",
-        ) or []
-
-        # Apply age bracket filtering in Python
-        age_brackets = _parse_multi(request.args, "age_bracket")
-        if age_brackets:
-            rows = [row for row in rows if _matches_age_bracket(
-                row['age'], age_brackets)]
-
-        # Now calculate summary based on filtered rows
-        total_registered = len(rows)
-        active_count = run_query(
-            conn,
-            f"""
-            SELECT COUNT(*) AS active_count
-            FROM applicants a
-            WHERE {where_sql} AND a.is_active = 1
-            """,
-            params,
-            fetch="one",
-        ) or {}
-
-        # Apply age bracket filtering to active count too
-        if age_brackets:
-            active_rows = run_query(
-                conn,
-                f"""
-                SELECT a.applicant_id, a.age
-                FROM applicants a
-                WHERE {where_sql} AND a.is_active = 1
-                """,
-                params,
-                fetch="all",
-            ) or []
-            active_rows = [row for row in active_rows if _matches_age_bracket(
-                row['age'], age_brackets)]
-            active_count = {"active_count": len(active_rows)}
-        else:
-            active_count = {"active_count": _to_int(
-                active_count.get("active_count"))}
-
-        data = {
-            "total_registered": total_registered,
-            "active_applicants": active_count["active_count"],
-            "new_registrations": total_registered,  # This might need adjustment
-        }
-        return jsonify({"success": True, "data": data})
-    except Exception as exc:
-        print("[analytics] applicants_summary error:", exc)
-        return jsonify({"success": False, "message": "Failed to load applicants summary"}), 500
-    finally:
-        conn.close()
+    for group in groups:
+        total = _to_int(group["total"])
+        sex_counts[group["sex"]] = sex_counts.get(group["sex"], 0) + total
+        education_counts[group["education"]] = education_counts.get(
+            group["education"], 0) + total
+        age_group_counts[group["age_group"]] += total
+
+    data = {
+        "by_sex": [
+            {"label": label, "count": count}
+            for label, count in sex_counts.items()
+        ],
+        "by_education": [
+            {"label": label, "count": count}
+            for label, count in education_counts.items()
+        ],
+        "by_age_group": [
+            {"age_group": age_group, "count": count}
+            for age_group, count in age_group_counts.items()
+            if count > 0
+        ],
+    }
+    return data
 
 
 @admin_bp.route("/api/analytics/applicants/demographics", methods=["GET"])
+@cached_analytics(("applicants",), APPLICANT_FILTER_ARGS)
 def applicants_demographics():
     """Applicants by sex, education, and age groups."""
-
-    conn = create_connection()
-    if not conn:
-        return jsonify({"success": False, "message": "Database connection failed"}), 500
-
-    try:
-        where_sql, params = build_applicants_filters(request.args, alias="a")
-
-        # Get all applicants first
-        all_applicants = run_query(
-            conn,
-            f"""
-            SELECT
-              a.applicant_id,
-              a.sex,
-              a.education,
-              a.age
-            FROM applicants a
-            WHERE {where_sql}
-            """,
-            params,
-            fetch="all",
-        ) or []
-
-        # Apply age bracket filtering in Python
-        age_brackets = _parse_multi(request.args, "age_bracket")
-        if age_brackets:
-            all_applicants = [row for row in all_applicants if _matches_age_bracket(
-                row['age'], age_brackets)]
-
-        # Calculate demographics from filtered data
-        sex_counts = {}
-        education_counts = {}
-        age_group_counts = {
-            "Under 18": 0,
-            "18-24": 0,
-            "25-34": 0,
-            "35-44": 0,
-            "45+": 0,
-            "Unspecified": 0
-        }
-
-        for applicant in all_applicants:
-            # Sex distribution
-            sex = applicant.get("sex") or "Unspecified"
-            sex_counts[sex] = sex_counts.get(sex, 0) + 1
-
-            # Education distribution
-            education = applicant.get("education") or "Unspecified"
-            education_counts[education] = education_counts.get(
-                education, 0) + 1
-
-            # Age groups
-            age = applicant.get("age")
-            if not age:
-                age_group_counts["Unspecified"] += 1
-            elif age < 18:
-                age_group_counts["Under 18"] += 1
-            elif 18 <= age <= 24:
-                age_group_counts["18-24"] += 1
-            elif 25 <= age <= 34:
-                age_group_counts["25-34"] += 1
-            elif 35 <= age <= 44:
-                age_group_counts["35-44"] += 1
-            else:
-                age_group_counts["45+"] += 1
-
-        data = {
-            "by_sex": [
-                {"label": label, "count": count}
-                for label, count in sex_counts.items()
-            ],
-            "by_education": [
-                {"label": label, "count": count}
-                for label, count in education_counts.items()
-            ],
-            "by_age_group": [
-                {"age_group": age_group, "count": count}
-                for age_group, count in age_group_counts.items()
-                if count > 0
-            ],
-        }
-        return jsonify({"success": True, "data": data})
-    except Exception as exc:
-        print("[analytics] applicants_demographics error:", exc)
-        return jsonify({"success": False, "message": "Failed to load applicant demographics"}), 500
-    finally:
-        conn.close()
+    return _analytics_json(_applicants_demographics_data, "applicants_demographics", "Failed to load applicant demographics")
+
+
+@_columnar("location")
+def _applicants_location_data(conn, args):
+    where_sql, params = build_applicants_filters(args, alias="a")
+
+    groups = run_query(
+        conn,
+        f"""
+        SELECT
+          COALESCE(NULLIF(a.city, ''), 'Unspecified') AS city,
+          a.is_from_lipa = 1 AS from_lipa,
+          COUNT(*) AS total
+        FROM applicants a
+        WHERE {where_sql}
+        GROUP BY 1, 2
+        """,
+        params,
+        fetch="all",
+    ) or []
+
+    city_counts = {}
+    lipa_counts = {"From Lipa": 0, "Not From Lipa": 0}
+
+    for group in groups:
+        total = _to_int(group["total"])
+        city_counts[group["city"]] = city_counts.get(group["city"], 0) + total
+        lipa_counts["From Lipa" if group["from_lipa"] == 1 else "Not From Lipa"] += total
+
+    # Get top 10 cities
+    top_cities = sorted(city_counts.items(),
+                        key=lambda x: x[1], reverse=True)[:10]
+
+    data = {
+        "by_city": [
+            {"city": city, "count": count}
+            for city, count in top_cities
+        ],
+        "by_is_from_lipa": [
+            {"status": status, "count": count}
+            for status, count in lipa_counts.items()
+        ],
+    }
+    return data
 
 
 @admin_bp.route("/api/analytics/applicants/location", methods=["GET"])
+@cached_analytics(("applicants",), APPLICANT_FILTER_ARGS)
 def applicants_location():
     """Applicants by top cities and is_from_lipa status."""
+    return _analytics_json(_applicants_location_data, "applicants_location", "Failed to load applicant location data")
 
-    conn = create_connection()
-    if not conn:
-        return jsonify({"success": False, "message": "Database connection failed"}), 500
 
-    try:
-        where_sql, params = build_applicants_filters(request.args, alias="a")
-
-        # Get all applicants with location data and age
-        rows = run_query(
-            conn,
-            f"""
-            SELECT
-              a.applicant_id,
-              COALESCE(NULLIF(a.city, ''), 'Unspecified') AS city,
-              a.is_from_lipa,
-              a.age
-            FROM applicants a
-            WHERE {where_sql}
-            """,
-            params,
-            fetch="all",
-        ) or []
-
-        # Apply age bracket filtering in Python
-        age_brackets = _parse_multi(request.args, "age_bracket")
-        if age_brackets:
-            rows = [row for row in rows if _matches_age_bracket(
-                row['age'], age_brackets)]
-
-        # Calculate city counts from filtered data
-        city_counts = {}
-        lipa_counts = {"From Lipa": 0, "Not From Lipa": 0}
-
-        for row in rows:
-            # City counts
-            city = row.get("city")
-            city_counts[city] = city_counts.get(city, 0) + 1
-
-            # Lipa status counts
-            is_from_lipa = row.get("is_from_lipa")
-            if is_from_lipa == 1:
-                lipa_counts["From Lipa"] += 1
-            else:
-                lipa_counts["Not From Lipa"] += 1
-
-        # Get top 10 cities
-        top_cities = sorted(city_counts.items(),
-                            key=lambda x: x[1], reverse=True)[:10]
-
-        data = {
-            "by_city": [
-                {"city": city, "count": count}
-                for city, count in top_cities
-            ],
-            "by_is_from_lipa": [
-                {"status": status, "count": count}
-                for status, count in lipa_counts.items()
-            ],
-        }
-        return jsonify({"success": True, "data": data})
-    except Exception as exc:
-        print("[analytics] applicants_location error:", exc)
-        return jsonify({"success": False, "message": "Failed to load applicant location data"}), 500
-    finally:
-        conn.close()
-
-
-@admin_bp.route("/api/analytics/applicants/experience", methods=["GET"])
-def applicants_experience():
-    """Applicants by years of experience."""
-
-    conn = create_connection()
-    if not conn:
-        return jsonify({"success": False, "message": "Database connection failed"}), 500
+def _experience_range(years_exp):
+    """Bucket a free-form years_experience value into the experience chart's ranges."""
+    # Handle your actual data formats
+    if (years_exp is None or
+        years_exp == '' or
+        years_exp == '0' or
+            str(years_exp).lower() == 'none'):
+        return "No Experience"
 
+    # Handle range formats like "1-2", "3-4"
+    if isinstance(years_exp, str) and '-' in years_exp:
+        try:
+            start, end = years_exp.split('-')
+            start_num = int(start.strip())
+            end_num = int(end.strip())
+        except (ValueError, TypeError):
+            return "Unspecified"
+        if 1 <= start_num <= 2 and 1 <= end_num <= 2:
+            return "1-2 Years"
+        if 3 <= start_num <= 5 and 3 <= end_num <= 5:
+            return "3-5 Years"
+        if 6 <= start_num <= 10 and 6 <= end_num <= 10:
+            return "6-10 Years"
+        return "Unspecified"
+
+    # Handle plus formats like "5+" and plain numbers
     try:
-        where_sql, params = build_applicants_filters(request.args, alias="a")
-
-        print(f"DEBUG - WHERE clause: {where_sql}")
-        print(f"DEBUG - Params: {params}")
-
-        # Get all applicants first
-        rows = run_query(
-            conn,
-            f"""
-            SELECT
-              a.applicant_id,
-              a.years_experience,
-              a.age
-            FROM applicants a
-            WHERE {where_sql}
-            """,
-            params,
-            fetch="all",
-        ) or []
-
-        print(f"DEBUG - Rows before age filtering: {len(rows)}")
-        for i, row in enumerate(rows[:5]):  # Show first 5 rows
-            print(
-                f"  Row {i}: age={row.get('age')}, years_experience='{row.get('years_experience')}'")
-
-        # Apply age bracket filtering in Python
-        age_brackets = _parse_multi(request.args, "age_bracket")
-        print(f"DEBUG - Age brackets from request: {age_brackets}")
-
-        if age_brackets:
-            filtered_rows = []
-            for row in rows:
-                age = row.get('age')
-                matches = _matches_age_bracket(age, age_brackets)
-                print(
-                    f"  Age {age} matches brackets {age_brackets}: {matches}")
-                if matches:
-                    filtered_rows.append(row)
-            rows = filtered_rows
-
-        print(f"DEBUG - Rows after age filtering: {len(rows)}")
-
-        # Calculate experience ranges from filtered data
-        exp_ranges = {
-            "No Experience": 0,
-            "1-2 Years": 0,
-            "3-5 Years": 0,
-            "6-10 Years": 0,
-            "10+ Years": 0,
-            "Unspecified": 0
-        }
+        if isinstance(years_exp, str) and years_exp.endswith('+'):
+            years_int = int(years_exp.replace('+', '').strip())
+            if years_int == 0:
+                return "Unspecified"
+        else:
+            years_int = int(years_exp)
+    except (ValueError, TypeError):
+        return "Unspecified"
+
+    if years_int == 0:
+        return "No Experience"
+    if 1 <= years_int <= 2:
+        return "1-2 Years"
+    if 3 <= years_int <= 5:
+        return "3-5 Years"
+    if 6 <= years_int <= 10:
+        return "6-10 Years"
+    if years_int > 10:
+        return "10+ Years"
+    return "Unspecified"
+
+
+@_columnar("experience")
+def _applicants_experience_data(conn, args):
+    where_sql, params = build_applicants_filters(args, alias="a")
+
+    # years_experience is free-form text with only a few distinct values,
+    # so group on it in SQL and bucket the distinct values here
+    groups = run_query(
+        conn,
+        f"""
+        SELECT a.years_experience, COUNT(*) AS total
+        FROM applicants a
+        WHERE {where_sql}
+        GROUP BY a.years_experience
+        """,
+        params,
+        fetch="all",
+    ) or []
+
+    exp_ranges = {
+        "No Experience": 0,
+        "1-2 Years": 0,
+        "3-5 Years": 0,
+        "6-10 Years": 0,
+        "10+ Years": 0,
+        "Unspecified": 0
+    }
 
-        for row in rows:
-            years_exp = row.get("years_experience")
-            print(f"DEBUG - Processing: years_experience='{years_exp}'")
+    for group in groups:
+        exp_ranges[_experience_range(group["years_experience"])] += _to_int(group["total"])
 
-            # Handle your actual data formats
-            if (years_exp is None or
-                years_exp == '' or
-                years_exp == '0' or
-                    str(years_exp).lower() == 'none'):
-                exp_ranges["No Experience"] += 1
+    data = {
+        "by_experience": [
+            {"range": exp_range, "count": count}
+            for exp_range, count in exp_ranges.items()
+            if count > 0
+        ],
+    }
 
-            # Handle range formats like "1-2", "3-4"
-            elif isinstance(years_exp, str) and '-' in years_exp:
-                try:
-                    start, end = years_exp.split('-')
-                    start_num = int(start.strip())
-                    end_num = int(end.strip())
-
-                    if 1 <= start_num <= 2 and 1 <= end_num <= 2:
-                        exp_ranges["1-2 Years"] += 1
-                    elif 3 <= start_num <= 5 and 3 <= end_num <= 5:
-                        exp_ranges["3-5 Years"] += 1
-                    elif 6 <= start_num <= 10 and 6 <= end_num <= 10:
-                        exp_ranges["6-10 Years"] += 1
-                    else:
-                        exp_ranges["Unspecified"] += 1
-                except (ValueError, TypeError):
-                    exp_ranges["Unspecified"] += 1
-
-            # Handle plus formats like "5+"
-            elif isinstance(years_exp, str) and years_exp.endswith('+'):
-                try:
-                    years_num = int(years_exp.replace('+', '').strip())
-                    if 1 <= years_num <= 2:
-                        exp_ranges["1-2 Years"] += 1
-                    elif 3 <= years_num <= 5:
-                        exp_ranges["3-5 Years"] += 1
-                    elif 6 <= years_num <= 10:
-                        exp_ranges["6-10 Years"] += 1
-                    elif years_num > 10:
-                        exp_ranges["10+ Years"] += 1
-                    else:
-                        exp_ranges["Unspecified"] += 1
-                except (ValueError, TypeError):
-                    exp_ranges["Unspecified"] += 1
-
-            # Handle single number formats
-            elif years_exp in ('1', '2'):
-                exp_ranges["1-2 Years"] += 1
-            elif years_exp in ('3', '4', '5'):
-                exp_ranges["3-5 Years"] += 1
-            elif years_exp in ('6', '7', '8', '9', '10'):
-                exp_ranges["6-10 Years"] += 1
+    # Sort by predefined order
+    order = {"No Experience": 1, "1-2 Years": 2,
+             "3-5 Years": 3, "6-10 Years": 4, "10+ Years": 5}
+    data["by_experience"].sort(key=lambda x: order.get(x["range"], 6))
 
-            else:
-                try:
-                    # Handle any other numeric values
-                    years_int = int(years_exp)
-                    if years_int == 0:
-                        exp_ranges["No Experience"] += 1
-                    elif 1 <= years_int <= 2:
-                        exp_ranges["1-2 Years"] += 1
-                    elif 3 <= years_int <= 5:
-                        exp_ranges["3-5 Years"] += 1
-                    elif 6 <= years_int <= 10:
-                        exp_ranges["6-10 Years"] += 1
-                    elif years_int > 10:
-                        exp_ranges["10+ Years"] += 1
-                    else:
-                        exp_ranges["Unspecified"] += 1
-                except (ValueError, TypeError):
-                    exp_ranges["Unspecified"] += 1
-
-        print(f"DEBUG - Final experience counts: {exp_ranges}")
-
-        data = {
-            "by_experience": [
-                {"range": exp_range, "count": count}
-                for exp_range, count in exp_ranges.items()
-                if count > 0
-            ],
-        }
+    return data
 
-        # Sort by predefined order
-        order = {"No Experience": 1, "1-2 Years": 2,
-                 "3-5 Years": 3, "6-10 Years": 4, "10+ Years": 5}
-        data["by_experience"].sort(key=lambda x: order.get(x["range"], 6))
 
-        print(f"DEBUG - Final data to return: {data}")
+@admin_bp.route("/api/analytics/applicants/experience", methods=["GET"])
+@cached_analytics(("applicants",), APPLICANT_FILTER_ARGS)
+def applicants_experience():
+    """Applicants by years of experience."""
+    return _analytics_json(_applicants_experience_data, "applicants_experience", "Failed to load applicant experience data")
+
+
+@_columnar("pwd")
+def _applicants_pwd_data(conn, args):
+    where_sql, params = build_applicants_filters(args, alias="a")
+
+    rows = run_query(
+        conn,
+        f"""
+        SELECT
+          COALESCE(NULLIF(a.pwd_type, ''), 'Not Specified') AS pwd_type,
+          COUNT(*) AS total
+        FROM applicants a
+        WHERE {where_sql} AND a.is_pwd = 1
+        GROUP BY 1
+        ORDER BY total DESC
+        """,
+        params,
+        fetch="all",
+    ) or []
+
+    data = {
+        "by_pwd_type": [
+            {"pwd_type": row["pwd_type"], "count": _to_int(row["total"])}
+            for row in rows
+        ],
+    }
 
-        return jsonify({"success": True, "data": data})
-    except Exception as exc:
-        print("[analytics] applicants_experience error:", exc)
-        import traceback
-        traceback.print_exc()
-        return jsonify({"success": False, "message": "Failed to load applicant experience data"}), 500
-    finally:
-        conn.close()
+    return data
 
 
 @admin_bp.route("/api/analytics/applicants/pwd", methods=["GET"])
+@cached_analytics(("applicants",), APPLICANT_FILTER_ARGS)
 def applicants_pwd():
     """Applicants by PWD type."""
-
-    conn = create_connection()
-    if not conn:
-        return jsonify({"success": False, "message": "Database connection failed"}), 500
-
-    try:
-        where_sql, params = build_applicants_filters(request.args, alias="a")
-
-        # Get all PWD applicants with their type and age
-        rows = run_query(
-            conn,
-            f"""
-            SELECT
-              a.applicant_id,
-              COALESCE(NULLIF(a.pwd_type, ''), 'Not Specified') AS pwd_type,
-              a.age
-            FROM applicants a
-            WHERE {where_sql} AND a.is_pwd = 1
-            """,
-            params,
-            fetch="all",
-        ) or []
-
-        # Apply age bracket filtering in Python
-        age_brackets = _parse_multi(request.args, "age_bracket")
-        if age_brackets:
-            rows = [row for row in rows if _matches_age_bracket(
-                row['age'], age_brackets)]
-
-        # Calculate PWD type counts from filtered data
-        pwd_counts = {}
-        for row in rows:
-            pwd_type = row.get("pwd_type")
-            pwd_counts[pwd_type] = pwd_counts.get(pwd_type, 0) + 1
-
-        data = {
-            "by_pwd_type": [
-                {"pwd_type": pwd_type, "count": count}
-                for pwd_type, count in pwd_counts.items()
-            ],
-        }
-        # Sort by count descending
-        data["by_pwd_type"].sort(key=lambda x: x["count"], reverse=True)
-
-        return jsonify({"success": True, "data": data})
-    except Exception as exc:
-        print("[analytics] applicants_pwd error:", exc)
-        return jsonify({"success": False, "message": "Failed to load PWD data"}), 500
-    finally:
-        conn.close()
+    return _analytics_json(_applicants_pwd_data, "applicants_pwd", "Failed to load PWD data")
 
 
 # ========== WIDGETS API ENDPOINTS ==========
@@ -1910,9 +1710,42 @@ def save_widget_preferences():
         conn.close()
 
 
+def _fetch_current_weather(latitude, longitude):
+    url = "https://api.open-meteo.com/v1/forecast"
+
+    params = {
+        "latitude": latitude,
+        "longitude": longitude,
+        "current_weather": True,
+        "timezone": "Asia/Manila",
+    }
+
+    headers = {
+        "User-Agent": "DashboardWidget/1.0"  # REQUIRED by Open-Meteo
+    }
+
+    response = http_session.get(url, params=params, headers=headers, timeout=7)
+    response.raise_for_status()
+
+    data = response.json()
+
+    if "current_weather" not in data:
+        raise Exception("No current weather field in API response")
+
+    return data["current_weather"]
+
+
+# Open-Meteo updates current conditions every 15 minutes
+weather_upstream = CachedUpstream(
+    "weather", _fetch_current_weather,
+    ttl=int(os.getenv("WEATHER_CACHE_TTL", 600)),
+    stale_ttl=int(os.getenv("WEATHER_STALE_TTL", 3 * 3600)),
+)
+
+
 @admin_bp.route("/api/widgets/weather", methods=["GET"])
 def get_weather():
-    """Get weather data using Open-Meteo API."""
+    """Get weather data using Open-Meteo API (cached, refreshed in the background)."""
     city = request.args.get("city", "Lipa City")
 
     # Coordinates for Lipa, Batangas
@@ -1920,28 +1753,7 @@ def get_weather():
     longitude = 121.1631
 
     try:
-        url = "https://api.open-meteo.com/v1/forecast"
-
-        params = {
-            "latitude": latitude,
-            "longitude": longitude,
-            "current_weather": True,
-            "timezone": "Asia/Manila",
-        }
-
-        headers = {
-            "User-Agent": "DashboardWidget/1.0"  # REQUIRED by Open-Meteo
-        }
-
-        response = requests.get(url, params=params, headers=headers, timeout=7)
-        response.raise_for_status()
-
-        data = response.json()
-
-        if "current_weather" not in data:
-            raise Exception("No current weather field in API response")
-
-        current = data["current_weather"]
+        current = weather_upstream.get((round(latitude, 2), round(longitude, 2)))
 
         # Extract values safely
         temperature = current.get("temperature")
@@ -2020,507 +1832,612 @@ def get_weather_info(weather_code):
         return {"description": "Unknown", "icon": "cloud"}
 
 
-@admin_bp.route("/api/widgets/productivity", methods=["GET"])
-def get_productivity_stats():
-    """Get productivity statistics for today."""
-
-    conn = create_connection()
-    if not conn:
-        return jsonify({"success": False, "message": "Database connection failed"}), 500
-
-    try:
-        today = datetime.today().date()
+def _productivity_data(conn, args):
+    today = datetime.today().date()
 
-        # Applications reviewed today (use applied_at since updated_at doesn't exist)
-        apps_reviewed = run_query(
-            conn,
-            """
-            SELECT COUNT(*) AS count
-            FROM applications
-            WHERE DATE(applied_at) = %s AND status IN ('Approved', 'Rejected')
-            """,
-            (today,),
-            fetch="one",
-        ) or {}
+    # Applications reviewed today (use applied_at since updated_at doesn't exist)
+    apps_reviewed = run_query(
+        conn,
+        """
+        SELECT COUNT(*) AS count
+        FROM applications
+        WHERE DATE(applied_at) = %s AND status IN ('Approved', 'Rejected')
+        """,
+        (today,),
+        fetch="one",
+    ) or {}
+
+    # New registrations today
+    new_regs = run_query(
+        conn,
+        """
+        SELECT COUNT(*) AS count
+        FROM applicants
+        WHERE DATE(created_at) = %s
+        """,
+        (today,),
+        fetch="one",
+    ) or {}
+
+    # New employers registered today
+    new_employers = run_query(
+        conn,
+        """
+        SELECT COUNT(*) AS count
+        FROM employers
+        WHERE DATE(created_at) = %s
+        """,
+        (today,),
+        fetch="one",
+    ) or {}
+
+    data = {
+        # Use applications reviewed as tasks
+        "tasks_completed": _to_int(apps_reviewed.get("count")),
+        "applications_reviewed": _to_int(apps_reviewed.get("count")),
+        "new_registrations": _to_int(new_regs.get("count")),
+        "new_employers": _to_int(new_employers.get("count")),
+    }
+    return data
 
-        # New registrations today
-        new_regs = run_query(
-            conn,
-            """
-            SELECT COUNT(*) AS count
-            FROM applicants
-            WHERE DATE(created_at) = %s
-            """,
-            (today,),
-            fetch="one",
-        ) or {}
 
-        # New employers registered today
-        new_employers = run_query(
-            conn,
-            """
-            SELECT COUNT(*) AS count
-            FROM employers
-            WHERE DATE(created_at) = %s
-            """,
-            (today,),
-            fetch="one",
-        ) or {}
-
-        data = {
-            # Use applications reviewed as tasks
-            "tasks_completed": _to_int(apps_reviewed.get("count")),
-            "applications_reviewed": _to_int(apps_reviewed.get("count")),
-            "new_registrations": _to_int(new_regs.get("count")),
-            "new_employers": _to_int(new_employers.get("count")),
-        }
-        return jsonify({"success": True, "data": data})
-    except Exception as exc:
-        print("[widgets] get_productivity_stats error:", exc)
-        return jsonify({"success": False, "message": "Failed to load productivity stats"}), 500
-    finally:
-        conn.close()
+@admin_bp.route("/api/widgets/productivity", methods=["GET"])
+def get_productivity_stats():
+    """Get productivity statistics for today."""
+    return _analytics_json(_productivity_data, "get_productivity_stats", "Failed to load productivity stats", log_prefix="[widgets]")
+
+
+@_columnar("employers_summary")
+def _employers_summary_data(conn, args):
+    where_sql, params = build_employers_filters(args, alias="e")
+    row = run_query(
+        conn,
+        f"""
+        SELECT
+          COUNT(*) AS total_employers,
+          SUM(CASE WHEN e.is_active = 1 THEN 1 ELSE 0 END) AS active_count,
+          SUM(CASE WHEN e.is_active = 0 THEN 1 ELSE 0 END) AS inactive_count
+        FROM employers e
+        WHERE {where_sql}
+        """,
+        params,
+        fetch="one",
+    ) or {}
+
+    total_employers = _to_int(row.get("total_employers"))
+    active_count = _to_int(row.get("active_count"))
+    inactive_count = _to_int(row.get("inactive_count"))
+
+    # Pending documents: approximate as status = 'Pending'
+    pending_row = run_query(
+        conn,
+        f"""
+        SELECT COUNT(*) AS pending_docs
+        FROM employers e
+        WHERE {where_sql} AND e.status = 'Pending'
+        """,
+        params,
+        fetch="one",
+    ) or {}
+
+    data = {
+        "total_employers": total_employers,
+        "active_employers": active_count,
+        "inactive_employers": inactive_count,
+        "pending_documents": _to_int(pending_row.get("pending_docs")),
+    }
+    return data
 
 
 @admin_bp.route("/api/analytics/employers/summary", methods=["GET"])
+@cached_analytics(("employers",), EMPLOYER_FILTER_ARGS)
 def employers_summary():
     """Employers volume & active vs inactive, respecting filters."""
-
-    conn = create_connection()
-    if not conn:
-        return jsonify({"success": False, "message": "Database connection failed"}), 500
-
-    try:
-        where_sql, params = build_employers_filters(request.args, alias="e")
-        row = run_query(
-            conn,
-            f"""
-            SELECT
-              COUNT(*) AS total_employers,
-              SUM(CASE WHEN e.is_active = 1 THEN 1 ELSE 0 END) AS active_count,
-              SUM(CASE WHEN e.is_active = 0 THEN 1 ELSE 0 END) AS inactive_count
-            FROM employers e
-            WHERE {where_sql}
-            """,
-            params,
-            fetch="one",
-        ) or {}
-
-        total_employers = _to_int(row.get("total_employers"))
-        active_count = _to_int(row.get("active_count"))
-        inactive_count = _to_int(row.get("inactive_count"))
-
-        # Pending documents: approximate as status = 'Pending'
-        pending_row = run_query(
-            conn,
-            f"""
-            SELECT COUNT(*) AS pending_docs
-            FROM employers e
-            WHERE {where_sql} AND e.status = 'Pending'
-            """,
-            params,
-            fetch="one",
-        ) or {}
-
-        data = {
-            "total_employers": total_employers,
-            "active_employers": active_count,
-            "inactive_employers": inactive_count,
-            "pending_documents": _to_int(pending_row.get("pending_docs")),
-        }
-        return jsonify({"success": True, "data": data})
-    except Exception as exc:
-        print("[analytics] employers_summary error:", exc)
-        return jsonify({"success": False, "message": "Failed to load employers summary"}), 500
-    finally:
-        conn.close()
+    return _analytics_json(_employers_summary_data, "employers_summary", "Failed to load employers summary")
+
+
+@_columnar("employers_business")
+def _employers_business_data(conn, args):
+    where_sql, params = build_employers_filters(args, alias="e")
+
+    industry_rows = run_query(
+        conn,
+        f"""
+        SELECT
+          COALESCE(NULLIF(e.industry, ''), 'Unspecified') AS industry,
+          COUNT(*) AS total
+        FROM employers e
+        WHERE {where_sql}
+        GROUP BY 1
+        ORDER BY total DESC
+        """,
+        params,
+        fetch="all",
+    ) or []
+
+    rec_rows = run_query(
+        conn,
+        f"""
+        SELECT
+          COALESCE(NULLIF(e.recruitment_type, ''), 'Unspecified') AS recruitment_type,
+          COUNT(*) AS total
+        FROM employers e
+        WHERE {where_sql}
+        GROUP BY 1
+        """,
+        params,
+        fetch="all",
+    ) or []
+
+    data = {
+        "by_industry": [
+            {"industry": r.get("industry"),
+             "count": _to_int(r.get("total"))}
+            for r in industry_rows
+        ],
+        "by_recruitment_type": [
+            {
+                "recruitment_type": r.get("recruitment_type"),
+                "count": _to_int(r.get("total")),
+            }
+            for r in rec_rows
+        ],
+    }
+    return data
 
 
 @admin_bp.route("/api/analytics/employers/business", methods=["GET"])
+@cached_analytics(("employers",), EMPLOYER_FILTER_ARGS)
 def employers_business():
     """Employers by industry and recruitment type, respecting filters."""
-
-    conn = create_connection()
-    if not conn:
-        return jsonify({"success": False, "message": "Database connection failed"}), 500
-
-    try:
-        where_sql, params = build_employers_filters(request.args, alias="e")
-
-        industry_rows = run_query(
-            conn,
-            f"""
-            SELECT
-              COALESCE(NULLIF(e.industry, ''), 'Unspecified') AS industry,
-              COUNT(*) AS total
-            FROM employers e
-            WHERE {where_sql}
-            GROUP BY industry
-            ORDER BY total DESC
-            """,
-            params,
-            fetch="all",
-        ) or []
-
-        rec_rows = run_query(
-            conn,
-            f"""
-            SELECT
-              COALESCE(NULLIF(e.recruitment_type, ''), 'Unspecified') AS recruitment_type,
-              COUNT(*) AS total
-            FROM employers e
-            WHERE {where_sql}
-            GROUP BY recruitment_type
-            """,
-            params,
-            fetch="all",
-        ) or []
-
-        data = {
-            "by_industry": [
-                {"industry": r.get("industry"),
-                 "count": _to_int(r.get("total"))}
-                for r in industry_rows
-            ],
-            "by_recruitment_type": [
-                {
-                    "recruitment_type": r.get("recruitment_type"),
-                    "count": _to_int(r.get("total")),
-                }
-                for r in rec_rows
-            ],
-        }
-        return jsonify({"success": True, "data": data})
-    except Exception as exc:
-        print("[analytics] employers_business error:", exc)
-        return jsonify({"success": False, "message": "Failed to load employer demographics"}), 500
-    finally:
-        conn.close()
+    return _analytics_json(_employers_business_data, "employers_business", "Failed to load employer demographics")
+
+
+@_columnar("employers_location")
+def _employers_location_data(conn, args):
+    where_sql, params = build_employers_filters(args, alias="e")
+
+    # Top 10 cities
+    city_rows = run_query(
+        conn,
+        f"""
+        SELECT
+          COALESCE(NULLIF(e.city, ''), 'Unspecified') AS city,
+          COUNT(*) AS total
+        FROM employers e
+        WHERE {where_sql}
+        GROUP BY 1
+        ORDER BY total DESC
+        LIMIT 10
+        """,
+        params,
+        fetch="all",
+    ) or []
+
+    # Top 10 provinces
+    province_rows = run_query(
+        conn,
+        f"""
+        SELECT
+          COALESCE(NULLIF(e.province, ''), 'Unspecified') AS province,
+          COUNT(*) AS total
+        FROM employers e
+        WHERE {where_sql}
+        GROUP BY 1
+        ORDER BY total DESC
+        LIMIT 10
+        """,
+        params,
+        fetch="all",
+    ) or []
+
+    data = {
+        "by_city": [
+            {"city": r.get("city"), "count": _to_int(r.get("total"))}
+            for r in city_rows
+        ],
+        "by_province": [
+            {"province": r.get("province"),
+             "count": _to_int(r.get("total"))}
+            for r in province_rows
+        ],
+    }
+    return data
 
 
 @admin_bp.route("/api/analytics/employers/location", methods=["GET"])
-def employers_location():
-    """Employers by top cities and provinces."""
-
-    conn = create_connection()
-    if not conn:
-        return jsonify({"success": False, "message": "Database connection failed"}), 500
-
-    try:
-        where_sql, params = build_employers_filters(request.args, alias="e")
-
-        # Top 10 cities
-        city_rows = run_query(
-            conn,
-            f"""
-            SELECT
-              COALESCE(NULLIF(e.city, ''), 'Unspecified') AS city,
-              COUNT(*) AS total
-            FROM employers e
-            WHERE {where_sql}
-            GROUP BY city
-            ORDER BY total DESC
-            LIMIT 10
-            """,
-            params,
-            fetch="all",
-        ) or []
-
-        # Top 10 provinces
-        province_rows = run_query(
-            conn,
-            f"""
-            SELECT
-              COALESCE(NULLIF(e.province, ''), 'Unspecified') AS province,
-              COUNT(*) AS total
-            FROM employers e
-            WHERE {where_sql}
-            GROUP BY province
-            ORDER BY total DESC
-            LIMIT 10
-            """,
-            params,
-            fetch="all",
-        ) or []
-
-        data = {
-            "by_city": [
-                {"city": r.get("city"), "count": _to_int(r.get("total"))}
-                for r in city_rows
-            ],
-            "by_province": [
-                {"province": r.get("province"),
-                 "count": _to_int(r.get("total"))}
-                for r in province_rows
-            ],
-        }
-        return jsonify({"success": True, "data": data})
-    except Exception as exc:
-        print("[analytics] employers_location error:", exc)
-        return jsonify({"success": False, "message": "Failed to load employer location data"}), 500
-    finally:
-        conn.close()
+@cached_analytics(("employers",), EMPLOYER_FILTER_ARGS)
+def employers_location():
+    """Employers by top cities and provinces."""
+    return _analytics_json(_employers_location_data, "employers_location", "Failed to load employer location data")
+
+
+@_columnar("employers_status")
+def _employers_status_data(conn, args):
+    rollup = rollup_source("employers", args, conn)
+    where_sql, params = build_employers_filters(args, alias="e")
+
+    status_rows = run_query(
+        conn,
+        f"""
+        SELECT
+          COALESCE(NULLIF(e.status, ''), 'Unspecified') AS status,
+          {"SUM(e.total)" if rollup else "COUNT(*)"} AS total
+        FROM {rollup or "employers"} e
+        WHERE {where_sql}
+        GROUP BY 1
+        ORDER BY total DESC
+        """,
+        params,
+        fetch="all",
+    ) or []
+
+    data = {
+        "by_status": [
+            {"status": r.get("status"), "count": _to_int(r.get("total"))}
+            for r in status_rows
+        ],
+    }
+    return data
 
 
 @admin_bp.route("/api/analytics/employers/status", methods=["GET"])
+@cached_analytics(("employers",), EMPLOYER_FILTER_ARGS)
 def employers_status():
     """Employers by status."""
+    return _analytics_json(_employers_status_data, "employers_status", "Failed to load employer status data")
 
-    conn = create_connection()
-    if not conn:
-        return jsonify({"success": False, "message": "Database connection failed"}), 500
 
-    try:
-        where_sql, params = build_employers_filters(request.args, alias="e")
+@_columnar("jobs_summary")
+def _jobs_summary_data(conn, args):
+    where_sql, params = build_jobs_filters(args, alias="j")
 
-        status_rows = run_query(
-            conn,
-            f"""
-            SELECT
-              COALESCE(NULLIF(e.status, ''), 'Unspecified') AS status,
-              COUNT(*) AS total
-            FROM employers e
-            WHERE {where_sql}
-            GROUP BY status
-            ORDER BY total DESC
-            """,
-            params,
-            fetch="all",
-        ) or []
+    # For "open jobs" metric, we want active jobs that haven't expired
+    # Check if user has specifically filtered for job status
+    job_statuses = _parse_multi(args, "job_status")
 
-        data = {
-            "by_status": [
-                {"status": r.get("status"), "count": _to_int(r.get("total"))}
-                for r in status_rows
-            ],
-        }
-        return jsonify({"success": True, "data": data})
-    except Exception as exc:
-        print("[analytics] employers_status error:", exc)
-        return jsonify({"success": False, "message": "Failed to load employer status data"}), 500
-    finally:
-        conn.close()
+    if not job_statuses:
+        # No job status filter applied - show only active, non-expired jobs for "open jobs" metric
+        open_jobs_where = f"({where_sql}) AND j.status = 'active' AND (j.job_expiration_date IS NULL OR j.job_expiration_date >= CURDATE())"
+    else:
+        # User applied job status filters - respect their selection but still check expiration for "open jobs"
+        open_jobs_where = f"({where_sql}) AND (j.job_expiration_date IS NULL OR j.job_expiration_date >= CURDATE())"
+
+    row = run_query(
+        conn,
+        f"""
+        SELECT COUNT(*) AS open_jobs
+        FROM jobs j
+        WHERE {open_jobs_where}
+        """,
+        params,
+        fetch="one",
+    ) or {}
+
+    data = {
+        "total_open_jobs": _to_int(row.get("open_jobs")),
+    }
+    return data
 
 
 @admin_bp.route("/api/analytics/jobs/summary", methods=["GET"])
+@cached_analytics(("jobs",), JOB_FILTER_ARGS)
 def jobs_summary():
     """Job demand KPIs: total open jobs."""
-
-    conn = create_connection()
-    if not conn:
-        return jsonify({"success": False, "message": "Database connection failed"}), 500
-
-    try:
-        where_sql, params = build_jobs_filters(request.args, alias="j")
-
-        # For "open jobs" metric, we want active jobs that haven't expired
-        # Check if user has specifically filtered for job status
-        job_statuses = _parse_multi(request.args, "job_status")
-
-        if not job_statuses:
-            # No job status filter applied - show only active, non-expired jobs for "open jobs" metric
-            open_jobs_where = f"({where_sql}) AND j.status = 'active' AND (j.job_expiration_date IS NULL OR j.job_expiration_date >= CURDATE())"
-        else:
-            # User applied job status filters - respect their selection but still check expiration for "open jobs"
-            open_jobs_where = f"({where_sql}) AND (j.job_expiration_date IS NULL OR j.job_expiration_date >= CURDATE())"
-
-        row = run_query(
-            conn,
-            f"""
-            SELECT COUNT(*) AS open_jobs
-            FROM jobs j
-            WHERE {open_jobs_where}
-            """,
-            params,
-            fetch="one",
-        ) or {}
-
-        data = {
-            "total_open_jobs": _to_int(row.get("open_jobs")),
-        }
-        return jsonify({"success": True, "data": data})
-    except Exception as exc:
-        print("[analytics] jobs_summary error:", exc)
-        return jsonify({"success": False, "message": "Failed to load jobs summary"}), 500
-    finally:
-        conn.close()
+    return _analytics_json(_jobs_summary_data, "jobs_summary", "Failed to load jobs summary")
+
+
+@_columnar("jobs_demand")
+def _jobs_demand_data(conn, args):
+    rollup = rollup_source("jobs", args, conn)
+    where_sql, params = build_jobs_filters(args, alias="j")
+    count_sql = "SUM(j.total)" if rollup else "COUNT(*)"
+
+    pos_rows = run_query(
+        conn,
+        f"""
+        SELECT
+          COALESCE(NULLIF(j.job_position, ''), 'Unspecified') AS job_position,
+          {count_sql} AS total
+        FROM {rollup or "jobs"} j
+        WHERE {where_sql}
+        GROUP BY 1
+        ORDER BY total DESC
+        LIMIT 5
+        """,
+        params,
+        fetch="all",
+    ) or []
+
+    sched_rows = run_query(
+        conn,
+        f"""
+        SELECT
+          COALESCE(NULLIF(j.work_schedule, ''), 'Unspecified') AS work_schedule,
+          {count_sql} AS total
+        FROM {rollup or "jobs"} j
+        WHERE {where_sql}
+        GROUP BY 1
+        """,
+        params,
+        fetch="all",
+    ) or []
+
+    data = {
+        "by_position": [
+            {"job_position": r.get("job_position"),
+             "count": _to_int(r.get("total"))}
+            for r in pos_rows
+        ],
+        "by_work_schedule": [
+            {"work_schedule": r.get("work_schedule"),
+             "count": _to_int(r.get("total"))}
+            for r in sched_rows
+        ],
+    }
+    return data
 
 
 @admin_bp.route("/api/analytics/jobs/demand", methods=["GET"])
+@cached_analytics(("jobs",), JOB_FILTER_ARGS)
 def jobs_demand():
     """Top job positions and jobs by work schedule."""
+    return _analytics_json(_jobs_demand_data, "jobs_demand", "Failed to load job demand")
+
+
+@_columnar("applications_summary")
+def _applications_summary_data(conn, args):
+    where_sql, params = build_applications_filters(args, alias="a")
+
+    rows = run_query(
+        conn,
+        f"""
+        SELECT
+          COALESCE(NULLIF(a.status, ''), 'Pending') AS status,
+          COUNT(*) AS total
+        FROM applications a
+        LEFT JOIN jobs j ON a.job_id = j.job_id
+        WHERE {where_sql}
+        GROUP BY 1
+        """,
+        params,
+        fetch="all",
+    ) or []
+
+    by_status = [
+        {"status": r.get("status"), "count": _to_int(r.get("total"))}
+        for r in rows
+    ]
 
-    conn = create_connection()
-    if not conn:
-        return jsonify({"success": False, "message": "Database connection failed"}), 500
-
-    try:
-        where_sql, params = build_jobs_filters(request.args, alias="j")
-
-        pos_rows = run_query(
-            conn,
-            f"""
-            SELECT
-              COALESCE(NULLIF(j.job_position, ''), 'Unspecified') AS job_position,
-              COUNT(*) AS total
-            FROM jobs j
-            WHERE {where_sql}
-            GROUP BY job_position
-            ORDER BY total DESC
-            LIMIT 5
-            """,
-            params,
-            fetch="all",
-        ) or []
-
-        sched_rows = run_query(
-            conn,
-            f"""
-            SELECT
-              COALESCE(NULLIF(j.work_schedule, ''), 'Unspecified') AS work_schedule,
-              COUNT(*) AS total
-            FROM jobs j
-            WHERE {where_sql}
-            GROUP BY work_schedule
-            """,
-            params,
-            fetch="all",
-        ) or []
-
-        data = {
-            "by_position": [
-                {"job_position": r.get("job_position"),
-                 "count": _to_int(r.get("total"))}
-                for r in pos_rows
-            ],
-            "by_work_schedule": [
-                {"work_schedule": r.get("work_schedule"),
-                 "count": _to_int(r.get("total"))}
-                for r in sched_rows
-            ],
-        }
-        return jsonify({"success": True, "data": data})
-    except Exception as exc:
-        print("[analytics] jobs_demand error:", exc)
-        return jsonify({"success": False, "message": "Failed to load job demand"}), 500
-    finally:
-        conn.close()
+    total_applications = sum(item["count"] for item in by_status)
+    # Update success rate calculation to use "Hired" instead of "Approved"
+    hired = next(
+        (item["count"]
+         for item in by_status if item["status"] == "Hired"), 0
+    )
+    success_rate = (
+        hired / total_applications) if total_applications else 0
+
+    data = {
+        "total_applications": total_applications,
+        "by_status": by_status,
+        "success_rate": success_rate,
+        "success_rate_percentage": round(success_rate * 100, 2)
+        if total_applications
+        else 0,
+    }
+    return data
 
 
 @admin_bp.route("/api/analytics/applications/summary", methods=["GET"])
+@cached_analytics(("applications", "jobs"), APPLICATION_FILTER_ARGS)
 def applications_summary():
     """Applications flow KPIs: total applications, status breakdown, success rate."""
+    return _analytics_json(_applications_summary_data, "applications_summary", "Failed to load applications summary")
+
+
+@_columnar("applications_trend")
+def _applications_trend_data(conn, args):
+    rollup = rollup_source("applications", args, conn)
+    where_sql, params = build_applications_filters(
+        args, alias="a", jobs_alias="a" if rollup else "j")
+    from_sql = f"{rollup} a" if rollup else "applications a LEFT JOIN jobs j ON a.job_id = j.job_id"
+
+    rows = run_query(
+        conn,
+        f"""
+        SELECT
+        DATE_FORMAT(a.applied_at, '%b %Y') AS label,
+        YEAR(a.applied_at) AS year_num,
+        MONTH(a.applied_at) AS month_num,
+        {"SUM(a.total)" if rollup else "COUNT(*)"} AS total
+        FROM {from_sql}
+        WHERE {where_sql}
+        GROUP BY year_num, month_num
+        ORDER BY year_num ASC, month_num ASC
+        """,
+        params,
+        fetch="all",
+    ) or []
+
+    data = [
+        {
+            "label": r.get("label"),
+            "year": _to_int(r.get("year_num")),
+            "month": _to_int(r.get("month_num")),
+            "count": _to_int(r.get("total")),
+        }
+        for r in rows
+    ]
 
-    conn = create_connection()
-    if not conn:
-        return jsonify({"success": False, "message": "Database connection failed"}), 500
-
-    try:
-        where_sql, params = build_applications_filters(request.args, alias="a")
-
-        rows = run_query(
-            conn,
-            f"""
-            SELECT
-              COALESCE(NULLIF(a.status, ''), 'Pending') AS status,
-              COUNT(*) AS total
-            FROM applications a
-            LEFT JOIN jobs j ON a.job_id = j.job_id
-            WHERE {where_sql}
-            GROUP BY status
-            """,
-            params,
-            fetch="all",
-        ) or []
+    # Check if we have meaningful data (same logic as other charts)
+    has_data = len(data) > 0 and any(item["count"] > 0 for item in data)
 
-        by_status = [
-            {"status": r.get("status"), "count": _to_int(r.get("total"))}
-            for r in rows
-        ]
+    if not has_data:
+        # Return empty array to trigger the "no data" state in frontend
+        return []
 
-        total_applications = sum(item["count"] for item in by_status)
-        # Update success rate calculation to use "Hired" instead of "Approved"
-        hired = next(
-            (item["count"]
-             for item in by_status if item["status"] == "Hired"), 0
-        )
-        success_rate = (
-            hired / total_applications) if total_applications else 0
-
-        data = {
-            "total_applications": total_applications,
-            "by_status": by_status,
-            "success_rate": success_rate,
-            "success_rate_percentage": round(success_rate * 100, 2)
-            if total_applications
-            else 0,
-        }
-        return jsonify({"success": True, "data": data})
-    except Exception as exc:
-        print("[analytics] applications_summary error:", exc)
-        return jsonify({"success": False, "message": "Failed to load applications summary"}), 500
-    finally:
-        conn.close()
+    return data
 
 
 @admin_bp.route("/api/analytics/applications/trend", methods=["GET"])
+@cached_analytics(("applications", "jobs"), APPLICATION_FILTER_ARGS)
 def applications_trend():
     """Applications by month/year trend."""
+    return _analytics_json(_applications_trend_data, "applications_trend", "Failed to load applications trend")
+
+
+# Widget ids accepted by /api/analytics/bundle -> (data function, route view).
+# The view carries the route's cache tags and args, so the bundle reads and
+# fills the same cache entries as the individual routes.
+ANALYTICS_WIDGETS = {
+    "summary": (_summary_data, admin_analytics_summary),
+    "applicants_summary": (_applicants_summary_data, applicants_summary),
+    "applicants_trend": (_applicants_per_month_data, admin_analytics_applicants_per_month),
+    "applicants_by_province": (_applicants_by_province_data, admin_analytics_applicants_by_province),
+    "demographics": (_applicants_demographics_data, applicants_demographics),
+    "location": (_applicants_location_data, applicants_location),
+    "experience": (_applicants_experience_data, applicants_experience),
+    "pwd": (_applicants_pwd_data, applicants_pwd),
+    "employers_summary": (_employers_summary_data, employers_summary),
+    "employers_business": (_employers_business_data, employers_business),
+    "employers_location": (_employers_location_data, employers_location),
+    "employers_status": (_employers_status_data, employers_status),
+    "employers_by_industry": (_employers_by_industry_data, admin_analytics_employers_by_industry),
+    "jobs_summary": (_jobs_summary_data, jobs_summary),
+    "jobs_demand": (_jobs_demand_data, jobs_demand),
+    "applications_summary": (_applications_summary_data, applications_summary),
+    "applications_trend": (_applications_trend_data, applications_trend),
+    "applications_by_category": (_applications_by_category_data, admin_analytics_applications_by_category),
+    "hiring_ratio": (_hiring_ratio_data, admin_analytics_hiring_ratio),
+    "productivity": (_productivity_data, get_productivity_stats),
+}
+
+ANALYTICS_BUNDLE_WORKERS = int(os.getenv("ANALYTICS_BUNDLE_WORKERS", 4))
+ANALYTICS_BUNDLE_TIMEOUT = float(os.getenv("ANALYTICS_BUNDLE_TIMEOUT", 30))
+_bundle_executor = ThreadPoolExecutor(max_workers=ANALYTICS_BUNDLE_WORKERS,
+                                      thread_name_prefix="analytics-bundle")
+
+
+def _run_widgets(conn, widgets, args):
+    """Compute widgets one after another on `conn`. Returns {widget: (data, error)}."""
+    results = {}
+    for widget in widgets:
+        try:
+            results[widget] = (ANALYTICS_WIDGETS[widget][0](conn, args), None)
+        except Exception as exc:
+            print(f"[analytics] bundle {widget} error:", exc)
+            results[widget] = (None, f"Failed to load {widget}")
+    return results
+
 
+def _run_widgets_pooled(widgets, args):
     conn = create_connection()
     if not conn:
-        return jsonify({"success": False, "message": "Database connection failed"}), 500
-
+        return {widget: (None, "Database connection failed") for widget in widgets}
     try:
-        where_sql, params = build_applications_filters(request.args, alias="a")
+        return _run_widgets(conn, widgets, args)
+    finally:
+        conn.close()
 
-        rows = run_query(
-            conn,
-            f"""
-            SELECT
-            DATE_FORMAT(a.applied_at, '%b %Y') AS label,
-            YEAR(a.applied_at) AS year_num,
-            MONTH(a.applied_at) AS month_num,
-            COUNT(*) AS total
-            FROM applications a
-            LEFT JOIN jobs j ON a.job_id = j.job_id
-            WHERE {where_sql}
-            GROUP BY year_num, month_num
-            ORDER BY year_num ASC, month_num ASC
-            """,
-            params,
-            fetch="all",
-        ) or []
 
-        data = [
-            {
-                "label": r.get("label"),
-                "year": _to_int(r.get("year_num")),
-                "month": _to_int(r.get("month_num")),
-                "count": _to_int(r.get("total")),
-            }
-            for r in rows
-        ]
+def _bundle_request():
+    """(widget ids, filter args, parallel) from the query string or a JSON body."""
+    if request.method == "POST":
+        payload = request.get_json(silent=True) or {}
+        filters = payload.get("filters") or {}
+        args = MultiDict({key: "|".join(map(str, value)) if isinstance(value, list) else str(value)
+                          for key, value in filters.items() if value is not None})
+        return list(payload.get("widgets") or []), args, bool(payload.get("parallel"))
 
-        # Check if we have meaningful data (same logic as other charts)
-        has_data = len(data) > 0 and any(item["count"] > 0 for item in data)
+    widgets = [w.strip() for w in request.args.get("widgets", "").split(",") if w.strip()]
+    parallel = request.args.get("parallel", "").lower() in ("1", "true", "yes")
+    return widgets, request.args, parallel
 
-        if not has_data:
-            # Return empty array to trigger the "no data" state in frontend
-            return jsonify({"success": True, "data": []})
 
-        return jsonify({"success": True, "data": data})
-    except Exception as exc:
-        print("[analytics] applications_trend error:", exc)
-        return jsonify({"success": False, "message": "Failed to load applications trend"}), 500
-    finally:
-        conn.close()
+@admin_bp.route("/api/analytics/bundle", methods=["GET", "POST"])
+def analytics_bundle():
+    """
+    Several dashboard widgets in one call, all with the same filters.
+
+    GET ?widgets=summary,demographics&<filters>&parallel=1, or POST
+    {"widgets": [...], "filters": {...}, "parallel": true} with lists for
+    multi-value filters. Cached widgets are served from the analytics cache;
+    the rest run on one connection, or with `parallel` spread over at most
+    ANALYTICS_BUNDLE_WORKERS pooled connections. Widgets fail independently
+    and are reported under "errors".
+    """
+    widgets, args, parallel = _bundle_request()
+    widgets = list(dict.fromkeys(widgets))
+    available = sorted([*ANALYTICS_WIDGETS, "notifications"])
+    unknown = [widget for widget in widgets if widget not in available]
+    if not widgets or unknown:
+        return jsonify({"success": False,
+                        "message": f"Unknown widgets: {', '.join(unknown)}" if unknown else "No widgets requested",
+                        "available": available}), 400
+
+    data, errors = {}, {}
+    counts = {"cached": 0, "computed": 0}
+    pending = {}  # widget -> (cache key, tag versions), or None when the route is not cached
+    for widget in widgets:
+        if widget not in ANALYTICS_WIDGETS:
+            continue
+        view = ANALYTICS_WIDGETS[widget][1]
+        tags = getattr(view, "cache_tags", None)
+        if tags is None:
+            pending[widget] = None
+            continue
+        key = (f"{admin_bp.name}.{view.__name__}", canonical_args(args, view.cache_args))
+        cached = cache_get(key, tags)
+        if cached is not None:
+            data[widget] = json.loads(cached[0])["data"]
+            counts["cached"] += 1
+        else:
+            pending[widget] = (key, cache_versions(tags))
+
+    if pending:
+        names = list(pending)
+        if parallel and len(names) > 1:
+            groups = [names[i::ANALYTICS_BUNDLE_WORKERS]
+                      for i in range(min(ANALYTICS_BUNDLE_WORKERS, len(names)))]
+            futures = [_bundle_executor.submit(_run_widgets_pooled, group, args) for group in groups]
+            done, _ = wait_futures(futures, timeout=ANALYTICS_BUNDLE_TIMEOUT)
+            results = {}
+            for group, future in zip(groups, futures):
+                if future in done:
+                    results.update(future.result())
+                else:
+                    results.update({widget: (None, "Timed out") for widget in group})
+        else:
+            conn = get_db()
+            if not conn:
+                return jsonify({"success": False, "message": "Database connection failed"}), 500
+            results = _run_widgets(conn, names, args)
+
+        for widget, (value, error) in results.items():
+            if error:
+                errors[widget] = error
+                continue
+            data[widget] = value
+            counts["computed"] += 1
+            if pending[widget]:
+                key, versions = pending[widget]
+                response = jsonify({"success": True, "data": value})
+                cache_put(key, versions, response.get_data(), response.mimetype)
+
+    if "notifications" in widgets:
+        try:
+            data["notifications"] = _admin_notifications_data(args)
+        except Exception as exc:
+            print("[analytics] bundle notifications error:", exc)
+            errors["notifications"] = "Failed to load notifications"
+
+    return jsonify({"success": True, "data": data, "errors": errors, "cache": counts})
 
 
 # ===== API: Get Notifications =====
-@admin_bp.route("/api/notifications", methods=["GET"])
-def api_get_notifications():
-    filter_param = request.args.get("filter", "all")
+def _admin_notifications_data(args):
+    filter_param = args.get("filter", "all")
 
     # Initialize filters
     is_read = None
@@ -2541,34 +2458,33 @@ def api_get_notifications():
         # Use mapped value or fallback to the param itself (e.g., 'applicant_approval')
         notification_type = type_mapping.get(filter_param, filter_param)
 
-    # 2. Fetch filtered notifications
-    all_notifications = get_notifications(
-        notification_type=notification_type,
-        is_read=is_read
+    # 2. STRICT list of Admin-only notification types (Security Allowlist),
+    #    applied in SQL so every page is full
+    if notification_type:
+        if notification_type not in ADMIN_NOTIFICATION_TYPES:
+            return {"notifications": [], "count": 0, "next_cursor": None}
+        include_types = [notification_type]
+    else:
+        include_types = sorted(ADMIN_NOTIFICATION_TYPES)
+
+    # 3. Fetch one page; ?cursor=<next_cursor> continues where it stopped
+    final_notifications, next_cursor = get_notifications_page(
+        is_read=is_read,
+        include_types=include_types,
+        cursor=args.get("cursor"),
+        limit=parse_page_size(args.get("limit"))
     )
 
-    # 3. Define STRICT list of Admin-only notification types (Security Allowlist)
-    admin_types = {
-        'applicant_approval',
-        'employer_approval',
-        'applicant_reported',
-        'employer_reported',
-        'applicant_outdated_docu',
-        'employer_outdated_docu',
-        'applicant_batch'
+    return {
+        "notifications": final_notifications,
+        "count": len(final_notifications),
+        "next_cursor": next_cursor
     }
 
-    # 4. Filter: Ensure we only return admin-allowed types
-    final_notifications = [
-        n for n in all_notifications
-        if n.get('notification_type') in admin_types
-    ]
 
-    return jsonify({
-        "success": True,
-        "notifications": final_notifications,
-        "count": len(final_notifications)
-    })
+@admin_bp.route("/api/notifications", methods=["GET"])
+def api_get_notifications():
+    return jsonify({"success": True, **_admin_notifications_data(request.args)})
 
 
 @admin_bp.route("/api/notifications/<int:notification_id>/read", methods=["POST"])
@@ -2601,19 +2517,22 @@ def api_unread_count():
         return jsonify({"success": False, "unread_count": 0})
 
     try:
-        # Dynamically build the placeholder string based on the list length
-        placeholders = ', '.join(['%s'] * len(admin_types))
-
-        query = f"""
-            SELECT COUNT(*) as count 
-            FROM notifications 
-            WHERE is_read = 0 
-            AND notification_type IN ({placeholders})
-        """
+        # Maintained global counters (primary-key lookup); COUNT(*) only as a fallback
+        count = get_unread_total(conn, "all", include_types=admin_types)
+        if count is None:
+            # Dynamically build the placeholder string based on the list length
+            placeholders = ', '.join(['%s'] * len(admin_types))
+
+            query = f"""
+                SELECT COUNT(*) as count 
+                FROM notifications 
+                WHERE is_read = 0 
+                AND notification_type IN ({placeholders})
+            """
 
-        # Pass the list as parameters
-        result = run_query(conn, query, tuple(admin_types), fetch="one")
-        count = result['count'] if result else 0
+            # Pass the list as parameters
+            result = run_query(conn, query, tuple(admin_types), fetch="one")
+            count = result['count'] if result else 0
 
         return jsonify({"success": True, "unread_count": count})
     except Exception as e:
@@ -2623,6 +2542,171 @@ def api_unread_count():
         conn.close()
 
 
+# ===== API: Database Pool Metrics =====
+@admin_bp.route("/api/system/db-pool", methods=["GET"])
+def api_db_pool_stats():
+    return jsonify({"success": True, "pool": get_pool_stats()})
+
+
+# ===== API: Notification Queue Metrics =====
+@admin_bp.route("/api/system/notification-queue", methods=["GET"])
+def api_notification_queue_stats():
+    return jsonify({"success": True, "queue": get_dispatcher_stats()})
+
+
+# ===== API: Live Event Hub Metrics =====
+@admin_bp.route("/api/system/events", methods=["GET"])
+def api_event_hub_stats():
+    return jsonify({"success": True, "events": hub.stats()})
+
+
+# ===== API: Notification Retention / Compaction =====
+@admin_bp.route("/api/system/notification-retention", methods=["GET", "POST"])
+def api_notification_retention():
+    """
+    GET (or POST with ?dry_run=1): report what compaction would archive + recent runs.
+    POST: run a compaction now.
+    """
+    dry_run = request.method == "GET" or request.args.get("dry_run") in ("1", "true")
+    if dry_run:
+        return jsonify({
+            "success": True,
+            "dry_run": True,
+            "report": retention_report(),
+            "runs": get_retention_runs(),
+        })
+
+    summary = compact_notifications()
+    if summary is None:
+        return jsonify({"success": False, "message": "Database connection failed"}), 500
+    return jsonify({"success": summary["error"] is None, "dry_run": False, "run": summary})
+
+
+@admin_bp.route("/api/system/email-outbox")
+def api_email_outbox():
+    """Outbox worker metrics and queue depth by status."""
+    return jsonify({"success": True, "outbox": get_outbox_stats()})
+
+
+@admin_bp.route("/api/system/sms")
+def api_sms_dispatcher():
+    """SMS dispatcher metrics: queue depth, rate limiter and circuit breaker state."""
+    return jsonify({"success": True, "sms": get_sms_stats()})
+
+
+@admin_bp.route("/api/system/rollups", methods=["GET", "POST"])
+def api_analytics_rollups():
+    """Freshness of the daily analytics rollups; POST rebuilds changed days now."""
+    if request.method == "POST":
+        refresh_rollups()
+    return jsonify({"success": True, "rollups": get_rollup_stats()})
+
+
+@admin_bp.route("/api/system/analytics-cache")
+def api_analytics_cache():
+    """Hit/miss counters and tag versions of the analytics response cache."""
+    return jsonify({"success": True, "cache": get_analytics_cache_stats()})
+
+
+@admin_bp.route("/api/system/columnar", methods=["GET", "POST"])
+def api_analytics_columnar():
+    """Size and freshness of the columnar analytics snapshots; POST refreshes them now."""
+    if request.method == "POST":
+        refresh_columnar()
+    return jsonify({"success": True, "columnar": get_columnar_stats()})
+
+
+@admin_bp.route("/api/system/upstreams")
+def api_upstream_cache():
+    """Hit/miss and refresh counters for cached external widget APIs."""
+    return jsonify({"success": True, "upstreams": get_upstream_stats()})
+
+
+# Applicant statuses never texted unless the filters ask for them
+BROADCAST_EXCLUDED_STATUSES = ("Rejected", "Suspended")
+
+
+def _broadcast_audience(filters, send_to_all=False):
+    """
+    Applicant analytics filters (same keys as the analytics query string,
+    lists allowed) plus `recommendation_expiring_within` days.
+    Only active, non-rejected, non-suspended applicants unless
+    applicant_is_active / applicant_status say otherwise. An empty filter
+    set raises ValueError unless `send_to_all` is set.
+    Returns (where_sql, params).
+    """
+    args = {key: "|".join(map(str, value)) if isinstance(value, list) else value
+            for key, value in (filters or {}).items()
+            if value not in (None, "", [])}
+    if not args and not send_to_all:
+        raise ValueError('no filters given; send "all": true to message every active applicant')
+    where_sql, params = build_applicants_filters(args, alias="a")
+
+    if not _parse_multi(args, "applicant_is_active"):
+        where_sql += " AND a.is_active = 1"
+    if not _parse_multi(args, "applicant_status"):
+        where_sql += f" AND a.status NOT IN ({', '.join(['%s'] * len(BROADCAST_EXCLUDED_STATUSES))})"
+        params = (*params, *BROADCAST_EXCLUDED_STATUSES)
+
+    expiring_within = args.get("recommendation_expiring_within")
+    if expiring_within:
+        where_sql += (" AND a.recommendation_letter_expiry"
+                      " BETWEEN CURDATE() AND CURDATE() + INTERVAL %s DAY")
+        params = (*params, int(expiring_within))
+    return where_sql, params
+
+
+@admin_bp.route("/api/sms/broadcasts", methods=["GET", "POST"])
+def api_sms_broadcasts():
+    """
+    GET: recent broadcasts.
+    POST {message, filters, all, dry_run}: preview the audience, or start a
+    broadcast and return its id right away (queueing runs in the background).
+    Empty filters are refused unless "all" is true.
+    """
+    if request.method == "GET":
+        return jsonify({"success": True, "broadcasts": list_broadcasts()})
+
+    data = request.get_json(silent=True) or {}
+    try:
+        where_sql, params = _broadcast_audience(data.get("filters"), send_to_all=data.get("all") is True)
+    except (TypeError, ValueError) as e:
+        return jsonify({"success": False, "message": f"Invalid filters: {e}"}), 400
+
+    if data.get("dry_run"):
+        preview = preview_broadcast(where_sql, params)
+        if preview is None:
+            return jsonify({"success": False, "message": "Database connection failed"}), 500
+        return jsonify({"success": True, "dry_run": True, "audience": preview})
+
+    try:
+        broadcast_id = start_broadcast(data.get("message"), where_sql, params,
+                                       filters=data.get("filters"),
+                                       created_by=session.get("admin_id"))
+    except ValueError as e:
+        return jsonify({"success": False, "message": str(e)}), 400
+    if broadcast_id is None:
+        return jsonify({"success": False, "message": "Database connection failed"}), 500
+    return jsonify({"success": True, "broadcast_id": broadcast_id}), 202
+
+
+@admin_bp.route("/api/sms/broadcasts/<int:broadcast_id>")
+def api_sms_broadcast_detail(broadcast_id):
+    """Broadcast counters plus send progress, throughput and ETA."""
+    broadcast = get_broadcast(broadcast_id)
+    if not broadcast:
+        return jsonify({"success": False, "message": "Broadcast not found"}), 404
+    return jsonify({"success": True, "broadcast": broadcast})
+
+
+@admin_bp.route("/api/sms/broadcasts/<int:broadcast_id>/cancel", methods=["POST"])
+def api_sms_broadcast_cancel(broadcast_id):
+    dropped = cancel_broadcast(broadcast_id)
+    if dropped is None:
+        return jsonify({"success": False, "message": "Database connection failed"}), 500
+    return jsonify({"success": True, "dropped": dropped})
+
+
 @admin_bp.route("/approve-reupload/<int:applicant_id>", methods=["POST"])
 def approve_reupload(applicant_id):
     try:
@@ -2646,20 +2730,11 @@ def approve_reupload(applicant_id):
             ("Approved", applicant_id)
         )
         conn.commit()
+        invalidate_analytics("applicants")
 
         # Send approval email
-        subject = "PESO SmartHire - Full Access Granted"
-        body = f"""
-        <p>Hi {applicant['first_name']},</p>
-        <p>This is PESO SmartHire Team.</p>
-        <p>Congratulations! Your reuploaded document has been reviewed and approved.</p>
-        <p>You now have full access to all features of the PESO SmartHire platform.</p>
-        <p>Thank you for your cooperation!</p>
-        <p>— PESO SmartHire Admin</p>
-        """
-        msg = Message(subject=subject, recipients=[
-                      applicant["email"]], html=body)
-        mail.send(msg)
+        queue_template("reupload_approved", [applicant["email"]],
+                       {"name": applicant["first_name"], "employer": False})
 
         cursor.close()
         conn.close()
@@ -2700,20 +2775,11 @@ def approve_employer_reupload(employer_id):
             ("Approved", employer_id)
         )
         conn.commit()
+        invalidate_analytics("employers")
 
         # Send approval email
-        subject = "PESO SmartHire - Full Access Granted"
-        body = f"""
-        <p>Dear {employer['employer_name']},</p>
-        <p>This is PESO SmartHire Team.</p>
-        <p>Congratulations! Your reuploaded documents have been reviewed and approved.</p>
-        <p>You now have full access to all features of the PESO SmartHire employer platform.</p>
-        <p>Thank you for your cooperation!</p>
-        <p>— PESO SmartHire Admin</p>
-        """
-        msg = Message(subject=subject, recipients=[
-                      employer["email"]], html=body)
-        mail.send(msg)
+        queue_template("reupload_approved", [employer["email"]],
+                       {"name": employer["employer_name"], "employer": True})
 
         cursor.close()
         conn.close()
@@ -2802,60 +2868,30 @@ def update_nonlipeno_status(applicant_id):
 
         # EXISTING users keep their must_change_password = 0 (they already changed password)
 
+        # Credentials block for first-time applicants; existing ones keep theirs
+        credentials = {
+            "code_label": "Applicant ID",
+            "code": applicant["applicant_code"],
+            "email": applicant["email"],
+            "phone": applicant["phone"],
+            "password": temp_password_plain,
+        } if is_new_applicant else None
+
         if action == "approved":
             new_status = "Approved"
-            subject = "PESO SmartHire - Application Approved"
-
-            if is_new_applicant:
-                # NEW applicant - send email with credentials
-                body = f"""
-                <p>Hi {applicant['first_name']},</p>
-                <p>This is PESO SmartHire Team.</p>
-                <p>Congratulations! Your registration has been reviewed and approved!</p>
-                <p>Included below are your login credentials:</p>
-                <ul>
-                    <li>Applicant ID: {applicant['applicant_code']}</li>
-                    <li>Email: {applicant['email']}</li>
-                    <li>Phone Number: {applicant['phone']}</li>
-                    <li>Password: {temp_password_plain}</li>
-                </ul>
-                <p><strong>Please change your password after logging in.</strong></p>
-                <p>Thank you for joining our PESO SmartHire Platform.</p>
-                <p>— PESO SmartHire Admin</p>
-                """
-            else:
-                # EXISTING applicant (residency change) - send approval without credentials
-                body = f"""
-                <p>Hi {applicant['first_name']},</p>
-                <p>This is PESO SmartHire Team.</p>
-                <p>Congratulations! Your residency change has been reviewed and approved.</p>
-                <p>You now have full access to all features of the PESO SmartHire platform.</p>
-                <p>You can log in using your existing credentials to continue using our services.</p>
-                <p>Thank you for keeping your information up to date!</p>
-                <p>— PESO SmartHire Admin</p>
-                """
+            # NEW applicant gets credentials, EXISTING (residency change) just the approval
+            template_id = "applicant_approved"
+            context = {"name": applicant["first_name"], "credentials": credentials}
 
             success_message = "Non-Lipeño applicant approved successfully! Credentials sent via email."
 
         elif action == "rejected":
             reason = data.get("reason")
-            subject = "PESO SmartHire - Application Status Update"
-            reason_block = f"<p><strong>Reason:</strong> {reason}</p>" if reason else ""
-
-            body = f"""
-            <p>Hi {applicant['first_name']},</p>
-            <p>This is PESO SmartHire Team.</p>
-            <p>We regret to inform you that your application for PESO SmartHire has been reviewed but did not meet the current requirements.</p>
-            {reason_block}
-            <p>You may reapply in the future once you meet the qualifications.</p>
-            <p>— PESO SmartHire Admin</p>
-            """
 
             # 1. Send Email FIRST (before deleting data)
-            msg = Message(subject=subject, recipients=[
-                          applicant["email"]], html=body)
             try:
-                mail.send(msg)
+                queue_template("applicant_rejected", [applicant["email"]],
+                               {"name": applicant["first_name"], "reason": reason})
             except Exception as e:
                 logger.error(f"Failed to send rejection email: {e}")
 
@@ -2876,6 +2912,7 @@ def update_nonlipeno_status(applicant_id):
             cursor.execute(
                 "DELETE FROM applicants WHERE applicant_id = %s", (applicant_id,))
             conn.commit()
+            invalidate_analytics("applicants")
 
             cursor.close()
             conn.close()
@@ -2884,46 +2921,11 @@ def update_nonlipeno_status(applicant_id):
         elif action == "reupload":
             new_status = "Reupload"
             document_name = data.get("document_name", "Recommendation Letter")
-            subject = "PESO SmartHire - Document Reupload Required"
-
-            if is_new_applicant:
-                # NEW applicant - send welcome email with credentials and reupload instructions
-                body = f"""
-                <p>Hi {applicant['first_name']},</p>
-                <p>This is PESO SmartHire Team.</p>
-                <p>We have reviewed your application for PESO SmartHire. To proceed with your application, we need you to upload your {document_name}.</p>
-                <p>To help you get started, here are your login credentials:</p>
-                <ul>
-                    <li>Applicant ID: {applicant['applicant_code']}</li>
-                    <li>Email: {applicant['email']}</li>
-                    <li>Phone Number: {applicant['phone']}</li>
-                    <li>Password: {temp_password_plain}</li>
-                </ul>
-                <p><strong>Steps to Upload Your Document:</strong></p>
-                <ol>
-                    <li>Log in to your account using the credentials above</li>
-                    <li>Upload your {document_name}</li>
-                </ol>
-                <p>We'll review your document once it's uploaded and notify you of any updates.</p>
-                <p>Thank you for choosing PESO SmartHire!</p>
-                <p>— PESO SmartHire Admin</p>
-                """
-            else:
-                # EXISTING applicant - regular reupload (don't force password change)
-                body = f"""
-                <p>Hi {applicant['first_name']},</p>
-                <p>This is PESO SmartHire Team.</p>
-                <p>We need you to provide an updated {document_name} for your application.</p>
-                <p><strong>Required Action:</strong></p>
-                <ol>
-                    <li>Log in to your PESO SmartHire account</li>
-                    <li>Upload your updated {document_name}</li>
-                </ol>
-                <p>We'll review your document once it's uploaded and update your application status accordingly.</p>
-                <p>Note: If you've forgotten your password, you can reset it using the "Forgot Password" option on the login page.</p>
-                <p>Thank you for your cooperation!</p>
-                <p>— PESO SmartHire Admin</p>
-                """
+            # NEW applicant gets credentials with the instructions; EXISTING
+            # applicant a regular reupload request (don't force password change)
+            template_id = "applicant_reupload_requested"
+            context = {"name": applicant["first_name"], "credentials": credentials,
+                       "document_name": document_name}
 
             success_message = "Re-upload request sent. Email notification sent to applicant."
 
@@ -2947,13 +2949,9 @@ def update_nonlipeno_status(applicant_id):
             )
 
         conn.commit()
+        invalidate_analytics("applicants")
 
-        msg = Message(
-            subject=subject,
-            recipients=[applicant["email"]],
-            html=body
-        )
-        mail.send(msg)
+        queue_template(template_id, [applicant["email"]], context)
 
         cursor.close()
         conn.close()
@@ -3399,21 +3397,16 @@ def admin_view_job(job_id):
             conn.close()
 
 
-def safe_send_email(subject, recipient, body):
-    """Send email with proper error handling"""
+def safe_send_email(template_id, recipient, context):
+    """Queue a templated email with proper error handling"""
     if not recipient:
-        print(f"❌ No recipient for: {subject}")
+        print(f"❌ No recipient for: {template_id}")
         return False
 
     try:
-        msg = Message(
-            subject=subject,
-            recipients=[recipient],
-            html=body,
-            sender=("PESO SmartHire", "noreply@pesosmarthire.com")
-        )
-        mail.send(msg)
-        print(f"✅ Email sent to: {recipient}")
+        queue_template(template_id, [recipient], context,
+                       sender=("PESO SmartHire", "noreply@pesosmarthire.com"))
+        print(f"✅ Email queued for: {recipient}")
         return True
     except Exception as e:
         print(f"❌ Failed to send email to {recipient}: {str(e)}")
@@ -3466,11 +3459,13 @@ def handle_job_report_action(report_id):
     if action not in valid_actions:
         return jsonify({"success": False, "message": "Invalid action"}), 400
 
-    conn = create_connection()
+    # Request-scoped so create_notification reuses this connection
+    conn = get_db()
     if not conn:
         return jsonify({"success": False, "message": "Database connection failed"}), 500
 
-    cursor = conn.cursor(dictionary=True)
+    # Buffered: create_notification runs on this connection between fetches
+    cursor = conn.cursor(dictionary=True, buffered=True)
     try:
         cursor.execute("""
             SELECT 
@@ -3513,7 +3508,7 @@ def handle_job_report_action(report_id):
             if employer_id:
                 print(
                     f"[notify] creating notification -> EMPLOYER {employer_id} (reported). job_id={job_id}")
-                create_notification(
+                enqueue_notification(
                     notification_type="report_verdict",
                     title="Job Suspended",
                     message=(
@@ -3530,7 +3525,7 @@ def handle_job_report_action(report_id):
             if reporter_id:
                 print(
                     f"[notify] creating notification -> APPLICANT {reporter_id} (reporter). job_id={job_id}")
-                create_notification(
+                enqueue_notification(
                     notification_type="report_verdict",
                     title="Report Confirmed",
                     message=(
@@ -3567,6 +3562,7 @@ def handle_job_report_action(report_id):
             impacted_applicants = cursor.fetchall() or []
 
             conn.commit()
+            invalidate_analytics("jobs", "applications")
             print("✅ Database updates committed")
 
             # ========== EMAIL SENDING ==========
@@ -3577,17 +3573,11 @@ def handle_job_report_action(report_id):
             if employer_email:
                 try:
                     print(f"📧 Sending email to employer: {employer_email}")
-                    safe_send_email(
-                        "Job post suspended",
-                        employer_email,
-                        f"""
-                        <p>Hello {report.get('employer_name', 'Employer')},</p>
-                        <p>Your job post titled <strong>{job_position}</strong> has been reported and confirmed. 
-                        It is now temporarily <strong>suspended</strong> and all applications have been cancelled.</p>
-                        <p>You have <strong>{days} days</strong> to respond to this report.</p>
-                        <p>Please contact PESO SmartHire admin for more details.</p>
-                        """
-                    )
+                    safe_send_email("job_suspended_employer", employer_email, {
+                        "name": report.get("employer_name"),
+                        "job_position": job_position,
+                        "days": days,
+                    })
                     email_count += 1
                 except Exception as e:
                     print(f"❌ Employer email error: {e}")
@@ -3599,16 +3589,10 @@ def handle_job_report_action(report_id):
                     try:
                         print(
                             f"📧 Sending email to applicant: {applicant_email}")
-                        safe_send_email(
-                            "Application cancelled",
-                            applicant_email,
-                            f"""
-                            <p>Hi {applicant.get('first_name', 'Applicant')},</p>
-                            <p>The job post <strong>{job_position}</strong> was suspended after our investigation. 
-                            Your application has been cancelled automatically.</p>
-                            <p>We apologize for any inconvenience.</p>
-                            """
-                        )
+                        safe_send_email("job_application_cancelled", applicant_email, {
+                            "name": applicant.get("first_name"),
+                            "job_position": job_position,
+                        })
                         email_count += 1
                     except Exception as e:
                         print(
@@ -3619,16 +3603,10 @@ def handle_job_report_action(report_id):
             if reporter_email:
                 try:
                     print(f"📧 Sending email to reporter: {reporter_email}")
-                    safe_send_email(
-                        "Report confirmed",
-                        reporter_email,
-                        f"""
-                        <p>Hi {report.get('reporter_name', 'Applicant')},</p>
-                        <p>Your report for <strong>{job_position}</strong> has been confirmed. 
-                        The job post is now suspended.</p>
-                        <p>Thank you for helping maintain the quality of our platform.</p>
-                        """
-                    )
+                    safe_send_email("job_report_confirmed", reporter_email, {
+                        "name": report.get("reporter_name"),
+                        "job_position": job_position,
+                    })
                     email_count += 1
                 except Exception as e:
                     print(f"❌ Reporter email error: {e}")
@@ -3654,7 +3632,7 @@ def handle_job_report_action(report_id):
             if reporter_id:
                 print(
                     f"[notify] creating REJECT notification -> APPLICANT {reporter_id}. report_id={report_id}")
-                create_notification(
+                enqueue_notification(
                     notification_type="report_verdict",
                     title="Report Rejected",
                     message=(
@@ -3673,17 +3651,11 @@ def handle_job_report_action(report_id):
                 try:
                     print(
                         f"📧 Sending rejection email to reporter: {reporter_email}")
-                    safe_send_email(
-                        "Report rejected",
-                        reporter_email,
-                        f"""
-                        <p>Hi {report.get('reporter_name', 'Applicant')},</p>
-                        <p>Your report for <strong>{job_position}</strong> was rejected. 
-                        Our moderators did not find sufficient evidence.</p>
-                        {f'<p>Moderator note: {moderator_note}</p>' if moderator_note else ''}
-                        <p>Thank you for your understanding.</p>
-                        """
-                    )
+                    safe_send_email("job_report_rejected", reporter_email, {
+                        "name": report.get("reporter_name"),
+                        "job_position": job_position,
+                        "moderator_note": moderator_note,
+                    })
                 except Exception as e:
                     print(f"❌ Reporter rejection email error: {e}")
 
@@ -3795,6 +3767,7 @@ def handle_applicant_report_action(report_id):
             )
 
             conn.commit()
+            invalidate_analytics("applications")
 
             report_reason = report.get('reason', 'Violation')
 
@@ -3836,41 +3809,19 @@ def handle_applicant_report_action(report_id):
                     f"[warn] employer_id missing for report {report_id} - cannot notify reporter.")
 
             # Send Email to Applicant
-            safe_send_email(
-                "Application Restrictions - PESO SmartHire",
-                report.get("applicant_email"),
-                f"""
-                <p>Hi {report.get('applicant_name', 'Applicant')},</p>
-                <p>A report from <strong>{employer_name}</strong> has been confirmed by our moderation team.</p>
-                <p>As a result, you have been <strong>restricted from applying to job posts at {employer_name}</strong>.</p>
-                
-                <p><strong>What this means:</strong></p>
-                <ul>
-                    <li> You can still apply to all other companies on our platform</li>
-                    <li> You can still login and use all platform features</li>
-                    <li> You can still update your profile and resume</li>
-                    <li> You cannot apply to {employer_name}'s job posts</li>
-                </ul>
-                
-                <p>This restriction will {'expire automatically after ' + str(blacklist_days) + ' days' if blacklist_days > 0 else 'remain in place until further review'}.</p>
-                
-                <p>If you believe this is a mistake, please contact PESO SmartHire support.</p>
-                """
-            )
+            safe_send_email("applicant_restricted", report.get("applicant_email"), {
+                "name": report.get("applicant_name"),
+                "employer_name": employer_name,
+                "blacklist_days": blacklist_days,
+            })
 
             # Send Email to Employer
-            safe_send_email(
-                "Report Confirmed - PESO SmartHire",
-                report.get("employer_email"),
-                f"""
-                <p>Hi {report.get('employer_name', 'Employer')},</p>
-                <p>Your report against applicant <strong>{report.get('applicant_name', '')} ({report.get('applicant_code', '')})</strong> has been confirmed.</p>
-                <p>This applicant has been restricted from applying to your job posts.</p>
-                <p>They can still apply to other employers on our platform.</p>
-                <p>The restriction will {'expire after ' + str(blacklist_days) + ' days' if blacklist_days > 0 else 'remain in place until further review'}.</p>
-                <p>Thank you for helping maintain platform quality.</p>
-                """
-            )
+            safe_send_email("applicant_report_confirmed", report.get("employer_email"), {
+                "name": report.get("employer_name"),
+                "applicant_name": report.get("applicant_name", ""),
+                "applicant_code": report.get("applicant_code", ""),
+                "blacklist_days": blacklist_days,
+            })
 
             return jsonify({
                 "success": True,
@@ -3906,17 +3857,11 @@ def handle_applicant_report_action(report_id):
                 print(
                     f"[warn] employer_id missing for report {report_id} - cannot notify reporter on reject.")
 
-            safe_send_email(
-                "Report Rejected - PESO SmartHire",
-                report.get("employer_email"),
-                f"""
-                <p>Hi {report.get('employer_name', 'Employer')},</p>
-                <p>Your report against {report.get('applicant_name', 'an applicant')} was reviewed but we did not find sufficient evidence of violation.</p>
-                {f'<p><strong>Moderator note:</strong> {moderator_note}</p>' if moderator_note else ''}
-                <p>The applicant continues to have full access to the platform.</p>
-                <p>Thank you for your understanding.</p>
-                """
-            )
+            safe_send_email("applicant_report_rejected", report.get("employer_email"), {
+                "name": report.get("employer_name"),
+                "applicant_name": report.get("applicant_name"),
+                "moderator_note": moderator_note,
+            })
 
             return jsonify({
                 "success": True,
@@ -4015,6 +3960,7 @@ def update_report_status():
                     "UPDATE jobs SET status = 'suspended' WHERE job_id = %s", (job_id,))
                 cursor.execute(
                     "UPDATE applications SET status = 'Cancelled' WHERE job_id = %s", (job_id,))
+                invalidate_analytics("jobs", "applications")
 
                 # [Existing] Get impacted applicants for email
                 cursor.execute("""
@@ -4046,17 +3992,17 @@ def update_report_status():
                     )
 
                 if report.get('employer_email'):
-                    safe_send_email(
-                        "Job Post Suspended", report['employer_email'], f"<p>Your job '{job_position}' was suspended.</p>")
+                    safe_send_email("job_suspended_employer", report['employer_email'], {
+                        "name": report.get("employer_name"), "job_position": job_position})
 
                 if report.get('reporter_email'):
-                    safe_send_email(
-                        "Report Confirmed", report['reporter_email'], f"<p>Your report on '{job_position}' was confirmed.</p>")
+                    safe_send_email("job_report_confirmed", report['reporter_email'], {
+                        "name": report.get("reporter_name"), "job_position": job_position})
 
                 for app_user in impacted_applicants:
                     if app_user.get('email'):
-                        safe_send_email(
-                            "Application Cancelled", app_user['email'], f"<p>Your application to '{job_position}' was cancelled.</p>")
+                        safe_send_email("job_application_cancelled", app_user['email'], {
+                            "name": app_user.get("first_name"), "job_position": job_position})
 
             # === CASE B: REJECTED ===
             elif new_status == "Rejected":
@@ -4072,11 +4018,8 @@ def update_report_status():
 
                 # [Existing Email Logic]
                 if report.get('reporter_email'):
-                    safe_send_email(
-                        "Report Rejected",
-                        report['reporter_email'],
-                        f"<p>Your report for <strong>{job_position}</strong> was reviewed and rejected. We did not find sufficient evidence of a violation.</p>"
-                    )
+                    safe_send_email("job_report_rejected", report['reporter_email'], {
+                        "name": report.get("reporter_name"), "job_position": job_position})
 
         conn.commit()
         return jsonify({"status": "success", "message": "Status updated and notifications sent!"})
@@ -4303,6 +4246,7 @@ def delete_rejected_employer(employer_id):
             (employer_id,)
         )
         conn.commit()
+        invalidate_analytics("employers")
 
         cursor.close()
         conn.close()
@@ -4368,52 +4312,27 @@ def update_local_employer_status(employer_id):
                 temp_password_plain = employer.get("temp_password")
 
             new_status = "Approved"
-            subject = "PESO SmartHire - Local Recruitment Account Approved"
-
-            if is_new_employer:
-                credentials_block = f"""
-                <p>Included below are your login credentials:</p>
-                <ul>
-                    <li>Employer Code: {employer['employer_code']}</li>
-                    <li>Email: {employer['email']}</li>
-                    <li>Phone Number: {employer['phone']}</li>
-                    <li>Password: {temp_password_plain}</li>
-                </ul>
-                <p><strong>You are required to change your password upon logging in for security purposes.</strong></p>
-                """
-            else:
-                credentials_block = """
-                <p><strong>Use your existing login credentials to access your account.</strong></p>
-                """
-
-            body = f"""
-            <p>Dear {employer['employer_name']},</p>
-            <p>This is PESO SmartHire Team.</p>
-            <p>Congratulations! Your local recruitment account has been reviewed and approved!</p>
-            <p>You may now post job orders and access your employer dashboard to manage your recruitment activities.</p>
-            {credentials_block}
-            <p>To get started, visit our platform and log in with your credentials. You can then begin posting job orders and managing your recruitment needs.</p>
-            <p>If you have any questions or need assistance, please don't hesitate to contact our support team.</p>
-            <p>Thank you for partnering with PESO SmartHire!</p>
-            <p>— PESO SmartHire Admin</p>
-            """
+            template_id = "employer_approved"
+            # NEW employers get their credentials, EXISTING ones keep theirs
+            context = {
+                "name": employer["employer_name"],
+                "recruitment_label": "local",
+                "credentials": {
+                    "code_label": "Employer Code",
+                    "code": employer["employer_code"],
+                    "email": employer["email"],
+                    "phone": employer["phone"],
+                    "password": temp_password_plain,
+                } if is_new_employer else None,
+            }
             success_message = "Local employer approved successfully! Email notification sent."
 
         elif action == "rejected":
             new_status = "Rejected"
             reason = data.get("reason") if isinstance(data, dict) else None
-            subject = "PESO SmartHire - Local Recruitment Account Status Update"
-            reason_block = f"<p><strong>Reason:</strong> {reason}</p>" if reason else ""
-            body = f"""
-            <p>Dear {employer['employer_name']},</p>
-            <p>This is PESO SmartHire Team.</p>
-            <p>We regret to inform you that your local recruitment account application has been reviewed but did not meet the current requirements.</p>
-            {reason_block}
-            <p>Please review the requirements and feel free to reapply in the future once you have met all the necessary qualifications.</p>
-            <p>If you have any questions regarding this decision, please contact our support team.</p>
-            <p>Thank you for your interest in PESO SmartHire.</p>
-            <p>— PESO SmartHire Admin</p>
-            """
+            template_id = "employer_rejected"
+            context = {"name": employer["employer_name"], "recruitment_label": "local",
+                       "reason": reason}
 
             is_new_registration = (employer['status'] == 'Pending') and (
                 employer.get("recruitment_type_change_pending", 0) == 0)
@@ -4422,9 +4341,7 @@ def update_local_employer_status(employer_id):
                 success_message = "Employer application rejected and record deleted."
 
                 try:
-                    msg = Message(subject=subject, recipients=[
-                                  employer["email"]], html=body)
-                    mail.send(msg)
+                    queue_template(template_id, [employer["email"]], context)
                 except Exception as email_error:
                     logger.error(
                         f"Failed to send rejection email: {email_error}")
@@ -4459,6 +4376,7 @@ def update_local_employer_status(employer_id):
                     (employer_id,)
                 )
                 conn.commit()
+                invalidate_analytics("employers")
                 cursor.close()
                 conn.close()
 
@@ -4511,31 +4429,19 @@ def update_local_employer_status(employer_id):
             documents_to_reupload = json.dumps(
                 normalized_docs) if normalized_docs else None
 
-            docs_block = ""
-            if requested_list:
-                docs_html = "".join([f"<li>{d}</li>" for d in requested_list])
-                docs_block = f"<p>The documents we specifically request you to re-upload are:</p><ul>{docs_html}</ul>"
-
-            subject = "PESO SmartHire - Local Recruitment Documents Update Required"
-            body = f"""
-            <p>Dear {employer['employer_name']},</p>
-            <p>This is PESO SmartHire Team.</p>
-            <p>We have reviewed your local recruitment account and noticed that some of your required documents need to be updated or are missing important information.</p>
-            {docs_block}
-            <p>Please log in to your account and re-upload the required documents through your employer dashboard as soon as possible.</p>
-            <p>Here are your login credentials:</p>
-            <ul>
-                <li>Employer ID: {employer['employer_code']}</li>
-                <li>Email: {employer['email']}</li>
-                <li>Phone Number: {employer['phone']}</li>
-                <li>Password: {temp_password_plain}</li>
-            </ul>
-            <p><strong>Please change your password after logging in for security purposes.</strong></p>
-            <p>Once you have updated your documents, we will review them promptly and notify you of the status.</p>
-            <p>If you need any assistance, please contact our support team.</p>
-            <p>Thank you for your cooperation!</p>
-            <p>— PESO SmartHire Admin</p>
-            """
+            template_id = "employer_documents_reupload"
+            context = {
+                "name": employer["employer_name"],
+                "recruitment_label": "local",
+                "documents": requested_list,
+                "credentials": {
+                    "code_label": "Employer ID",
+                    "code": employer["employer_code"],
+                    "email": employer["email"],
+                    "phone": employer["phone"],
+                    "password": temp_password_plain,
+                },
+            }
             success_message = "Re-upload request sent. Email notification with login credentials sent to local employer."
 
         else:
@@ -4561,11 +4467,10 @@ def update_local_employer_status(employer_id):
                 (new_status, is_active_value, documents_to_reupload, employer_id)
             )
         conn.commit()
+        invalidate_analytics("employers")
 
         try:
-            msg = Message(subject=subject, recipients=[
-                          employer["email"]], html=body)
-            mail.send(msg)
+            queue_template(template_id, [employer["email"]], context)
         except Exception as e:
             print(f"Failed to send email: {e}")
 
@@ -4630,52 +4535,27 @@ def update_international_employer_status(employer_id):
                 temp_password_plain = employer.get("temp_password")
 
             new_status = "Approved"
-            subject = "PESO SmartHire - International Recruitment Account Approved"
-
-            if is_new_employer:
-                credentials_block = f"""
-                <p>Included below are your login credentials:</p>
-                <ul>
-                    <li>Employer Code: {employer['employer_code']}</li>
-                    <li>Email: {employer['email']}</li>
-                    <li>Phone Number: {employer['phone']}</li>
-                    <li>Password: {temp_password_plain}</li>
-                </ul>
-                <p><strong>You are required to change your password upon logging in for security purposes.</strong></p>
-                """
-            else:
-                credentials_block = """
-                <p><strong>Use your existing login credentials to access your account.</strong></p>
-                """
-
-            body = f"""
-            <p>Dear {employer['employer_name']},</p>
-            <p>This is PESO SmartHire Team.</p>
-            <p>Congratulations! Your international recruitment account has been reviewed and approved!</p>
-            <p>You may now post job orders and access your employer dashboard to manage your recruitment activities.</p>
-            {credentials_block}
-            <p>To get started, visit our platform and log in with your credentials. You can then begin posting job orders and managing your recruitment needs.</p>
-            <p>If you have any questions or need assistance, please don't hesitate to contact our support team.</p>
-            <p>Thank you for partnering with PESO SmartHire!</p>
-            <p>— PESO SmartHire Admin</p>
-            """
+            template_id = "employer_approved"
+            # NEW employers get their credentials, EXISTING ones keep theirs
+            context = {
+                "name": employer["employer_name"],
+                "recruitment_label": "international",
+                "credentials": {
+                    "code_label": "Employer Code",
+                    "code": employer["employer_code"],
+                    "email": employer["email"],
+                    "phone": employer["phone"],
+                    "password": temp_password_plain,
+                } if is_new_employer else None,
+            }
             success_message = "International employer approved successfully! Email notification sent."
 
         elif action == "rejected":
             new_status = "Rejected"
             reason = data.get("reason") if isinstance(data, dict) else None
-            subject = "PESO SmartHire - International Recruitment Account Status Update"
-            reason_block = f"<p><strong>Reason:</strong> {reason}</p>" if reason else ""
-            body = f"""
-            <p>Dear {employer['employer_name']},</p>
-            <p>This is PESO SmartHire Team.</p>
-            <p>We regret to inform you that your international recruitment account application has been reviewed but did not meet the current requirements.</p>
-            {reason_block}
-            <p>Please review the requirements and feel free to reapply in the future once you have met all the necessary qualifications.</p>
-            <p>If you have any questions regarding this decision, please contact our support team.</p>
-            <p>Thank you for your interest in PESO SmartHire.</p>
-            <p>— PESO SmartHire Admin</p>
-            """
+            template_id = "employer_rejected"
+            context = {"name": employer["employer_name"], "recruitment_label": "international",
+                       "reason": reason}
 
             is_new_registration = (employer['status'] == 'Pending') and (
                 employer.get("recruitment_type_change_pending", 0) == 0)
@@ -4684,9 +4564,7 @@ def update_international_employer_status(employer_id):
                 success_message = "Employer application rejected and record deleted."
 
                 try:
-                    msg = Message(subject=subject, recipients=[
-                                  employer["email"]], html=body)
-                    mail.send(msg)
+                    queue_template(template_id, [employer["email"]], context)
                 except Exception as email_error:
                     logger.error(
                         f"Failed to send rejection email: {email_error}")
@@ -4721,6 +4599,7 @@ def update_international_employer_status(employer_id):
                     (employer_id,)
                 )
                 conn.commit()
+                invalidate_analytics("employers")
                 cursor.close()
                 conn.close()
 
@@ -4770,31 +4649,19 @@ def update_international_employer_status(employer_id):
             documents_to_reupload = json.dumps(
                 normalized_docs) if normalized_docs else None
 
-            docs_block = ""
-            if requested_list:
-                docs_html = "".join([f"<li>{d}</li>" for d in requested_list])
-                docs_block = f"<p>The documents we specifically request you to re-upload are:</p><ul>{docs_html}</ul>"
-
-            subject = "PESO SmartHire - International Recruitment Documents Update Required"
-            body = f"""
-            <p>Dear {employer['employer_name']},</p>
-            <p>This is PESO SmartHire Team.</p>
-            <p>We have reviewed your international recruitment account and noticed that some of your required documents need to be updated or are missing important information.</p>
-            {docs_block}
-            <p>Please log in to your account and re-upload the required documents through your employer dashboard as soon as possible.</p>
-            <p>Here are your login credentials:</p>
-            <ul>
-                <li>Employer ID: {employer['employer_code']}</li>
-                <li>Email: {employer['email']}</li>
-                <li>Phone Number: {employer['phone']}</li>
-                <li>Password: {temp_password_plain}</li>
-            </ul>
-            <p><strong>Please change your password after logging in for security purposes.</strong></p>
-            <p>Once you have updated your documents, we will review them promptly and notify you of the status.</p>
-            <p>If you need any assistance, please contact our support team.</p>
-            <p>Thank you for your cooperation!</p>
-            <p>— PESO SmartHire Admin</p>
-            """
+            template_id = "employer_documents_reupload"
+            context = {
+                "name": employer["employer_name"],
+                "recruitment_label": "international",
+                "documents": requested_list,
+                "credentials": {
+                    "code_label": "Employer ID",
+                    "code": employer["employer_code"],
+                    "email": employer["email"],
+                    "phone": employer["phone"],
+                    "password": temp_password_plain,
+                },
+            }
             success_message = "Re-upload request sent. Email notification with login credentials sent to international employer."
 
         else:
@@ -4820,11 +4687,10 @@ def update_international_employer_status(employer_id):
                 (new_status, is_active_value, documents_to_reupload, employer_id)
             )
         conn.commit()
+        invalidate_analytics("employers")
 
         try:
-            msg = Message(subject=subject, recipients=[
-                          employer["email"]], html=body)
-            mail.send(msg)
+            queue_template(template_id, [employer["email"]], context)
         except Exception as e:
             print(f"Failed to send email: {e}")
 
@@ -4894,6 +4760,7 @@ def reupload_recruitment_type_change(employer_id):
         """, ("Reupload", documents_to_reupload_json, employer_id))
 
         conn.commit()
+        invalidate_analytics("employers")
 
         temp_password_plain = None
         # If new and missing temp_password, generate one. Otherwise keep existing temp_password (DO NOT reset for existing)
@@ -4909,43 +4776,18 @@ def reupload_recruitment_type_change(employer_id):
         else:
             temp_password_plain = employer.get("temp_password")
 
-        doc_list = "".join([f"<li>{label}</li>" for label in doc_labels])
-
+        # NEW employers also get their phone and temporary password
+        credentials = {"code_label": "Employer Code", "code": employer["employer_code"],
+                       "email": employer["email"]}
         if is_new_employer:
-            credentials_block = f"""
-            <p>Please log in to your account using the credentials below and upload these documents in the <strong>Documents tab only</strong> (other features are temporarily restricted).</p>
-            <ul>
-                <li>Employer Code: {employer['employer_code']}</li>
-                <li>Email: {employer['email']}</li>
-                <li>Phone Number: {employer['phone']}</li>
-                <li>Password: {temp_password_plain}</li>
-            </ul>
-            """
-        else:
-            credentials_block = f"""
-            <p>Please log in to your account using your existing credentials and upload these documents in the <strong>Documents tab only</strong> (other features are temporarily restricted).</p>
-            <ul>
-                <li>Employer Code: {employer['employer_code']}</li>
-                <li>Email: {employer['email']}</li>
-            </ul>
-            """
-
-        subject = f"PESO SmartHire - Reupload Required for {new_recruitment_type} Recruitment"
-        body = f"""
-        <p>Dear {employer['employer_name']},</p>
-        <p>This is PESO SmartHire Team.</p>
-        <p>We have reviewed your recruitment type change to <strong>{new_recruitment_type} recruitment</strong> and need you to reupload the required documents.</p>
-        <p><strong>You must reupload the following documents:</strong></p>
-        <ul>{doc_list}</ul>
-        {credentials_block}
-        <p>Once you have uploaded the required documents, we will review them and notify you of the status.</p>
-        <p>Thank you for your cooperation!</p>
-        <p>— PESO SmartHire Admin</p>
-        """
+            credentials.update(phone=employer["phone"], password=temp_password_plain)
 
-        msg = Message(subject=subject, recipients=[
-                      employer["email"]], html=body)
-        mail.send(msg)
+        queue_template("employer_type_change_reupload", [employer["email"]], {
+            "name": employer["employer_name"],
+            "recruitment_type": new_recruitment_type,
+            "documents": doc_labels,
+            "credentials": credentials,
+        })
 
         cursor.close()
         conn.close()
@@ -5040,28 +4882,20 @@ def approve_recruitment_type_change(employer_id):
         """, ("Approved", employer_id))
 
         conn.commit()
+        invalidate_analytics("employers")
 
         # Send approval email with EXISTING login credentials
-        subject = f"PESO SmartHire - {employer['recruitment_type']} Recruitment Approved"
-        body = f"""
-        <p>Dear {employer['employer_name']},</p>
-        <p>This is PESO SmartHire Team.</p>
-        <p>Congratulations! Your recruitment type change has been reviewed and approved.</p>
-        <p>You may now use your account to manage {employer['recruitment_type'].lower()} recruitment activities.</p>
-        <p><strong>To log in, use your existing credentials:</strong></p>
-        <ul>
-            <li>Employer Code: {employer['employer_code']}</li>
-            <li>Email: {employer['email']}</li>
-            <li>Phone Number: {employer['phone']}</li>
-            <li>Password: (the password you use daily)</li>
-        </ul>
-        <p>Thank you for partnering with PESO SmartHire!</p>
-        <p>— PESO SmartHire Admin</p>
-        """
-
-        msg = Message(subject=subject, recipients=[
-                      employer["email"]], html=body)
-        mail.send(msg)
+        queue_template("employer_type_change_approved", [employer["email"]], {
+            "name": employer["employer_name"],
+            "recruitment_type": employer["recruitment_type"],
+            "credentials": {
+                "code_label": "Employer Code",
+                "code": employer["employer_code"],
+                "email": employer["email"],
+                "phone": employer["phone"],
+                "password": "(the password you use daily)",
+            },
+        })
 
         cursor.close()
         conn.close()
@@ -5124,25 +4958,14 @@ def reject_recruitment_type_change(employer_id):
         """, (old_type, employer_id))
 
         conn.commit()
+        invalidate_analytics("employers")
 
         # Send rejection email
-        subject = "PESO SmartHire - Recruitment Type Change Rejected"
-        reason_block = f"<p><strong>Reason:</strong> {reason}</p>" if reason else ""
-        body = f"""
-        <p>Dear {employer['employer_name']},</p>
-        <p>This is PESO SmartHire Team.</p>
-        <p>We regret to inform you that your request to change your recruitment type has been reviewed but could not be approved at this time.</p>
-        {reason_block}
-        <p>Your recruitment type has been reverted back to <strong>{old_type}</strong> recruitment.</p>
-        <p>Your previous documents have been restored and you may continue your {old_type.lower()} recruitment activities.</p>
-        <p>You may reapply for recruitment type change in the future once you meet all requirements.</p>
-        <p>If you have any questions, please contact our support team.</p>
-        <p>— PESO SmartHire Admin</p>
-        """
-
-        msg = Message(subject=subject, recipients=[
-                      employer["email"]], html=body)
-        mail.send(msg)
+        queue_template("employer_type_change_rejected", [employer["email"]], {
+            "name": employer["employer_name"],
+            "recruitment_type": old_type,
+            "reason": reason,
+        })
 
         cursor.close()
         conn.close()
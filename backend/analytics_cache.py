@@ -0,0 +1,151 @@
+from collections import OrderedDict
+from datetime import date
+from functools import wraps
+import hashlib
+import json
+import os
+import threading
+import time
+
+from flask import current_app, make_response, request
+
+# Response cache for the admin analytics routes.
+#
+# Every chart on the dashboard fetches its own route, and every admin loading
+# the page with the same filters used to recompute the same queries. Cached
+# routes are keyed by endpoint plus a hash of the normalized query args the
+# route actually reads (multi-value filters split on "|", de-duplicated and
+# sorted, empty values dropped), so parameter order and unused args do not
+# split the cache.
+#
+# Entries live for ANALYTICS_CACHE_TTL seconds in an LRU of at most
+# ANALYTICS_CACHE_MAX_ENTRIES. Each route declares the tags its data comes
+# from (applicants, employers, jobs, applications); write paths call
+# invalidate_analytics() with the tags they touched, which bumps the tag's
+# version and makes every entry built under the old version a miss.
+#
+# Versions are per process: other worker processes see a write once their
+# entries expire.
+
+CACHE_TTL = float(os.getenv("ANALYTICS_CACHE_TTL", 300))
+CACHE_MAX_ENTRIES = int(os.getenv("ANALYTICS_CACHE_MAX_ENTRIES", 512))
+
+TAGS = ("applicants", "employers", "jobs", "applications")
+
+# Args read as a single value by the routes; the rest are "|"-separated lists
+SINGLE_VALUE_ARGS = {"date_from", "date_to", "quick_range", "year", "month", "category"}
+
+_lock = threading.Lock()
+_entries = OrderedDict()  # (endpoint, args_hash) -> (expires_at, versions, body, mimetype)
+_versions = {tag: 0 for tag in TAGS}
+_stats = {"hits": 0, "misses": 0, "expired": 0, "invalidated": 0, "evictions": 0}
+
+
+def canonical_args(args, names):
+    """Hash of the args in `names`, normalized so equivalent filter sets collide."""
+    normalized = {}
+    for name in names:
+        raw = args.get(name) or ""
+        if name in SINGLE_VALUE_ARGS:
+            values = [raw.strip()] if raw.strip() else []
+        else:
+            values = sorted({value.strip() for value in raw.split("|") if value.strip()})
+        if values:
+            normalized[name] = values
+    # Quick ranges resolve against today's date
+    if "quick_range" in normalized:
+        normalized["today"] = date.today().isoformat()
+    return hashlib.sha256(json.dumps(normalized, sort_keys=True).encode()).hexdigest()
+
+
+def _current_versions(tags):
+    # Caller holds _lock
+    return tuple(_versions[tag] for tag in tags)
+
+
+def cache_get(key, tags):
+    """Cached (body, mimetype) for `key`, or None."""
+    now = time.monotonic()
+    with _lock:
+        entry = _entries.get(key)
+        if entry is None:
+            _stats["misses"] += 1
+            return None
+        expires_at, versions, body, mimetype = entry
+        if expires_at <= now or versions != _current_versions(tags):
+            del _entries[key]
+            _stats["expired" if expires_at <= now else "invalidated"] += 1
+            _stats["misses"] += 1
+            return None
+        _entries.move_to_end(key)
+        _stats["hits"] += 1
+        return body, mimetype
+
+
+def cache_versions(tags):
+    """Tag versions to store with an entry; read before computing it."""
+    with _lock:
+        return _current_versions(tags)
+
+
+def cache_put(key, versions, body, mimetype):
+    with _lock:
+        _entries[key] = (time.monotonic() + CACHE_TTL, versions, body, mimetype)
+        _entries.move_to_end(key)
+        while len(_entries) > CACHE_MAX_ENTRIES:
+            _entries.popitem(last=False)
+            _stats["evictions"] += 1
+
+
+def invalidate_analytics(*tags):
+    """Drop cached analytics built from any of `tags` (write paths call this after committing)."""
+    with _lock:
+        for tag in tags:
+            _versions[tag] += 1
+
+
+def cached_analytics(tags, args=()):
+    """
+    Serve a GET analytics route from the cache. `tags` are the tables its
+    data comes from, `args` the query args it reads. Only successful
+    responses are stored.
+    """
+    tags = tuple(tags)
+
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*view_args, **view_kwargs):
+            key = (request.endpoint, canonical_args(request.args, args))
+            cached = cache_get(key, tags)
+            if cached is not None:
+                body, mimetype = cached
+                response = current_app.response_class(body, status=200, mimetype=mimetype)
+                response.headers["X-Analytics-Cache"] = "hit"
+                return response
+
+            # Versions taken before the queries run, so a write that lands
+            # meanwhile leaves this entry already stale
+            versions = cache_versions(tags)
+            response = make_response(view(*view_args, **view_kwargs))
+            if response.status_code == 200 and response.is_json and (response.get_json() or {}).get("success"):
+                cache_put(key, versions, response.get_data(), response.mimetype)
+            response.headers["X-Analytics-Cache"] = "miss"
+            return response
+
+        # Lets the bundle endpoint share this route's entries
+        wrapper.cache_tags, wrapper.cache_args = tags, tuple(args)
+        return wrapper
+    return decorator
+
+
+def get_analytics_cache_stats():
+    with _lock:
+        lookups = _stats["hits"] + _stats["misses"]
+        return {
+            **_stats,
+            "hit_rate": round(_stats["hits"] / lookups, 3) if lookups else None,
+            "entries": len(_entries),
+            "max_entries": CACHE_MAX_ENTRIES,
+            "ttl_seconds": CACHE_TTL,
+            "tag_versions": dict(_versions),
+        }
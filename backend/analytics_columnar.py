@@ -0,0 +1,872 @@
+from datetime import date, datetime
+import os
+import threading
+import time
+import traceback
+
+from db_connection import create_connection, run_query
+
+from .analytics_cache import cache_versions
+from .analytics_filters import JOB_STATUS_MAPPING, MANILA_INDICATORS, SCHEDULE_MAPPING, date_range, year_range
+
+try:
+    import numpy as np
+except ImportError:  # optional; without it every widget is answered by SQL
+    np = None
+
+# In-memory columnar snapshot for the admin analytics dashboard.
+#
+# For deployments where the analytics tables fit in memory, each of
+# applicants, employers, jobs and applications is held as one NumPy array per
+# column: text columns dictionary-encoded (int32 codes into a list of the
+# distinct raw values), flags and ages as float (NaN for NULL) and timestamps
+# as datetime64 (NaT for NULL). The analytics data functions in admin.py ask
+# columnar_widget() first; it evaluates the same filters as the
+# build_*_filters() WHERE clauses as boolean masks and the GROUP BYs as
+# bincounts over the codes. Text matches and groups are case-insensitive,
+# like the tables' collation.
+#
+# Snapshots are refreshed in a background thread: incrementally, by fetching
+# rows with a new id or an updated_at at or past the last one seen (tables
+# without updated_at only pick up new ids), and from scratch every
+# ANALYTICS_COLUMNAR_FULL_RELOAD_SECONDS, when a row count shows deletes, or
+# when a write in this process touched a table without updated_at.
+#
+# Until a snapshot has caught up with the analytics cache tag versions (see
+# analytics_cache.invalidate_analytics) the widget is answered by SQL, so a
+# write is never hidden behind a fresh cache entry. Writes from other
+# processes show up within ANALYTICS_COLUMNAR_REFRESH_SECONDS.
+#
+# Opt-in with ANALYTICS_COLUMNAR=true; tables over ANALYTICS_COLUMNAR_MAX_ROWS
+# rows are not loaded. The widgets are written to return what the SQL would,
+# but keep this off in production until tests/test_analytics_parity.py has
+# passed against the MySQL server in use.
+
+COLUMNAR_ENABLED = os.getenv("ANALYTICS_COLUMNAR", "false").lower() in ("1", "true", "yes")
+MAX_ROWS = int(os.getenv("ANALYTICS_COLUMNAR_MAX_ROWS", 2000000))
+REFRESH_SECONDS = float(os.getenv("ANALYTICS_COLUMNAR_REFRESH_SECONDS", 30))
+FULL_RELOAD_SECONDS = float(os.getenv("ANALYTICS_COLUMNAR_FULL_RELOAD_SECONDS", 3600))
+PAGE_SIZE = int(os.getenv("ANALYTICS_COLUMNAR_PAGE_SIZE", 50000))
+
+COLUMNAR_TABLES = {
+    "applicants": {
+        "table": "applicants",
+        "from": "applicants s",
+        "id": "s.applicant_id",
+        # column -> (kind, source expression)
+        "columns": {
+            "created_at": ("date", "s.created_at"),
+            "status": ("category", "s.status"),
+            "is_active": ("number", "s.is_active"),
+            "sex": ("category", "s.sex"),
+            "education": ("category", "s.education"),
+            "is_pwd": ("number", "s.is_pwd"),
+            "pwd_type": ("category", "s.pwd_type"),
+            "has_work_exp": ("number", "s.has_work_exp"),
+            "years_experience": ("category", "s.years_experience"),
+            "province": ("category", "s.province"),
+            "city": ("category", "s.city"),
+            "barangay": ("category", "s.barangay"),
+            "is_from_lipa": ("number", "s.is_from_lipa"),
+            "age": ("number", "s.age"),
+        },
+        "tags": ("applicants",),
+    },
+    "employers": {
+        "table": "employers",
+        "from": "employers s",
+        "id": "s.employer_id",
+        "columns": {
+            "created_at": ("date", "s.created_at"),
+            "status": ("category", "s.status"),
+            "is_active": ("number", "s.is_active"),
+            "industry": ("category", "s.industry"),
+            "recruitment_type": ("category", "s.recruitment_type"),
+            "province": ("category", "s.province"),
+            "city": ("category", "s.city"),
+            "barangay": ("category", "s.barangay"),
+        },
+        "tags": ("employers",),
+    },
+    "jobs": {
+        "table": "jobs",
+        "from": "jobs s",
+        "id": "s.job_id",
+        "columns": {
+            "created_at": ("date", "s.created_at"),
+            "job_expiration_date": ("date", "s.job_expiration_date"),
+            "status": ("category", "s.status"),
+            "work_schedule": ("category", "s.work_schedule"),
+            "job_position": ("category", "s.job_position"),
+        },
+        "tags": ("jobs",),
+    },
+    "applications": {
+        "table": "applications",
+        "from": "applications s LEFT JOIN jobs j ON s.job_id = j.job_id",
+        "id": "s.id",
+        "columns": {
+            "applied_at": ("date", "s.applied_at"),
+            "created_at": ("date", "s.created_at"),
+            "status": ("category", "s.status"),
+            # From the joined job; an edited job changes these without
+            # touching the application, hence the "jobs" tag
+            "work_schedule": ("category", "j.work_schedule"),
+            "has_job": ("number", "j.job_id IS NOT NULL"),
+        },
+        "tags": ("applications", "jobs"),
+        "watermark": False,
+    },
+}
+
+_refresh_lock = threading.Lock()
+_thread_lock = threading.Lock()
+_refresh_thread = None
+_stats = {"hits": 0, "fallbacks": 0, "errors": 0}
+
+
+class _Snapshot:
+    """One immutable load of a table: sorted row ids plus one array per column."""
+
+    def __init__(self, ids, columns, categories, watermark, versions):
+        self.ids = ids
+        self.columns = columns
+        # column -> (raw values, {raw value: code}) for category columns
+        self.categories = categories
+        self.watermark = watermark
+        self.versions = versions
+        self.loaded_at = datetime.now()
+
+    def __len__(self):
+        return len(self.ids)
+
+    def nbytes(self):
+        return int(self.ids.nbytes + sum(column.nbytes for column in self.columns.values()))
+
+
+class ColumnarTable:
+    """Current snapshot of one table and how to bring it up to date."""
+
+    def __init__(self, name, spec):
+        self.name = name
+        self.spec = spec
+        self.snapshot = None
+        self.updated_column = None
+        self.too_large = False
+        self.full_loaded_at = None
+        self.refreshed_at = None
+        self.failed_at = None
+        self.stats = {"full_loads": 0, "incremental_loads": 0, "rows_fetched": 0,
+                      "last_refresh_seconds": None}
+
+    def is_current(self):
+        """Snapshot loaded and built under the current cache tag versions."""
+        snapshot = self.snapshot
+        return snapshot is not None and snapshot.versions == cache_versions(self.spec["tags"])
+
+    def is_due(self):
+        now = time.monotonic()
+        # Back off after a failed load instead of retrying on every request
+        if self.failed_at is not None and now - self.failed_at < REFRESH_SECONDS:
+            return False
+        if self.too_large:
+            return now - self.full_loaded_at >= FULL_RELOAD_SECONDS
+        return (not self.is_current() or self.refreshed_at is None
+                or now - self.refreshed_at >= REFRESH_SECONDS)
+
+    def refresh(self, conn):
+        started = time.monotonic()
+        # Versions taken before reading, so a write landing meanwhile leaves the snapshot stale
+        versions = cache_versions(self.spec["tags"])
+        snapshot = self.snapshot
+
+        full = (snapshot is None
+                or started - self.full_loaded_at >= FULL_RELOAD_SECONDS
+                or (not self.updated_column and snapshot.versions != versions))
+        if not full:
+            merged = self._incremental(conn, snapshot, versions)
+            if merged is None:
+                full = True
+            else:
+                self.snapshot = merged
+                self.stats["incremental_loads"] += 1
+        if full and not self._full(conn, versions):
+            self.failed_at = None if self.too_large else time.monotonic()
+            return False
+
+        self.failed_at = None
+        self.refreshed_at = time.monotonic()
+        self.stats["last_refresh_seconds"] = round(self.refreshed_at - started, 3)
+        return True
+
+    def _count(self, conn):
+        row = run_query(conn, f"SELECT COUNT(*) AS total FROM {self.spec['table']}", fetch="one")
+        return int(row["total"]) if row else None
+
+    def _full(self, conn, versions):
+        self.full_loaded_at = time.monotonic()
+        if self.spec.get("watermark", True):
+            row = run_query(conn, f"SHOW COLUMNS FROM {self.spec['table']} LIKE 'updated_at'", fetch="one")
+            self.updated_column = "updated_at" if row else None
+
+        total = self._count(conn)
+        if total is None:
+            return False
+        self.too_large = total > MAX_ROWS
+        if self.too_large:
+            print(f"[analytics] Columnar {self.name} skipped: {total} rows over ANALYTICS_COLUMNAR_MAX_ROWS")
+            self.snapshot = None
+            return False
+
+        rows = self._fetch(conn, "", ())
+        if rows is None:
+            return False
+        categories = {name: ([], {}) for name, (kind, _) in self.spec["columns"].items()
+                      if kind == "category"}
+        columns = {name: _encode(kind, [row[name] for row in rows], categories.get(name))
+                   for name, (kind, _) in self.spec["columns"].items()}
+        ids = np.fromiter((row["row_id"] for row in rows), dtype=np.int64, count=len(rows))
+        self.snapshot = _Snapshot(ids, columns, categories, self._watermark(rows, None), versions)
+        self.stats["full_loads"] += 1
+        return True
+
+    def _incremental(self, conn, snapshot, versions):
+        """Snapshot with changed and new rows applied, or None when a full load is needed."""
+        max_id = int(snapshot.ids[-1]) if len(snapshot) else 0
+        if self.updated_column and snapshot.watermark is not None:
+            rows = self._fetch(conn, f" AND ({self.spec['id']} > %s OR s.{self.updated_column} >= %s)",
+                               (max_id, snapshot.watermark))
+        else:
+            rows = self._fetch(conn, f" AND {self.spec['id']} > %s", (max_id,))
+        if rows is None:
+            return None
+
+        if rows:
+            ids = np.fromiter((row["row_id"] for row in rows), dtype=np.int64, count=len(rows))
+            positions = np.searchsorted(snapshot.ids, ids)
+            found = positions < len(snapshot)
+            found[found] = snapshot.ids[positions[found]] == ids[found]
+            # An id below the newest one that was never loaded: a gap we cannot patch
+            if np.any(~found & (ids <= max_id)):
+                return None
+
+            categories = {name: (list(values), dict(lookup))
+                          for name, (values, lookup) in snapshot.categories.items()}
+            columns = {}
+            for name, (kind, _) in self.spec["columns"].items():
+                values = _encode(kind, [row[name] for row in rows], categories.get(name))
+                column = snapshot.columns[name].copy()
+                column[positions[found]] = values[found]
+                columns[name] = np.concatenate([column, values[~found]])
+            snapshot = _Snapshot(np.concatenate([snapshot.ids, ids[~found]]), columns, categories,
+                                 self._watermark(rows, snapshot.watermark), versions)
+        else:
+            snapshot = _Snapshot(snapshot.ids, snapshot.columns, snapshot.categories,
+                                 snapshot.watermark, versions)
+
+        # Deletes only show up in the row count
+        if self._count(conn) != len(snapshot):
+            return None
+        return snapshot
+
+    def _fetch(self, conn, where_sql, params):
+        """Rows matching `where_sql`, read in id order one page at a time."""
+        select = ", ".join(f"{expr} AS {name}" for name, (_, expr) in self.spec["columns"].items())
+        if self.updated_column:
+            select += f", s.{self.updated_column} AS _updated"
+        rows, last_id = [], 0
+        while True:
+            page = run_query(conn, f"""
+                SELECT {self.spec['id']} AS row_id, {select}
+                FROM {self.spec['from']}
+                WHERE {self.spec['id']} > %s{where_sql}
+                ORDER BY {self.spec['id']}
+                LIMIT %s
+            """, (last_id, *params, PAGE_SIZE), fetch="all")
+            if page is None:
+                print(f"[analytics] Columnar {self.name} load failed")
+                return None
+            rows.extend(page)
+            self.stats["rows_fetched"] += len(page)
+            if len(page) < PAGE_SIZE:
+                return rows
+            last_id = page[-1]["row_id"]
+
+    def _watermark(self, rows, previous):
+        if not self.updated_column:
+            return None
+        seen = [row["_updated"] for row in rows if row["_updated"] is not None]
+        if previous is not None:
+            seen.append(previous)
+        return max(seen) if seen else None
+
+
+_tables = {name: ColumnarTable(name, spec) for name, spec in COLUMNAR_TABLES.items()}
+
+
+def _encode(kind, values, dictionary=None):
+    """Column array for raw DB values; category codes extend `dictionary` in place."""
+    if kind == "category":
+        categories, lookup = dictionary
+        codes = np.empty(len(values), dtype=np.int32)
+        for i, value in enumerate(values):
+            code = lookup.get(value)
+            if code is None:
+                code = lookup[value] = len(categories)
+                categories.append(value)
+            codes[i] = code
+        return codes
+    if kind == "number":
+        return np.fromiter((_as_float(value) for value in values), dtype=np.float64, count=len(values))
+    return np.array([_as_datetime(value) for value in values], dtype="datetime64[s]")
+
+
+def _as_float(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+def _as_datetime(value):
+    if isinstance(value, (date, datetime)):
+        return np.datetime64(value, "s")
+    return np.datetime64("NaT")
+
+
+def refresh_columnar(name=None):
+    """
+    Bring the snapshots (or just `name`) up to date. Returns
+    {table: loaded}, or {} when a refresh is already running.
+    """
+    if not COLUMNAR_ENABLED or np is None or not _refresh_lock.acquire(blocking=False):
+        return {}
+
+    conn = None
+    try:
+        conn = create_connection()
+        if not conn:
+            return {}
+        results = {}
+        for table in _tables.values():
+            if name and table.name != name:
+                continue
+            try:
+                results[table.name] = table.refresh(conn)
+            except Exception:
+                traceback.print_exc()
+                table.failed_at = time.monotonic()
+                results[table.name] = False
+        return results
+    finally:
+        if conn:
+            conn.close()
+        _refresh_lock.release()
+
+
+def _refresh_due_tables():
+    for table in _tables.values():
+        if table.is_due():
+            refresh_columnar(table.name)
+
+
+def _refresh_in_background():
+    global _refresh_thread
+    with _thread_lock:
+        if _refresh_thread is not None and _refresh_thread.is_alive():
+            return
+        _refresh_thread = threading.Thread(target=_refresh_due_tables, name="analytics-columnar",
+                                           daemon=True)
+        _refresh_thread.start()
+
+
+def columnar_widget(widget, args):
+    """
+    Data for analytics `widget` under filter `args` computed from the
+    snapshots, or None when SQL has to answer it: disabled, NumPy missing, a
+    widget not covered here, or a snapshot not loaded or behind a write.
+    """
+    if not COLUMNAR_ENABLED or np is None or widget not in COLUMNAR_WIDGETS:
+        return None
+    compute, names = COLUMNAR_WIDGETS[widget]
+    tables = [_tables[name] for name in names]
+
+    if any(table.is_due() for table in tables):
+        _refresh_in_background()
+    if not all(table.is_current() for table in tables):
+        _stats["fallbacks"] += 1
+        return None
+
+    try:
+        data = compute({table.name: table.snapshot for table in tables}, args)
+    except (TypeError, ValueError) as exc:
+        # Filter values SQL would have to interpret (malformed dates and the like)
+        print(f"[analytics] Columnar {widget} error:", exc)
+        _stats["errors"] += 1
+        return None
+    _stats["hits"] += 1
+    return data
+
+
+def get_columnar_stats():
+    return {
+        **_stats,
+        "enabled": COLUMNAR_ENABLED,
+        "numpy": np is not None,
+        "refresh_seconds": REFRESH_SECONDS,
+        "full_reload_seconds": FULL_RELOAD_SECONDS,
+        "max_rows": MAX_ROWS,
+        "tables": {table.name: {
+            **table.stats,
+            "rows": len(table.snapshot) if table.snapshot is not None else None,
+            "bytes": table.snapshot.nbytes() if table.snapshot is not None else None,
+            "loaded_at": table.snapshot.loaded_at.isoformat() if table.snapshot is not None else None,
+            "current": table.is_current(),
+            "too_large": table.too_large,
+            "watermark_column": table.updated_column,
+        } for table in _tables.values()},
+    }
+
+
+# ---------- Filters (the build_*_filters() WHERE clauses as masks) ----------
+
+def _multi(args, key):
+    value = args.get(key)
+    if not value:
+        return []
+    return [x.strip() for x in value.split('|') if x.strip()]
+
+
+def _date_mask(snapshot, column, args):
+    values = snapshot.columns[column]
+    mask = np.ones(len(snapshot), dtype=bool)
+    date_from, date_to = date_range(args)
+    # NaT compares False, like NULL
+    if date_from:
+        mask &= values >= np.datetime64(date_from)
+    if date_to:
+        mask &= values < np.datetime64(date_to) + np.timedelta64(1, "D")
+    return mask
+
+
+def _year_range_mask(snapshot, column, year, month=None):
+    bounds = year_range(year, month)
+    if bounds is None:
+        return np.zeros(len(snapshot), dtype=bool)
+    values = snapshot.columns[column]
+    return (values >= np.datetime64(bounds[0])) & (values < np.datetime64(bounds[1]))
+
+
+def _year_of(snapshot, column):
+    values = snapshot.columns[column]
+    years = values.astype("datetime64[Y]").astype(np.int64) + 1970
+    return np.where(np.isnat(values), 0, years)
+
+
+def _month_of(snapshot, column):
+    values = snapshot.columns[column]
+    months = values.astype("datetime64[M]").astype(np.int64) % 12 + 1
+    return np.where(np.isnat(values), 0, months)
+
+
+def _isin(snapshot, column, values):
+    """UPPER(column) IN (values): a lookup over the distinct values indexed by the codes."""
+    wanted = {value.upper() for value in values}
+    categories = snapshot.categories[column][0]
+    lookup = np.fromiter((isinstance(value, str) and value.upper() in wanted for value in categories),
+                         dtype=bool, count=len(categories))
+    return lookup[snapshot.columns[column]]
+
+
+def _match(mask, snapshot, column, values):
+    if values:
+        mask &= _isin(snapshot, column, values)
+
+
+def _match_numbers(mask, snapshot, column, values):
+    if values:
+        mask &= np.isin(snapshot.columns[column], [_as_float(value) for value in values])
+
+
+def _age_mask(snapshot, age_brackets):
+    """Same brackets as admin._age_bracket_clause(); nothing matches if none are valid."""
+    age = snapshot.columns["age"]
+    mask = np.zeros(len(snapshot), dtype=bool)
+    for bracket in age_brackets:
+        if bracket == "60+":
+            mask |= age >= 60
+        elif '-' in bracket:
+            try:
+                start, end = bracket.split('-')
+                start, end = int(start), int(end)
+            except ValueError:
+                continue
+            mask |= (age >= start) & (age <= end)
+    # NULL/0 ages never match a bracket
+    return mask & (age > 0)
+
+
+def _applicants_mask(snapshot, args):
+    mask = _date_mask(snapshot, "created_at", args)
+    _match(mask, snapshot, "status", _multi(args, "applicant_status"))
+    _match_numbers(mask, snapshot, "is_active", _multi(args, "applicant_is_active"))
+    _match(mask, snapshot, "sex", _multi(args, "sex"))
+    _match(mask, snapshot, "education", _multi(args, "education"))
+    _match_numbers(mask, snapshot, "is_pwd", _multi(args, "is_pwd"))
+    _match_numbers(mask, snapshot, "has_work_exp", _multi(args, "has_work_exp"))
+    _match(mask, snapshot, "province", _multi(args, "applicant_province"))
+    _match(mask, snapshot, "city", _multi(args, "applicant_city"))
+    _match(mask, snapshot, "barangay", _multi(args, "applicant_barangay"))
+    age_brackets = _multi(args, "age_bracket")
+    if age_brackets:
+        mask &= _age_mask(snapshot, age_brackets)
+    return mask
+
+
+def _employers_mask(snapshot, args):
+    mask = _date_mask(snapshot, "created_at", args)
+    _match(mask, snapshot, "status", _multi(args, "employer_status"))
+    _match_numbers(mask, snapshot, "is_active", _multi(args, "employer_is_active"))
+    _match(mask, snapshot, "industry", _multi(args, "industry"))
+    _match(mask, snapshot, "recruitment_type", _multi(args, "recruitment_type"))
+
+    provinces = _multi(args, "employer_province")
+    _match(mask, snapshot, "province", provinces)
+    if any(province.upper() in MANILA_INDICATORS for province in provinces):
+        _match(mask, snapshot, "city", ["MANILA"])
+
+    _match(mask, snapshot, "city", _multi(args, "employer_city"))
+    _match(mask, snapshot, "barangay", _multi(args, "employer_barangay"))
+    return mask
+
+
+def _jobs_mask(snapshot, args):
+    mask = _date_mask(snapshot, "created_at", args)
+    _match(mask, snapshot, "status",
+           [JOB_STATUS_MAPPING.get(status, status) for status in _multi(args, "job_status")])
+    _match(mask, snapshot, "work_schedule",
+           [SCHEDULE_MAPPING.get(schedule, schedule) for schedule in _multi(args, "work_schedule")])
+    return mask
+
+
+def _applications_mask(snapshot, args):
+    mask = _date_mask(snapshot, "applied_at", args)
+    _match(mask, snapshot, "status", _multi(args, "application_status"))
+    _match(mask, snapshot, "work_schedule",
+           [SCHEDULE_MAPPING.get(schedule, schedule) for schedule in _multi(args, "work_schedule")])
+    return mask
+
+
+# ---------- Group-bys ----------
+
+def _group_counts(snapshot, column, mask, default, blank_is_null=True):
+    """
+    [(label, count)] for GROUP BY COALESCE(NULLIF(column, ''), default) over
+    the rows in `mask`, grouped case-insensitively in first-seen order.
+    """
+    categories = snapshot.categories[column][0]
+    counts = np.bincount(snapshot.columns[column][mask], minlength=len(categories))
+    groups = {}
+    for value, count in zip(categories, counts.tolist()):
+        if not count:
+            continue
+        label = default if value is None or (blank_is_null and value == "") else value
+        key = label.upper() if isinstance(label, str) else label
+        if key in groups:
+            groups[key][1] += count
+        else:
+            groups[key] = [label, count]
+    return [tuple(group) for group in groups.values()]
+
+
+def _by_total(groups, limit=None):
+    """ORDER BY total DESC [LIMIT n]."""
+    return sorted(groups, key=lambda group: group[1], reverse=True)[:limit]
+
+
+def _month_counts(snapshot, column, mask):
+    """[(year, month, count)] in calendar order for the dated rows in `mask`."""
+    values = snapshot.columns[column][mask]
+    values = values[~np.isnat(values)]
+    months, counts = np.unique(values.astype("datetime64[M]").astype(np.int64), return_counts=True)
+    return [(int(month) // 12 + 1970, int(month) % 12 + 1, int(count))
+            for month, count in zip(months, counts)]
+
+
+# ---------- Widgets (meant to mirror the admin.py data functions) ----------
+
+def _summary(tables, args):
+    jobs = tables["jobs"]
+    return {
+        "totalApplicants": len(tables["applicants"]),
+        "totalEmployers": len(tables["employers"]),
+        "activeJobs": int(_isin(jobs, "status", ["active"]).sum()),
+        "totalApplications": len(tables["applications"]),
+    }
+
+
+def _applicants_per_month(tables, args):
+    applicants = tables["applicants"]
+    mask = _applicants_mask(applicants, args)
+    year_filter = args.get("year", type=int)
+    if year_filter:
+        mask &= _year_range_mask(applicants, "created_at", year_filter)
+    return [{
+        "month": month,
+        "year": year,
+        "label": datetime(year, month, 1).strftime("%b %Y"),
+        "count": count,
+    } for year, month, count in _month_counts(applicants, "created_at", mask)]
+
+
+def _applicants_by_province(tables, args):
+    applicants = tables["applicants"]
+    mask = _applicants_mask(applicants, args)
+    month_filter = args.get("month", type=int)
+    year_filter = args.get("year", type=int)
+    if month_filter:
+        mask &= _month_of(applicants, "created_at") == month_filter
+    if year_filter:
+        mask &= _year_of(applicants, "created_at") == year_filter
+    return [{"province": province, "count": count}
+            for province, count in _by_total(_group_counts(applicants, "province", mask, "Unspecified"))]
+
+
+def _applicants_summary(tables, args):
+    applicants = tables["applicants"]
+    mask = _applicants_mask(applicants, args)
+    total_registered = int(mask.sum())
+    return {
+        "total_registered": total_registered,
+        "active_applicants": int((mask & (applicants.columns["is_active"] == 1)).sum()),
+        "new_registrations": total_registered,
+    }
+
+
+AGE_GROUP_EDGES = [18, 25, 35, 45]
+AGE_GROUPS = ["Under 18", "18-24", "25-34", "35-44", "45+"]
+
+
+def _applicants_demographics(tables, args):
+    applicants = tables["applicants"]
+    mask = _applicants_mask(applicants, args)
+
+    age = applicants.columns["age"][mask]
+    known = ~np.isnan(age) & (age != 0)
+    # Ages are whole years, so "<= 24" is "< 25"
+    by_group = np.bincount(np.searchsorted(AGE_GROUP_EDGES, age[known], side="right"),
+                           minlength=len(AGE_GROUPS)).tolist()
+    age_group_counts = dict(zip(AGE_GROUPS, by_group))
+    age_group_counts["Unspecified"] = int((~known).sum())
+
+    return {
+        "by_sex": [{"label": label, "count": count}
+                   for label, count in _group_counts(applicants, "sex", mask, "Unspecified")],
+        "by_education": [{"label": label, "count": count}
+                         for label, count in _group_counts(applicants, "education", mask, "Unspecified")],
+        "by_age_group": [{"age_group": age_group, "count": count}
+                         for age_group, count in age_group_counts.items() if count > 0],
+    }
+
+
+def _applicants_location(tables, args):
+    applicants = tables["applicants"]
+    mask = _applicants_mask(applicants, args)
+    from_lipa = int((mask & (applicants.columns["is_from_lipa"] == 1)).sum())
+    return {
+        "by_city": [{"city": city, "count": count}
+                    for city, count in _by_total(_group_counts(applicants, "city", mask, "Unspecified"), 10)],
+        "by_is_from_lipa": [
+            {"status": "From Lipa", "count": from_lipa},
+            {"status": "Not From Lipa", "count": int(mask.sum()) - from_lipa},
+        ],
+    }
+
+
+def _applicants_experience(tables, args):
+    from .admin import _experience_range
+
+    applicants = tables["applicants"]
+    mask = _applicants_mask(applicants, args)
+    exp_ranges = {"No Experience": 0, "1-2 Years": 0, "3-5 Years": 0,
+                  "6-10 Years": 0, "10+ Years": 0, "Unspecified": 0}
+
+    # Bucket each distinct value once and add up its rows
+    values = applicants.categories["years_experience"][0]
+    counts = np.bincount(applicants.columns["years_experience"][mask], minlength=len(values))
+    for value, count in zip(values, counts.tolist()):
+        if count:
+            exp_ranges[_experience_range(value)] += count
+
+    order = {"No Experience": 1, "1-2 Years": 2, "3-5 Years": 3, "6-10 Years": 4, "10+ Years": 5}
+    by_experience = [{"range": exp_range, "count": count}
+                     for exp_range, count in exp_ranges.items() if count > 0]
+    by_experience.sort(key=lambda x: order.get(x["range"], 6))
+    return {"by_experience": by_experience}
+
+
+def _applicants_pwd(tables, args):
+    applicants = tables["applicants"]
+    mask = _applicants_mask(applicants, args) & (applicants.columns["is_pwd"] == 1)
+    return {"by_pwd_type": [{"pwd_type": pwd_type, "count": count}
+                            for pwd_type, count in _by_total(_group_counts(applicants, "pwd_type", mask, "Not Specified"))]}
+
+
+def _employers_summary(tables, args):
+    employers = tables["employers"]
+    mask = _employers_mask(employers, args)
+    is_active = employers.columns["is_active"]
+    return {
+        "total_employers": int(mask.sum()),
+        "active_employers": int((mask & (is_active == 1)).sum()),
+        "inactive_employers": int((mask & (is_active == 0)).sum()),
+        "pending_documents": int((mask & _isin(employers, "status", ["Pending"])).sum()),
+    }
+
+
+def _employers_business(tables, args):
+    employers = tables["employers"]
+    mask = _employers_mask(employers, args)
+    return {
+        "by_industry": [{"industry": industry, "count": count}
+                        for industry, count in _by_total(_group_counts(employers, "industry", mask, "Unspecified"))],
+        "by_recruitment_type": [{"recruitment_type": rec_type, "count": count}
+                                for rec_type, count in _group_counts(employers, "recruitment_type", mask, "Unspecified")],
+    }
+
+
+def _employers_location(tables, args):
+    employers = tables["employers"]
+    mask = _employers_mask(employers, args)
+    return {
+        "by_city": [{"city": city, "count": count}
+                    for city, count in _by_total(_group_counts(employers, "city", mask, "Unspecified"), 10)],
+        "by_province": [{"province": province, "count": count}
+                        for province, count in _by_total(_group_counts(employers, "province", mask, "Unspecified"), 10)],
+    }
+
+
+def _employers_status(tables, args):
+    employers = tables["employers"]
+    mask = _employers_mask(employers, args)
+    return {"by_status": [{"status": status, "count": count}
+                          for status, count in _by_total(_group_counts(employers, "status", mask, "Unspecified"))]}
+
+
+def _employers_by_industry(tables, args):
+    employers = tables["employers"]
+    mask = np.ones(len(employers), dtype=bool)
+    return [{"industry": industry, "count": count}
+            for industry, count in _by_total(_group_counts(employers, "industry", mask, "Unspecified"))]
+
+
+def _jobs_summary(tables, args):
+    jobs = tables["jobs"]
+    mask = _jobs_mask(jobs, args)
+    # "Open jobs" are active unless the job_status filter says otherwise, and not expired
+    if not _multi(args, "job_status"):
+        mask &= _isin(jobs, "status", ["active"])
+    expires = jobs.columns["job_expiration_date"]
+    mask &= np.isnat(expires) | (expires >= np.datetime64(date.today()))
+    return {"total_open_jobs": int(mask.sum())}
+
+
+def _jobs_demand(tables, args):
+    jobs = tables["jobs"]
+    mask = _jobs_mask(jobs, args)
+    return {
+        "by_position": [{"job_position": position, "count": count}
+                        for position, count in _by_total(_group_counts(jobs, "job_position", mask, "Unspecified"), 5)],
+        "by_work_schedule": [{"work_schedule": schedule, "count": count}
+                             for schedule, count in _group_counts(jobs, "work_schedule", mask, "Unspecified")],
+    }
+
+
+def _applications_summary(tables, args):
+    applications = tables["applications"]
+    mask = _applications_mask(applications, args)
+    by_status = [{"status": status, "count": count}
+                 for status, count in _group_counts(applications, "status", mask, "Pending")]
+
+    total_applications = sum(item["count"] for item in by_status)
+    hired = next((item["count"] for item in by_status if item["status"] == "Hired"), 0)
+    success_rate = (hired / total_applications) if total_applications else 0
+    return {
+        "total_applications": total_applications,
+        "by_status": by_status,
+        "success_rate": success_rate,
+        "success_rate_percentage": round(success_rate * 100, 2) if total_applications else 0,
+    }
+
+
+def _applications_trend(tables, args):
+    applications = tables["applications"]
+    mask = _applications_mask(applications, args)
+    # Months without rows are not listed, so an empty list is the "no data" state
+    return [{
+        "label": datetime(year, month, 1).strftime("%b %Y"),
+        "year": year,
+        "month": month,
+        "count": count,
+    } for year, month, count in _month_counts(applications, "applied_at", mask)]
+
+
+def _applications_by_category(tables, args):
+    applications = tables["applications"]
+    # Inner join on jobs
+    mask = applications.columns["has_job"] == 1
+    month_filter = args.get("month", type=int)
+    year_filter = args.get("year", type=int)
+    category_filter = args.get("category", type=str)
+    if month_filter:
+        mask &= _month_of(applications, "created_at") == month_filter
+    if year_filter:
+        mask &= _year_of(applications, "created_at") == year_filter
+    if category_filter:
+        mask &= _isin(applications, "work_schedule", [category_filter])
+    return [{"category": category, "count": count}
+            for category, count in _by_total(_group_counts(applications, "work_schedule", mask, "Unspecified"))]
+
+
+def _hiring_ratio(tables, args):
+    applications = tables["applications"]
+    mask = np.ones(len(applications), dtype=bool)
+    month_filter = args.get("month", type=int)
+    year_filter = args.get("year", type=int)
+    if year_filter:
+        mask &= _year_range_mask(applications, "created_at", year_filter, month_filter)
+    elif month_filter:
+        mask &= _month_of(applications, "created_at") == month_filter
+
+    breakdown = dict(_group_counts(applications, "status", mask, "Pending", blank_is_null=False))
+    hired = breakdown.get("Hired", 0)
+    total = sum(breakdown.values())
+    return {
+        "hired": hired,
+        "not_hired": max(total - hired, 0),
+        "breakdown": breakdown,
+    }
+
+
+# Widget id (as in admin.ANALYTICS_WIDGETS) -> (compute(snapshots, args), tables it reads)
+COLUMNAR_WIDGETS = {
+    "summary": (_summary, ("applicants", "employers", "jobs", "applications")),
+    "applicants_summary": (_applicants_summary, ("applicants",)),
+    "applicants_trend": (_applicants_per_month, ("applicants",)),
+    "applicants_by_province": (_applicants_by_province, ("applicants",)),
+    "demographics": (_applicants_demographics, ("applicants",)),
+    "location": (_applicants_location, ("applicants",)),
+    "experience": (_applicants_experience, ("applicants",)),
+    "pwd": (_applicants_pwd, ("applicants",)),
+    "employers_summary": (_employers_summary, ("employers",)),
+    "employers_business": (_employers_business, ("employers",)),
+    "employers_location": (_employers_location, ("employers",)),
+    "employers_status": (_employers_status, ("employers",)),
+    "employers_by_industry": (_employers_by_industry, ("employers",)),
+    "jobs_summary": (_jobs_summary, ("jobs",)),
+    "jobs_demand": (_jobs_demand, ("jobs",)),
+    "applications_summary": (_applications_summary, ("applications",)),
+    "applications_trend": (_applications_trend, ("applications",)),
+    "applications_by_category": (_applications_by_category, ("applications",)),
+    "hiring_ratio": (_hiring_ratio, ("applications",)),
+}
@@ -0,0 +1,61 @@
+from datetime import datetime, timedelta
+
+# Filter rules shared by the analytics SQL (admin.build_*_filters) and the
+# columnar snapshots (analytics_columnar), so both read the dashboard's
+# filter values the same way.
+
+# Dashboard filter labels -> values stored in jobs.work_schedule / jobs.status
+SCHEDULE_MAPPING = {
+    "Full-Time": "full-time",
+    "Part-Time": "part-time",
+    "Contract": "contract",
+    "Freelance": "freelance",
+}
+JOB_STATUS_MAPPING = {
+    "Active": "active",
+    "Inactive": "inactive",
+    "Archived": "archived",
+    "Suspended": "suspended",
+}
+
+# Employer province values that mean the City of Manila
+MANILA_INDICATORS = {"MANILA", "METRO MANILA", "NCR", "NATIONAL CAPITAL REGION"}
+
+
+def date_range(args):
+    """
+    (date_from, date_to) for the analytics filters: explicit dates win,
+    otherwise quick_range (last_30, ytd, qtd) is resolved against today.
+    Either bound may be None.
+    """
+    date_from = args.get("date_from")
+    date_to = args.get("date_to")
+    quick_range = args.get("quick_range")
+
+    if quick_range and not (date_from or date_to):
+        today = datetime.today().date()
+        if quick_range == "last_30":
+            date_from = (today - timedelta(days=30)).isoformat()
+            date_to = today.isoformat()
+        elif quick_range == "ytd":
+            date_from = f"{today.year}-01-01"
+            date_to = today.isoformat()
+        elif quick_range == "qtd":
+            quarter = (today.month - 1) // 3 + 1
+            start_month = 3 * (quarter - 1) + 1
+            date_from = f"{today.year}-{start_month:02d}-01"
+            date_to = today.isoformat()
+    return date_from, date_to
+
+
+def year_range(year, month=None):
+    """
+    [start, end) datetimes covering `year`, or one month of it, for range
+    predicates that can use a date index. None when the year or month is out
+    of range: nothing matches, as with YEAR(col) = year / MONTH(col) = month.
+    """
+    if not 1 <= year <= 9998 or (month and not 1 <= month <= 12):
+        return None
+    if month:
+        return datetime(year, month, 1), datetime(year + (month == 12), month % 12 + 1, 1)
+    return datetime(year, 1, 1), datetime(year + 1, 1, 1)
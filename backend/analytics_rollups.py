@@ -0,0 +1,326 @@
+from db_connection import create_connection, db_transaction, run_query
+import os
+import threading
+import time
+import traceback
+
+from .analytics_cache import invalidate_analytics
+
+# Daily rollups for the admin analytics dashboard.
+#
+# Each fact (applicants, employers, jobs, applications) gets a table with one
+# row per day and combination of filter dimensions, holding the number of
+# source rows. The rollup's day column has the same name as the source's date
+# column and the dimensions keep their source names and raw values, so the
+# build_*_filters() WHERE clauses in admin.py apply to it unchanged and the
+# endpoints only swap COUNT(*) for SUM(total).
+#
+# refresh_rollups() keeps them current without touching the write paths: it
+# reads a per-day fingerprint of each source table (row count plus an XOR of
+# row checksums over the id and the dimensions) and rebuilds only the days
+# whose fingerprint changed since the last run. New rows, status changes and
+# deletes all change their day's fingerprint. A row that changes during a
+# rebuild just leaves its day dirty for the next run.
+#
+# Rollups lag the source tables by up to ANALYTICS_ROLLUP_MINUTES. Filters on
+# columns a rollup does not keep (PWD, work experience, barangay, age) and
+# timestamp (not date) bounds are answered from the raw tables.
+
+ROLLUPS_ENABLED = os.getenv("ANALYTICS_ROLLUPS", "true").lower() in ("1", "true", "yes")
+DAYS_PER_BATCH = int(os.getenv("ANALYTICS_ROLLUP_DAYS_PER_BATCH", 31))
+STATE_CHECK_SECONDS = 60
+
+DAYS_TABLE = "analytics_rollup_days"
+STATE_TABLE = "analytics_rollup_state"
+
+ROLLUP_SOURCES = {
+    "applicants": {
+        "from": "applicants s",
+        "id": "s.applicant_id",
+        "date": "created_at",
+        # (rollup column, column type, source expression)
+        "dimensions": [
+            ("status", "VARCHAR(50)", "s.status"),
+            ("is_active", "TINYINT", "s.is_active"),
+            ("sex", "VARCHAR(20)", "s.sex"),
+            ("education", "VARCHAR(255)", "s.education"),
+            ("province", "VARCHAR(255)", "s.province"),
+            ("city", "VARCHAR(255)", "s.city"),
+            ("is_from_lipa", "TINYINT", "s.is_from_lipa"),
+        ],
+        # build_applicants_filters() keys the rollup cannot answer
+        "uncovered": ("is_pwd", "has_work_exp", "applicant_barangay", "age_bracket"),
+    },
+    "employers": {
+        "from": "employers s",
+        "id": "s.employer_id",
+        "date": "created_at",
+        "dimensions": [
+            ("status", "VARCHAR(50)", "s.status"),
+            ("is_active", "TINYINT", "s.is_active"),
+            ("industry", "VARCHAR(255)", "s.industry"),
+            ("recruitment_type", "VARCHAR(50)", "s.recruitment_type"),
+            ("province", "VARCHAR(255)", "s.province"),
+            ("city", "VARCHAR(255)", "s.city"),
+        ],
+        "uncovered": ("employer_barangay",),
+    },
+    "jobs": {
+        "from": "jobs s",
+        "id": "s.job_id",
+        "date": "created_at",
+        "dimensions": [
+            ("status", "VARCHAR(50)", "s.status"),
+            ("work_schedule", "VARCHAR(50)", "s.work_schedule"),
+            ("job_position", "VARCHAR(255)", "s.job_position"),
+        ],
+        "uncovered": (),
+    },
+    "applications": {
+        "from": "applications s LEFT JOIN jobs j ON s.job_id = j.job_id",
+        "id": "s.id",
+        "date": "applied_at",
+        "dimensions": [
+            ("status", "VARCHAR(50)", "s.status"),
+            ("work_schedule", "VARCHAR(50)", "j.work_schedule"),
+        ],
+        "uncovered": (),
+    },
+}
+
+for _fact, _source in ROLLUP_SOURCES.items():
+    _source["rollup"] = f"analytics_{_fact}_daily"
+
+ROLLUP_TABLE_SQL = """
+    CREATE TABLE IF NOT EXISTS {table} (
+        rollup_id BIGINT AUTO_INCREMENT PRIMARY KEY,
+        {date} DATE NOT NULL,
+        {dimensions},
+        total INT NOT NULL,
+        INDEX idx_{table}_day ({date})
+    )
+"""
+
+DAYS_TABLE_SQL = f"""
+    CREATE TABLE IF NOT EXISTS {DAYS_TABLE} (
+        fact VARCHAR(32) NOT NULL,
+        day DATE NOT NULL,
+        row_count INT NOT NULL,
+        checksum BIGINT UNSIGNED NOT NULL,
+        PRIMARY KEY (fact, day)
+    )
+"""
+
+STATE_TABLE_SQL = f"""
+    CREATE TABLE IF NOT EXISTS {STATE_TABLE} (
+        fact VARCHAR(32) NOT NULL PRIMARY KEY,
+        refreshed_at DATETIME NOT NULL,
+        days_tracked INT NOT NULL DEFAULT 0,
+        days_rebuilt INT NOT NULL DEFAULT 0,
+        refresh_seconds FLOAT NULL
+    )
+"""
+
+_tables_ready = False
+_refresh_lock = threading.Lock()
+
+_state_lock = threading.Lock()
+_built = {"checked_at": None, "facts": frozenset()}
+
+
+def ensure_rollup_tables(conn=None):
+    global _tables_ready
+    if _tables_ready:
+        return True
+
+    local_conn = conn or create_connection()
+    if not local_conn:
+        return False
+
+    try:
+        cursor = local_conn.cursor()
+        for source in ROLLUP_SOURCES.values():
+            cursor.execute(ROLLUP_TABLE_SQL.format(
+                table=source["rollup"],
+                date=source["date"],
+                dimensions=",\n        ".join(
+                    f"{name} {sql_type} NULL" for name, sql_type, _ in source["dimensions"]),
+            ))
+        cursor.execute(DAYS_TABLE_SQL)
+        cursor.execute(STATE_TABLE_SQL)
+        cursor.close()
+        local_conn.commit()
+        _tables_ready = True
+    except Exception as e:
+        print(f"[analytics] Rollup tables unavailable: {e}")
+    finally:
+        if conn is None:
+            local_conn.close()
+    return _tables_ready
+
+
+def _placeholders(values):
+    return ", ".join(["%s"] * len(values))
+
+
+def _fingerprints(conn, source):
+    """{day: (row_count, checksum)} for the source table, or None on error."""
+    quoted = ", ".join(f"QUOTE({expr})" for _, _, expr in source["dimensions"])
+    rows = run_query(conn, f"""
+        SELECT DATE(s.{source['date']}) AS day,
+               COUNT(*) AS row_count,
+               BIT_XOR(CRC32(CONCAT_WS('|', {source['id']}, {quoted}))) AS checksum
+        FROM {source['from']}
+        WHERE s.{source['date']} IS NOT NULL
+        GROUP BY day
+    """, fetch="all")
+    if rows is None:
+        return None
+    return {row["day"]: (int(row["row_count"]), int(row["checksum"])) for row in rows}
+
+
+def _rebuild_days(conn, fact, source, days, current):
+    """Replace the rollup rows and stored fingerprints of `days` (sorted) in one transaction."""
+    date_col = source["date"]
+    names = ", ".join(name for name, _, _ in source["dimensions"])
+    exprs = ", ".join(expr for _, _, expr in source["dimensions"])
+    group_by = ", ".join(str(i) for i in range(1, len(source["dimensions"]) + 2))
+    marks = _placeholders(days)
+
+    cursor = conn.cursor()
+    try:
+        cursor.execute(f"DELETE FROM {source['rollup']} WHERE {date_col} IN ({marks})", tuple(days))
+        # The range keeps the source's date index usable; IN picks the dirty days inside it
+        cursor.execute(f"""
+            INSERT INTO {source['rollup']} ({date_col}, {names}, total)
+            SELECT DATE(s.{date_col}), {exprs}, COUNT(*)
+            FROM {source['from']}
+            WHERE s.{date_col} >= %s AND s.{date_col} < %s + INTERVAL 1 DAY
+              AND DATE(s.{date_col}) IN ({marks})
+            GROUP BY {group_by}
+        """, (days[0], days[-1], *days))
+        cursor.execute(f"DELETE FROM {DAYS_TABLE} WHERE fact = %s AND day IN ({marks})",
+                       (fact, *days))
+        present = [(fact, day, *current[day]) for day in days if day in current]
+        if present:
+            cursor.executemany(f"""
+                INSERT INTO {DAYS_TABLE} (fact, day, row_count, checksum)
+                VALUES (%s, %s, %s, %s)
+            """, present)
+    finally:
+        cursor.close()
+
+
+def _refresh_fact(conn, fact, source):
+    started = time.monotonic()
+    current = _fingerprints(conn, source)
+    stored_rows = run_query(conn, f"SELECT day, row_count, checksum FROM {DAYS_TABLE} WHERE fact = %s",
+                            (fact,), fetch="all")
+    if current is None or stored_rows is None:
+        print(f"[analytics] Rollup refresh for {fact} skipped: fingerprint query failed")
+        return None
+    stored = {row["day"]: (int(row["row_count"]), int(row["checksum"])) for row in stored_rows}
+
+    dirty = sorted({day for day, fingerprint in current.items() if stored.get(day) != fingerprint}
+                   | (stored.keys() - current.keys()))
+    for start in range(0, len(dirty), DAYS_PER_BATCH):
+        with db_transaction() as tx:
+            _rebuild_days(tx, fact, source, dirty[start:start + DAYS_PER_BATCH], current)
+
+    elapsed = time.monotonic() - started
+    run_query(conn, f"""
+        INSERT INTO {STATE_TABLE} (fact, refreshed_at, days_tracked, days_rebuilt, refresh_seconds)
+        VALUES (%s, NOW(), %s, %s, %s)
+        ON DUPLICATE KEY UPDATE refreshed_at = VALUES(refreshed_at), days_tracked = VALUES(days_tracked),
+            days_rebuilt = VALUES(days_rebuilt), refresh_seconds = VALUES(refresh_seconds)
+    """, (fact, len(current), len(dirty), round(elapsed, 3)))
+    return {"days_tracked": len(current), "days_rebuilt": len(dirty), "seconds": round(elapsed, 3)}
+
+
+def refresh_rollups(fact=None):
+    """
+    Bring the rollups up to date by rebuilding the days whose source rows
+    changed. Returns {fact: {"days_tracked", "days_rebuilt", "seconds"}}.
+    """
+    if not _refresh_lock.acquire(blocking=False):
+        print("[analytics] Rollup refresh already running")
+        return {}
+
+    conn = None
+    try:
+        conn = create_connection()
+        if not conn or not ensure_rollup_tables(conn):
+            return {}
+        results = {}
+        for name, source in ROLLUP_SOURCES.items():
+            if fact and name != fact:
+                continue
+            try:
+                results[name] = _refresh_fact(conn, name, source)
+                if results[name] and results[name]["days_rebuilt"]:
+                    # Cached responses may have been built from the old rollup rows
+                    invalidate_analytics(name)
+            except Exception:
+                traceback.print_exc()
+                results[name] = None
+        with _state_lock:
+            _built["checked_at"] = None
+        return results
+    finally:
+        if conn:
+            conn.close()
+        _refresh_lock.release()
+
+
+def _built_facts(conn):
+    """Facts whose rollups have completed at least one refresh (re-read every minute)."""
+    now = time.monotonic()
+    with _state_lock:
+        if _built["checked_at"] is not None and now - _built["checked_at"] < STATE_CHECK_SECONDS:
+            return _built["facts"]
+
+    rows = run_query(conn, f"SELECT fact FROM {STATE_TABLE}", fetch="all")
+    facts = frozenset(row["fact"] for row in rows or [])
+    with _state_lock:
+        _built["checked_at"], _built["facts"] = now, facts
+    return facts
+
+
+def rollup_source(fact, args, conn):
+    """
+    Rollup table to answer `fact` from for these analytics filter args, or
+    None when the raw table has to be used: rollups disabled or not built
+    yet, or a filter the rollup cannot answer.
+    """
+    if not ROLLUPS_ENABLED:
+        return None
+    source = ROLLUP_SOURCES[fact]
+    if any(args.get(name) for name in source["uncovered"]):
+        return None
+    # Rollups are per day; a bound with a time of day needs the raw rows
+    if any(len(args.get(name) or "") > 10 for name in ("date_from", "date_to")):
+        return None
+    if fact not in _built_facts(conn):
+        return None
+    return source["rollup"]
+
+
+def get_rollup_stats(conn=None):
+    local_conn = conn or create_connection()
+    if not local_conn:
+        return {}
+    try:
+        rows = run_query(local_conn, f"""
+            SELECT fact, refreshed_at, days_tracked, days_rebuilt, refresh_seconds
+            FROM {STATE_TABLE}
+        """, fetch="all") or []
+        return {row["fact"]: {
+            "table": ROLLUP_SOURCES.get(row["fact"], {}).get("rollup"),
+            "refreshed_at": row["refreshed_at"].isoformat() if row["refreshed_at"] else None,
+            "days_tracked": int(row["days_tracked"]),
+            "days_rebuilt": int(row["days_rebuilt"]),
+            "refresh_seconds": row["refresh_seconds"],
+        } for row in rows}
+    finally:
+        if conn is None:
+            local_conn.close()
@@ -5,9 +5,12 @@ from dateutil.relativedelta import relativedelta
 from flask import request
 from .recaptcha import verify_recaptcha
 from .notifications import create_notification, get_notifications, mark_notification_read
-from flask_mail import Message
-from extensions import mail
-from db_connection import create_connection, run_query
+from .notification_dispatcher import enqueue_notification
+from .notification_counters import counter_keys, get_unread_total, refresh_unread_counters
+from .email_outbox import queue_template
+from .expiry_engine import refresh_expiry_schedule, run_due_expiry_checks
+from .analytics_cache import invalidate_analytics
+from db_connection import create_connection, get_db, run_query
 from werkzeug.utils import secure_filename
 from datetime import datetime, date, timedelta
 from flask import Blueprint, render_template, request, redirect, url_for, session, flash, jsonify
@@ -50,23 +53,21 @@ def release_expired_suspensions(conn):
             "UPDATE applicants SET status = %s, is_active = 1, suspension_end_at = NULL, updated_at = NOW() WHERE applicant_id = %s",
             ("Active", row["applicant_id"])
         )
-        create_notification(
+        enqueue_notification(
             notification_type="applicant_reported",
             title="Account restored",
             message="Your suspension period has ended. You can now access your account.",
             applicant_id=row["applicant_id"]
         )
         try:
-            msg = Message(
-                subject="Account restored",
-                recipients=[row.get("email")],
-                html=f"<p>Hi {row.get('first_name', 'Applicant')},</p><p>Your suspension period has ended. You may now continue using PESO SmartHire.</p>"
-            )
-            mail.send(msg)
+            queue_template("account_restored", [row.get("email")],
+                           {"name": row.get("first_name") or "Applicant"})
         except Exception as exc:
             print(f"[v1] Failed to send suspension end email: {exc}")
     conn.commit()
     cursor.close()
+    if rows:
+        invalidate_analytics("applicants")
 
 
 applicants_bp = Blueprint("applicants", __name__)
@@ -106,100 +107,14 @@ def will_expire_in_7_days(expiry_date):
 
 
 def check_expired_recommendations():
-    conn = create_connection()
+    # Shared with release_expired_suspensions -> create_notification
+    conn = get_db()
     if not conn:
         print("[v0] DB connection failed")
         return
 
     try:
-        # --- 0. Reset warning flags daily for non-expired docs ---
-        run_query(
-            conn,
-            "UPDATE applicants SET recommendation_warning_sent = 0 WHERE recommendation_letter_expiry > NOW()"
-        )
-        conn.commit()
-
-        # Fetch all applicants with a recommendation letter expiry
-        applicants = run_query(
-            conn,
-            """
-            SELECT applicant_id, first_name, last_name, email, recommendation_letter_expiry, status,
-                   recommendation_warning_sent, recommendation_warning_date
-            FROM applicants
-            WHERE recommendation_letter_expiry IS NOT NULL
-            """,
-            fetch="all"
-        )
-
-        today = datetime.now().date()
-
-        for applicant in applicants:
-            expiry_date = to_date(applicant["recommendation_letter_expiry"])
-            last_warning_date = applicant.get("recommendation_warning_date")
-            if last_warning_date:
-                last_warning_date = to_date(last_warning_date)
-
-            # --- 1. Send pre-expiry warning (7 days before) ---
-            if will_expire_in_7_days(expiry_date) and applicant.get("recommendation_warning_sent") != 1:
-                # Only send once per day
-                if last_warning_date != today:
-                    warning_subject = "Your Recommendation Letter Will Expire Soon"
-                    warning_body = f"""
-                    <p>Hi {applicant['first_name']},</p>
-                    <p>This is a reminder that your recommendation letter will expire in less than 7 days.</p>
-                    <p>Please prepare a new copy to avoid any interruption in your application.</p>
-                    """
-                    try:
-                        msg = Message(subject=warning_subject,
-                                      recipients=[applicant["email"]],
-                                      html=warning_body)
-                        mail.send(msg)
-
-                        # Mark as warning sent
-                        run_query(
-                            conn,
-                            """
-                            UPDATE applicants
-                            SET recommendation_warning_sent = 1,
-                                recommendation_warning_date = %s
-                            WHERE applicant_id = %s
-                            """,
-                            (today, applicant["applicant_id"])
-                        )
-                        conn.commit()
-
-                        print(f"Warning email sent to {applicant['email']}")
-                    except Exception as e:
-                        print(
-                            f"Failed to send warning email to {applicant['email']}: {e}")
-
-            # --- 2. Send expired email ---
-            if is_document_expired(expiry_date):
-                if applicant.get("status") != "Reupload":
-                    # Update status and deactivate
-                    run_query(
-                        conn,
-                        "UPDATE applicants SET status=%s, is_active=%s WHERE applicant_id=%s",
-                        ("Reupload", 0, applicant["applicant_id"])
-                    )
-                    conn.commit()
-
-                    # Email for expired document
-                    subject = "Recommendation Letter Expired - Action Required"
-                    body = f"""
-                    <p>Hi {applicant['first_name']},</p>
-                    <p>Your recommendation letter has expired. Please upload a new recommendation letter to continue your application.</p>
-                    """
-                    try:
-                        msg = Message(subject=subject,
-                                      recipients=[applicant["email"]],
-                                      html=body)
-                        mail.send(msg)
-                        print(f"Expired email sent to {applicant['email']}")
-                    except Exception as e:
-                        print(
-                            f"Failed to send expired email to {applicant['email']}: {e}")
-
+        run_due_expiry_checks("applicant")
         release_expired_suspensions(conn)
 
     except Exception as e:
@@ -369,6 +284,9 @@ def register_applicant(form, files):
         )
         applicant_id = applicant_id_row["id"] if applicant_id_row else None
         print(f"[v0] Applicant ID: {applicant_id}")
+        if applicant_id and recommendation_expiry:
+            refresh_expiry_schedule(conn, "applicant", applicant_id)
+        invalidate_analytics("applicants")
 
         applicant_code = "N/A"
         if applicant_id:
@@ -409,33 +327,12 @@ def register_applicant(form, files):
 
         # ==== Send Email ====
         try:
+            credentials = None
             if is_from_lipa:
-                subject = "PESO SmartHire - Registration Successful"
-                body = f"""
-                <p>Hi {form.get('applicantFirstName')},</p>
-                <p>This is PESO SmartHire Team.</p>
-                <p>Congratulations! Your registration is approved!</p>
-                <p>Included below is your login credentials:</p>
-                <ul>
-                    <li>Applicant ID: {applicant_code}</li>
-                    <li>Email: {email}</li>
-                    <li>Phone Number: {phone}</li>
-                    <li>Password: {temp_password_plain}</li>
-                </ul>
-                <p><strong>Please change your password after logging in.</strong></p>
-                <p>Thank you for joining our PESO SmartHire Platform.</p>
-                """
-            else:
-                subject = "PESO SmartHire - Registration Submitted"
-                body = f"""
-                <p>Hi {form.get('applicantFirstName')},</p>
-                <p>This is PESO SmartHire Team.</p>
-                <p>Your registration is submitted and pending admin approval.</p>
-                <p>After approval, you will receive your login credentials.</p>
-                <p>Thank you for joining our PESO SmartHire Platform.</p>
-                """
-            msg = Message(subject=subject, recipients=[email], html=body)
-            mail.send(msg)
+                credentials = {"code_label": "Applicant ID", "code": applicant_code,
+                               "email": email, "phone": phone, "password": temp_password_plain}
+            queue_template("applicant_registered", [email],
+                           {"name": form.get("applicantFirstName"), "credentials": credentials})
             print(f"Email sent successfully to {email}")
         except Exception as e:
             print(f"Failed to send email: {e}")
@@ -656,7 +553,8 @@ def apply_job(job_id):
     if "applicant_id" not in session:
         return jsonify({"success": False, "message": "You must login first."}), 401
 
-    conn = create_connection()
+    # Request-scoped so create_notification reuses this connection
+    conn = get_db()
     if not conn:
         return jsonify({"success": False, "message": "Database connection failed."}), 500
 
@@ -756,7 +654,7 @@ def apply_job(job_id):
 
             # Send Notification
             try:
-                create_notification(
+                enqueue_notification(
                     notification_type='job_application',
                     title=f"New Application for {job_position}",
                     message=f"{applicant_name} has applied (or re-applied) to your job posting",
@@ -787,6 +685,7 @@ def apply_job(job_id):
         new_count_row = run_query(
             conn, "SELECT application_count FROM jobs WHERE job_id = %s", (job_id,), fetch="one")
         new_count = new_count_row["application_count"] if new_count_row else 0
+        invalidate_analytics("applications")
 
         return jsonify({
             "success": True,
@@ -956,15 +855,22 @@ def get_unread_notif_count():
     try:
         # UPDATED QUERY: Removed 'applicant_reported' and 'employer_reported' from the exclusion list
         # so the red dot appears when a verdict arrives.
-        query = """
-        SELECT COUNT(*) as count 
-        FROM notifications 
-        WHERE applicant_id = %s 
-          AND is_read = 0 
-          AND notification_type NOT IN ('employer_approval', 'applicant_approval', 'employer_reported', 'employer_outdated_docu', 'applicant_batch')
-        """
-        result = run_query(conn, query, (applicant_id,), fetch="one")
-        count = result['count'] if result else 0
+        hidden_types = ('employer_approval', 'applicant_approval', 'employer_reported',
+                        'employer_outdated_docu', 'applicant_batch')
+
+        # Maintained counter (primary-key lookup); COUNT(*) only as a fallback
+        count = get_unread_total(conn, "applicant", applicant_id,
+                                 exclude_types=hidden_types)
+        if count is None:
+            query = """
+            SELECT COUNT(*) as count 
+            FROM notifications 
+            WHERE applicant_id = %s 
+              AND is_read = 0 
+              AND notification_type NOT IN ('employer_approval', 'applicant_approval', 'employer_reported', 'employer_outdated_docu', 'applicant_batch')
+            """
+            result = run_query(conn, query, (applicant_id,), fetch="one")
+            count = result['count'] if result else 0
 
         return jsonify({'success': True, 'count': count})
     except Exception as e:
@@ -1002,12 +908,11 @@ def mark_applicant_notification_read(notif_id):
             conn.close()
             return jsonify({'success': False, 'message': 'Unauthorized'}), 403
 
-        # 2. Update status directly (Reuse connection)
-        run_query(
-            conn, "UPDATE notifications SET is_read = 1 WHERE notification_id = %s", (notif_id,))
-        conn.commit()
         conn.close()
 
+        # 2. Update status (also keeps the unread counters in step)
+        mark_notification_read(notif_id)
+
         return jsonify({'success': True})
 
     except Exception as e:
@@ -1283,6 +1188,7 @@ def delete_application(app_id):
                 f"[v0] Error sending cancellation notification: {notif_error}")
 
         conn.commit()
+        invalidate_analytics("applications")
         print(
             f"[v0] Application {app_id} cancelled successfully by applicant {applicant_id}")
 
@@ -1361,11 +1267,14 @@ def submit_reupload():
             (new_path, recommendation_expiry, upload_date, 0, applicant_id)
         )
         conn.commit()
+        refresh_expiry_schedule(conn, "applicant", applicant_id)
+        invalidate_analytics("applicants")
 
         update_query = """
         UPDATE notifications
         SET title = %s, message = %s, is_read = 0, updated_at = NOW()
         WHERE applicant_id = %s AND notification_type = 'applicant_approval'
+        ORDER BY notification_id DESC LIMIT 1
         """
         params = (
             "Applicant Document Reuploaded",
@@ -1373,6 +1282,7 @@ def submit_reupload():
             applicant_id
         )
         run_query(conn, update_query, params)
+        refresh_unread_counters(conn, counter_keys("applicant_approval", applicant_id=applicant_id))
         conn.commit()
         conn.close()
 
@@ -1455,6 +1365,7 @@ def reactivate_applicant_account():
             "DELETE FROM deactivated_users WHERE id = %s", (user["id"],))
 
         conn.commit()
+        invalidate_analytics("applicants")
 
         return jsonify({"success": True, "message": "Your account has been successfully reactivated."})
 
@@ -1575,6 +1486,7 @@ def account_security():
                     UPDATE notifications
                     SET title = %s, message = %s, residency_type = %s, is_read = 0, updated_at = NOW()
                     WHERE applicant_id = %s AND notification_type = 'applicant_approval'
+                    ORDER BY notification_id DESC LIMIT 1
                     """
                     params = (
                         "Applicant Residency Changed to Lipeño",
@@ -1583,6 +1495,7 @@ def account_security():
                         applicant_id
                     )
                     run_query(conn, update_query, params)
+                    refresh_unread_counters(conn, counter_keys("applicant_approval", applicant_id=applicant_id))
                     flash(
                         "Your residency has been updated to Lipeño. Your account is now approved and active.", "success")
 
@@ -1601,6 +1514,7 @@ def account_security():
                     UPDATE notifications
                     SET title = %s, message = %s, residency_type = %s, is_read = 0, updated_at = NOW()
                     WHERE applicant_id = %s AND notification_type = 'applicant_approval'
+                    ORDER BY notification_id DESC LIMIT 1
                     """
                     params = (
                         "Applicant Residency Changed - Needs Re-verification",
@@ -1609,6 +1523,7 @@ def account_security():
                         applicant_id
                     )
                     run_query(conn, update_query, params)
+                    refresh_unread_counters(conn, counter_keys("applicant_approval", applicant_id=applicant_id))
                     flash("Your residency has been changed to Non-Lipeño. Your recommendation letter has been uploaded. Please wait for admin approval. You will be logged out.", "info")
 
             # === SECURITY FIX: Handle Re-upload WITHOUT Residency Change ===
@@ -1628,6 +1543,7 @@ def account_security():
                 UPDATE notifications
                 SET title = %s, message = %s, is_read = 0, updated_at = NOW()
                 WHERE applicant_id = %s AND notification_type = 'applicant_approval'
+                ORDER BY notification_id DESC LIMIT 1
                 """
                 params = (
                     "Non-Lipeño Applicant Document Updated",
@@ -1635,6 +1551,7 @@ def account_security():
                     applicant_id
                 )
                 run_query(conn, update_query, params)
+                refresh_unread_counters(conn, counter_keys("applicant_approval", applicant_id=applicant_id))
 
             # Determine recommendation expiry to store
             try:
@@ -1697,6 +1614,8 @@ def account_security():
                 ),
             )
             conn.commit()
+            refresh_expiry_schedule(conn, "applicant", applicant_id)
+            invalidate_analytics("applicants")
 
             session["applicant_status"] = status
 
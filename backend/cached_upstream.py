@@ -0,0 +1,138 @@
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# Cache for slow external APIs behind dashboard widgets.
+#
+# A CachedUpstream wraps a fetch function and keeps its results per key
+# (e.g. coordinates) for `ttl` seconds. After that the value is still served
+# for up to `stale_ttl` seconds while one background thread refreshes it, so
+# page loads never wait on the upstream once the key has been fetched. Only
+# one fetch per key runs at a time: concurrent misses wait for the leader's
+# result instead of each calling the API. After a failed fetch the last good
+# value is kept, and the key is not retried for `failure_ttl` seconds, whether
+# it is uncached or only stale.
+
+http_session = requests.Session()
+http_session.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=8))
+http_session.mount("http://", HTTPAdapter(pool_connections=4, pool_maxsize=8))
+
+_upstreams = {}
+
+
+class UpstreamUnavailable(Exception):
+    pass
+
+
+class _Entry:
+    __slots__ = ("value", "fetched_at", "failed_at", "error")
+
+    def __init__(self):
+        self.value = None
+        self.fetched_at = None
+        self.failed_at = None
+        self.error = None
+
+
+class CachedUpstream:
+    def __init__(self, name, fetch, ttl=600, stale_ttl=3600, failure_ttl=60, wait_timeout=10):
+        self.name = name
+        self.fetch = fetch
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.failure_ttl = failure_ttl
+        self.wait_timeout = wait_timeout
+        self._entries = {}
+        self._inflight = {}  # key -> threading.Event
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "stale_hits": 0, "misses": 0, "fetches": 0, "failures": 0}
+        _upstreams[name] = self
+
+    def get(self, key):
+        """
+        Cached value for `key`, calling fetch(*key) when needed. Raises
+        UpstreamUnavailable when there is no value to serve.
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.setdefault(key, _Entry())
+            age = now - entry.fetched_at if entry.fetched_at is not None else None
+
+            if age is not None and age < self.ttl:
+                self.stats["hits"] += 1
+                return entry.value
+
+            if age is not None and age < self.stale_ttl:
+                self.stats["stale_hits"] += 1
+                recently_failed = (entry.failed_at is not None
+                                   and now - entry.failed_at < self.failure_ttl)
+                if key not in self._inflight and not recently_failed:
+                    self._inflight[key] = threading.Event()
+                    threading.Thread(target=self._refresh, args=(key,),
+                                     name=f"upstream-{self.name}", daemon=True).start()
+                return entry.value
+
+            self.stats["misses"] += 1
+            if entry.failed_at is not None and now - entry.failed_at < self.failure_ttl:
+                return self._fallback(entry)
+
+            done = self._inflight.get(key)
+            leader = done is None
+            if leader:
+                done = self._inflight[key] = threading.Event()
+
+        if leader:
+            self._refresh(key)
+        else:
+            done.wait(self.wait_timeout)
+
+        with self._lock:
+            entry = self._entries[key]
+            if entry.fetched_at is not None and time.monotonic() - entry.fetched_at < self.stale_ttl:
+                return entry.value
+            return self._fallback(entry)
+
+    def _fallback(self, entry):
+        # Caller holds _lock; any last good value beats no value
+        if entry.fetched_at is not None:
+            return entry.value
+        raise UpstreamUnavailable(f"{self.name}: {entry.error or 'no data'}")
+
+    def _refresh(self, key):
+        try:
+            with self._lock:
+                self.stats["fetches"] += 1
+            value = self.fetch(*key)
+            with self._lock:
+                entry = self._entries[key]
+                entry.value, entry.fetched_at = value, time.monotonic()
+                entry.failed_at = entry.error = None
+        except Exception as e:
+            print(f"[widgets] {self.name} fetch failed for {key}: {e}")
+            with self._lock:
+                self.stats["failures"] += 1
+                entry = self._entries[key]
+                entry.failed_at, entry.error = time.monotonic(), str(e)
+        finally:
+            with self._lock:
+                done = self._inflight.pop(key, None)
+            if done:
+                done.set()
+
+    def snapshot(self):
+        now = time.monotonic()
+        with self._lock:
+            return {
+                **self.stats,
+                "keys": len(self._entries),
+                "refreshing": len(self._inflight),
+                "oldest_age_seconds": max(
+                    (round(now - e.fetched_at, 1) for e in self._entries.values()
+                     if e.fetched_at is not None), default=None),
+            }
+
+
+def get_upstream_stats():
+    return {name: upstream.snapshot() for name, upstream in _upstreams.items()}
@@ -1,9 +1,23 @@
-from flask import Blueprint, request, jsonify, session, render_template
-from db_connection import create_connection, run_query
+from flask import Blueprint, Response, request, jsonify, session, render_template
+from db_connection import create_connection, get_db, run_query
 from datetime import datetime
+import base64
+import hashlib
+import json
+from .event_hub import publish
+from .chat_autoreply import engine as autoreply_engine
 
 chat_bp = Blueprint("chat", __name__)
 
+# Only the fields the chat widgets render
+MESSAGE_COLUMNS = "message_id, conversation_id, sender_type, message, is_read, created_at"
+
+# Admin inbox rows: maintained counter + denormalized name, no per-row subqueries
+CONVERSATION_COLUMNS = ("conversation_id, user_id, user_type, user_name, "
+                        "unread_user_messages AS unread_count, last_message_at")
+CONVERSATION_PAGE_SIZE = 50
+MAX_CONVERSATION_PAGE_SIZE = 200
+
 # --- UTILS ---
 
 
@@ -15,36 +29,164 @@ def get_current_user():
         return session['employer_id'], 'employer'
     return None, None
 
-# --- USER SIDE (Applicant/Employer) ---
 
+def _ensure_index(conn, table, name, columns):
+    existing = run_query(conn, f"SHOW INDEX FROM {table} WHERE Key_name = %s", (name,), fetch="all")
+    if existing is not None and not existing:
+        print(f"[v0] Creating index {name}")
+        run_query(conn, f"CREATE INDEX {name} ON {table} {columns}")
 
-@chat_bp.route("/api/my_messages", methods=["GET"])
-def get_my_messages():
-    user_id, user_type = get_current_user()
-    if not user_id:
-        return jsonify({"error": "Unauthorized"}), 401
 
-    conn = create_connection()
-    # 1. Get or Create Conversation
+def ensure_chat_schema(conn=None):
+    """
+    Startup migration for the support chat:
+    - (conversation_id, message_id) index for the delta fetch
+    - unread_user_messages counter and denormalized user_name on
+      support_conversations, re-synced from the source tables
+    - (last_message_at, conversation_id) index for the paginated inbox and
+      an unread_user_messages index for the badge count
+    """
+    local_conn = conn or get_db()
+    if not local_conn:
+        return False
+
+    try:
+        _ensure_index(local_conn, "support_messages", "idx_support_messages_convo",
+                      "(conversation_id, message_id)")
+
+        for column, definition in (
+                ("unread_user_messages", "INT NOT NULL DEFAULT 0"),
+                ("user_name", "VARCHAR(255) NULL")):
+            found = run_query(local_conn, f"SHOW COLUMNS FROM support_conversations LIKE '{column}'",
+                              fetch="one")
+            if not found:
+                print(f"[v0] Adding support_conversations.{column}")
+                run_query(local_conn,
+                          f"ALTER TABLE support_conversations ADD COLUMN {column} {definition}")
+
+        _ensure_index(local_conn, "support_conversations", "idx_support_conversations_inbox",
+                      "(last_message_at, conversation_id)")
+        _ensure_index(local_conn, "support_conversations", "idx_support_conversations_unread",
+                      "(unread_user_messages)")
+
+        # Re-sync the denormalized columns (repairs any drift since last start)
+        run_query(local_conn, """
+            UPDATE support_conversations c
+            LEFT JOIN (
+                SELECT conversation_id, COUNT(*) AS unread
+                FROM support_messages
+                WHERE sender_type = 'user' AND is_read = 0
+                GROUP BY conversation_id
+            ) u ON u.conversation_id = c.conversation_id
+            SET c.unread_user_messages = COALESCE(u.unread, 0)
+        """)
+        run_query(local_conn, """
+            UPDATE support_conversations c
+            JOIN applicants a ON c.user_type = 'applicant' AND a.applicant_id = c.user_id
+            SET c.user_name = CONCAT(a.first_name, ' ', a.last_name)
+        """)
+        run_query(local_conn, """
+            UPDATE support_conversations c
+            JOIN employers e ON c.user_type = 'employer' AND e.employer_id = c.user_id
+            SET c.user_name = e.employer_name
+        """)
+        return True
+    finally:
+        if conn is None:
+            local_conn.close()
+
+
+def lookup_display_name(conn, user_id, user_type):
+    if user_type == 'applicant':
+        row = run_query(conn, "SELECT CONCAT(first_name, ' ', last_name) AS name FROM applicants WHERE applicant_id=%s",
+                        (user_id,), fetch="one")
+    elif user_type == 'employer':
+        row = run_query(conn, "SELECT employer_name AS name FROM employers WHERE employer_id=%s",
+                        (user_id,), fetch="one")
+    else:
+        row = None
+    return row['name'] if row else None
+
+
+def recount_unread_user_messages(conn, convo_id):
+    """Set the conversation's counter from support_messages (after the admin reads it)."""
+    run_query(conn, """
+        UPDATE support_conversations
+        SET unread_user_messages = (
+            SELECT COUNT(*) FROM support_messages
+            WHERE conversation_id = %s AND sender_type = 'user' AND is_read = 0
+        )
+        WHERE conversation_id = %s
+    """, (convo_id, convo_id))
+
+
+def parse_after_id(value):
+    try:
+        return max(0, int(value))
+    except (TypeError, ValueError):
+        return 0
+
+
+def fetch_messages(conn, convo_id, after_id=0):
+    """Messages of a conversation newer than after_id (0 = whole conversation), oldest first."""
+    return run_query(
+        conn,
+        f"SELECT {MESSAGE_COLUMNS} FROM support_messages "
+        "WHERE conversation_id=%s AND message_id > %s ORDER BY message_id ASC",
+        (convo_id, after_id),
+        fetch="all"
+    ) or []
+
+
+def get_or_create_conversation_id(conn, user_id, user_type):
+    """Conversation id for the current user; cached in the session after the first lookup."""
+    cached = session.get('support_conversation')
+    if cached and cached[0] == user_type and cached[1] == user_id:
+        return cached[2]
+
     convo = run_query(conn, "SELECT conversation_id FROM support_conversations WHERE user_id=%s AND user_type=%s",
                       (user_id, user_type), fetch="one")
 
     if not convo:
         # Create new conversation if none exists
         run_query(
-            conn, "INSERT INTO support_conversations (user_id, user_type) VALUES (%s, %s)", (user_id, user_type))
+            conn, "INSERT INTO support_conversations (user_id, user_type, user_name) VALUES (%s, %s, %s)",
+            (user_id, user_type, lookup_display_name(conn, user_id, user_type)))
         convo = run_query(
-            conn, "SELECT LAST_INSERT_ID() as conversation_id", fetch="one")
-        conn.commit()
+            conn, "SELECT conversation_id FROM support_conversations WHERE user_id=%s AND user_type=%s",
+            (user_id, user_type), fetch="one")
+
+    session['support_conversation'] = [user_type, user_id, convo['conversation_id']]
+    return convo['conversation_id']
+
+
+def publish_chat_event(convo_id, user_id, user_type):
+    """Tell the user's open tabs and the admin inbox that a conversation changed"""
+    data = {"conversation_id": convo_id}
+    publish(f"{user_type}:{user_id}", "chat", data)
+    publish("admin", "chat", data)
+
+# --- USER SIDE (Applicant/Employer) ---
+
+
+@chat_bp.route("/api/my_messages", methods=["GET"])
+def get_my_messages():
+    user_id, user_type = get_current_user()
+    if not user_id:
+        return jsonify({"error": "Unauthorized"}), 401
 
-    convo_id = convo['conversation_id']
+    conn = create_connection()
+    # 1. Get or Create Conversation (session-cached)
+    convo_id = get_or_create_conversation_id(conn, user_id, user_type)
 
-    # 2. Fetch Messages
-    messages = run_query(
-        conn, "SELECT * FROM support_messages WHERE conversation_id=%s ORDER BY created_at ASC", (convo_id,), fetch="all")
+    # 2. Fetch Messages: ?after_id=<last message_id seen> returns only newer ones
+    after_id = parse_after_id(request.args.get('after_id'))
+    messages = fetch_messages(conn, convo_id, after_id)
 
     conn.close()
-    return jsonify({"success": True, "messages": messages, "conversation_id": convo_id})
+    last_id = messages[-1]['message_id'] if messages else after_id
+    return jsonify({"success": True, "messages": messages, "conversation_id": convo_id,
+                    "last_id": last_id})
 
 
 @chat_bp.route("/api/send_message", methods=["POST"])
@@ -64,80 +206,31 @@ def send_message():
 
     try:
         # 2️⃣ Ensure conversation exists
-        convo = run_query(
-            conn,
-            "SELECT conversation_id FROM support_conversations WHERE user_id=%s AND user_type=%s",
-            (user_id, user_type),
-            fetch="one"
-        )
-        if not convo:
-            run_query(
-                conn,
-                "INSERT INTO support_conversations (user_id, user_type) VALUES (%s, %s)",
-                (user_id, user_type)
-            )
-            conn.commit()
-            convo = run_query(
-                conn,
-                "SELECT conversation_id FROM support_conversations WHERE user_id=%s AND user_type=%s",
-                (user_id, user_type),
-                fetch="one"
-            )
-
-        convo_id = convo['conversation_id']
-
-        # 3️⃣ Insert user message
+        convo_id = get_or_create_conversation_id(conn, user_id, user_type)
+
+        # 3️⃣ Insert the user message and its auto-replies (quick-select
+        #    rules / outside office hours) in one multi-row INSERT
+        rows = [(convo_id, 'user', message)]
+        rows += [(convo_id, 'admin', reply) for reply in autoreply_engine.replies_for(message)]
         run_query(
             conn,
-            "INSERT INTO support_messages (conversation_id, sender_type, message) VALUES (%s, 'user', %s)",
-            (convo_id, message)
+            "INSERT INTO support_messages (conversation_id, sender_type, message) VALUES "
+            + ", ".join(["(%s, %s, %s)"] * len(rows)),
+            tuple(value for row in rows for value in row)
         )
 
-        # 4️⃣ Update last message timestamp
+        # 4️⃣ Update last message timestamp, unread counter and display name
         run_query(
             conn,
-            "UPDATE support_conversations SET last_message_at=NOW() WHERE conversation_id=%s",
-            (convo_id,)
+            """UPDATE support_conversations
+               SET last_message_at=NOW(), unread_user_messages = unread_user_messages + 1,
+                   user_name = COALESCE(%s, user_name)
+               WHERE conversation_id=%s""",
+            (lookup_display_name(conn, user_id, user_type), convo_id)
         )
 
-        # 5️⃣ QUICK-SELECT AUTO REPLIES
-        lower_msg = message.lower()
-
-        quick_replies = {
-            "yes": "Sure! What else can I help you with?",
-            "no": "Thank you! If you need anything else, feel free to message anytime.",
-            "check my application": "No problem! Please wait a moment while we assist with your application status.",
-            "report a job": "Got it! Let me guide you on how to report a job properly.",
-            "reset my password": "Sure! Click 'Forgot password' on the login page to reset your password."
-        }
-
-        if lower_msg in quick_replies:
-            auto_reply = quick_replies[lower_msg]
-            run_query(
-                conn,
-                "INSERT INTO support_messages (conversation_id, sender_type, message) VALUES (%s, 'admin', %s)",
-                (convo_id, auto_reply)
-            )
-            conn.commit()
-            return jsonify({"success": True})
-
-        # 6️⃣ Outside Office Hours auto reply
-        now = datetime.now()
-        start_time = now.replace(hour=8, minute=0, second=0, microsecond=0)
-        end_time = now.replace(hour=17, minute=0, second=0, microsecond=0)
-
-        if now.weekday() > 4 or not (start_time <= now <= end_time):
-            auto_reply = (
-                "Hello! You've reached us outside office hours (8 AM - 5 PM). "
-                "We have received your message and an admin will reply as soon as we're back online."
-            )
-            run_query(
-                conn,
-                "INSERT INTO support_messages (conversation_id, sender_type, message) VALUES (%s, 'admin', %s)",
-                (convo_id, auto_reply)
-            )
-
         conn.commit()
+        publish_chat_event(convo_id, user_id, user_type)
         return jsonify({"success": True})
 
     except Exception as e:
@@ -157,26 +250,118 @@ def admin_chat_page():
     return render_template("Admin/admin_messages.html")
 
 
+def _encode_conversation_cursor(row):
+    ts = row['last_message_at']
+    raw = f"{ts.strftime('%Y-%m-%d %H:%M:%S.%f') if ts else ''}|{row['conversation_id']}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def _decode_conversation_cursor(value):
+    if not value:
+        return None
+    try:
+        ts, convo_id = base64.urlsafe_b64decode(
+            (value + "=" * (-len(value) % 4)).encode()).decode().split("|")
+        return (datetime.strptime(ts, '%Y-%m-%d %H:%M:%S.%f') if ts else None), int(convo_id)
+    except Exception:
+        return None
+
+
+def get_conversation_page(conn, cursor=None, limit=CONVERSATION_PAGE_SIZE):
+    """
+    One page of the admin inbox, most recent activity first.
+    Conversations with activity are walked by (last_message_at, conversation_id)
+    and empty ones (NULL last_message_at) after them, so each page is one
+    index range scan. Returns (rows, next_cursor).
+    """
+    position = _decode_conversation_cursor(cursor)
+    rows = []
+    wanted = limit + 1
+
+    if not position or position[0] is not None:
+        query = f"SELECT {CONVERSATION_COLUMNS} FROM support_conversations WHERE last_message_at IS NOT NULL"
+        params = []
+        if position:
+            query += " AND (last_message_at < %s OR (last_message_at = %s AND conversation_id < %s))"
+            params.extend([position[0], position[0], position[1]])
+        query += " ORDER BY last_message_at DESC, conversation_id DESC LIMIT %s"
+        params.append(wanted)
+        rows.extend(run_query(conn, query, tuple(params), fetch="all") or [])
+
+    if len(rows) < wanted:
+        query = f"SELECT {CONVERSATION_COLUMNS} FROM support_conversations WHERE last_message_at IS NULL"
+        params = []
+        if position and position[0] is None:
+            query += " AND conversation_id < %s"
+            params.append(position[1])
+        query += " ORDER BY conversation_id DESC LIMIT %s"
+        params.append(wanted - len(rows))
+        rows.extend(run_query(conn, query, tuple(params), fetch="all") or [])
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = _encode_conversation_cursor(rows[-1])
+    return rows, next_cursor
+
+
+def _etag_response(payload):
+    """JSON response with a content ETag; answers 304 when the client already has it."""
+    body = json.dumps(payload, default=str)
+    etag = '"' + hashlib.sha1(body.encode()).hexdigest() + '"'
+    if etag in request.headers.get("If-None-Match", ""):
+        response = Response(status=304)
+    else:
+        response = Response(body, mimetype="application/json")
+    response.headers["ETag"] = etag
+    # Let the browser keep the body but revalidate on every poll
+    response.headers["Cache-Control"] = "private, no-cache"
+    return response
+
+
+def _page_size(value):
+    try:
+        return max(1, min(int(value), MAX_CONVERSATION_PAGE_SIZE))
+    except (TypeError, ValueError):
+        return CONVERSATION_PAGE_SIZE
+
+
 @chat_bp.route("/api/admin/conversations")
 def get_admin_conversations():
+    """First page of the inbox as a plain list (older clients)."""
     if 'admin_id' not in session:
         return jsonify({"error": "Unauthorized"}), 401
 
     conn = create_connection()
-    # Fetch conversations with user details
-    query = """
-        SELECT c.*, 
-            (SELECT COUNT(*) FROM support_messages m WHERE m.conversation_id = c.conversation_id AND m.is_read = 0 AND m.sender_type = 'user') as unread_count,
-            CASE 
-                WHEN c.user_type = 'applicant' THEN (SELECT CONCAT(first_name, ' ', last_name) FROM applicants WHERE applicant_id = c.user_id)
-                WHEN c.user_type = 'employer' THEN (SELECT employer_name FROM employers WHERE employer_id = c.user_id)
-            END as user_name
-        FROM support_conversations c
-        ORDER BY c.last_message_at DESC
-    """
-    convos = run_query(conn, query, fetch="all")
+    convos, _ = get_conversation_page(conn, limit=_page_size(request.args.get('limit')))
     conn.close()
-    return jsonify(convos)
+    return _etag_response(convos)
+
+
+@chat_bp.route("/api/admin/conversations/page")
+def get_admin_conversations_page():
+    """Paginated inbox: ?cursor=<next_cursor>&limit=<n>."""
+    if 'admin_id' not in session:
+        return jsonify({"error": "Unauthorized"}), 401
+
+    conn = create_connection()
+    convos, next_cursor = get_conversation_page(
+        conn, cursor=request.args.get('cursor'), limit=_page_size(request.args.get('limit')))
+    conn.close()
+    return _etag_response({"success": True, "conversations": convos, "next_cursor": next_cursor})
+
+
+@chat_bp.route("/api/admin/conversations/unread")
+def get_admin_unread_conversations():
+    """Badge check: how many conversations have unread user messages."""
+    if 'admin_id' not in session:
+        return jsonify({"error": "Unauthorized"}), 401
+
+    conn = create_connection()
+    row = run_query(conn, "SELECT COUNT(*) AS unread FROM support_conversations WHERE unread_user_messages > 0",
+                    fetch="one")
+    conn.close()
+    return jsonify({"success": True, "unread_conversations": int(row['unread']) if row else 0})
 
 
 @chat_bp.route("/api/admin/conversation/<int:convo_id>")
@@ -185,12 +370,14 @@ def get_admin_messages(convo_id):
         return jsonify({"error": "Unauthorized"}), 401
 
     conn = create_connection()
-    messages = run_query(
-        conn, "SELECT * FROM support_messages WHERE conversation_id=%s ORDER BY created_at ASC", (convo_id,), fetch="all")
-
-    # Mark as read
-    run_query(conn, "UPDATE support_messages SET is_read=1 WHERE conversation_id=%s AND sender_type='user'", (convo_id,))
-    conn.commit()
+    # ?after_id=<last message_id seen> returns only newer messages
+    after_id = parse_after_id(request.args.get('after_id'))
+    messages = fetch_messages(conn, convo_id, after_id)
+
+    # Mark as read (only when this fetch could have delivered unread user messages)
+    if not after_id or any(m['sender_type'] == 'user' and not m['is_read'] for m in messages):
+        run_query(conn, "UPDATE support_messages SET is_read=1 WHERE conversation_id=%s AND sender_type='user' AND is_read=0", (convo_id,))
+        recount_unread_user_messages(conn, convo_id)
     conn.close()
 
     return jsonify(messages)
@@ -209,7 +396,12 @@ def admin_reply():
     run_query(conn, "INSERT INTO support_messages (conversation_id, sender_type, message) VALUES (%s, 'admin', %s)", (convo_id, message))
     run_query(
         conn, "UPDATE support_conversations SET last_message_at=NOW() WHERE conversation_id=%s", (convo_id,))
+    convo = run_query(
+        conn, "SELECT user_id, user_type FROM support_conversations WHERE conversation_id=%s", (convo_id,), fetch="one")
     conn.commit()
     conn.close()
 
+    if convo:
+        publish_chat_event(convo_id, convo['user_id'], convo['user_type'])
+
     return jsonify({"success": True})
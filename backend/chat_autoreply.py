@@ -0,0 +1,273 @@
+import json
+import os
+import re
+import time
+from collections import deque
+from datetime import date, datetime, time as dtime
+
+# Support chat auto-replies.
+#
+# Rules are compiled once into:
+#   - exact:   dict keyed by the normalized message
+#   - prefix:  character trie, longest matching prefix wins
+#   - keyword: Aho-Corasick automaton, whole-word matches only
+# so matching a message costs O(len(message)) no matter how many rules exist.
+# Exact rules beat prefix rules, which beat keyword rules; within keywords the
+# lowest priority value wins, then the earliest match.
+#
+# CHAT_AUTOREPLY_RULES may point to a JSON list of
+#   {"match": "exact" | "prefix" | "keyword", "pattern": "...", "reply": "...",
+#    "priority": 100}
+# which replaces DEFAULT_RULES.
+
+DEFAULT_RULES = [
+    {"match": "exact", "pattern": "yes",
+     "reply": "Sure! What else can I help you with?"},
+    {"match": "exact", "pattern": "no",
+     "reply": "Thank you! If you need anything else, feel free to message anytime."},
+    {"match": "exact", "pattern": "check my application",
+     "reply": "No problem! Please wait a moment while we assist with your application status."},
+    {"match": "exact", "pattern": "report a job",
+     "reply": "Got it! Let me guide you on how to report a job properly."},
+    {"match": "exact", "pattern": "reset my password",
+     "reply": "Sure! Click 'Forgot password' on the login page to reset your password."},
+]
+
+OUT_OF_OFFICE_REPLY = os.getenv(
+    "CHAT_OUT_OF_OFFICE_REPLY",
+    "Hello! You've reached us outside office hours ({hours}). "
+    "We have received your message and an admin will reply as soon as we're back online."
+)
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize(text):
+    return _WHITESPACE.sub(" ", (text or "").strip().lower())
+
+
+def _is_word_char(ch):
+    return ch.isalnum() or ch == "_"
+
+
+class KeywordAutomaton:
+    """Aho-Corasick automaton over keyword patterns; each pattern carries a payload."""
+
+    def __init__(self):
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [[]]   # (pattern_length, payload) per state
+        self._built = False
+
+    def add(self, pattern, payload):
+        state = 0
+        for ch in pattern:
+            nxt = self._goto[state].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+                self._goto[state][ch] = nxt
+            state = nxt
+        self._out[state].append((len(pattern), payload))
+        self._built = False
+
+    def build(self):
+        queue = deque()
+        for nxt in self._goto[0].values():
+            self._fail[nxt] = 0
+            queue.append(nxt)
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fallback = self._fail[state]
+                while fallback and ch not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[nxt] = self._goto[fallback].get(ch, 0)
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+        self._built = True
+
+    def iter_matches(self, text):
+        """Yield (start, end, payload) for every occurrence, in order of end position."""
+        if not self._built:
+            self.build()
+        state = 0
+        for i, ch in enumerate(text):
+            while state and ch not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(ch, 0)
+            for length, payload in self._out[state]:
+                yield i - length + 1, i + 1, payload
+
+
+class AutoReplyEngine:
+    """Compiled rule set plus office-hours policy."""
+
+    def __init__(self, rules=None, office_start=dtime(8, 0), office_end=dtime(17, 0),
+                 office_days=(0, 1, 2, 3, 4), holidays=(), out_of_office_reply=OUT_OF_OFFICE_REPLY):
+        self.office_start = office_start
+        self.office_end = office_end
+        self.office_days = frozenset(office_days)
+        self.holidays = frozenset(holidays)
+        self.out_of_office_reply = out_of_office_reply
+        self.compile(DEFAULT_RULES if rules is None else rules)
+
+    def compile(self, rules):
+        self._exact = {}
+        self._prefix_trie = {}
+        self._keywords = KeywordAutomaton()
+        self.rule_count = 0
+
+        for order, rule in enumerate(rules):
+            kind = rule.get("match", "exact")
+            pattern = normalize(rule.get("pattern"))
+            reply = rule.get("reply")
+            if not pattern or not reply:
+                continue
+            priority = (int(rule.get("priority", 100)), order)
+
+            if kind == "exact":
+                self._exact.setdefault(pattern, reply)
+            elif kind == "prefix":
+                node = self._prefix_trie
+                for ch in pattern:
+                    node = node.setdefault(ch, {})
+                node.setdefault(None, reply)  # None key marks the end of a pattern
+            elif kind == "keyword":
+                self._keywords.add(pattern, (priority, reply))
+            else:
+                print(f"[v0] Unknown auto-reply rule type '{kind}', skipped")
+                continue
+            self.rule_count += 1
+
+        self._keywords.build()
+
+    def match(self, message):
+        """Reply text for the first matching rule, or None."""
+        text = normalize(message)
+        if not text:
+            return None
+
+        reply = self._exact.get(text)
+        if reply:
+            return reply
+
+        node, best = self._prefix_trie, None
+        for ch in text:
+            node = node.get(ch)
+            if node is None:
+                break
+            best = node.get(None, best)
+        if best:
+            return best
+
+        found = None
+        for start, end, (priority, reply) in self._keywords.iter_matches(text):
+            # Whole words only: "no" must not fire inside "know"
+            if start > 0 and _is_word_char(text[start - 1]):
+                continue
+            if end < len(text) and _is_word_char(text[end]):
+                continue
+            if found is None or priority < found[0]:
+                found = (priority, reply)
+        return found[1] if found else None
+
+    def is_office_hours(self, now=None):
+        now = now or datetime.now()
+        if now.date() in self.holidays or now.weekday() not in self.office_days:
+            return False
+        return self.office_start <= now.time() <= self.office_end
+
+    def replies_for(self, message, now=None):
+        """Auto-replies to store after a user message (at most one)."""
+        reply = self.match(message)
+        if reply:
+            return [reply]
+        if not self.is_office_hours(now):
+            hours = f"{self.office_start.strftime('%I %p').lstrip('0')} - " \
+                    f"{self.office_end.strftime('%I %p').lstrip('0')}"
+            return [self.out_of_office_reply.format(hours=hours)]
+        return []
+
+
+def _parse_time(value, default):
+    try:
+        hour, minute = value.split(":")
+        return dtime(int(hour), int(minute))
+    except Exception:
+        return default
+
+
+def _parse_days(value):
+    """Parse "0-4" or "0,1,2,3,4,5" (Monday = 0) into weekday numbers."""
+    days = set()
+    for part in (value or "").split(","):
+        part = part.strip()
+        if "-" in part:
+            first, last = part.split("-")
+            days.update(range(int(first), int(last) + 1))
+        elif part:
+            days.add(int(part))
+    return days
+
+
+def _parse_holidays(value):
+    holidays = set()
+    for part in (value or "").split(","):
+        part = part.strip()
+        if part:
+            try:
+                holidays.add(date.fromisoformat(part))
+            except ValueError:
+                print(f"[v0] Ignoring invalid holiday date '{part}'")
+    return holidays
+
+
+def load_engine():
+    """Build the engine from the environment (rules file, office hours, holidays)."""
+    rules = None
+    rules_path = os.getenv("CHAT_AUTOREPLY_RULES")
+    if rules_path:
+        try:
+            with open(rules_path, encoding="utf-8") as fh:
+                rules = json.load(fh)
+        except Exception as exc:
+            print(f"[v0] Could not load auto-reply rules from {rules_path}: {exc}")
+
+    office_hours = os.getenv("CHAT_OFFICE_HOURS", "08:00-17:00").split("-")
+    return AutoReplyEngine(
+        rules=rules,
+        office_start=_parse_time(office_hours[0], dtime(8, 0)),
+        office_end=_parse_time(office_hours[-1], dtime(17, 0)),
+        office_days=_parse_days(os.getenv("CHAT_OFFICE_DAYS", "0-4")),
+        holidays=_parse_holidays(os.getenv("CHAT_HOLIDAYS", "")),
+    )
+
+
+engine = load_engine()
+
+
+def benchmark(rule_count=500, messages=2000, message_length=200):
+    """
+    Time match() with a synthetic rule set; per-message cost should stay flat
+    as rule_count grows. Run with: python -m backend.chat_autoreply
+    """
+    rules = [{"match": ("exact", "prefix", "keyword")[i % 3],
+              "pattern": f"topic{i} question", "reply": f"reply {i}"}
+             for i in range(rule_count)]
+    bench_engine = AutoReplyEngine(rules=rules)
+    sample = ("hello i have a question about topic42 question and more words " * 8)[:message_length]
+
+    started = time.perf_counter()
+    for _ in range(messages):
+        bench_engine.match(sample)
+    elapsed = time.perf_counter() - started
+    return {"rules": bench_engine.rule_count, "messages": messages,
+            "us_per_message": round(elapsed / messages * 1e6, 2)}
+
+
+if __name__ == "__main__":
+    for count in (10, 100, 1000):
+        print(benchmark(rule_count=count))
@@ -0,0 +1,491 @@
+from db_connection import create_connection, run_query
+from extensions import mail
+from flask_mail import Message
+from .email_templates import html_to_text, precompile_email_templates, render_email, render_subject
+from datetime import date
+import hashlib
+import json
+import os
+import smtplib
+import threading
+import time
+import traceback
+import uuid
+
+# Persistent outbox for outgoing email.
+#
+# Request handlers and scheduler jobs call queue_message()/queue_email(),
+# which only INSERT a row and wake the workers. A small pool of worker
+# threads claims pending rows in batches and sends each batch over one SMTP
+# session (mail.connect()), so N emails cost one TLS handshake instead of N.
+# Failed sends are retried with exponential backoff; rows that keep failing
+# end up as status='failed'. Once a row is sent or failed its rendered body
+# and template context are cleared (both can carry reset tokens and
+# temporary passwords); subject, recipients and status stay for the audit
+# trail.
+#
+# queue_template() stores a template id plus its JSON context instead of the
+# rendered HTML; the worker renders it (see email_templates.py) right before
+# sending, which keeps rows small for bulk notices.
+#
+# For local testing point MAIL_SERVER/MAIL_PORT at a throwaway SMTP sink,
+# e.g. `python -m aiosmtpd -n -l localhost:8025` with MAIL_USE_TLS off.
+
+OUTBOX_TABLE_SQL = """
+    CREATE TABLE IF NOT EXISTS email_outbox (
+        email_id BIGINT AUTO_INCREMENT PRIMARY KEY,
+        dedupe_key CHAR(64) NULL,
+        subject VARCHAR(255) NOT NULL,
+        recipients TEXT NOT NULL,
+        sender VARCHAR(255) NULL,
+        body MEDIUMTEXT NULL,
+        html MEDIUMTEXT NULL,
+        template_id VARCHAR(64) NULL,
+        context TEXT NULL,
+        status ENUM('pending', 'sending', 'sent', 'failed') NOT NULL DEFAULT 'pending',
+        attempts INT NOT NULL DEFAULT 0,
+        next_attempt_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+        claimed_by CHAR(32) NULL,
+        claimed_at DATETIME NULL,
+        last_error TEXT NULL,
+        created_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+        sent_at DATETIME NULL,
+        UNIQUE KEY uq_email_outbox_dedupe (dedupe_key),
+        INDEX idx_email_outbox_due (status, next_attempt_at),
+        INDEX idx_email_outbox_claim (claimed_by)
+    )
+"""
+
+WORKERS = int(os.getenv("EMAIL_WORKERS", 2))
+BATCH_SIZE = int(os.getenv("EMAIL_BATCH_SIZE", 20))
+POLL_INTERVAL = float(os.getenv("EMAIL_POLL_INTERVAL", 5))
+MAX_ATTEMPTS = int(os.getenv("EMAIL_MAX_ATTEMPTS", 6))
+BACKOFF_BASE_SECONDS = int(os.getenv("EMAIL_BACKOFF_BASE", 30))
+BACKOFF_MAX_SECONDS = int(os.getenv("EMAIL_BACKOFF_MAX", 3600))
+# A row stuck in 'sending' this long (worker died mid-batch) is reclaimed
+CLAIM_TIMEOUT_SECONDS = int(os.getenv("EMAIL_CLAIM_TIMEOUT", 600))
+# "sync" sends inline like the old mail.send() calls (debugging / scripts)
+MODE = os.getenv("EMAIL_OUTBOX_MODE", "async")
+
+# Errors that mean the SMTP session itself is gone; the rest of the batch
+# is released for a retry instead of being failed one by one
+_CONNECTION_ERRORS = (smtplib.SMTPServerDisconnected, smtplib.SMTPConnectError,
+                      ConnectionError, TimeoutError)
+
+_app = None
+_wake = threading.Event()
+_stop = threading.Event()
+_workers = []
+_ready = False
+_stats_lock = threading.Lock()
+_stats = {
+    "queued": 0,
+    "deduplicated": 0,
+    "sent_inline": 0,
+    "sent": 0,
+    "retried": 0,
+    "released": 0,
+    "failed": 0,
+    "batches": 0,
+    "smtp_sessions": 0,
+    "batch_seconds_total": 0.0,
+    "last_error": None,
+}
+
+
+def _bump(key, amount=1):
+    with _stats_lock:
+        _stats[key] += amount
+
+
+def ensure_email_outbox(conn=None):
+    global _ready
+
+    local_conn = conn or create_connection()
+    if not local_conn:
+        return False
+
+    try:
+        cursor = local_conn.cursor()
+        cursor.execute(OUTBOX_TABLE_SQL)
+        cursor.execute("SHOW COLUMNS FROM email_outbox")
+        columns = {row[0] for row in cursor.fetchall()}
+        if "template_id" not in columns:
+            print("[email] Adding template columns to email_outbox")
+            cursor.execute("""
+                ALTER TABLE email_outbox
+                    ADD COLUMN template_id VARCHAR(64) NULL AFTER html,
+                    ADD COLUMN context TEXT NULL AFTER template_id
+            """)
+        # Rows finished before bodies were cleared on send
+        cursor.execute("""
+            UPDATE email_outbox SET body = NULL, html = NULL, context = NULL
+            WHERE status IN ('sent', 'failed')
+              AND (body IS NOT NULL OR html IS NOT NULL OR context IS NOT NULL)
+        """)
+        cursor.close()
+        local_conn.commit()
+        _ready = True
+    except Exception as exc:
+        print(f"[email] Outbox table unavailable, sending inline: {exc}")
+        _ready = False
+    finally:
+        if conn is None:
+            local_conn.close()
+
+    return _ready
+
+
+def init_email_outbox(app):
+    """Create the outbox table and start the worker pool (called once at startup)."""
+    global _app
+    _app = app
+    precompile_email_templates()
+    if ensure_email_outbox() and MODE != "sync":
+        start_workers()
+
+
+def _default_dedupe_key(subject, recipients, body, html):
+    # With dedupe=True the same email to the same people is sent at most once per day
+    digest = hashlib.sha256()
+    for part in (subject, ",".join(sorted(recipients)), body or "", html or "", date.today().isoformat()):
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def _build_message(subject, recipients, body=None, html=None, sender=None,
+                   template_id=None, context=None):
+    if template_id:
+        subject, html, body = render_email(template_id, context)
+    elif html and not body:
+        # Every message goes out as multipart/alternative with a text part
+        body = html_to_text(html)
+    if isinstance(sender, list):
+        sender = tuple(sender)
+    return Message(subject=subject, recipients=recipients, body=body, html=html, sender=sender)
+
+
+def _send_inline(subject, recipients, body=None, html=None, sender=None, template_id=None, context=None):
+    mail.send(_build_message(subject, recipients, body, html, sender, template_id, context))
+    _bump("sent_inline")
+
+
+def _enqueue(subject, recipients, body, html, sender, template_id, context, dedupe_key, dedupe):
+    recipients = [r for r in (recipients or []) if r]
+    if not recipients:
+        print(f"[email] No recipient for: {subject}")
+        return False
+
+    if MODE == "sync" or not _ready:
+        _send_inline(subject, recipients, body, html, sender, template_id, context)
+        return True
+
+    context_json = json.dumps(context, sort_keys=True, default=str) if template_id else None
+    if dedupe_key is None and dedupe:
+        dedupe_key = _default_dedupe_key(subject, recipients, body or context_json, html or template_id)
+    elif dedupe_key is not None:
+        dedupe_key = hashlib.sha256(str(dedupe_key).encode("utf-8")).hexdigest()
+
+    conn = create_connection()
+    if not conn:
+        _send_inline(subject, recipients, body, html, sender, template_id, context)
+        return True
+
+    try:
+        cursor = conn.cursor()
+        cursor.execute("""
+            INSERT IGNORE INTO email_outbox
+                (dedupe_key, subject, recipients, sender, body, html, template_id, context)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+        """, (dedupe_key, subject, json.dumps(recipients),
+              json.dumps(sender) if sender else None, body, html, template_id, context_json))
+        inserted = cursor.rowcount == 1
+        cursor.close()
+        conn.commit()
+    finally:
+        conn.close()
+
+    _bump("queued" if inserted else "deduplicated")
+    _wake.set()
+    return True
+
+
+def queue_email(subject, recipients, body=None, html=None, sender=None, dedupe_key=None, dedupe=False):
+    """
+    Add an email to the outbox and return immediately.
+    An explicit dedupe_key is sent at most once; dedupe=True derives one so
+    that identical emails (same recipients/subject/content) go out at most
+    once per day. By default every call is sent.
+    Falls back to sending inline if the outbox is unavailable.
+    Returns True when queued or sent.
+    """
+    return _enqueue(subject, recipients, body, html, sender, None, None, dedupe_key, dedupe)
+
+
+def queue_template(template_id, recipients, context=None, sender=None, dedupe_key=None, dedupe=False):
+    """
+    Queue a registered email template (see email_templates.EMAIL_TEMPLATES).
+    Only the template id and the JSON-serializable context are stored; the
+    body is rendered by the worker when the email is sent, after which the
+    context is cleared.
+    """
+    context = context or {}
+    # Renders just the subject, and fails fast on an unknown template id
+    subject = render_subject(template_id, context)
+    return _enqueue(subject, recipients, None, None, sender, template_id, context, dedupe_key, dedupe)
+
+
+def queue_template_batch(template_id, items, conn=None):
+    """
+    Queue one template for many recipients with a single multi-row insert.
+    `items` are (recipient, context, dedupe_key) tuples; a None dedupe_key
+    is not deduplicated. When `conn` is given the rows are
+    written on it and the caller commits, so they land in the caller's
+    transaction. Returns the number of new outbox rows.
+    """
+    items = [(recipient, context or {}, key) for recipient, context, key in items if recipient]
+    if not items:
+        return 0
+
+    if MODE == "sync" or not _ready:
+        for recipient, context, _ in items:
+            _send_inline(render_subject(template_id, context), [recipient],
+                         template_id=template_id, context=context)
+        return len(items)
+
+    rows = []
+    for recipient, context, dedupe_key in items:
+        subject = render_subject(template_id, context)
+        context_json = json.dumps(context, sort_keys=True, default=str)
+        if dedupe_key is not None:
+            dedupe_key = hashlib.sha256(str(dedupe_key).encode("utf-8")).hexdigest()
+        rows.append((dedupe_key, subject, json.dumps([recipient]), template_id, context_json))
+
+    local_conn = conn or create_connection()
+    if not local_conn:
+        for recipient, context, _ in items:
+            _send_inline(render_subject(template_id, context), [recipient],
+                         template_id=template_id, context=context)
+        return len(items)
+
+    try:
+        cursor = local_conn.cursor()
+        cursor.executemany("""
+            INSERT IGNORE INTO email_outbox (dedupe_key, subject, recipients, template_id, context)
+            VALUES (%s, %s, %s, %s, %s)
+        """, rows)
+        inserted = max(cursor.rowcount, 0)
+        cursor.close()
+        if conn is None:
+            local_conn.commit()
+    finally:
+        if conn is None:
+            local_conn.close()
+
+    _bump("queued", inserted)
+    _bump("deduplicated", len(rows) - inserted)
+    _wake.set()
+    return inserted
+
+
+def queue_message(msg, dedupe_key=None, dedupe=False):
+    """Drop-in replacement for mail.send(msg) that goes through the outbox."""
+    sender = msg.sender
+    if isinstance(sender, tuple):
+        sender = list(sender)
+    return queue_email(
+        subject=msg.subject,
+        recipients=list(msg.recipients or []),
+        body=msg.body,
+        html=msg.html,
+        sender=sender,
+        dedupe_key=dedupe_key,
+        dedupe=dedupe,
+    )
+
+
+# ----- worker pool -----
+
+def start_workers():
+    if _workers and any(w.is_alive() for w in _workers):
+        return
+    _stop.clear()
+    del _workers[:]
+    for i in range(max(1, WORKERS)):
+        worker = threading.Thread(target=_worker_loop, name=f"email-outbox-{i}", daemon=True)
+        worker.start()
+        _workers.append(worker)
+    print(f"[email] Outbox started with {len(_workers)} worker(s)")
+
+
+def stop_workers(timeout=5):
+    _stop.set()
+    _wake.set()
+    for worker in _workers:
+        worker.join(timeout)
+
+
+def _worker_loop():
+    while not _stop.is_set():
+        try:
+            with _app.app_context():
+                sent_any = _process_batch()
+        except Exception:
+            traceback.print_exc()
+            sent_any = False
+
+        if not sent_any:
+            _wake.wait(POLL_INTERVAL)
+            _wake.clear()
+
+
+def _claim_batch(conn, token):
+    cursor = conn.cursor(dictionary=True)
+    try:
+        cursor.execute("""
+            UPDATE email_outbox
+            SET status = 'sending', claimed_by = %s, claimed_at = NOW()
+            WHERE (status = 'pending' AND next_attempt_at <= NOW())
+               OR (status = 'sending' AND claimed_at < NOW() - INTERVAL %s SECOND)
+            ORDER BY email_id
+            LIMIT %s
+        """, (token, CLAIM_TIMEOUT_SECONDS, BATCH_SIZE))
+        conn.commit()
+        cursor.execute("""
+            SELECT email_id, subject, recipients, sender, body, html, template_id, context, attempts
+            FROM email_outbox WHERE claimed_by = %s AND status = 'sending'
+            ORDER BY email_id
+        """, (token,))
+        return cursor.fetchall()
+    finally:
+        cursor.close()
+
+
+def _mark_sent(conn, email_id):
+    run_query(conn, """
+        UPDATE email_outbox
+        SET status = 'sent', sent_at = NOW(), attempts = attempts + 1,
+            claimed_by = NULL, last_error = NULL, body = NULL, html = NULL, context = NULL
+        WHERE email_id = %s
+    """, (email_id,))
+
+
+def _mark_retry(conn, row, error):
+    attempts = row["attempts"] + 1
+    if attempts >= MAX_ATTEMPTS:
+        status, delay = "failed", 0
+        _bump("failed")
+    else:
+        status = "pending"
+        delay = min(BACKOFF_BASE_SECONDS * (2 ** (attempts - 1)), BACKOFF_MAX_SECONDS)
+        _bump("retried")
+
+    run_query(conn, """
+        UPDATE email_outbox
+        SET status = %s, attempts = %s, next_attempt_at = NOW() + INTERVAL %s SECOND,
+            claimed_by = NULL, last_error = %s,
+            body = IF(%s = 'failed', NULL, body), html = IF(%s = 'failed', NULL, html),
+            context = IF(%s = 'failed', NULL, context)
+        WHERE email_id = %s
+    """, (status, attempts, delay, str(error)[:2000], status, status, status, row["email_id"]))
+    with _stats_lock:
+        _stats["last_error"] = str(error)[:500]
+
+
+def _release(conn, rows, error):
+    """Hand unsent rows back after an SMTP outage without spending one of their attempts."""
+    if not rows:
+        return
+    placeholders = ", ".join(["%s"] * len(rows))
+    run_query(conn, f"""
+        UPDATE email_outbox
+        SET status = 'pending', next_attempt_at = NOW() + INTERVAL %s SECOND,
+            claimed_by = NULL, last_error = %s
+        WHERE email_id IN ({placeholders})
+    """, (BACKOFF_BASE_SECONDS, str(error)[:2000], *(row["email_id"] for row in rows)))
+    _bump("released", len(rows))
+    with _stats_lock:
+        _stats["last_error"] = str(error)[:500]
+
+
+def _process_batch():
+    """Claim and send one batch over a single SMTP session. Returns True if work was done."""
+    conn = create_connection()
+    if not conn:
+        return False
+
+    try:
+        rows = _claim_batch(conn, uuid.uuid4().hex)
+        if not rows:
+            return False
+
+        started = time.monotonic()
+        pending = list(rows)
+        try:
+            with mail.connect() as smtp:
+                _bump("smtp_sessions")
+                while pending:
+                    row = pending[0]
+                    try:
+                        msg = _build_message(
+                            row["subject"],
+                            json.loads(row["recipients"]),
+                            body=row["body"],
+                            html=row["html"],
+                            sender=json.loads(row["sender"]) if row["sender"] else None,
+                            template_id=row["template_id"],
+                            context=json.loads(row["context"]) if row["context"] else None,
+                        )
+                        smtp.send(msg)
+                    except _CONNECTION_ERRORS as exc:
+                        # The session dropped during this send: it counts as an attempt
+                        _mark_retry(conn, row, exc)
+                        pending.pop(0)
+                        raise
+                    except Exception as exc:
+                        # This message is bad (refused recipient, template error); keep the session
+                        _mark_retry(conn, row, exc)
+                        pending.pop(0)
+                        continue
+                    _mark_sent(conn, row["email_id"])
+                    _bump("sent")
+                    pending.pop(0)
+        except Exception as exc:
+            # Could not connect or the session dropped: the rest were never tried
+            print(f"[email] SMTP session failed, {len(pending)} email(s) released: {exc}")
+            _release(conn, pending, exc)
+
+        with _stats_lock:
+            _stats["batches"] += 1
+            _stats["batch_seconds_total"] += time.monotonic() - started
+        return True
+    finally:
+        conn.close()
+
+
+def get_outbox_stats():
+    with _stats_lock:
+        snapshot = dict(_stats)
+    snapshot.update({
+        "mode": MODE if _ready else "inline (outbox unavailable)",
+        "workers_alive": sum(1 for w in _workers if w.is_alive()),
+        "batch_seconds_avg": (snapshot["batch_seconds_total"] / snapshot["batches"]
+                              if snapshot["batches"] else 0.0),
+    })
+
+    conn = create_connection()
+    if conn:
+        try:
+            rows = run_query(conn, """
+                SELECT status, COUNT(*) AS total, MIN(created_at) AS oldest
+                FROM email_outbox GROUP BY status
+            """, fetch="all") or []
+            snapshot["by_status"] = {
+                r["status"]: {"total": int(r["total"]),
+                              "oldest": r["oldest"].isoformat() if r["oldest"] else None}
+                for r in rows
+            }
+        finally:
+            conn.close()
+    return snapshot
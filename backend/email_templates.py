@@ -0,0 +1,148 @@
+from collections import namedtuple
+from jinja2 import Environment, FileSystemLoader, select_autoescape
+import html as html_lib
+import os
+import re
+import threading
+
+# Registry of outgoing email templates.
+#
+# Each entry maps a template id to its subject (itself a small Jinja
+# template) and the HTML file under templates/emails/. A matching
+# <id>.txt is used as the plain-text part when present; otherwise the text
+# part is derived from the rendered HTML. Templates are compiled once per
+# process and reused, and HTML output is autoescaped, so values coming from
+# forms (names, rejection reasons, moderator notes) no longer end up as raw
+# markup in the email.
+
+TEMPLATE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                            "templates", "emails")
+
+EMAIL_TEMPLATES = {
+    # Applicants
+    "account_restored": "Account restored",
+    "recommendation_expiring": "Your Recommendation Letter Will Expire Soon",
+    "recommendation_expired": "Recommendation Letter Expired - Action Required",
+    "applicant_registered": "PESO SmartHire - {{ 'Registration Successful' if credentials else 'Registration Submitted' }}",
+    "applicant_approved": "PESO SmartHire - Application Approved",
+    "applicant_rejected": "PESO SmartHire - Application Status Update",
+    "applicant_reupload_requested": "PESO SmartHire - Document Reupload Required",
+    "reupload_approved": "PESO SmartHire - Full Access Granted",
+    "applicant_restricted": "Application Restrictions - PESO SmartHire",
+    "applicant_report_confirmed": "Report Confirmed - PESO SmartHire",
+    "applicant_report_rejected": "Report Rejected - PESO SmartHire",
+    # Job reports
+    "job_suspended_employer": "Job post suspended",
+    "job_application_cancelled": "Application cancelled",
+    "job_report_confirmed": "Report confirmed",
+    "job_report_rejected": "Report rejected",
+    # Employers
+    "employer_registration_received": "PESO SmartHire - Employer Registration Received",
+    "employer_document_expiring": "PESO SmartHire - Document Expiry Warning",
+    "employer_document_expired": "PESO SmartHire - Document Expired",
+    "employer_approved": "PESO SmartHire - {{ recruitment_label|title }} Recruitment Account Approved",
+    "employer_rejected": "PESO SmartHire - {{ recruitment_label|title }} Recruitment Account Status Update",
+    "employer_documents_reupload": "PESO SmartHire - {{ recruitment_label|title }} Recruitment Documents Update Required",
+    "employer_type_change_reupload": "PESO SmartHire - Reupload Required for {{ recruitment_type }} Recruitment",
+    "employer_type_change_approved": "PESO SmartHire - {{ recruitment_type }} Recruitment Approved",
+    "employer_type_change_rejected": "PESO SmartHire - Recruitment Type Change Rejected",
+    # Accounts
+    "password_reset_token": "Password Reset Token",
+}
+
+RenderedEmail = namedtuple("RenderedEmail", ["subject", "html", "text"])
+
+_env = Environment(
+    loader=FileSystemLoader(TEMPLATE_DIR),
+    autoescape=select_autoescape(["html"]),
+    auto_reload=False,
+    cache_size=-1,
+    trim_blocks=True,
+    lstrip_blocks=True,
+)
+
+# Plain-text templates must not HTML-escape their values
+_text_env = _env.overlay(autoescape=False)
+
+_compiled = {}
+_compile_lock = threading.Lock()
+
+
+class UnknownEmailTemplate(KeyError):
+    pass
+
+
+def _compile(template_id):
+    if template_id not in EMAIL_TEMPLATES:
+        raise UnknownEmailTemplate(template_id)
+
+    text_path = os.path.join(TEMPLATE_DIR, f"{template_id}.txt")
+    return (
+        _text_env.from_string(EMAIL_TEMPLATES[template_id]),
+        _env.get_template(f"{template_id}.html"),
+        _text_env.get_template(f"{template_id}.txt") if os.path.exists(text_path) else None,
+    )
+
+
+def get_template(template_id):
+    """(subject, html, text-or-None) compiled templates for an id, compiled on first use."""
+    compiled = _compiled.get(template_id)
+    if compiled is None:
+        with _compile_lock:
+            compiled = _compiled.get(template_id)
+            if compiled is None:
+                compiled = _compiled[template_id] = _compile(template_id)
+    return compiled
+
+
+def precompile_email_templates():
+    """Compile every registered template up front; returns the ids that failed."""
+    failed = []
+    for template_id in EMAIL_TEMPLATES:
+        try:
+            get_template(template_id)
+        except Exception as exc:
+            print(f"[email] Template '{template_id}' failed to compile: {exc}")
+            failed.append(template_id)
+    return failed
+
+
+_WHITESPACE = re.compile(r"\s+")
+_PARAGRAPH_END = re.compile(r"<\s*/(p|ul|ol|h\d|div|table)\s*>", re.IGNORECASE)
+_LINE_END = re.compile(r"<\s*(br\s*/?|/li|/tr)\s*>", re.IGNORECASE)
+_LIST_ITEM = re.compile(r"<\s*li[^>]*>", re.IGNORECASE)
+_TAG = re.compile(r"<[^>]+>")
+_BLANK_LINES = re.compile(r"\n{3,}")
+
+
+def html_to_text(markup):
+    """Cheap plain-text rendering of the simple markup used in our emails."""
+    text = _WHITESPACE.sub(" ", markup or "")
+    text = _PARAGRAPH_END.sub("\n\n", text)
+    text = _LINE_END.sub("\n", text)
+    text = _LIST_ITEM.sub("- ", text)
+    text = html_lib.unescape(_TAG.sub("", text))
+    lines = [line.strip() for line in text.split("\n")]
+    return _BLANK_LINES.sub("\n\n", "\n".join(lines)).strip() + "\n"
+
+
+def render_subject(template_id, context=None):
+    subject_template, _, _ = get_template(template_id)
+    return subject_template.render(context or {}).strip()
+
+
+def render_email(template_id, context=None):
+    """Render subject, HTML and plain-text parts for a registered template."""
+    context = context or {}
+    subject_template, html_template, text_template = get_template(template_id)
+    html = html_template.render(context)
+    text = text_template.render(context) if text_template else html_to_text(html)
+    return RenderedEmail(subject_template.render(context).strip(), html, text)
+
+
+def render_email_bytes(template_id, context=None, encoding="utf-8"):
+    """render_email() with the HTML and text parts encoded, ready for a MIME body."""
+    rendered = render_email(template_id, context)
+    return RenderedEmail(rendered.subject,
+                         rendered.html.encode(encoding),
+                         rendered.text.encode(encoding))
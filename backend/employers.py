@@ -2,11 +2,15 @@ from flask import Blueprint, render_template, request, redirect, url_for, sessio
 from datetime import datetime, timedelta, date
 from werkzeug.utils import secure_filename
 from werkzeug.security import generate_password_hash, check_password_hash
-from db_connection import create_connection, run_query
-from flask_mail import Message
-from extensions import mail
-from .notifications import create_notification
+from db_connection import create_connection, get_db, run_query
+from .email_outbox import queue_template
+from .expiry_engine import refresh_expiry_schedule, run_due_expiry_checks
+from .analytics_cache import invalidate_analytics
+from .notifications import create_notification, mark_notification_read
+from .notification_counters import counter_keys, get_unread_total, refresh_unread_counters
+from .notification_feed import get_notification_page, parse_page_size
 from .recaptcha import verify_recaptcha
+from .event_hub import publish
 from .recruitment_change_handler import handle_recruitment_type_change
 from dateutil.relativedelta import relativedelta
 from apscheduler.schedulers.background import BackgroundScheduler
@@ -58,15 +62,8 @@ doc_key_map = {
     "license_to_recruit_path": "dmw_recruit_authority",
 }
 
-DOCUMENT_NAMES = {
-    "business_permit_expiry": "Business Permit",
-    "philiobnet_registration_expiry": "PhilJobNet Registration",
-    "job_orders_expiry": "Job Orders",
-    "dole_no_pending_case_expiry": "DOLE No Pending Case",
-    "dole_authority_expiry": "DOLE Authority",
-    "dmw_no_pending_case_expiry": "DMW No Pending Case",
-    "license_to_recruit_expiry": "License to Recruit"
-}
+# Notification types shown in the employer feed and counted by its unread badge
+EMPLOYER_FEED_TYPES = ('job_application', 'report_verdict')
 
 
 def to_date(value):
@@ -91,175 +88,13 @@ def get_expiry_date(months_valid):
 
 
 def check_expired_employer_documents():
-    """Check for expired employer documents and send warning emails (daily reminders)."""
-    conn = create_connection()
-    if not conn:
-        print("[v0] ✗ DB connection failed in check_expired_employer_documents")
-        return
-
+    """Send expiry warnings and flag expired documents for employers whose schedule entry is due."""
     try:
-        reset_updates = [
-            "business_permit_warning_sent = 0 WHERE business_permit_expiry > NOW()",
-            "philiobnet_registration_warning_sent = 0 WHERE philiobnet_registration_expiry > NOW()",
-            "job_orders_warning_sent = 0 WHERE job_orders_expiry > NOW()",
-            "dole_no_pending_case_warning_sent = 0 WHERE dole_no_pending_case_expiry > NOW()",
-            "dole_authority_warning_sent = 0 WHERE dole_authority_expiry > NOW()",
-            "dmw_no_pending_case_warning_sent = 0 WHERE dmw_no_pending_case_expiry > NOW()",
-            "license_to_recruit_warning_sent = 0 WHERE license_to_recruit_expiry > NOW()"
-        ]
-
-        for update in reset_updates:
-            run_query(conn, f"UPDATE employers SET {update}")
-            conn.commit()
-
-        employers = run_query(
-            conn,
-            """
-            SELECT employer_id, employer_name, email, status, is_active,
-                   business_permit_expiry, philiobnet_registration_expiry,
-                   job_orders_expiry, dole_no_pending_case_expiry,
-                   dole_authority_expiry, dmw_no_pending_case_expiry,
-                   license_to_recruit_expiry,
-                   business_permit_warning_sent, philiobnet_registration_warning_sent,
-                   job_orders_warning_sent, dole_no_pending_case_warning_sent,
-                   dole_authority_warning_sent, dmw_no_pending_case_warning_sent,
-                   license_to_recruit_warning_sent,
-                   business_permit_warning_date, philiobnet_registration_warning_date,
-                   job_orders_warning_date, dole_no_pending_case_warning_date,
-                   dole_authority_warning_date, dmw_no_pending_case_warning_date,
-                   license_to_recruit_warning_date
-            FROM employers
-            WHERE is_active = 1
-            """,
-            fetch="all"
-        )
-
-        if not employers:
-            print("[v0] No active employers to check")
-            return
-
-        print(
-            f"[v0] Checking expired documents for {len(employers)} employers")
-
-        today = datetime.now().date()
-
-        for emp in employers:
-            # Define document fields with expiry, warning flag, and warning date
-            doc_fields = [
-                ("business_permit_expiry", "business_permit_warning_sent",
-                 "business_permit_warning_date"),
-                ("philiobnet_registration_expiry", "philiobnet_registration_warning_sent",
-                 "philiobnet_registration_warning_date"),
-                ("job_orders_expiry", "job_orders_warning_sent",
-                 "job_orders_warning_date"),
-                ("dole_no_pending_case_expiry", "dole_no_pending_case_warning_sent",
-                 "dole_no_pending_case_warning_date"),
-                ("dole_authority_expiry", "dole_authority_warning_sent",
-                 "dole_authority_warning_date"),
-                ("dmw_no_pending_case_expiry", "dmw_no_pending_case_warning_sent",
-                 "dmw_no_pending_case_warning_date"),
-                ("license_to_recruit_expiry", "license_to_recruit_warning_sent",
-                 "license_to_recruit_warning_date")
-            ]
-
-            for expiry_field, warning_field, warning_date_field in doc_fields:
-                expiry_date = emp.get(expiry_field)
-                warning_sent = emp.get(warning_field)
-                last_warning_date = emp.get(warning_date_field)
-
-                # Normalize warning_date to date object
-                if last_warning_date:
-                    last_warning_date = to_date(last_warning_date)
-
-                if not expiry_date:
-                    continue
-
-                print(
-                    f"[v0] Employer {emp['employer_id']}: Checking {expiry_field} (expires: {expiry_date}, warning_sent: {warning_sent}, last_warning_date: {last_warning_date})")
-
-                doc_friendly_name = DOCUMENT_NAMES.get(
-                    expiry_field, expiry_field)
-
-                # --- 1. Pre-expiry warning (7 days before, once per day) ---
-                if will_expire_in_7_days(expiry_date) and warning_sent != 1:
-                    # Only send once per day (like applicants.py)
-                    if last_warning_date != today:
-                        subject = "PESO SmartHire - Document Expiry Warning"
-                        body = f"""
-                        <p>Hi {emp['employer_name']},</p>
-                        <p>The following document will expire soon: <b>{doc_friendly_name}</b>.</p>
-                        <p>Please update it to avoid any disruption in your account status.</p>
-                        <p>Expiry Date: <b>{expiry_date.strftime('%Y-%m-%d')}</b></p>
-                        <p>Best regards,<br/>PESO SmartHire Team</p>
-                        """
-
-                        try:
-                            from extensions import mail
-                            msg = Message(
-                                subject=subject,
-                                recipients=[emp["email"]],
-                                html=body
-                            )
-                            mail.send(msg)
-
-                            # Mark warning as sent and record today's date
-                            run_query(
-                                conn,
-                                f"UPDATE employers SET {warning_field} = 1, {warning_date_field} = %s WHERE employer_id=%s",
-                                (today, emp["employer_id"],)
-                            )
-                            conn.commit()
-                            print(
-                                f"[v0] ✓ Pre-expiry warning sent to {emp['email']} for {expiry_field}")
-                        except Exception as e:
-                            print(
-                                f"[v0] ✗ Failed to send pre-expiry warning to {emp['email']}: {e}")
-                            import traceback
-                            traceback.print_exc()
-
-                # --- 2. Expired documents (send on expiry date) ---
-                if is_document_expired(expiry_date):
-                    if emp.get("status") != "Reupload":
-                        run_query(
-                            conn,
-                            "UPDATE employers SET status=%s, is_active=%s WHERE employer_id=%s",
-                            ("Reupload", 0, emp["employer_id"])
-                        )
-                        conn.commit()
-
-                        doc_friendly_name = DOCUMENT_NAMES.get(
-                            expiry_field, expiry_field)
-
-                        subject = "PESO SmartHire - Document Expired"
-                        body = f"""
-                        <p>Hi {emp['employer_name']},</p>
-                        <p>Your document <b>{doc_friendly_name}</b> has expired. Please re-upload it immediately to maintain your account's active status.</p>
-                        <p>You can still enter your account to re-upload the necessary documents.</p>
-                        <p>Best regards,<br/>PESO SmartHire Team</p>
-                        """
-
-                        try:
-                            from extensions import mail
-                            msg = Message(
-                                subject=subject,
-                                recipients=[emp["email"]],
-                                html=body
-                            )
-                            mail.send(msg)
-                            print(
-                                f"[v0] ✓ Expired email sent to {emp['email']} for {expiry_field}")
-                        except Exception as e:
-                            print(
-                                f"[v0] ✗ Failed to send expired email to {emp['email']}: {e}")
-                            import traceback
-                            traceback.print_exc()
-
+        run_due_expiry_checks("employer")
     except Exception as e:
         print(f"[v0] ✗ Error checking expired employer documents: {e}")
         import traceback
         traceback.print_exc()
-    finally:
-        conn.close()
 
 
 def is_document_expired(expiry_date):
@@ -497,26 +332,14 @@ def register_employer(form_data, files):
             fetch="one"
         )
         employer_id = employer_id_row["id"] if employer_id_row else None
+        if employer_id:
+            refresh_expiry_schedule(conn, "employer", employer_id)
+        invalidate_analytics("employers")
 
         # === Send confirmation email ===
         try:
-            msg = Message(
-                subject="PESO SmartHire - Employer Registration Received",
-                sender="your_email@example.com",
-                recipients=[employer_data["email"]],
-            )
-            msg.body = f"""
-            Hello {employer_data["employer_name"]},
-
-            Thank you for registering with PESO SmartHire.
-            Your account is currently pending admin approval.
-
-            We will notify you once it has been reviewed.
-
-            Regards,  
-            PESO SmartHire Team
-            """
-            mail.send(msg)
+            queue_template("employer_registration_received", [employer_data["email"]],
+                           {"name": employer_data["employer_name"]})
             print("[v0] Confirmation email sent successfully")
         except Exception as e:
             print(f"[v0] Failed to send confirmation email: {e}")
@@ -1195,6 +1018,8 @@ def account_security():
             conn.commit()
             print(
                 f"[account_security] ✓ Non-recruitment UPDATE committed (files saved)")
+            refresh_expiry_schedule(conn, "employer", employer_id)
+            invalidate_analytics("employers")
 
             # -----------
             # STEP B: If recruitment type changed, validate then call single handler that will
@@ -1218,6 +1043,8 @@ def account_security():
 
                 if result["success"]:
                     # handler already committed (it calls conn.commit()). We still have to close session and redirect
+                    refresh_expiry_schedule(conn, "employer", employer_id)
+                    invalidate_analytics("employers")
                     print(
                         f"[account_security] ✓ Recruitment type change handled successfully")
                     conn.close()
@@ -1478,6 +1305,8 @@ def submit_reupload():
             return redirect(url_for("employers.account_security"))
 
         conn.commit()
+        refresh_expiry_schedule(conn, "employer", employer_id)
+        invalidate_analytics("employers")
         print(
             f"[submit_reupload] Database committed successfully for employer {employer_id}")
 
@@ -1502,6 +1331,7 @@ def submit_reupload():
             UPDATE notifications
             SET title=%s, message=%s, is_read=0, updated_at=NOW()
             WHERE employer_id=%s AND notification_type='employer_approval'
+            ORDER BY notification_id DESC LIMIT 1
             """,
             (
                 "Employer Documents Reuploaded",
@@ -1509,6 +1339,7 @@ def submit_reupload():
                 employer_id
             )
         )
+        refresh_unread_counters(conn, counter_keys("employer_approval", employer_id=employer_id))
         conn.commit()
 
         flash("Documents reuploaded successfully! Please wait for admin review.", "success")
@@ -1606,6 +1437,7 @@ def deactivate_employer_account():
         """, (employer_id,))
 
         conn.commit()
+        invalidate_analytics("employers")
         session.clear()
 
         return jsonify({
@@ -1651,6 +1483,7 @@ def reactivate_employer_account():
             "DELETE FROM deactivated_users WHERE id = %s", (user["id"],))
 
         conn.commit()
+        invalidate_analytics("employers")
 
         return jsonify({"success": True, "message": "Your account has been successfully reactivated."})
 
@@ -1747,6 +1580,7 @@ def create_job():
         ))
 
         conn.commit()
+        invalidate_analytics("jobs")
         flash("Job posted successfully!", "success")
 
     except Exception as e:
@@ -1799,6 +1633,7 @@ def update_job_status(job_id, new_status):
         cursor.execute(
             "UPDATE jobs SET status = %s WHERE job_id = %s", (new_status, job_id))
         conn.commit()
+        invalidate_analytics("jobs")
         return jsonify({"success": True, "message": f"Job status updated to {new_status}."})
     except Exception as e:
         print("Error updating job status:", e)
@@ -1818,6 +1653,7 @@ def auto_deactivate_jobs():
         WHERE job_expiration_date < NOW() AND status = 'active'
     """)
     conn.commit()
+    invalidate_analytics("jobs")
     conn.close()
     return "Auto deactivation complete."
 
@@ -1998,6 +1834,8 @@ def update_job(job_id):
         ))
         conn.commit()
         cursor.close()
+        # Applications are charted by their job's work schedule
+        invalidate_analytics("jobs", "applications")
 
         return jsonify({"success": True, "message": "Job updated successfully."})
 
@@ -2030,6 +1868,7 @@ def archive_job(job_id):
         run_query(
             conn, "UPDATE jobs SET status=%s WHERE job_id=%s", (new_status, job_id))
         conn.commit()
+        invalidate_analytics("jobs")
 
         action = "unarchived" if new_status == 'active' else "archived"
         flash(f"Job post successfully {action}!", "success")
@@ -2081,6 +1920,7 @@ def delete_job(job_id):
         # FOURTH: Only if not suspended, proceed with deletion
         cursor.execute("DELETE FROM jobs WHERE job_id = %s", (job_id,))
         conn.commit()
+        invalidate_analytics("jobs", "applications")
 
         return jsonify({"success": True, "message": "Job post deleted successfully."})
 
@@ -2110,37 +1950,44 @@ def get_notifications():
         # report_verdict covers both:
         # 1. When the employer reported someone (Confirmation/Rejection)
         # 2. When the employer was reported and action was taken (Notice of being reported)
-        query = """SELECT notification_id, notification_type, title, message, is_read, created_at, related_ids
-                   FROM notifications 
-                   WHERE employer_id = %s 
-                   AND notification_type IN ('job_application', 'report_verdict')"""
-
-        params = [employer_id]
+        include_types = EMPLOYER_FEED_TYPES
+        is_read = None
 
         # Optional: Filter specific tabs if you want to separate them in UI later
         if filter_type == 'job_application':
-            query += " AND notification_type = 'job_application'"
+            include_types = ('job_application',)
         elif filter_type == 'reports':
-            query += " AND notification_type = 'report_verdict'"
+            include_types = ('report_verdict',)
 
         if filter_type == 'unread':
-            query += " AND is_read = 0"
-
-        query += " ORDER BY is_read ASC, created_at DESC LIMIT 50"
-
-        notifications = run_query(conn, query, tuple(params), fetch="all")
+            is_read = False
 
-        unread_count = run_query(
+        # Keyset pagination: ?cursor=<next_cursor> returns the following page
+        notifications, next_cursor = get_notification_page(
             conn,
-            """SELECT COUNT(*) as count 
-               FROM notifications 
-               WHERE employer_id = %s 
-               AND is_read = 0
-               AND notification_type IN ('job_application', 'report_verdict')""",
-            (employer_id,),
-            fetch="one"
+            cursor=request.args.get('cursor'),
+            limit=parse_page_size(request.args.get('limit')),
+            is_read=is_read,
+            include_types=include_types,
+            employer_id=employer_id,
         )
 
+        unread_total = get_unread_total(conn, "employer", employer_id,
+                                        include_types=EMPLOYER_FEED_TYPES)
+        if unread_total is None:
+            unread_count = run_query(
+                conn,
+                """SELECT COUNT(*) as count 
+                   FROM notifications 
+                   WHERE employer_id = %s 
+                   AND is_read = 0
+                   AND notification_type IN ('job_application', 'report_verdict')""",
+                (employer_id,),
+                fetch="one"
+            )
+        else:
+            unread_count = {"count": unread_total}
+
         normalized = []
         for notif in notifications or []:
             # ... (keep existing related_ids parsing logic) ...
@@ -2185,7 +2032,8 @@ def get_notifications():
         return jsonify({
             "success": True,
             "notifications": normalized,
-            "unread_count": unread_count["count"] if unread_count else 0
+            "unread_count": unread_count["count"] if unread_count else 0,
+            "next_cursor": next_cursor
         })
 
     except Exception as e:
@@ -2206,16 +2054,20 @@ def get_unread_notif_count():
         return jsonify({'success': False, 'count': 0})
 
     try:
-        # [FIX] Reverted to only count relevant types
-        query = """
-        SELECT COUNT(*) as count 
-        FROM notifications 
-        WHERE employer_id = %s 
-          AND is_read = 0 
-          AND notification_type IN ('job_application', 'report_verdict')
-        """
-        result = run_query(conn, query, (employer_id,), fetch="one")
-        count = result['count'] if result else 0
+        # Maintained counter (primary-key lookup); COUNT(*) only as a fallback
+        count = get_unread_total(conn, "employer", employer_id,
+                                 include_types=EMPLOYER_FEED_TYPES)
+        if count is None:
+            # [FIX] Reverted to only count relevant types
+            query = """
+            SELECT COUNT(*) as count 
+            FROM notifications 
+            WHERE employer_id = %s 
+              AND is_read = 0 
+              AND notification_type IN ('job_application', 'report_verdict')
+            """
+            result = run_query(conn, query, (employer_id,), fetch="one")
+            count = result['count'] if result else 0
 
         return jsonify({'success': True, 'count': count})
     except Exception as e:
@@ -2232,20 +2084,13 @@ def mark_notification_read_by_id(notification_id):
         return jsonify({"success": False}), 401
 
     employer_id = session['employer_id']
-    conn = create_connection()
-    if not conn:
-        return jsonify({"success": False}), 500
 
     try:
-        run_query(conn, "UPDATE notifications SET is_read = 1 WHERE notification_id = %s AND employer_id = %s",
-                  (notification_id, employer_id))
-        conn.commit()
+        mark_notification_read(notification_id, employer_id=employer_id)
         return jsonify({"success": True})
     except Exception as e:
         print(f"[v0] Error marking notification read: {e}")
         return jsonify({"success": False}), 500
-    finally:
-        conn.close()
 
 
 # Route to show applicants for a specific job (employer-facing)
@@ -2465,7 +2310,8 @@ def update_application_status(application_id):
     if not new_status or new_status not in allowed_statuses:
         return jsonify({'success': False, 'message': 'Invalid status'}), 400
 
-    conn = create_connection()
+    # Request-scoped so create_notification reuses this connection
+    conn = get_db()
     try:
         # Verify ownership and get details
         app_row = run_query(
@@ -2534,8 +2380,8 @@ def update_application_status(application_id):
                 notif_msg = f"You have been invited for an interview for {app_row.get('job_position')}."
 
             # Create Notification
-            from .notifications import create_notification
-            create_notification(
+            from .notification_dispatcher import enqueue_notification
+            enqueue_notification(
                 notification_type='job_application',
                 title=notif_title,
                 message=notif_msg,
@@ -2565,8 +2411,8 @@ def update_application_status(application_id):
                 notif_title = "You've Been Shortlisted"
                 notif_msg = f"Great news! You have been shortlisted for {app_row.get('job_position')}."
 
-            from .notifications import create_notification
-            create_notification(
+            from .notification_dispatcher import enqueue_notification
+            enqueue_notification(
                 notification_type='job_application',
                 title=notif_title,
                 message=notif_msg,
@@ -2575,6 +2421,14 @@ def update_application_status(application_id):
             )
 
         conn.commit()
+        invalidate_analytics("applications")
+
+        # Live-refresh the applicant's tabs and the employer's applicant list
+        event_data = {"application_id": application_id,
+                      "job_id": app_row.get('job_id'), "status": new_status}
+        publish(f"applicant:{app_row.get('applicant_id')}", "application", event_data)
+        publish(f"employer:{employer_id}", "application", event_data)
+
         return jsonify({'success': True, 'message': 'Status updated successfully', 'new_status': new_status})
 
     except Exception as e:
@@ -2668,6 +2522,7 @@ def cancel_interview_schedule(application_id):
         """, (application_id, employer_id))
 
         conn.commit()
+        invalidate_analytics("applications")
 
         # 5. Notify Applicant
         from .notifications import create_notification
@@ -0,0 +1,97 @@
+import threading
+import time
+from collections import deque
+
+
+class EventHub:
+    """
+    In-process pub/sub used by the live update stream.
+
+    Every published event gets a monotonically increasing version and is kept
+    in a bounded ring buffer. Subscribers block in wait() with the last
+    version they saw (their cursor) and wake as soon as an event for one of
+    their channels is published, so an idle client costs a sleeping thread
+    and no database work.
+
+    Channels: "admin", "applicant:<id>", "employer:<id>".
+    Only covers the current process; each worker process has its own hub.
+    """
+
+    def __init__(self, history=2000):
+        self._cond = threading.Condition()
+        self._events = deque(maxlen=history)  # (version, channel, event, data)
+        self._version = 0
+        self._waiting = 0
+        self._published = 0
+
+    @property
+    def version(self):
+        return self._version
+
+    def publish(self, channel, event, data=None):
+        with self._cond:
+            self._version += 1
+            self._events.append((self._version, channel, event, data or {}))
+            self._published += 1
+            self._cond.notify_all()
+            return self._version
+
+    def wait(self, channels, after, timeout=15):
+        """
+        Block until events newer than `after` exist on any of `channels`.
+        Returns (events, cursor). events is a list of (version, event, data);
+        a lone "resync" event means the cursor fell out of the buffer, or is
+        ahead of this hub (a Last-Event-ID from before a restart or from
+        another worker), and the client should refetch its state.
+        """
+        channels = set(channels)
+        deadline = time.monotonic() + timeout
+
+        with self._cond:
+            self._waiting += 1
+            try:
+                while True:
+                    oldest = self._events[0][0] if self._events else self._version + 1
+                    if after and (after < oldest - 1 or after > self._version):
+                        return [(self._version, "resync", {})], self._version
+
+                    matched = []
+                    for version, channel, event, data in reversed(self._events):
+                        if version <= after:
+                            break
+                        if channel in channels:
+                            matched.append((version, event, data))
+                    if matched:
+                        matched.reverse()
+                        return matched, self._version
+
+                    # Nothing for us up to here; skip these on the next scan
+                    after = max(after, self._version)
+
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        return [], after
+                    self._cond.wait(remaining)
+            finally:
+                self._waiting -= 1
+
+    def stats(self):
+        with self._cond:
+            return {
+                "version": self._version,
+                "buffered": len(self._events),
+                "published": self._published,
+                "waiting_clients": self._waiting,
+            }
+
+
+hub = EventHub()
+
+
+def publish(channel, event, data=None):
+    """Publish to the process-wide hub; never let a push failure break a write path."""
+    try:
+        return hub.publish(channel, event, data)
+    except Exception as exc:
+        print(f"[events] publish failed: {exc}")
+        return None
@@ -0,0 +1,89 @@
+from flask import Blueprint, Response, request, jsonify, session, stream_with_context
+import json
+import os
+import time
+
+from .event_hub import hub
+
+events_bp = Blueprint("events", __name__)
+
+# Seconds between keep-alive comments, and max lifetime of one SSE response
+# (EventSource reconnects transparently with Last-Event-ID afterwards).
+HEARTBEAT_SECONDS = 15
+STREAM_LIFETIME_SECONDS = int(os.getenv("EVENTS_STREAM_LIFETIME", 300))
+LONG_POLL_MAX_SECONDS = 25
+
+
+def _session_channels():
+    """Channels the logged-in user may listen to."""
+    channels = []
+    if 'admin_id' in session:
+        channels.append("admin")
+    if 'applicant_id' in session:
+        channels.append(f"applicant:{session['applicant_id']}")
+    if 'employer_id' in session:
+        channels.append(f"employer:{session['employer_id']}")
+    return channels
+
+
+def _parse_cursor(value):
+    try:
+        return max(0, int(value))
+    except (TypeError, ValueError):
+        return None
+
+
+@events_bp.route("/api/events/stream")
+def event_stream():
+    """Server-Sent Events feed for notifications, chat and application updates."""
+    channels = _session_channels()
+    if not channels:
+        return jsonify({"error": "Unauthorized"}), 401
+
+    cursor = _parse_cursor(request.headers.get("Last-Event-ID"))
+    if cursor is None:
+        cursor = _parse_cursor(request.args.get("cursor"))
+    if cursor is None:
+        cursor = hub.version
+
+    def generate(cursor):
+        # No DB work in here: an open stream only costs a sleeping thread
+        yield f"retry: 5000\nid: {cursor}\nevent: ready\ndata: {{}}\n\n"
+        stream_end = time.monotonic() + STREAM_LIFETIME_SECONDS
+
+        while time.monotonic() < stream_end:
+            events, cursor = hub.wait(channels, cursor, timeout=HEARTBEAT_SECONDS)
+            if not events:
+                yield ": keep-alive\n\n"
+                continue
+            for version, event, data in events:
+                yield f"id: {version}\nevent: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+    response = Response(stream_with_context(generate(cursor)),
+                        mimetype="text/event-stream")
+    response.headers["Cache-Control"] = "no-cache"
+    response.headers["X-Accel-Buffering"] = "no"  # don't let nginx buffer the stream
+    return response
+
+
+@events_bp.route("/api/events/poll")
+def event_long_poll():
+    """Long-poll fallback: GET ?cursor=<n> blocks until something newer exists."""
+    channels = _session_channels()
+    if not channels:
+        return jsonify({"error": "Unauthorized"}), 401
+
+    cursor = _parse_cursor(request.args.get("cursor"))
+    if cursor is None:
+        # First call just hands out the current cursor
+        return jsonify({"success": True, "cursor": hub.version, "events": []})
+
+    timeout = min(_parse_cursor(request.args.get("timeout")) or LONG_POLL_MAX_SECONDS,
+                  LONG_POLL_MAX_SECONDS)
+    events, cursor = hub.wait(channels, cursor, timeout=timeout)
+
+    return jsonify({
+        "success": True,
+        "cursor": cursor,
+        "events": [{"id": v, "event": e, "data": d} for v, e, d in events],
+    })
@@ -3,10 +3,9 @@ import random
 import string
 from datetime import datetime, timedelta
 from flask import Blueprint, render_template, request, redirect, url_for, flash
-from flask_mail import Message
 from werkzeug.security import generate_password_hash
 from db_connection import create_connection, run_query
-from extensions import mail  # your Flask-Mail instance
+from backend.email_outbox import queue_template
 from backend.send_sms import send_sms
 
 forgot_password_bp = Blueprint("forgot_password", __name__)
@@ -88,14 +87,9 @@ def forgot_password_request():
         conn.close()
 
         # Send email
-        msg = Message(
-            "Password Reset Token",
-            recipients=[email],
-            body=f"Good Day Ka-PESO!\n\nWe received a request to reset your account password.\nHere is your password reset token:\n\n{token}\n\nThis token expires in 15 minutes.\nIf you did not request this, please disregard it.\n\nThank you,\nThe PESO team"
-        )
-
         try:
-            mail.send(msg)
+            queue_template("password_reset_token", [email],
+                           {"token": token, "expires_minutes": 15})
             flash("Verification token sent to your email.", "success")
         except Exception as e:
             flash(f"Failed to send email: {e}", "danger")
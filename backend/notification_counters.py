@@ -0,0 +1,179 @@
+from db_connection import get_db, run_query
+
+# Maintained unread counters, one row per (recipient_kind, recipient_id, bucket)
+# where bucket is the notification_type. Every notification row feeds:
+#   ('all', 0, type)                  - global totals (admin badge)
+#   ('applicant', applicant_id, type) - when addressed to an applicant
+#   ('employer', employer_id, type)   - when addressed to an employer
+# so each unread-count poll is a primary-key range read instead of a COUNT(*).
+COUNTERS_TABLE_SQL = """
+    CREATE TABLE IF NOT EXISTS notification_unread_counters (
+        recipient_kind ENUM('all', 'applicant', 'employer') NOT NULL,
+        recipient_id INT NOT NULL,
+        bucket VARCHAR(64) NOT NULL,
+        unread_count INT NOT NULL DEFAULT 0,
+        updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+            ON UPDATE CURRENT_TIMESTAMP,
+        PRIMARY KEY (recipient_kind, recipient_id, bucket)
+    )
+"""
+
+# Source query per recipient kind, used by refresh and reconciliation
+_RECOUNT_SOURCES = {
+    "all": ("0", "1 = 1"),
+    "applicant": ("applicant_id", "applicant_id IS NOT NULL"),
+    "employer": ("employer_id", "employer_id IS NOT NULL"),
+}
+
+_counters_ready = False
+
+
+def ensure_unread_counters(conn=None):
+    """Create the counters table and seed it from notifications (startup)."""
+    global _counters_ready
+
+    local_conn = conn or get_db()
+    if not local_conn:
+        return False
+
+    try:
+        cursor = local_conn.cursor()
+        cursor.execute(COUNTERS_TABLE_SQL)
+        cursor.close()
+        local_conn.commit()
+        _counters_ready = reconcile_unread_counters(local_conn) is not None
+    except Exception as exc:
+        print(f"[notifications] Unread counters unavailable: {exc}")
+        _counters_ready = False
+    finally:
+        if conn is None:
+            local_conn.close()
+
+    return _counters_ready
+
+
+def counter_keys(notification_type, applicant_id=None, employer_id=None):
+    """Counter rows a notification with this type/recipient contributes to."""
+    keys = [("all", 0, notification_type)]
+    if applicant_id:
+        keys.append(("applicant", int(applicant_id), notification_type))
+    if employer_id:
+        keys.append(("employer", int(employer_id), notification_type))
+    return keys
+
+
+def adjust_unread_counters(conn, keys, delta):
+    """Add delta to each counter (caller commits)."""
+    if not _counters_ready or not keys:
+        return
+
+    cursor = conn.cursor()
+    try:
+        for kind, rid, bucket in keys:
+            cursor.execute("""
+                INSERT INTO notification_unread_counters
+                    (recipient_kind, recipient_id, bucket, unread_count)
+                VALUES (%s, %s, %s, GREATEST(%s, 0))
+                ON DUPLICATE KEY UPDATE unread_count = GREATEST(unread_count + %s, 0)
+            """, (kind, rid, bucket, delta, delta))
+    finally:
+        cursor.close()
+
+
+def refresh_unread_counters(conn, keys):
+    """
+    Recount the given counters from notifications (caller commits).
+    Used by write paths that can't tell how many rows flipped, e.g. batched
+    upserts and the "re-flag as unread" updates.
+    """
+    if not _counters_ready or not keys:
+        return
+
+    cursor = conn.cursor()
+    try:
+        for kind, rid, bucket in set(keys):
+            column, _ = _RECOUNT_SOURCES[kind]
+            query = """
+                INSERT INTO notification_unread_counters
+                    (recipient_kind, recipient_id, bucket, unread_count)
+                SELECT %s, %s, %s, COUNT(*)
+                FROM notifications
+                WHERE is_read = 0 AND notification_type = %s
+            """
+            params = [kind, rid, bucket, bucket]
+            if kind != "all":
+                query += f" AND {column} = %s"
+                params.append(rid)
+            query += " ON DUPLICATE KEY UPDATE unread_count = VALUES(unread_count)"
+            cursor.execute(query, tuple(params))
+    finally:
+        cursor.close()
+
+
+def reconcile_unread_counters(conn=None):
+    """
+    Rebuild every counter from notifications to repair drift.
+    Scheduled periodically; returns the number of counter rows written.
+    """
+    local_conn = conn or get_db()
+    if not local_conn:
+        return None
+
+    cursor = None
+    try:
+        cursor = local_conn.cursor()
+        cursor.execute("DELETE FROM notification_unread_counters")
+        written = 0
+        for kind, (column, where) in _RECOUNT_SOURCES.items():
+            group_by = "notification_type" if kind == "all" else f"{column}, notification_type"
+            cursor.execute(f"""
+                INSERT INTO notification_unread_counters
+                    (recipient_kind, recipient_id, bucket, unread_count)
+                SELECT '{kind}', {column}, notification_type, COUNT(*)
+                FROM notifications
+                WHERE is_read = 0 AND {where}
+                GROUP BY {group_by}
+            """)
+            written += cursor.rowcount
+        local_conn.commit()
+        return written
+    except Exception as exc:
+        print(f"[notifications] Counter reconciliation failed: {exc}")
+        try:
+            local_conn.rollback()
+        except Exception:
+            pass
+        return None
+    finally:
+        if cursor:
+            cursor.close()
+        if conn is None:
+            local_conn.close()
+
+
+def get_unread_total(conn, kind, recipient_id=0, include_types=None, exclude_types=None):
+    """
+    Sum the maintained counters for one recipient.
+    Returns None when counters are unavailable so callers can fall back to COUNT(*).
+    """
+    if not _counters_ready:
+        return None
+
+    query = """
+        SELECT COALESCE(SUM(unread_count), 0) AS count
+        FROM notification_unread_counters
+        WHERE recipient_kind = %s AND recipient_id = %s
+    """
+    params = [kind, recipient_id]
+
+    if include_types:
+        query += f" AND bucket IN ({', '.join(['%s'] * len(include_types))})"
+        params.extend(include_types)
+    if exclude_types:
+        query += f" AND bucket NOT IN ({', '.join(['%s'] * len(exclude_types))})"
+        params.extend(exclude_types)
+
+    result = run_query(conn, query, tuple(params), fetch="one")
+    if result is None:
+        return None
+    return int(result["count"] or 0)
@@ -0,0 +1,320 @@
+import atexit
+import os
+import queue
+import threading
+import time
+import traceback
+
+from db_connection import create_connection
+from . import notifications
+from .notification_counters import counter_keys, refresh_unread_counters
+from .notifications import (
+    NOTIFICATION_COLUMNS,
+    create_notification,
+    ensure_notification_coalesce_key,
+    ensure_notification_type_value,
+    publish_notification_event,
+    _prepare_notification_row,
+)
+
+# Same upsert as create_notification, but a coalesced row carries the number
+# of merged events in `count`, so a duplicate adds VALUES(count) instead of 1.
+UPSERT_NOTIFICATION_BATCH_SQL = f"""
+    INSERT INTO notifications ({", ".join(NOTIFICATION_COLUMNS)})
+    VALUES ({", ".join(["%s"] * len(NOTIFICATION_COLUMNS))})
+    ON DUPLICATE KEY UPDATE
+        count = count + VALUES(count),
+        message = VALUES(message),
+        title = VALUES(title),
+        updated_at = NOW()
+"""
+
+
+def _coalesce_key(row):
+    # (type, employer_id, applicant_id, recruitment_type) mirrors notifications.coalesce_key
+    return (row[0], row[8], row[7], row[5])
+
+
+class NotificationDispatcher:
+    """
+    Write-behind queue for create_notification.
+
+    Request handlers call enqueue() and return immediately; a daemon worker
+    drains the queue, merges identical (type, recipient) events that arrive
+    within `flush_interval` seconds and writes each batch with one
+    executemany upsert.
+
+    - max_queue bounds memory; when full, enqueue() blocks for up to
+      `enqueue_timeout` seconds (backpressure) and then writes synchronously.
+    - synchronous=True writes inline through create_notification (tests,
+      scripts, or NOTIFICATION_DISPATCH_MODE=sync).
+    - A batch write that fails is retried `max_retries` times with
+      exponential backoff, then written one row at a time; only rows that
+      still fail are lost.
+    """
+
+    def __init__(self, max_queue=10000, flush_interval=0.5, batch_size=200,
+                 enqueue_timeout=0.05, synchronous=False, max_retries=3, retry_delay=0.5):
+        self.max_queue = max_queue
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.enqueue_timeout = enqueue_timeout
+        self.synchronous = synchronous
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._worker = None
+        self._stop = threading.Event()
+        self._start_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._stats = {
+            "enqueued": 0,
+            "written_inline": 0,
+            "backpressure_fallbacks": 0,
+            "coalesced": 0,
+            "rows_flushed": 0,
+            "flushes": 0,
+            "flush_retries": 0,
+            "row_fallbacks": 0,
+            "rows_lost": 0,
+            "flush_errors": 0,
+            "flush_latency_total": 0.0,
+            "flush_latency_max": 0.0,
+            "last_error": None,
+        }
+
+    # ----- producer side -----
+
+    def enqueue(self, **kwargs):
+        """
+        Queue a notification (same keyword arguments as create_notification).
+        Returns True once the event is accepted or written.
+        """
+        if self.synchronous:
+            self._bump("written_inline")
+            ok, _ = create_notification(**kwargs)
+            return ok
+
+        self.start()
+        try:
+            self._queue.put(kwargs, timeout=self.enqueue_timeout)
+        except queue.Full:
+            # Worker is behind: never drop, degrade to an inline write instead
+            self._bump("backpressure_fallbacks")
+            ok, _ = create_notification(**kwargs)
+            return ok
+
+        self._bump("enqueued")
+        return True
+
+    # ----- worker side -----
+
+    def start(self):
+        if self._worker and self._worker.is_alive():
+            return
+        with self._start_lock:
+            if self._worker and self._worker.is_alive():
+                return
+            self._stop.clear()
+            self._worker = threading.Thread(
+                target=self._run, name="notification-dispatcher", daemon=True)
+            self._worker.start()
+
+    def stop(self, flush=True, timeout=5):
+        """Stop the worker, writing whatever is still queued when flush=True."""
+        self._stop.set()
+        if self._worker:
+            self._worker.join(timeout)
+        if flush:
+            self._flush(self._drain(self.max_queue))
+
+    def flush(self):
+        """Write everything queued so far on the calling thread."""
+        self._flush(self._drain(self.max_queue))
+
+    def _drain(self, limit):
+        items = []
+        while len(items) < limit:
+            try:
+                items.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return items
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                first = self._queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                continue
+
+            batch = [first]
+            window_end = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                remaining = window_end - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            self._flush(batch)
+
+    def _flush(self, batch):
+        if not batch:
+            return
+
+        started = time.monotonic()
+
+        # Coalesce identical (type, recipient) events; latest title/message wins
+        merged = {}
+        for kwargs in batch:
+            row = _prepare_notification_row(
+                kwargs.get("notification_type"),
+                kwargs.get("title"),
+                kwargs.get("message"),
+                kwargs.get("count", 1),
+                kwargs.get("related_ids"),
+                kwargs.get("recruitment_type"),
+                kwargs.get("residency_type"),
+                kwargs.get("applicant_id"),
+                kwargs.get("employer_id"),
+            )
+            key = _coalesce_key(row)
+            previous = merged.get(key)
+            if previous:
+                row = row[:3] + (previous[3] + row[3],) + row[4:]
+            merged[key] = row
+
+        rows = list(merged.values())
+
+        pending, last_error = rows, None
+        for attempt in range(self.max_retries + 1):
+            try:
+                pending = self._write_batch(pending)
+                if not pending:
+                    break
+                last_error = "Notification insert failed"
+            except Exception as exc:
+                traceback.print_exc()
+                last_error = exc
+            if attempt < self.max_retries:
+                self._bump("flush_retries")
+                time.sleep(self.retry_delay * 2 ** attempt)
+        else:
+            # The batch keeps failing: write row by row so a transient outage
+            # that has passed, or one bad row, does not take the rest with it
+            self._bump("row_fallbacks")
+            lost = sum(1 for row in pending if not self._write_row(row))
+            if lost:
+                self._record_error(str(last_error), lost)
+                return
+
+        elapsed = time.monotonic() - started
+        with self._stats_lock:
+            self._stats["flushes"] += 1
+            self._stats["rows_flushed"] += len(rows)
+            self._stats["coalesced"] += len(batch) - len(rows)
+            self._stats["flush_latency_total"] += elapsed
+            if elapsed > self._stats["flush_latency_max"]:
+                self._stats["flush_latency_max"] = elapsed
+
+    def _write_batch(self, rows):
+        """
+        Upsert `rows` in one transaction and return the rows still unwritten
+        (only row-by-row writes can leave some). Raises, with nothing
+        written, when the batch fails.
+        """
+        conn = create_connection()
+        if not conn:
+            raise RuntimeError("DB connection failed")
+
+        cur = None
+        try:
+            for ntype in {row[0] for row in rows}:
+                ensure_notification_type_value(ntype, conn)
+
+            if notifications._coalesce_key_ready is None:
+                ensure_notification_coalesce_key(conn)
+
+            if not notifications._coalesce_key_ready:
+                return [row for row in rows if not self._write_row(row)]
+
+            cur = conn.cursor()
+            cur.executemany(UPSERT_NOTIFICATION_BATCH_SQL, rows)
+            # executemany can't say which rows were new, so recount them
+            refresh_unread_counters(conn, [
+                key for row in rows
+                for key in counter_keys(row[0], applicant_id=row[7], employer_id=row[8])
+            ])
+            conn.commit()
+        except Exception:
+            try:
+                conn.rollback()
+            except Exception:
+                pass
+            raise
+        finally:
+            if cur:
+                cur.close()
+            conn.close()
+
+        for row in rows:
+            publish_notification_event(row)
+        return []
+
+    def _write_row(self, row):
+        ok, _ = create_notification(*row[:4], related_ids=row[4],
+                                    recruitment_type=row[5], residency_type=row[6],
+                                    applicant_id=row[7], employer_id=row[8])
+        return ok
+
+    # ----- metrics -----
+
+    def _bump(self, key):
+        with self._stats_lock:
+            self._stats[key] += 1
+
+    def _record_error(self, message, lost_rows):
+        print(f"[notifications] Dispatcher flush failed ({lost_rows} rows): {message}")
+        with self._stats_lock:
+            self._stats["flush_errors"] += 1
+            self._stats["rows_lost"] += lost_rows
+            self._stats["last_error"] = message
+
+    def stats(self):
+        with self._stats_lock:
+            snapshot = dict(self._stats)
+        flushes = snapshot["flushes"]
+        snapshot.update({
+            "mode": "sync" if self.synchronous else "async",
+            "queue_depth": self._queue.qsize(),
+            "max_queue": self.max_queue,
+            "worker_alive": bool(self._worker and self._worker.is_alive()),
+            "flush_latency_avg": (snapshot["flush_latency_total"] / flushes
+                                  if flushes else 0.0),
+        })
+        return snapshot
+
+
+dispatcher = NotificationDispatcher(
+    max_queue=int(os.getenv("NOTIFICATION_QUEUE_SIZE", 10000)),
+    flush_interval=float(os.getenv("NOTIFICATION_FLUSH_INTERVAL", 0.5)),
+    batch_size=int(os.getenv("NOTIFICATION_BATCH_SIZE", 200)),
+    synchronous=os.getenv("NOTIFICATION_DISPATCH_MODE", "async") == "sync",
+    max_retries=int(os.getenv("NOTIFICATION_FLUSH_RETRIES", 3)),
+)
+
+# Don't lose queued notifications on a clean shutdown
+atexit.register(dispatcher.stop)
+
+
+def enqueue_notification(**kwargs):
+    """Fire-and-forget create_notification for request handlers and scheduler jobs."""
+    return dispatcher.enqueue(**kwargs)
+
+
+def get_dispatcher_stats():
+    return dispatcher.stats()
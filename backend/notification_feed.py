@@ -0,0 +1,147 @@
+from db_connection import get_db, run_query
+import base64
+from datetime import datetime
+
+# Feed order is unread first, newest first: (is_read ASC, created_at DESC,
+# notification_id DESC). Each is_read value is walked as its own segment so
+# every page is one index range scan on
+# (recipient, is_read, created_at, notification_id), however deep the page.
+FEED_INDEXES = {
+    "idx_notifications_feed_all": "(is_read, created_at, notification_id)",
+    "idx_notifications_feed_applicant": "(applicant_id, is_read, created_at, notification_id)",
+    "idx_notifications_feed_employer": "(employer_id, is_read, created_at, notification_id)",
+}
+
+# Compact projection: only what the feed cards and redirect_url need
+FEED_COLUMNS = (
+    "notification_id, notification_type, title, message, count, related_ids, "
+    "recruitment_type, applicant_id, employer_id, is_read, created_at"
+)
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 100
+
+_CURSOR_TIME_FORMAT = "%Y-%m-%d %H:%M:%S.%f"
+
+
+def ensure_notification_feed_indexes(conn=None):
+    """Create the keyset pagination indexes if missing (startup migration)."""
+    local_conn = conn or get_db()
+    if not local_conn:
+        return False
+
+    cursor = None
+    try:
+        cursor = local_conn.cursor(dictionary=True, buffered=True)
+        cursor.execute("SHOW INDEX FROM notifications")
+        existing = {row["Key_name"] for row in cursor.fetchall()}
+
+        for name, columns in FEED_INDEXES.items():
+            if name not in existing:
+                print(f"[notifications] Creating index {name}")
+                cursor.execute(f"CREATE INDEX {name} ON notifications {columns}")
+
+        local_conn.commit()
+        return True
+    except Exception as exc:
+        print(f"[notifications] Feed index migration failed: {exc}")
+        return False
+    finally:
+        if cursor:
+            cursor.close()
+        if conn is None:
+            local_conn.close()
+
+
+def encode_feed_cursor(row):
+    """Opaque cursor pointing just past `row`."""
+    created_at = row["created_at"]
+    if isinstance(created_at, datetime):
+        created_at = created_at.strftime(_CURSOR_TIME_FORMAT)
+    raw = f"{int(bool(row['is_read']))}|{created_at}|{row['notification_id']}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_feed_cursor(value):
+    """Return (is_read, created_at, notification_id), or None for a missing/bad cursor."""
+    if not value:
+        return None
+    try:
+        padded = value + "=" * (-len(value) % 4)
+        is_read, created_at, notification_id = (
+            base64.urlsafe_b64decode(padded.encode()).decode().split("|"))
+        return (int(is_read),
+                datetime.strptime(created_at, _CURSOR_TIME_FORMAT),
+                int(notification_id))
+    except Exception:
+        return None
+
+
+def parse_page_size(value, default=DEFAULT_PAGE_SIZE):
+    try:
+        return max(1, min(int(value), MAX_PAGE_SIZE))
+    except (TypeError, ValueError):
+        return default
+
+
+def get_notification_page(
+        conn,
+        cursor=None,
+        limit=DEFAULT_PAGE_SIZE,
+        is_read=None,
+        include_types=None,
+        exclude_types=None,
+        applicant_id=None,
+        employer_id=None):
+    """
+    Fetch one page of the notification feed.
+    Returns (rows, next_cursor); next_cursor is None on the last page.
+    Rows are the FEED_COLUMNS projection as returned by MySQL.
+    """
+    where = []
+    params = []
+
+    if applicant_id:
+        where.append("applicant_id = %s")
+        params.append(applicant_id)
+    if employer_id:
+        where.append("employer_id = %s")
+        params.append(employer_id)
+    if include_types:
+        where.append(f"notification_type IN ({', '.join(['%s'] * len(include_types))})")
+        params.extend(include_types)
+    if exclude_types:
+        where.append(f"notification_type NOT IN ({', '.join(['%s'] * len(exclude_types))})")
+        params.extend(exclude_types)
+
+    segments = [0, 1] if is_read is None else [int(bool(is_read))]
+    position = decode_feed_cursor(cursor)
+    if position:
+        segments = [s for s in segments if s >= position[0]]
+
+    rows = []
+    wanted = limit + 1  # one extra row tells us whether another page exists
+    for segment in segments:
+        query = f"SELECT {FEED_COLUMNS} FROM notifications WHERE is_read = %s"
+        segment_params = [segment]
+        for clause in where:
+            query += f" AND {clause}"
+        segment_params.extend(params)
+
+        if position and position[0] == segment:
+            query += " AND (created_at < %s OR (created_at = %s AND notification_id < %s))"
+            segment_params.extend([position[1], position[1], position[2]])
+
+        query += " ORDER BY created_at DESC, notification_id DESC LIMIT %s"
+        segment_params.append(wanted - len(rows))
+
+        rows.extend(run_query(conn, query, tuple(segment_params), fetch="all") or [])
+        if len(rows) >= wanted:
+            break
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_feed_cursor(rows[-1])
+
+    return rows, next_cursor
@@ -0,0 +1,326 @@
+from db_connection import create_connection, get_db, run_query
+from datetime import datetime, timedelta
+import os
+import time
+import traceback
+
+from .notifications import NOTIFICATION_COLUMNS
+
+# Read notifications older than RETENTION_DAYS move to notifications_archive.
+# Read rows older than FOLD_DAYS that a newer row with the same
+# (type, recipient, recruitment_type) supersedes are archived as well.
+RETENTION_DAYS = int(os.getenv("NOTIFICATION_RETENTION_DAYS", 90))
+FOLD_DAYS = int(os.getenv("NOTIFICATION_FOLD_DAYS", 14))
+BATCH_SIZE = int(os.getenv("NOTIFICATION_RETENTION_BATCH", 500))
+MAX_BATCHES = int(os.getenv("NOTIFICATION_RETENTION_MAX_BATCHES", 200))
+# Pause between batches so row locks are released and writers get in
+BATCH_PAUSE_SECONDS = float(os.getenv("NOTIFICATION_RETENTION_PAUSE", 0.05))
+
+ARCHIVE_COLUMNS = ("notification_id",) + NOTIFICATION_COLUMNS + ("is_read", "created_at", "updated_at")
+
+ARCHIVE_TABLE_SQL = """
+    CREATE TABLE IF NOT EXISTS notifications_archive (
+        notification_id INT NOT NULL PRIMARY KEY,
+        notification_type VARCHAR(64) NOT NULL,
+        title VARCHAR(255),
+        message TEXT,
+        count INT NOT NULL DEFAULT 1,
+        related_ids TEXT,
+        recruitment_type VARCHAR(64),
+        residency_type VARCHAR(64),
+        applicant_id INT NULL,
+        employer_id INT NULL,
+        is_read TINYINT(1) NOT NULL DEFAULT 1,
+        created_at DATETIME NULL,
+        updated_at DATETIME NULL,
+        archived_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+        archive_reason ENUM('expired', 'superseded') NOT NULL,
+        INDEX idx_notifications_archive_applicant (applicant_id, created_at),
+        INDEX idx_notifications_archive_employer (employer_id, created_at)
+    )
+"""
+
+RUNS_TABLE_SQL = """
+    CREATE TABLE IF NOT EXISTS notification_retention_runs (
+        run_id INT AUTO_INCREMENT PRIMARY KEY,
+        started_at DATETIME NOT NULL,
+        finished_at DATETIME NULL,
+        archived_expired INT NOT NULL DEFAULT 0,
+        archived_superseded INT NOT NULL DEFAULT 0,
+        batches INT NOT NULL DEFAULT 0,
+        duration_ms INT NOT NULL DEFAULT 0,
+        rows_per_second DECIMAL(12, 2) NOT NULL DEFAULT 0,
+        completed TINYINT(1) NOT NULL DEFAULT 0,
+        error TEXT NULL
+    )
+"""
+
+# FROM ... WHERE fragments (alias n) selecting the rows each phase archives.
+# "superseded" joins the newest row per identity instead of probing
+# notifications for every candidate row; that GROUP BY reads the whole table,
+# so a compaction run evaluates it once into SUPERSEDED_TABLE (_BATCH_SOURCES).
+_CANDIDATES = {
+    "expired": """
+        FROM notifications n
+        WHERE n.is_read = 1 AND n.created_at < %s
+    """,
+    "superseded": """
+        FROM notifications n
+        JOIN (
+            SELECT notification_type, applicant_id, employer_id, recruitment_type,
+                   MAX(notification_id) AS keep_id
+            FROM notifications
+            GROUP BY notification_type, applicant_id, employer_id, recruitment_type
+        ) latest
+          ON latest.notification_type = n.notification_type
+         AND latest.applicant_id <=> n.applicant_id
+         AND latest.employer_id <=> n.employer_id
+         AND latest.recruitment_type <=> n.recruitment_type
+        WHERE n.is_read = 1 AND n.created_at < %s
+          AND n.notification_id < latest.keep_id
+    """,
+}
+
+SUPERSEDED_TABLE = "notification_superseded_ids"
+
+# What each batch reads: an index range per batch, keyset-walked by id
+_BATCH_SOURCES = {
+    "expired": _CANDIDATES["expired"],
+    "superseded": f"""
+        FROM {SUPERSEDED_TABLE} s
+        JOIN notifications n ON n.notification_id = s.notification_id
+        WHERE n.is_read = 1 AND n.created_at < %s
+    """,
+}
+
+
+def ensure_retention_tables(conn=None):
+    local_conn = conn or get_db()
+    if not local_conn:
+        return False
+
+    try:
+        cursor = local_conn.cursor()
+        cursor.execute(ARCHIVE_TABLE_SQL)
+        cursor.execute(RUNS_TABLE_SQL)
+        cursor.close()
+        local_conn.commit()
+        return True
+    except Exception as exc:
+        print(f"[notifications] Retention tables unavailable: {exc}")
+        return False
+    finally:
+        if conn is None:
+            local_conn.close()
+
+
+def _cutoffs(now=None):
+    now = now or datetime.now()
+    return {
+        "expired": now - timedelta(days=RETENTION_DAYS),
+        "superseded": now - timedelta(days=FOLD_DAYS),
+    }
+
+
+def retention_report(conn=None):
+    """Dry run: what the next compaction would archive, without touching anything."""
+    local_conn = conn or get_db()
+    if not local_conn:
+        return None
+
+    try:
+        cutoffs = _cutoffs()
+        report = {
+            "retention_days": RETENTION_DAYS,
+            "fold_days": FOLD_DAYS,
+            "batch_size": BATCH_SIZE,
+            "max_batches": MAX_BATCHES,
+        }
+
+        for reason, candidates in _CANDIDATES.items():
+            rows = run_query(local_conn, f"""
+                SELECT n.notification_type, COUNT(*) AS rows_, MIN(n.created_at) AS oldest
+                {candidates}
+                GROUP BY n.notification_type
+            """, (cutoffs[reason],), fetch="all") or []
+
+            report[reason] = {
+                "cutoff": cutoffs[reason].isoformat(),
+                "total": sum(int(r["rows_"]) for r in rows),
+                "by_type": {
+                    r["notification_type"]: {
+                        "rows": int(r["rows_"]),
+                        "oldest": r["oldest"].isoformat() if r["oldest"] else None,
+                    }
+                    for r in rows
+                },
+            }
+
+        # Upper bound: a row can be both expired and superseded
+        candidates = report["expired"]["total"] + report["superseded"]["total"]
+        report["estimated_batches"] = -(-candidates // BATCH_SIZE)
+        total = run_query(local_conn, "SELECT COUNT(*) AS total FROM notifications", fetch="one")
+        report["table_rows"] = int(total["total"]) if total else None
+        return report
+    finally:
+        if conn is None:
+            local_conn.close()
+
+
+def _collect_superseded(conn, cutoff):
+    """
+    Snapshot the superseded ids into a session temporary table, so the
+    per-identity GROUP BY runs once per compaction instead of once per batch.
+    Returns the number of ids collected.
+    """
+    cursor = conn.cursor()
+    try:
+        cursor.execute(f"DROP TEMPORARY TABLE IF EXISTS {SUPERSEDED_TABLE}")
+        cursor.execute(f"CREATE TEMPORARY TABLE {SUPERSEDED_TABLE} (notification_id INT NOT NULL PRIMARY KEY)")
+        cursor.execute(f"""
+            INSERT INTO {SUPERSEDED_TABLE} (notification_id)
+            SELECT n.notification_id
+            {_CANDIDATES["superseded"]}
+        """, (cutoff,))
+        collected = cursor.rowcount
+        conn.commit()
+        return collected
+    finally:
+        cursor.close()
+
+
+def _drop_superseded(conn):
+    # The connection goes back to the pool; don't leave the table on its session
+    try:
+        run_query(conn, f"DROP TEMPORARY TABLE IF EXISTS {SUPERSEDED_TABLE}")
+    except Exception as exc:
+        print(f"[notifications] Could not drop {SUPERSEDED_TABLE}: {exc}")
+
+
+def _archive_batch(conn, reason, cutoff, after=0):
+    """
+    Move one batch of ids above `after` to the archive in its own short
+    transaction. Returns (rows moved, last id looked at); last id is None
+    when nothing is left.
+    """
+    cursor = conn.cursor()
+    try:
+        cursor.execute(f"""
+            SELECT n.notification_id
+            {_BATCH_SOURCES[reason]}
+              AND n.notification_id > %s
+            ORDER BY n.notification_id
+            LIMIT %s
+        """, (cutoff, after, BATCH_SIZE))
+        ids = [row[0] for row in cursor.fetchall()]
+        if not ids:
+            conn.commit()
+            return 0, None
+        last_id = ids[-1]
+
+        # Lock just this batch (still read) so a concurrent "re-flag as
+        # unread" can't slip in between the copy and the delete
+        placeholders = ", ".join(["%s"] * len(ids))
+        cursor.execute(f"""
+            SELECT notification_id FROM notifications
+            WHERE notification_id IN ({placeholders}) AND is_read = 1
+            FOR UPDATE
+        """, tuple(ids))
+        ids = [row[0] for row in cursor.fetchall()]
+        if not ids:
+            conn.commit()
+            return 0, last_id
+
+        placeholders = ", ".join(["%s"] * len(ids))
+        columns = ", ".join(ARCHIVE_COLUMNS)
+        cursor.execute(f"""
+            INSERT IGNORE INTO notifications_archive ({columns}, archive_reason)
+            SELECT {columns}, %s FROM notifications
+            WHERE notification_id IN ({placeholders})
+        """, (reason, *ids))
+        cursor.execute(
+            f"DELETE FROM notifications WHERE notification_id IN ({placeholders})", tuple(ids))
+        moved = cursor.rowcount
+        conn.commit()
+        return moved, last_id
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+
+
+def compact_notifications():
+    """
+    Archive expired and superseded read notifications in bounded batches.
+    Records the run in notification_retention_runs and returns its summary.
+    Only read rows are moved, so the unread counters are unaffected.
+    """
+    conn = create_connection()
+    if not conn:
+        print("[notifications] Compaction skipped: DB connection failed")
+        return None
+
+    started_at = datetime.now()
+    started = time.monotonic()
+    summary = {"expired": 0, "superseded": 0, "batches": 0, "completed": False, "error": None}
+
+    try:
+        ensure_retention_tables(conn)
+        cutoffs = _cutoffs(started_at)
+
+        _collect_superseded(conn, cutoffs["superseded"])
+
+        # Fold superseded history first so the age pass has less to scan
+        for reason in ("superseded", "expired"):
+            last_id = 0
+            while summary["batches"] < MAX_BATCHES:
+                moved, last_id = _archive_batch(conn, reason, cutoffs[reason], last_id)
+                if last_id is None:
+                    break
+                summary[reason] += moved
+                summary["batches"] += 1
+                time.sleep(BATCH_PAUSE_SECONDS)
+        summary["completed"] = summary["batches"] < MAX_BATCHES
+
+    except Exception as exc:
+        traceback.print_exc()
+        summary["error"] = str(exc)
+    finally:
+        _drop_superseded(conn)
+
+    elapsed = time.monotonic() - started
+    moved_total = summary["expired"] + summary["superseded"]
+    summary["duration_ms"] = int(elapsed * 1000)
+    summary["rows_per_second"] = round(moved_total / elapsed, 2) if elapsed > 0 else 0.0
+
+    try:
+        run_query(conn, """
+            INSERT INTO notification_retention_runs
+                (started_at, finished_at, archived_expired, archived_superseded,
+                 batches, duration_ms, rows_per_second, completed, error)
+            VALUES (%s, NOW(), %s, %s, %s, %s, %s, %s, %s)
+        """, (started_at, summary["expired"], summary["superseded"], summary["batches"],
+              summary["duration_ms"], summary["rows_per_second"],
+              int(summary["completed"]), summary["error"]))
+    except Exception as exc:
+        print(f"[notifications] Could not record compaction run: {exc}")
+    finally:
+        conn.close()
+
+    print(f"[notifications] Compaction archived {moved_total} rows "
+          f"({summary['superseded']} superseded, {summary['expired']} expired) "
+          f"in {summary['batches']} batches, {summary['rows_per_second']} rows/s")
+    return summary
+
+
+def get_retention_runs(limit=20):
+    conn = get_db()
+    if not conn:
+        return []
+    rows = run_query(conn, """
+        SELECT * FROM notification_retention_runs
+        ORDER BY run_id DESC LIMIT %s
+    """, (limit,), fetch="all") or []
+    conn.close()
+    return rows
@@ -1,69 +1,275 @@
-from db_connection import create_connection, run_query
+from db_connection import get_db, run_query
+from .event_hub import publish
+from .notification_counters import (
+    adjust_unread_counters,
+    counter_keys,
+    ensure_unread_counters,
+    get_unread_total,
+    refresh_unread_counters,
+)
+from .notification_feed import (
+    DEFAULT_PAGE_SIZE,
+    ensure_notification_feed_indexes,
+    get_notification_page,
+)
 from datetime import datetime
 import json
+import threading
 import traceback
 
 
+# Process-wide cache of the notifications.notification_type ENUM options.
+# None means "not loaded yet"; _NOT_AN_ENUM means the column accepts any value.
+_NOT_AN_ENUM = frozenset()
+_notification_types = None
+_notification_types_lock = threading.Lock()
+
+
+def _read_notification_type_column(cursor):
+    """Return (enum_options, column_info) for notifications.notification_type."""
+    cursor.execute("""
+        SELECT COLUMN_TYPE, DATA_TYPE, IS_NULLABLE, COLUMN_DEFAULT
+        FROM INFORMATION_SCHEMA.COLUMNS
+        WHERE TABLE_SCHEMA = DATABASE()
+          AND TABLE_NAME = 'notifications'
+          AND COLUMN_NAME = 'notification_type'
+    """)
+    column = cursor.fetchone()
+
+    if not column or (column.get("DATA_TYPE") != "enum"):
+        return None, column
+
+    column_type = column.get("COLUMN_TYPE") or ""
+    if not column_type.lower().startswith("enum("):
+        return None, column
+
+    raw_values = column_type[5:-1]  # strip leading "enum(" and trailing ")"
+    enum_options = []
+    for item in raw_values.split("','"):
+        cleaned = item.strip("'").strip()
+        if cleaned:
+            enum_options.append(cleaned)
+
+    return enum_options, column
+
+
+def load_notification_types(conn=None):
+    """
+    (Re)load the cached ENUM options from INFORMATION_SCHEMA.
+    Called once at startup and again after ensure_notification_type_value alters the column.
+    """
+    global _notification_types
+
+    local_conn = conn or get_db()
+    if not local_conn:
+        return None
+
+    cursor = None
+    try:
+        cursor = local_conn.cursor(dictionary=True, buffered=True)
+        enum_options, _ = _read_notification_type_column(cursor)
+        with _notification_types_lock:
+            _notification_types = (frozenset(enum_options)
+                                   if enum_options is not None else _NOT_AN_ENUM)
+        return _notification_types
+    except Exception as exc:
+        print(f"[notifications] Failed to load notification_type values: {exc}")
+        return None
+    finally:
+        if cursor:
+            cursor.close()
+        if conn is None:
+            local_conn.close()
+
+
 def ensure_notification_type_value(target_value, conn=None):
     """
     Ensure the notifications.notification_type ENUM includes the provided value.
     Automatically alters the column to append the missing type when needed.
+    The steady-state cost is a set lookup against the cached ENUM options.
     """
+    global _notification_types
+
     if not target_value:
         return
 
-    local_conn = conn or create_connection()
-    if not local_conn:
+    cached = _notification_types
+    if cached is _NOT_AN_ENUM or (cached is not None and target_value in cached):
         return
 
-    close_conn = conn is None
-    cursor = None
-
-    try:
-        cursor = local_conn.cursor(dictionary=True)
-        cursor.execute("""
-            SELECT COLUMN_TYPE, DATA_TYPE, IS_NULLABLE, COLUMN_DEFAULT
-            FROM INFORMATION_SCHEMA.COLUMNS
-            WHERE TABLE_SCHEMA = DATABASE()
-              AND TABLE_NAME = 'notifications'
-              AND COLUMN_NAME = 'notification_type'
-        """)
-        column = cursor.fetchone()
-
-        if not column or (column.get("DATA_TYPE") != "enum"):
+    with _notification_types_lock:
+        # Another thread may have extended the column while we waited
+        cached = _notification_types
+        if cached is _NOT_AN_ENUM or (cached is not None and target_value in cached):
             return
 
-        column_type = column.get("COLUMN_TYPE") or ""
-        if not column_type.lower().startswith("enum("):
+        local_conn = conn or get_db()
+        if not local_conn:
             return
 
-        raw_values = column_type[5:-1]  # strip leading "enum(" and trailing ")"
-        enum_options = []
-        for item in raw_values.split("','"):
-            cleaned = item.strip("'").strip()
-            if cleaned:
-                enum_options.append(cleaned)
+        close_conn = conn is None
+        cursor = None
 
-        if target_value in enum_options:
-            return
+        try:
+            cursor = local_conn.cursor(dictionary=True, buffered=True)
+            enum_options, column = _read_notification_type_column(cursor)
+
+            if enum_options is None:
+                _notification_types = _NOT_AN_ENUM
+                return
+
+            if target_value in enum_options:
+                _notification_types = frozenset(enum_options)
+                return
+
+            enum_options.append(target_value)
+            enum_clause = ",".join(f"'{opt}'" for opt in enum_options)
+
+            nullable = column.get("IS_NULLABLE") == "YES"
+            column_default = column.get("COLUMN_DEFAULT")
+
+            alter_sql = f"ALTER TABLE notifications MODIFY notification_type ENUM({enum_clause})"
+            if not nullable:
+                alter_sql += " NOT NULL"
+            if column_default is not None:
+                alter_sql += f" DEFAULT '{column_default}'"
 
-        enum_options.append(target_value)
-        enum_clause = ",".join(f"'{opt}'" for opt in enum_options)
+            cursor.execute(alter_sql)
+            local_conn.commit()
+
+            # Invalidate: next lookup sees the altered column
+            _notification_types = None
+            enum_options, _ = _read_notification_type_column(cursor)
+            if enum_options is not None:
+                _notification_types = frozenset(enum_options)
+
+        except Exception as exc:
+            print(f"[notifications] Failed to extend notification_type enum: {exc}")
+            _notification_types = None
+            try:
+                local_conn.rollback()
+            except Exception:
+                pass
+        finally:
+            if cursor:
+                cursor.close()
+            if close_conn:
+                local_conn.close()
+
+
+def init_notification_schema():
+    """One-time startup schema check for the notifications table."""
+    load_notification_types()
+    ensure_notification_coalesce_key()
+    ensure_unread_counters()
+    ensure_notification_feed_indexes()
+
+
+# Generated unread-coalescing key: one unread row per
+# (type, recipient, recruitment_type). Read rows get NULL, which the UNIQUE
+# index ignores, so history is kept while unread rows coalesce.
+COALESCE_KEY_EXPR = """
+    IF(is_read = 0,
+       CONCAT_WS(':', notification_type,
+                 IFNULL(CONCAT('e', employer_id), ''),
+                 IFNULL(CONCAT('a', applicant_id), ''),
+                 IFNULL(recruitment_type, '')),
+       NULL)
+"""
+
+NOTIFICATION_COLUMNS = (
+    "notification_type", "title", "message", "count", "related_ids",
+    "recruitment_type", "residency_type", "applicant_id", "employer_id",
+)
+
+# LAST_INSERT_ID(notification_id) makes cursor.lastrowid report the existing
+# row's id when the insert collapses into an UPDATE.
+UPSERT_NOTIFICATION_SQL = f"""
+    INSERT INTO notifications ({", ".join(NOTIFICATION_COLUMNS)})
+    VALUES ({", ".join(["%s"] * len(NOTIFICATION_COLUMNS))})
+    ON DUPLICATE KEY UPDATE
+        notification_id = LAST_INSERT_ID(notification_id),
+        count = count + 1,
+        message = VALUES(message),
+        title = VALUES(title),
+        updated_at = NOW()
+"""
+
+# None = not checked yet, True/False = coalesce_key column + unique index present
+_coalesce_key_ready = None
+
+# Types that belong to the admin notification center
+ADMIN_NOTIFICATION_TYPES = frozenset({
+    'applicant_approval',
+    'employer_approval',
+    'applicant_reported',
+    'employer_reported',
+    'applicant_outdated_docu',
+    'employer_outdated_docu',
+    'applicant_batch',
+})
+
+
+def publish_notification_event(row, notification_id=None):
+    """Push a "notification" event to every live client that should refresh its badge."""
+    notification_type, applicant_id, employer_id = row[0], row[7], row[8]
+    data = {"notification_id": notification_id, "notification_type": notification_type}
+
+    if applicant_id:
+        publish(f"applicant:{applicant_id}", "notification", data)
+    if employer_id:
+        publish(f"employer:{employer_id}", "notification", data)
+    if notification_type in ADMIN_NOTIFICATION_TYPES:
+        publish("admin", "notification", data)
+
+
+def ensure_notification_coalesce_key(conn=None):
+    """
+    Add the generated coalesce_key column and its UNIQUE index if missing.
+    Older duplicate unread rows (from the pre-upsert race) are marked read
+    first so the index can be built.
+    """
+    global _coalesce_key_ready
 
-        nullable = column.get("IS_NULLABLE") == "YES"
-        column_default = column.get("COLUMN_DEFAULT")
+    local_conn = conn or get_db()
+    if not local_conn:
+        return False
 
-        alter_sql = f"ALTER TABLE notifications MODIFY notification_type ENUM({enum_clause})"
-        if not nullable:
-            alter_sql += " NOT NULL"
-        if column_default is not None:
-            alter_sql += f" DEFAULT '{column_default}'"
+    cursor = None
+    try:
+        cursor = local_conn.cursor(dictionary=True, buffered=True)
+
+        cursor.execute("SHOW COLUMNS FROM notifications LIKE 'coalesce_key'")
+        if not cursor.fetchone():
+            cursor.execute(f"""
+                ALTER TABLE notifications
+                ADD COLUMN coalesce_key VARCHAR(191)
+                AS ({COALESCE_KEY_EXPR}) STORED
+            """)
+
+        cursor.execute(
+            "SHOW INDEX FROM notifications WHERE Key_name = 'uq_notifications_coalesce'")
+        if not cursor.fetchall():
+            cursor.execute("""
+                UPDATE notifications n
+                JOIN (
+                    SELECT coalesce_key, MAX(notification_id) AS keep_id
+                    FROM notifications
+                    WHERE coalesce_key IS NOT NULL
+                    GROUP BY coalesce_key
+                    HAVING COUNT(*) > 1
+                ) d ON n.coalesce_key = d.coalesce_key AND n.notification_id < d.keep_id
+                SET n.is_read = 1
+            """)
+            cursor.execute(
+                "CREATE UNIQUE INDEX uq_notifications_coalesce ON notifications (coalesce_key)")
 
-        cursor.execute(alter_sql)
         local_conn.commit()
+        _coalesce_key_ready = True
 
     except Exception as exc:
-        print(f"[notifications] Failed to extend notification_type enum: {exc}")
+        print(f"[notifications] coalesce_key migration failed, using legacy writes: {exc}")
+        _coalesce_key_ready = False
         try:
             local_conn.rollback()
         except Exception:
@@ -71,35 +277,24 @@ def ensure_notification_type_value(target_value, conn=None):
     finally:
         if cursor:
             cursor.close()
-        if close_conn:
+        if conn is None:
             local_conn.close()
 
+    return _coalesce_key_ready
 
-def create_notification(
+
+def _prepare_notification_row(
     notification_type,
     title,
     message,
-    count=1,
-    related_ids=None,
-    recruitment_type=None,
-    residency_type=None,
-    applicant_id=None,
-    employer_id=None
+    count,
+    related_ids,
+    recruitment_type,
+    residency_type,
+    applicant_id,
+    employer_id
 ):
-    """
-    Insert or update a notification.
-    If a notification exists for the same type and user (applicant/employer),
-    update it (increment count, update message, update timestamp).
-    Otherwise, insert a new one.
-    Returns (True, inserted_id) or (False, error_message).
-    """
-    conn = create_connection()
-    if not conn:
-        return False, "DB connection failed"
-
-    # Ensure ENUM columns include the desired notification_type value (for legacy DBs)
-    ensure_notification_type_value(notification_type, conn)
-
+    """Normalize create_notification arguments into a NOTIFICATION_COLUMNS tuple."""
     # Normalize related_ids into a Python list
     parsed_related = None
     if related_ids is None:
@@ -140,6 +335,26 @@ def create_notification(
     except Exception:
         pass
 
+    related_ids_json = json.dumps(parsed_related) if parsed_related else None
+
+    return (
+        notification_type,
+        title,
+        message,
+        count,
+        related_ids_json,
+        recruitment_type,
+        residency_type,
+        applicant_id,
+        employer_id,
+    )
+
+
+def _create_notification_legacy(conn, row):
+    """Select-then-write path for databases where the coalesce_key migration failed."""
+    notification_type, title, message = row[0], row[1], row[2]
+    recruitment_type, applicant_id, employer_id = row[5], row[7], row[8]
+
     check_query = "SELECT notification_id FROM notifications WHERE notification_type = %s"
     check_params = [notification_type]
 
@@ -157,88 +372,101 @@ def create_notification(
     # Only match unread notifications to reuse
     check_query += " AND is_read = 0 LIMIT 1"
 
+    cur = conn.cursor(dictionary=True, buffered=True)
     try:
-        existing = run_query(
-            conn, check_query, tuple(check_params), fetch="one")
+        cur.execute(check_query, tuple(check_params))
+        existing = cur.fetchone()
 
         if existing:
-            update_query = """
+            cur.execute("""
                 UPDATE notifications 
                 SET count = count + 1, 
                     message = %s, 
                     title = %s,
                     updated_at = NOW()
                 WHERE notification_id = %s
-            """
-            run_query(conn, update_query,
-                      (message, title, existing["notification_id"]))
-            conn.commit()
-            conn.close()
-            print(
-                f"[notifications] Updated existing notification id={existing['notification_id']}, incremented count")
-            return True, existing["notification_id"]
-    except Exception as e:
-        print(f"[notifications] Error checking for existing notification: {e}")
-        # Fall through to create new one
+            """, (message, title, existing["notification_id"]))
+            return existing["notification_id"]
+
+        cur.execute(f"""
+            INSERT INTO notifications ({", ".join(NOTIFICATION_COLUMNS)})
+            VALUES ({", ".join(["%s"] * len(NOTIFICATION_COLUMNS))})
+        """, row)
+        return cur.lastrowid
+    finally:
+        cur.close()
 
-    related_ids_json = json.dumps(parsed_related) if parsed_related else None
 
-    query = """
-        INSERT INTO notifications 
-        (notification_type, title, message, count, related_ids, 
-         recruitment_type, residency_type, applicant_id, employer_id)
-        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
+def create_notification(
+    notification_type,
+    title,
+    message,
+    count=1,
+    related_ids=None,
+    recruitment_type=None,
+    residency_type=None,
+    applicant_id=None,
+    employer_id=None
+):
     """
-    params = (
-        notification_type,
-        title,
-        message,
-        count,
-        related_ids_json,
-        recruitment_type,
-        residency_type,
-        applicant_id,
-        employer_id,
-    )
+    Insert or update a notification.
+    If an unread notification exists for the same type, user (applicant/employer)
+    and recruitment type, update it (increment count, update message, update timestamp).
+    Otherwise, insert a new one. Both cases are a single INSERT ... ON DUPLICATE KEY UPDATE.
+    Returns (True, notification_id) or (False, error_message).
+    """
+    conn = get_db()
+    if not conn:
+        return False, "DB connection failed"
 
-    try:
-        result = run_query(conn, query, params)
-        if result:
-            try:
-                last = run_query(
-                    conn, "SELECT LAST_INSERT_ID() as id", fetch="one")
-                inserted_id = last["id"] if last else None
-            except Exception:
-                inserted_id = None
-            conn.commit()
-            conn.close()
-            print(
-                f"[notifications] Inserted new notification id={inserted_id}")
-            return True, inserted_id
-    except Exception as e:
-        print("[notifications] run_query failed:", str(e))
-        traceback.print_exc()
+    # Ensure ENUM columns include the desired notification_type value (for legacy DBs)
+    ensure_notification_type_value(notification_type, conn)
 
-    # fallback: raw cursor
+    if _coalesce_key_ready is None:
+        ensure_notification_coalesce_key(conn)
+
+    row = _prepare_notification_row(
+        notification_type, title, message, count, related_ids,
+        recruitment_type, residency_type, applicant_id, employer_id)
+
+    cur = None
     try:
-        cur = conn.cursor()
-        cur.execute(query, params)
+        if _coalesce_key_ready:
+            cur = conn.cursor()
+            cur.execute(UPSERT_NOTIFICATION_SQL, row)
+            notification_id = cur.lastrowid
+            # rowcount: 1 = new row inserted, 2 = existing unread row updated
+            inserted = cur.rowcount == 1
+        else:
+            notification_id = _create_notification_legacy(conn, row)
+            inserted = None
+
+        # Only a brand-new unread row changes the unread counters
+        keys = counter_keys(row[0], applicant_id=row[7], employer_id=row[8])
+        if inserted:
+            adjust_unread_counters(conn, keys, 1)
+        elif inserted is None:
+            refresh_unread_counters(conn, keys)
+
         conn.commit()
-        inserted_id = getattr(cur, "lastrowid", None)
-        cur.close()
-        conn.close()
-        print(f"[notifications] Inserted notification id={inserted_id}")
-        return True, inserted_id
+        publish_notification_event(row, notification_id)
+        action = {True: "Inserted", False: "Updated"}.get(inserted, "Saved")
+        print(f"[notifications] {action} notification id={notification_id}")
+        return True, notification_id
+
     except Exception as exc:
         err = str(exc)
-        print("[notifications] Exception during insert:", err)
+        print("[notifications] Exception during upsert:", err)
         traceback.print_exc()
         try:
             conn.rollback()
         except Exception:
             pass
-        conn.close()
         return False, err
+    finally:
+        if cur:
+            cur.close()
+        conn.close()
 
 
 # handling recruitment change
@@ -298,121 +526,127 @@ def build_redirect_url(notif, admin_prefix="/admin"):
     return "#"
 
 
-def get_notifications(
+def _serialize_feed_row(r):
+    """Turn a FEED_COLUMNS row into the JSON shape the notification UIs use."""
+    related = r.get("related_ids") or []
+    if isinstance(related, (str, bytes)):
+        try:
+            related = json.loads(related)
+        except Exception:
+            related = []
+
+    created_at = r.get("created_at")
+    notif_obj = {
+        "notification_id": r.get("notification_id"),
+        "notification_type": r.get("notification_type"),
+        "title": r.get("title"),
+        "message": r.get("message"),
+        "count": r.get("count") or 1,
+        "related_ids": related,
+        "recruitment_type": r.get("recruitment_type"),
+        "applicant_id": r.get("applicant_id"),
+        "employer_id": r.get("employer_id"),
+        "is_read": 1 if r.get("is_read") else 0,
+        "created_at": created_at.isoformat() if hasattr(created_at, "isoformat") else created_at,
+    }
+    notif_obj["redirect_url"] = build_redirect_url(notif_obj)
+    return notif_obj
+
+
+def get_notifications_page(
         notification_type=None,
         is_read=None,
-        limit=50,
+        limit=DEFAULT_PAGE_SIZE,
+        cursor=None,
+        include_types=None,
         exclude_types=None,
         applicant_id=None,
         employer_id=None):
     """
-    Fetch notifications with optional filtering and normalize the returned dict keys
-    so frontend can reliably use: notification_id, title, message, is_read, created_at, redirect_url, related_ids
-
-    exclude_types: list of notification types to exclude (e.g., ['job_application'])
+    Keyset-paginated notification feed (unread first, newest first).
+    Returns (notifications, next_cursor); pass next_cursor back for the next page.
     """
-    conn = create_connection()
+    conn = get_db()
     if not conn:
-        return []
-
-    query = "SELECT * FROM notifications WHERE 1=1"
-    params = []
+        return [], None
 
     if notification_type:
-        query += " AND notification_type = %s"
-        params.append(notification_type)
-
-    if is_read is not None:
-        query += " AND is_read = %s"
-        params.append(is_read)
-
-    if applicant_id:
-        query += " AND applicant_id = %s"
-        params.append(applicant_id)
-
-    if employer_id:
-        query += " AND employer_id = %s"
-        params.append(employer_id)
-
-    if exclude_types and len(exclude_types) > 0:
-        placeholders = ", ".join(["%s"] * len(exclude_types))
-        query += f" AND notification_type NOT IN ({placeholders})"
-        params.extend(exclude_types)
+        include_types = [notification_type]
+
+    rows, next_cursor = get_notification_page(
+        conn,
+        cursor=cursor,
+        limit=limit,
+        is_read=is_read,
+        include_types=include_types,
+        exclude_types=exclude_types,
+        applicant_id=applicant_id,
+        employer_id=employer_id,
+    )
+    conn.close()
 
-    query += " ORDER BY is_read ASC, created_at DESC LIMIT %s"
-    params.append(limit)
+    return [_serialize_feed_row(r) for r in rows], next_cursor
 
-    rows = run_query(conn, query, tuple(params), fetch="all")
-    conn.close()
 
-    if not rows:
-        return []
+def get_notifications(
+        notification_type=None,
+        is_read=None,
+        limit=50,
+        exclude_types=None,
+        applicant_id=None,
+        employer_id=None):
+    """
+    Fetch the first `limit` notifications with optional filtering, normalized so
+    the frontend can reliably use: notification_id, title, message, is_read,
+    created_at, redirect_url, related_ids
 
-    normalized = []
-    for r in rows:
-        # normalize id
-        nid = r.get("notification_id") or r.get("id") or r.get("notif_id")
+    exclude_types: list of notification types to exclude (e.g., ['job_application'])
+    """
+    notifications, _ = get_notifications_page(
+        notification_type=notification_type,
+        is_read=is_read,
+        limit=limit,
+        exclude_types=exclude_types,
+        applicant_id=applicant_id,
+        employer_id=employer_id,
+    )
+    return notifications
 
-        # normalize is_read
-        is_read_val = r.get("is_read")
-        try:
-            is_read_norm = 1 if (
-                is_read_val is True or int(is_read_val) == 1) else 0
-        except Exception:
-            is_read_norm = 0 if not is_read_val else 1
 
-        # normalize created_at
-        created_at_val = r.get("created_at")
-        if created_at_val is None:
-            created_at_iso = None
-        else:
-            try:
-                created_at_iso = created_at_val.isoformat()
-            except Exception:
-                created_at_iso = str(created_at_val)
 
-        # parse related_ids
-        related = []
-        if r.get("related_ids"):
-            try:
-                related = json.loads(r.get("related_ids"))
-            except Exception:
-                related = []
-
-        notif_obj = {
-            "notification_id": nid,
-            "notification_type": r.get("notification_type"),
-            "title": r.get("title"),
-            "message": r.get("message"),
-            "count": r.get("count") or 1,
-            "related_ids": related,
-            "recruitment_type": r.get("recruitment_type"),
-            "residency_type": r.get("residency_type"),
-            "applicant_id": r.get("applicant_id"),
-            "employer_id": r.get("employer_id"),
-            "is_read": is_read_norm,
-            "created_at": created_at_iso,
-            "updated_at": (r.get("updated_at").isoformat()
-                           if r.get("updated_at") and hasattr(r.get("updated_at"), "isoformat")
-                           else (str(r.get("updated_at")) if r.get("updated_at") else None))
-        }
-
-        # Inject redirect_url dynamically
-        notif_obj["redirect_url"] = build_redirect_url(notif_obj)
-
-        normalized.append(notif_obj)
-
-    return normalized
-
-
-def mark_notification_read(notification_id):
-    """Mark a notification as read"""
-    conn = create_connection()
+def mark_notification_read(notification_id, employer_id=None):
+    """
+    Mark a notification as read and decrement its unread counters.
+    Pass employer_id to only touch a notification owned by that employer.
+    """
+    conn = get_db()
     if not conn:
         return False
 
+    lookup = """
+        SELECT notification_type, applicant_id, employer_id
+        FROM notifications
+        WHERE notification_id = %s AND is_read = 0
+    """
     query = "UPDATE notifications SET is_read = 1 WHERE notification_id = %s"
-    result = run_query(conn, query, (notification_id,))
+    params = [notification_id]
+
+    if employer_id is not None:
+        lookup += " AND employer_id = %s"
+        query += " AND employer_id = %s"
+        params.append(employer_id)
+
+    unread = run_query(conn, lookup, tuple(params), fetch="one")
+    result = run_query(conn, query, tuple(params))
+
+    if unread and result:
+        adjust_unread_counters(
+            conn,
+            counter_keys(unread["notification_type"],
+                         applicant_id=unread.get("applicant_id"),
+                         employer_id=unread.get("employer_id")),
+            -result)
+        conn.commit()
     conn.close()
 
     return result
@@ -420,10 +654,15 @@ def mark_notification_read(notification_id):
 
 def get_unread_count(exclude_types=None):
     """Get count of unread notifications, excluding specific types"""
-    conn = create_connection()
+    conn = get_db()
     if not conn:
         return 0
 
+    maintained = get_unread_total(conn, "all", exclude_types=exclude_types)
+    if maintained is not None:
+        conn.close()
+        return maintained
+
     query = "SELECT COUNT(*) as count FROM notifications WHERE is_read = 0"
     params = []
 
@@ -444,7 +683,7 @@ def batch_lipeno_applicants():
     Create a batch notification for Lipeno applicants registered in the last 30 minutes
     This should be called by a scheduled task (cron job or scheduler)
     """
-    conn = create_connection()
+    conn = get_db()
     if not conn:
         return False
 
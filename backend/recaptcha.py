@@ -1,19 +1,190 @@
+import hashlib
+import json
 import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeout
+
 import requests
+from requests.adapters import HTTPAdapter
+
+# reCAPTCHA verification.
+#
+# Verification goes through one keep-alive session, so logins reuse the TLS
+# connection to Google instead of opening a new one each time. Concurrent
+# checks of the same (token, IP) share one request, so a double-submitted login
+# form is answered from the first check instead of getting
+# "timeout-or-duplicate" back from Google. A success that arrives after the
+# shared request finished is kept for a few seconds (RECAPTCHA_CACHE_TTL) and
+# handed out once; a solved CAPTCHA never passes more than one extra check.
+#
+# The request runs on a small executor so callers can wait with a hard
+# wall-clock budget (RECAPTCHA_LATENCY_BUDGET) or start verification early
+# with verify_recaptcha_async(). When Google cannot be reached in time the
+# result follows RECAPTCHA_FAIL_OPEN: closed (reject, the default) or open.
+#
+# RECAPTCHA_VERIFY_URL can point at run_fake_siteverify() for local testing.
 
-RECAPTCHA_VERIFY_URL = "https://www.google.com/recaptcha/api/siteverify"
+RECAPTCHA_VERIFY_URL = os.environ.get("RECAPTCHA_VERIFY_URL",
+                                      "https://www.google.com/recaptcha/api/siteverify")
 RECAPTCHA_SECRET_KEY = os.environ.get("RECAPTCHA_SECRET_KEY")
 
-def verify_recaptcha(response_token, remote_ip=None):
-    if not RECAPTCHA_SECRET_KEY:
-        return {"success": False, "error-codes": ["missing-secret-key"]}
+REQUEST_TIMEOUT = float(os.environ.get("RECAPTCHA_TIMEOUT", 3))
+LATENCY_BUDGET = float(os.environ.get("RECAPTCHA_LATENCY_BUDGET", 0)) or None
+FAIL_OPEN = os.environ.get("RECAPTCHA_FAIL_OPEN", "false").lower() in ("1", "true", "yes")
+CACHE_TTL = float(os.environ.get("RECAPTCHA_CACHE_TTL", 5))
+CACHE_MAX_ENTRIES = 2048
+WORKERS = int(os.environ.get("RECAPTCHA_WORKERS", 4))
+
+_session = requests.Session()
+_session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=WORKERS))
+_session.mount("http://", HTTPAdapter(pool_connections=1, pool_maxsize=WORKERS))
+
+_executor = ThreadPoolExecutor(max_workers=WORKERS, thread_name_prefix="recaptcha")
+
+_lock = threading.Lock()
+_cache = {}     # key -> (expires_at, result), successes only, single use
+_inflight = {}  # key -> Future
+
+
+def _cache_key(response_token, remote_ip):
+    return hashlib.sha256(f"{response_token}|{remote_ip or ''}".encode()).hexdigest()
+
+
+def _take(key):
+    # Caller holds _lock. Popped on read: each cached success is used once
+    entry = _cache.pop(key, None)
+    if entry and entry[0] > time.monotonic():
+        return entry[1]
+    return None
+
 
+def _remember(key, result):
+    now = time.monotonic()
+    with _lock:
+        if len(_cache) >= CACHE_MAX_ENTRIES:
+            for stale in [k for k, (expires, _) in _cache.items() if expires <= now]:
+                del _cache[stale]
+            if len(_cache) >= CACHE_MAX_ENTRIES:
+                _cache.pop(next(iter(_cache)))
+        _cache[key] = (now + CACHE_TTL, result)
+
+
+def _unavailable(reason):
+    """Result used when Google could not give an answer, per the fail-open setting."""
+    print(f"[v0] reCAPTCHA unavailable ({reason}), failing {'open' if FAIL_OPEN else 'closed'}")
+    return {"success": FAIL_OPEN, "error-codes": ["verification-unavailable", reason],
+            "fail_open": FAIL_OPEN}
+
+
+def _post(payload):
+    try:
+        r = _session.post(RECAPTCHA_VERIFY_URL, data=payload, timeout=REQUEST_TIMEOUT)
+        r.raise_for_status()
+        return r.json()
+    except Exception as e:
+        return _unavailable(f"request-error: {e}")
+
+
+def _siteverify(key, payload):
+    try:
+        result = _post(payload)
+        # Callers waiting on this request already share the result; only a success
+        # is kept for a late duplicate. Failures and transport errors go to Google again
+        if result.get("success") and not result.get("fail_open") and CACHE_TTL > 0:
+            _remember(key, result)
+        return result
+    finally:
+        # Here rather than in a done-callback: a future that has already
+        # finished runs its callbacks in the submitting thread, which still
+        # holds _lock. verify_recaptcha_async() registers the future under
+        # _lock, so this cannot run before it is in _inflight
+        with _lock:
+            _inflight.pop(key, None)
+
+
+def verify_recaptcha_async(response_token, remote_ip=None):
+    """
+    Start verifying a token and return a Future with the result dict.
+    Concurrent calls for the same token and IP share one request.
+    """
+    if not RECAPTCHA_SECRET_KEY or not response_token:
+        future = Future()
+        future.set_result({"success": False, "error-codes": [
+            "missing-secret-key" if not RECAPTCHA_SECRET_KEY else "missing-input-response"]})
+        return future
+
+    key = _cache_key(response_token, remote_ip)
     payload = {"secret": RECAPTCHA_SECRET_KEY, "response": response_token}
     if remote_ip:
         payload["remoteip"] = remote_ip
 
+    with _lock:
+        cached = _take(key)
+        if cached is not None:
+            future = Future()
+            future.set_result(cached)
+            return future
+
+        future = _inflight.get(key)
+        if future is None:
+            future = _inflight[key] = _executor.submit(_siteverify, key, payload)
+    return future
+
+
+def wait_recaptcha(future, budget=LATENCY_BUDGET):
+    """Result of a verify_recaptcha_async() future, giving up after `budget` seconds."""
     try:
-        r = requests.post(RECAPTCHA_VERIFY_URL, data=payload, timeout=5)
-        return r.json()
-    except Exception as e:
-        return {"success": False, "error-codes": ["request-error", str(e)]}
+        return future.result(timeout=budget)
+    except FutureTimeout:
+        return _unavailable("verification-timeout")
+
+
+def verify_recaptcha(response_token, remote_ip=None, budget=LATENCY_BUDGET):
+    return wait_recaptcha(verify_recaptcha_async(response_token, remote_ip), budget)
+
+
+def run_fake_siteverify(port=8788, latency=0.0):
+    """
+    Minimal stand-in for Google's siteverify endpoint. Tokens starting with
+    "pass" verify once; reusing a token returns timeout-or-duplicate like the
+    real service. `latency` seconds are added to every reply.
+    """
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+    from urllib.parse import parse_qs
+
+    used = set()
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            form = parse_qs(self.rfile.read(int(self.headers.get("Content-Length", 0))).decode())
+            token = (form.get("response") or [""])[0]
+            time.sleep(latency)
+            if token in used:
+                reply = {"success": False, "error-codes": ["timeout-or-duplicate"]}
+            elif token.startswith("pass"):
+                reply = {"success": True, "hostname": "localhost",
+                         "challenge_ts": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())}
+            else:
+                reply = {"success": False, "error-codes": ["invalid-input-response"]}
+            used.add(token)
+            payload = json.dumps(reply).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, fmt, *args):
+            print(f"[fake-siteverify] {fmt % args}")
+
+    print(f"[fake-siteverify] listening on http://127.0.0.1:{port}/recaptcha/api/siteverify")
+    ThreadingHTTPServer(("127.0.0.1", port), Handler).serve_forever()
+
+
+if __name__ == "__main__":
+    import sys
+
+    if len(sys.argv) > 1 and sys.argv[1] == "--fake-server":
+        run_fake_siteverify(int(sys.argv[2]) if len(sys.argv) > 2 else 8788,
+                            float(sys.argv[3]) if len(sys.argv) > 3 else 0.0)
@@ -278,9 +278,15 @@ def handle_recruitment_type_change(employer_id, db, new_type, uploaded_paths=Non
                     is_read = 0
                 WHERE employer_id = %s
                   AND notification_type = 'employer_approval'
+                ORDER BY notification_id DESC
+                LIMIT 1
             """, (notif_title, notif_message, employer_id))
 
-            if cursor.rowcount == 0:
+            if cursor.rowcount:
+                from .notification_counters import counter_keys, refresh_unread_counters
+                refresh_unread_counters(db, counter_keys(
+                    "employer_approval", employer_id=employer_id))
+            else:
                 from .notifications import create_notification
                 create_notification(
                     notification_type="employer_approval",
@@ -1,258 +1,733 @@
-import os
-import time
-import requests
-from dotenv import load_dotenv
-
-# Load .env from the backend folder
-env_path = os.path.join(os.path.dirname(__file__), '.env')
-if not os.path.exists(env_path):
-    # fallback: parent folder's backend directory
-    env_path = os.path.join(os.path.dirname(__file__), 'backend', '.env')
-
-load_dotenv(dotenv_path=env_path)
-
-
-_last_request_time = 0
-_min_request_interval = 0.5
-
-
-def format_phone_number(phone_number):
-    """
-    Format phone numbers for httpsms API.
-    Converts to international format with + prefix.
-
-    Examples:
-    - "09050759425" -> "+639050759425"
-    - "9050759425" -> "+639050759425"
-    - "+639050759425" -> "+639050759425"
-    - "639050759425" -> "+639050759425"
-    """
-    if not phone_number:
-        return None
-
-    # Remove all non-digit characters except leading +
-    cleaned = phone_number.lstrip('+')
-    cleaned = ''.join(c for c in cleaned if c.isdigit())
-
-    # Handle Philippine numbers (add country code 63 if needed)
-    if cleaned.startswith('0'):
-        # Remove leading 0 and add country code
-        cleaned = '63' + cleaned[1:]
-    elif not cleaned.startswith('63'):
-        # Assume it's a Philippine number if no country code
-        cleaned = '63' + cleaned
-
-    # Add + prefix for international format
-    formatted = '+' + cleaned
-
-    # Validate length (most numbers are 10-15 digits after country code)
-    if len(cleaned) < 10 or len(cleaned) > 15:
-        print(f"[v0] Warning: Phone number might be invalid - {formatted}")
-
-    return formatted
-
-
-def check_httpsms_status():
-    """
-    Check httpsms API connectivity and authentication.
-    """
-    api_key = os.getenv("HTTPSMS_API_KEY")
-    from_number = os.getenv("HTTPSMS_FROM_NUMBER")
-
-    print("\n=== HTTPSMS DEBUG CHECK ===")
-    print(f"[v0] API Key configured: {'Yes' if api_key else 'NO - MISSING'}")
-    print(
-        f"[v0] From Number configured: {from_number if from_number else 'NO - MISSING'}")
-
-    if not api_key or not from_number:
-        print("[v0] ERROR: Missing required environment variables!")
-        return False
-
-    # Test API connectivity
-    try:
-        url = "https://api.httpsms.com/v1/messages/send"
-        headers = {
-            "x-api-key": api_key,
-            "Content-Type": "application/json"
-        }
-
-        # Send a test request with minimal payload to check auth
-        test_payload = {
-            "from": format_phone_number(from_number),
-            "to": "+639999999999",  # Dummy number
-            "content": "test"
-        }
-
-        response = requests.post(
-            url, json=test_payload, headers=headers, timeout=5)
-
-        if response.status_code == 200:
-            print("[v0] ✓ API authentication successful")
-            return True
-        elif response.status_code == 401:
-            print("[v0] ✗ ERROR: Invalid API key (401 Unauthorized)")
-            print(f"[v0] Response: {response.text}")
-            return False
-        elif response.status_code == 400:
-            print("[v0] ✓ API reachable (400 is expected for test payload)")
-            return True
-        else:
-            print(f"[v0] API returned status {response.status_code}")
-            print(f"[v0] Response: {response.text}")
-            return True
-
-    except Exception as e:
-        print(f"[v0] ✗ ERROR: Cannot reach httpsms API: {e}")
-        return False
-
-
-def send_sms(to_number, message, from_number=None, max_retries=2):
-    """
-    Send SMS via httpsms API with enhanced debugging.
-    """
-    global _last_request_time
-
-    try:
-        # Validate inputs
-        if not to_number or not message:
-            print(
-                f"[v0] Error: Invalid inputs - to_number={to_number}, message_length={len(message) if message else 0}")
-            return False
-
-        # Get API key
-        api_key = os.getenv("HTTPSMS_API_KEY")
-        if not api_key:
-            print(f"[v0] Error: HTTPSMS_API_KEY not set in environment variables")
-            return False
-
-        # Get sender phone number (required for httpsms)
-        if not from_number:
-            from_number = os.getenv("HTTPSMS_FROM_NUMBER")
-
-        if not from_number:
-            print(
-                f"[v0] Error: from_number not provided and HTTPSMS_FROM_NUMBER not set")
-            return False
-
-        formatted_to = format_phone_number(to_number)
-        formatted_from = format_phone_number(from_number)
-
-        if not formatted_to or not formatted_from:
-            print(f"[v0] Error: Invalid phone number format")
-            return False
-
-        print(f"\n[v0] === SMS SEND ATTEMPT ===")
-        print(f"[v0] From: {formatted_from}")
-        print(f"[v0] To: {formatted_to}")
-        print(f"[v0] Message length: {len(message)} characters")
-        print(
-            f"[v0] IMPORTANT: Verify that {formatted_from} is registered in httpsms Android app!")
-
-        # Rate limiting
-        current_time = time.time()
-        time_since_last_request = current_time - _last_request_time
-        if time_since_last_request < _min_request_interval:
-            sleep_time = _min_request_interval - time_since_last_request
-            time.sleep(sleep_time)
-
-        _last_request_time = time.time()
-
-        # httpsms API endpoint
-        url = "https://api.httpsms.com/v1/messages/send"
-
-        # Prepare headers
-        headers = {
-            "x-api-key": api_key,
-            "Content-Type": "application/json"
-        }
-
-        # Prepare payload
-        payload = {
-            "from": formatted_from,
-            "to": formatted_to,
-            "content": message
-        }
-
-        # Send SMS with retry logic
-        for attempt in range(max_retries + 1):
-            try:
-                response = requests.post(
-                    url, json=payload, headers=headers, timeout=10)
-
-                print(f"[v0] API Response Status: {response.status_code}")
-
-                if response.status_code == 200:
-                    response_data = response.json()
-
-                    status = response_data.get(
-                        'data', {}).get('status', 'unknown')
-                    print(f"[v0] Message Status: {status}")
-
-                    if status == 'pending':
-                        print(f"[v0] ⚠ WARNING: Message queued but NOT sent yet!")
-                        print(
-                            f"[v0] This means the httpsms Android app hasn't sent it yet.")
-                        print(f"[v0] Check:")
-                        print(
-                            f"[v0]   1. Is the httpsms app running on the sender phone?")
-                        print(
-                            f"[v0]   2. Is {formatted_from} registered in the app?")
-                        print(f"[v0]   3. Does the phone have cellular signal?")
-                        print(f"[v0]   4. Does the SIM have SMS capability?")
-                    elif status == 'sent':
-                        print(f"[v0] ✓ SMS sent successfully!")
-                    elif status == 'delivered':
-                        print(f"[v0] ✓ SMS delivered!")
-
-                    print(f"[v0] Full response: {response_data}")
-                    return True
-                else:
-                    error_msg = response.text
-                    print(
-                        f"[v0] API Error (Attempt {attempt + 1}/{max_retries + 1}): Status {response.status_code}")
-                    print(f"[v0] Error details: {error_msg}")
-
-                    # Retry on specific status codes
-                    if attempt < max_retries and response.status_code in [429, 500, 502, 503, 504]:
-                        retry_delay = 2 ** attempt
-                        print(f"[v0] Retrying in {retry_delay} seconds...")
-                        time.sleep(retry_delay)
-                        continue
-
-                    return False
-
-            except requests.exceptions.Timeout:
-                print(
-                    f"[v0] Request timeout (Attempt {attempt + 1}/{max_retries + 1})")
-                if attempt < max_retries:
-                    retry_delay = 2 ** attempt
-                    print(f"[v0] Retrying in {retry_delay} seconds...")
-                    time.sleep(retry_delay)
-                    continue
-                return False
-
-            except requests.exceptions.RequestException as e:
-                print(
-                    f"[v0] Request error (Attempt {attempt + 1}/{max_retries + 1}): {e}")
-                if attempt < max_retries:
-                    retry_delay = 2 ** attempt
-                    print(f"[v0] Retrying in {retry_delay} seconds...")
-                    time.sleep(retry_delay)
-                    continue
-                return False
-
-        return False
-
-    except Exception as e:
-        print(f"[v0] Unexpected error sending SMS: {type(e).__name__}: {e}")
-        return False
-
-
-# Test script
-if __name__ == "__main__":
-    # Run diagnostic check
-    check_httpsms_status()
-
-    # Test send
-    print("\n[v0] Attempting to send test SMS...")
-    send_sms("+639928037409", "Test message from httpsms")
+import os
+import json
+import random
+import re
+import threading
+import time
+import traceback
+import uuid
+import requests
+from requests.adapters import HTTPAdapter
+from dotenv import load_dotenv
+
+# Load .env from the backend folder
+env_path = os.path.join(os.path.dirname(__file__), '.env')
+if not os.path.exists(env_path):
+    # fallback: parent folder's backend directory
+    env_path = os.path.join(os.path.dirname(__file__), 'backend', '.env')
+
+load_dotenv(dotenv_path=env_path)
+
+from db_connection import create_connection, run_query  # noqa: E402
+
+# SMS dispatch.
+#
+# send_sms()/queue_sms() only store the message in sms_outbox and return;
+# background workers send it through the httpsms API:
+#   - a shared token bucket keeps us under the provider's rate limit
+#   - one pooled requests.Session reuses the TLS connection
+#   - failed sends are retried later with exponential backoff + jitter
+#   - a circuit breaker stops hammering httpsms while it is down
+# Each row keeps its status (queued -> sending -> sent / failed) and the
+# httpsms message id/status.
+#
+# HTTPSMS_API_URL can point at a local fake server for testing, e.g.
+#   python -m backend.send_sms --fake-server 8787
+#   HTTPSMS_API_URL=http://127.0.0.1:8787/v1
+
+API_URL = os.getenv("HTTPSMS_API_URL", "https://api.httpsms.com/v1").rstrip("/")
+RATE_PER_SECOND = float(os.getenv("SMS_RATE_PER_SECOND", 2))
+BURST = int(os.getenv("SMS_BURST", 4))
+WORKERS = int(os.getenv("SMS_WORKERS", 2))
+BATCH_SIZE = int(os.getenv("SMS_BATCH_SIZE", 10))
+POLL_INTERVAL = float(os.getenv("SMS_POLL_INTERVAL", 5))
+MAX_ATTEMPTS = int(os.getenv("SMS_MAX_ATTEMPTS", 5))
+BACKOFF_BASE_SECONDS = float(os.getenv("SMS_BACKOFF_BASE", 2))
+BACKOFF_MAX_SECONDS = float(os.getenv("SMS_BACKOFF_MAX", 300))
+CLAIM_TIMEOUT_SECONDS = int(os.getenv("SMS_CLAIM_TIMEOUT", 300))
+BREAKER_FAILURES = int(os.getenv("SMS_BREAKER_FAILURES", 5))
+BREAKER_RESET_SECONDS = float(os.getenv("SMS_BREAKER_RESET", 60))
+REQUEST_TIMEOUT = float(os.getenv("SMS_REQUEST_TIMEOUT", 10))
+
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+SMS_TABLE_SQL = """
+    CREATE TABLE IF NOT EXISTS sms_outbox (
+        sms_id BIGINT AUTO_INCREMENT PRIMARY KEY,
+        to_number VARCHAR(20) NOT NULL,
+        from_number VARCHAR(20) NOT NULL,
+        content TEXT NOT NULL,
+        status ENUM('queued', 'sending', 'sent', 'failed') NOT NULL DEFAULT 'queued',
+        attempts INT NOT NULL DEFAULT 0,
+        max_attempts INT NOT NULL DEFAULT 5,
+        next_attempt_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+        claimed_by CHAR(32) NULL,
+        claimed_at DATETIME NULL,
+        provider_message_id VARCHAR(64) NULL,
+        provider_status VARCHAR(32) NULL,
+        last_error TEXT NULL,
+        created_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+        sent_at DATETIME NULL,
+        priority TINYINT NOT NULL DEFAULT 0,
+        broadcast_id BIGINT NULL,
+        INDEX idx_sms_outbox_due (status, next_attempt_at),
+        INDEX idx_sms_outbox_claim (claimed_by),
+        INDEX idx_sms_outbox_broadcast (broadcast_id, status)
+    )
+"""
+
+# Lower value is sent first: one-off messages (OTP codes) overtake broadcasts
+PRIORITY_NORMAL = 0
+PRIORITY_BULK = 1
+
+
+def format_phone_number(phone_number):
+    """
+    Format phone numbers for httpsms API.
+    Converts to international format with + prefix.
+
+    Examples:
+    - "09050759425" -> "+639050759425"
+    - "9050759425" -> "+639050759425"
+    - "+639050759425" -> "+639050759425"
+    - "639050759425" -> "+639050759425"
+    """
+    if not phone_number:
+        return None
+
+    # Remove all non-digit characters except leading +
+    cleaned = phone_number.lstrip('+')
+    cleaned = ''.join(c for c in cleaned if c.isdigit())
+
+    # Handle Philippine numbers (add country code 63 if needed)
+    if cleaned.startswith('0'):
+        # Remove leading 0 and add country code
+        cleaned = '63' + cleaned[1:]
+    elif not cleaned.startswith('63'):
+        # Assume it's a Philippine number if no country code
+        cleaned = '63' + cleaned
+
+    # Add + prefix for international format
+    formatted = '+' + cleaned
+
+    # Validate length (most numbers are 10-15 digits after country code)
+    if len(cleaned) < 10 or len(cleaned) > 15:
+        print(f"[v0] Warning: Phone number might be invalid - {formatted}")
+
+    return formatted
+
+
+_NON_DIGITS = re.compile(r"\D")
+
+
+def normalize_phone_numbers(phone_numbers):
+    """
+    Batch version of format_phone_number for bulk sends: same rules, no
+    per-number logging. Returns a list aligned with the input holding the
+    formatted number, or None where the number is missing or has an
+    invalid length.
+    """
+    normalized = []
+    for phone_number in phone_numbers:
+        cleaned = _NON_DIGITS.sub("", phone_number or "")
+        if not cleaned:
+            normalized.append(None)
+            continue
+        if cleaned[0] == "0":
+            cleaned = "63" + cleaned[1:]
+        elif not cleaned.startswith("63"):
+            cleaned = "63" + cleaned
+        normalized.append("+" + cleaned if 10 <= len(cleaned) <= 15 else None)
+    return normalized
+
+
+class TokenBucket:
+    """Thread-safe token bucket: `rate` tokens per second, bursts up to `capacity`."""
+
+    def __init__(self, rate, capacity):
+        self.rate = float(rate)
+        self.capacity = float(capacity)
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def try_acquire(self):
+        """Take a token if one is available; otherwise return seconds until one is."""
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return 0.0
+            return (1 - self._tokens) / self.rate
+
+    def acquire(self, stop_event=None):
+        """Block (the calling worker only) until a token is available."""
+        while True:
+            wait = self.try_acquire()
+            if not wait:
+                return True
+            if stop_event is not None and stop_event.wait(wait):
+                return False
+            if stop_event is None:
+                time.sleep(wait)
+
+    def snapshot(self):
+        with self._lock:
+            self._refill(time.monotonic())
+            return {"rate_per_second": self.rate, "capacity": self.capacity,
+                    "tokens": round(self._tokens, 2)}
+
+
+class CircuitBreaker:
+    """
+    closed -> open after `failure_threshold` consecutive failures;
+    open -> half_open after `reset_timeout` seconds, letting one probe through;
+    the probe's result closes or re-opens it.
+    """
+
+    def __init__(self, failure_threshold, reset_timeout):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def allow(self):
+        with self._lock:
+            if self.state == "closed":
+                return True
+            if self.state == "open" and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = "half_open"
+                self._probing = False
+            if self.state == "half_open" and not self._probing:
+                self._probing = True
+                return True
+            return False
+
+    def retry_after(self):
+        with self._lock:
+            if self.state != "open":
+                return 0.0
+            return max(0.0, self.reset_timeout - (time.monotonic() - self.opened_at))
+
+    def record_success(self):
+        with self._lock:
+            self.state = "closed"
+            self.failures = 0
+            self._probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == "half_open" or self.failures >= self.failure_threshold:
+                if self.state != "open":
+                    print(f"[v0] SMS circuit breaker OPEN after {self.failures} failure(s)")
+                self.state = "open"
+                self.opened_at = time.monotonic()
+                self._probing = False
+
+    def snapshot(self):
+        with self._lock:
+            return {"state": self.state, "consecutive_failures": self.failures}
+
+
+bucket = TokenBucket(RATE_PER_SECOND, BURST)
+breaker = CircuitBreaker(BREAKER_FAILURES, BREAKER_RESET_SECONDS)
+
+_session = requests.Session()
+_session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=max(2, WORKERS)))
+_session.mount("http://", HTTPAdapter(pool_connections=1, pool_maxsize=max(2, WORKERS)))
+
+_wake = threading.Event()
+_stop = threading.Event()
+_workers = []
+_ready = False
+_stats_lock = threading.Lock()
+_stats = {
+    "queued": 0,
+    "sent": 0,
+    "retried": 0,
+    "failed": 0,
+    "rejected_by_breaker": 0,
+    "last_error": None,
+}
+
+
+def _bump(key, amount=1):
+    with _stats_lock:
+        _stats[key] += amount
+
+
+def _api_headers():
+    return {
+        "x-api-key": os.getenv("HTTPSMS_API_KEY") or "",
+        "Content-Type": "application/json",
+    }
+
+
+def check_httpsms_status():
+    """
+    Check httpsms API connectivity and authentication.
+    """
+    api_key = os.getenv("HTTPSMS_API_KEY")
+    from_number = os.getenv("HTTPSMS_FROM_NUMBER")
+
+    print("\n=== HTTPSMS DEBUG CHECK ===")
+    print(f"[v0] API URL: {API_URL}")
+    print(f"[v0] API Key configured: {'Yes' if api_key else 'NO - MISSING'}")
+    print(
+        f"[v0] From Number configured: {from_number if from_number else 'NO - MISSING'}")
+
+    if not api_key or not from_number:
+        print("[v0] ERROR: Missing required environment variables!")
+        return False
+
+    # Test API connectivity
+    try:
+        # Send a test request with minimal payload to check auth
+        test_payload = {
+            "from": format_phone_number(from_number),
+            "to": "+639999999999",  # Dummy number
+            "content": "test"
+        }
+
+        response = _session.post(
+            f"{API_URL}/messages/send", json=test_payload, headers=_api_headers(), timeout=5)
+
+        if response.status_code == 200:
+            print("[v0] ✓ API authentication successful")
+            return True
+        elif response.status_code == 401:
+            print("[v0] ✗ ERROR: Invalid API key (401 Unauthorized)")
+            print(f"[v0] Response: {response.text}")
+            return False
+        elif response.status_code == 400:
+            print("[v0] ✓ API reachable (400 is expected for test payload)")
+            return True
+        else:
+            print(f"[v0] API returned status {response.status_code}")
+            print(f"[v0] Response: {response.text}")
+            return True
+
+    except Exception as e:
+        print(f"[v0] ✗ ERROR: Cannot reach httpsms API: {e}")
+        return False
+
+
+def _post_message(from_number, to_number, content):
+    """
+    One send attempt. Returns (ok, retryable, provider_id, provider_status, error).
+    """
+    payload = {"from": from_number, "to": to_number, "content": content}
+    try:
+        response = _session.post(f"{API_URL}/messages/send", json=payload,
+                                 headers=_api_headers(), timeout=REQUEST_TIMEOUT)
+    except requests.exceptions.RequestException as e:
+        return False, True, None, None, f"{type(e).__name__}: {e}"
+
+    if response.status_code == 200:
+        try:
+            data = response.json().get("data", {}) or {}
+        except ValueError:
+            data = {}
+        status = data.get("status", "unknown")
+        if status == "pending":
+            print(f"[v0] ⚠ SMS to {to_number} accepted but still pending on the httpsms "
+                  f"phone; check that the app is running and {from_number} is registered.")
+        return True, False, data.get("id"), status, None
+
+    retryable = response.status_code in RETRYABLE_STATUS
+    return False, retryable, None, None, f"HTTP {response.status_code}: {response.text[:500]}"
+
+
+def ensure_sms_outbox(conn=None):
+    global _ready
+
+    local_conn = conn or create_connection()
+    if not local_conn:
+        return False
+
+    try:
+        cursor = local_conn.cursor()
+        cursor.execute(SMS_TABLE_SQL)
+        cursor.execute("SHOW COLUMNS FROM sms_outbox")
+        columns = {row[0] for row in cursor.fetchall()}
+        if "broadcast_id" not in columns:
+            print("[v0] Adding broadcast columns to sms_outbox")
+            cursor.execute("""
+                ALTER TABLE sms_outbox
+                    ADD COLUMN priority TINYINT NOT NULL DEFAULT 0,
+                    ADD COLUMN broadcast_id BIGINT NULL,
+                    ADD INDEX idx_sms_outbox_broadcast (broadcast_id, status)
+            """)
+        cursor.close()
+        local_conn.commit()
+        _ready = True
+    except Exception as e:
+        print(f"[v0] SMS outbox unavailable, sending inline: {e}")
+        _ready = False
+    finally:
+        if conn is None:
+            local_conn.close()
+
+    return _ready
+
+
+def init_sms_dispatcher():
+    """Create the outbox table and start the dispatch workers (called once at startup)."""
+    if ensure_sms_outbox():
+        start_workers()
+
+
+def _prepare(to_number, message, from_number):
+    if not to_number or not message:
+        print(
+            f"[v0] Error: Invalid inputs - to_number={to_number}, message_length={len(message) if message else 0}")
+        return None
+
+    if not os.getenv("HTTPSMS_API_KEY"):
+        print(f"[v0] Error: HTTPSMS_API_KEY not set in environment variables")
+        return None
+
+    from_number = from_number or os.getenv("HTTPSMS_FROM_NUMBER")
+    if not from_number:
+        print(
+            f"[v0] Error: from_number not provided and HTTPSMS_FROM_NUMBER not set")
+        return None
+
+    formatted_to = format_phone_number(to_number)
+    formatted_from = format_phone_number(from_number)
+    if not formatted_to or not formatted_from:
+        print(f"[v0] Error: Invalid phone number format")
+        return None
+    return formatted_to, formatted_from
+
+
+def _send_inline(formatted_to, formatted_from, message):
+    # Outbox unavailable: one attempt, still rate limited and breaker guarded
+    if not breaker.allow():
+        _bump("rejected_by_breaker")
+        return False
+    bucket.acquire()
+    ok, retryable, _, _, error = _post_message(formatted_from, formatted_to, message)
+    if ok or not retryable:
+        breaker.record_success()
+    else:
+        breaker.record_failure()
+    if ok:
+        _bump("sent")
+    else:
+        print(f"[v0] SMS to {formatted_to} failed: {error}")
+    return ok
+
+
+def queue_sms(to_number, message, from_number=None, max_attempts=MAX_ATTEMPTS, conn=None):
+    """
+    Queue an SMS for the dispatcher and return its sms_id immediately.
+    Returns None if the message is invalid or could not be stored, and 0
+    when the outbox is unavailable and the message was sent inline.
+    """
+    prepared = _prepare(to_number, message, from_number)
+    if not prepared:
+        return None
+    formatted_to, formatted_from = prepared
+
+    local_conn = conn or create_connection()
+    if not _ready or not local_conn:
+        if local_conn and conn is None:
+            local_conn.close()
+        return 0 if _send_inline(formatted_to, formatted_from, message) else None
+
+    try:
+        cursor = local_conn.cursor()
+        cursor.execute("""
+            INSERT INTO sms_outbox (to_number, from_number, content, max_attempts)
+            VALUES (%s, %s, %s, %s)
+        """, (formatted_to, formatted_from, message, max(1, int(max_attempts))))
+        sms_id = cursor.lastrowid
+        cursor.close()
+        local_conn.commit()
+    except Exception as e:
+        print(f"[v0] Could not queue SMS to {formatted_to}: {e}")
+        return None
+    finally:
+        if conn is None:
+            local_conn.close()
+
+    _bump("queued")
+    _wake.set()
+    print(f"[v0] SMS {sms_id} queued for {formatted_to}")
+    return sms_id
+
+
+def queue_sms_batch(conn, formatted_numbers, message, broadcast_id=None,
+                    from_number=None, max_attempts=MAX_ATTEMPTS):
+    """
+    Queue one message to many already-normalized numbers with a single
+    multi-row INSERT at bulk priority. Commits and returns the row count.
+    """
+    from_number = format_phone_number(from_number or os.getenv("HTTPSMS_FROM_NUMBER"))
+    if not formatted_numbers or not from_number:
+        return 0
+
+    cursor = conn.cursor()
+    try:
+        cursor.executemany("""
+            INSERT INTO sms_outbox
+                (to_number, from_number, content, max_attempts, priority, broadcast_id)
+            VALUES (%s, %s, %s, %s, %s, %s)
+        """, [(number, from_number, message, max_attempts, PRIORITY_BULK, broadcast_id)
+              for number in formatted_numbers])
+        conn.commit()
+    finally:
+        cursor.close()
+
+    _bump("queued", len(formatted_numbers))
+    _wake.set()
+    return len(formatted_numbers)
+
+
+def send_sms(to_number, message, from_number=None, max_retries=2):
+    """
+    Queue an SMS via the dispatcher. Returns True once it is accepted;
+    delivery happens in the background (see get_sms_status).
+    """
+    return queue_sms(to_number, message, from_number, max_attempts=max_retries + 1) is not None
+
+
+def get_sms_status(sms_id):
+    conn = create_connection()
+    if not conn:
+        return None
+    try:
+        return run_query(conn, """
+            SELECT sms_id, to_number, status, attempts, max_attempts, provider_message_id,
+                   provider_status, last_error, created_at, sent_at, next_attempt_at
+            FROM sms_outbox WHERE sms_id = %s
+        """, (sms_id,), fetch="one")
+    finally:
+        conn.close()
+
+
+# ----- dispatch workers -----
+
+def start_workers():
+    if _workers and any(w.is_alive() for w in _workers):
+        return
+    _stop.clear()
+    del _workers[:]
+    for i in range(max(1, WORKERS)):
+        worker = threading.Thread(target=_worker_loop, name=f"sms-dispatch-{i}", daemon=True)
+        worker.start()
+        _workers.append(worker)
+    print(f"[v0] SMS dispatcher started with {len(_workers)} worker(s)")
+
+
+def stop_workers(timeout=5):
+    _stop.set()
+    _wake.set()
+    for worker in _workers:
+        worker.join(timeout)
+
+
+def _worker_loop():
+    while not _stop.is_set():
+        try:
+            worked = _process_batch()
+        except Exception:
+            traceback.print_exc()
+            worked = False
+
+        if not worked:
+            _wake.wait(POLL_INTERVAL)
+            _wake.clear()
+
+
+def _claim_batch(conn, token):
+    cursor = conn.cursor(dictionary=True)
+    try:
+        cursor.execute("""
+            UPDATE sms_outbox
+            SET status = 'sending', claimed_by = %s, claimed_at = NOW()
+            WHERE (status = 'queued' AND next_attempt_at <= NOW())
+               OR (status = 'sending' AND claimed_at < NOW() - INTERVAL %s SECOND)
+            ORDER BY priority, sms_id
+            LIMIT %s
+        """, (token, CLAIM_TIMEOUT_SECONDS, BATCH_SIZE))
+        conn.commit()
+        cursor.execute("""
+            SELECT sms_id, to_number, from_number, content, attempts, max_attempts
+            FROM sms_outbox WHERE claimed_by = %s AND status = 'sending'
+            ORDER BY sms_id
+        """, (token,))
+        return cursor.fetchall()
+    finally:
+        cursor.close()
+
+
+def _backoff(attempts):
+    # "Full jitter": spreads retries out so they don't arrive in lockstep
+    return random.uniform(0, min(BACKOFF_MAX_SECONDS, BACKOFF_BASE_SECONDS * (2 ** attempts)))
+
+
+def _release(conn, row, delay):
+    """Put a claimed row back without counting an attempt (breaker open / shutdown)."""
+    run_query(conn, """
+        UPDATE sms_outbox
+        SET status = 'queued', claimed_by = NULL, next_attempt_at = NOW() + INTERVAL %s SECOND
+        WHERE sms_id = %s
+    """, (int(delay), row["sms_id"]))
+
+
+def _record_result(conn, row, ok, retryable, provider_id, provider_status, error):
+    attempts = row["attempts"] + 1
+    if ok:
+        run_query(conn, """
+            UPDATE sms_outbox
+            SET status = 'sent', attempts = %s, sent_at = NOW(), claimed_by = NULL,
+                provider_message_id = %s, provider_status = %s, last_error = NULL
+            WHERE sms_id = %s
+        """, (attempts, provider_id, provider_status, row["sms_id"]))
+        _bump("sent")
+        return
+
+    if retryable and attempts < row["max_attempts"]:
+        status, delay = "queued", _backoff(attempts)
+        _bump("retried")
+    else:
+        status, delay = "failed", 0
+        _bump("failed")
+    run_query(conn, """
+        UPDATE sms_outbox
+        SET status = %s, attempts = %s, next_attempt_at = NOW() + INTERVAL %s SECOND,
+            claimed_by = NULL, last_error = %s
+        WHERE sms_id = %s
+    """, (status, attempts, int(delay), (error or "")[:2000], row["sms_id"]))
+    with _stats_lock:
+        _stats["last_error"] = (error or "")[:500]
+    print(f"[v0] SMS {row['sms_id']} attempt {attempts} failed ({status}): {error}")
+
+
+def _process_batch():
+    conn = create_connection()
+    if not conn:
+        return False
+
+    try:
+        rows = _claim_batch(conn, uuid.uuid4().hex)
+        if not rows:
+            return False
+
+        for index, row in enumerate(rows):
+            if _stop.is_set():
+                for pending in rows[index:]:
+                    _release(conn, pending, 0)
+                break
+
+            if not breaker.allow():
+                # Provider is down: hand the rest back untouched until the breaker resets
+                delay = breaker.retry_after() or POLL_INTERVAL
+                for pending in rows[index:]:
+                    _release(conn, pending, delay)
+                _bump("rejected_by_breaker", len(rows) - index)
+                break
+
+            if not bucket.acquire(_stop):
+                for pending in rows[index:]:
+                    _release(conn, pending, 0)
+                break
+
+            ok, retryable, provider_id, provider_status, error = _post_message(
+                row["from_number"], row["to_number"], row["content"])
+            if ok or not retryable:
+                # A 4xx still means httpsms is up; only provider/network trouble trips the breaker
+                breaker.record_success()
+            else:
+                breaker.record_failure()
+            _record_result(conn, row, ok, retryable, provider_id, provider_status, error)
+        return True
+    finally:
+        conn.close()
+
+
+def get_sms_stats():
+    with _stats_lock:
+        snapshot = dict(_stats)
+    snapshot.update({
+        "api_url": API_URL,
+        "outbox": "ready" if _ready else "unavailable (sending inline)",
+        "workers_alive": sum(1 for w in _workers if w.is_alive()),
+        "rate_limit": bucket.snapshot(),
+        "circuit_breaker": breaker.snapshot(),
+    })
+
+    conn = create_connection()
+    if conn:
+        try:
+            rows = run_query(conn, """
+                SELECT status, COUNT(*) AS total FROM sms_outbox GROUP BY status
+            """, fetch="all") or []
+            snapshot["by_status"] = {r["status"]: int(r["total"]) for r in rows}
+        finally:
+            conn.close()
+    return snapshot
+
+
+# ----- local fake httpsms server (for testing) -----
+
+def run_fake_httpsms(port=8787, failure_rate=0.0):
+    """
+    Minimal stand-in for POST /v1/messages/send. `failure_rate` of the
+    requests get a 503 so retries and the circuit breaker can be exercised.
+    """
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+            if self.path.rstrip("/") != "/v1/messages/send":
+                code, reply = 404, {"status": "error", "message": "not found"}
+            elif random.random() < failure_rate:
+                code, reply = 503, {"status": "error", "message": "unavailable"}
+            else:
+                code, reply = 200, {"status": "success", "data": {
+                    "id": str(uuid.uuid4()), "status": "sent",
+                    "from": body.get("from"), "to": body.get("to")}}
+            payload = json.dumps(reply).encode()
+            self.send_response(code)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, fmt, *args):
+            print(f"[fake-httpsms] {fmt % args}")
+
+    print(f"[fake-httpsms] listening on http://127.0.0.1:{port}/v1")
+    ThreadingHTTPServer(("127.0.0.1", port), Handler).serve_forever()
+
+
+# Test script
+if __name__ == "__main__":
+    import sys
+
+    if len(sys.argv) > 1 and sys.argv[1] == "--fake-server":
+        run_fake_httpsms(int(sys.argv[2]) if len(sys.argv) > 2 else 8787,
+                         float(sys.argv[3]) if len(sys.argv) > 3 else 0.0)
+    else:
+        # Run diagnostic check
+        check_httpsms_status()
+
+        # Test send
+        print("\n[v0] Attempting to send test SMS...")
+        start_workers()
+        print(send_sms("+639928037409", "Test message from httpsms"))
+        time.sleep(3)
+        print(get_sms_stats())
@@ -0,0 +1,313 @@
+from db_connection import create_connection, run_query
+from datetime import datetime
+import json
+import os
+import threading
+import time
+import traceback
+
+from .send_sms import RATE_PER_SECOND, normalize_phone_numbers, queue_sms_batch
+
+# Bulk SMS broadcasts (job fairs, expiry reminders).
+#
+# start_broadcast() records the campaign and returns at once; a background
+# thread walks the matching applicants in keyset pages of CHUNK_SIZE,
+# normalizes and de-duplicates their numbers, and queues each page into
+# sms_outbox with one multi-row INSERT at bulk priority. The SMS dispatcher
+# then sends them under its shared rate limit, so OTP messages still go
+# first. Progress and throughput come from the broadcast's outbox rows.
+
+CHUNK_SIZE = int(os.getenv("SMS_BROADCAST_CHUNK", 500))
+MAX_RECIPIENTS = int(os.getenv("SMS_BROADCAST_MAX_RECIPIENTS", 20000))
+MAX_MESSAGE_LENGTH = 480  # three concatenated SMS segments
+
+BROADCASTS_TABLE_SQL = """
+    CREATE TABLE IF NOT EXISTS sms_broadcasts (
+        broadcast_id BIGINT AUTO_INCREMENT PRIMARY KEY,
+        message TEXT NOT NULL,
+        filters TEXT NULL,
+        status ENUM('pending', 'queueing', 'queued', 'cancelled', 'failed') NOT NULL DEFAULT 'pending',
+        matched INT NOT NULL DEFAULT 0,
+        invalid_numbers INT NOT NULL DEFAULT 0,
+        duplicates INT NOT NULL DEFAULT 0,
+        queued INT NOT NULL DEFAULT 0,
+        created_by INT NULL,
+        created_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+        started_at DATETIME NULL,
+        queued_at DATETIME NULL,
+        error TEXT NULL,
+        INDEX idx_sms_broadcasts_created (created_at)
+    )
+"""
+
+_tables_ready = False
+
+
+def ensure_broadcast_tables(conn=None):
+    global _tables_ready
+    if _tables_ready:
+        return True
+
+    local_conn = conn or create_connection()
+    if not local_conn:
+        return False
+
+    try:
+        cursor = local_conn.cursor()
+        cursor.execute(BROADCASTS_TABLE_SQL)
+        cursor.close()
+        local_conn.commit()
+        _tables_ready = True
+    except Exception as e:
+        print(f"[v0] SMS broadcast table unavailable: {e}")
+    finally:
+        if conn is None:
+            local_conn.close()
+    return _tables_ready
+
+
+def iter_recipient_pages(conn, where_sql, params, chunk_size=CHUNK_SIZE):
+    """
+    Yield lists of applicant rows (applicant_id, phone) matching the filter,
+    one keyset page at a time, so memory stays flat however many match.
+    """
+    last_id = 0
+    while True:
+        rows = run_query(conn, f"""
+            SELECT a.applicant_id, a.phone
+            FROM applicants a
+            WHERE {where_sql}
+              AND a.phone IS NOT NULL AND a.phone <> ''
+              AND a.applicant_id > %s
+            ORDER BY a.applicant_id
+            LIMIT %s
+        """, (*params, last_id, chunk_size), fetch="all") or []
+        if not rows:
+            return
+        yield rows
+        if len(rows) < chunk_size:
+            return
+        last_id = rows[-1]["applicant_id"]
+
+
+def preview_broadcast(where_sql, params):
+    """Dry run: how many applicants match and how many distinct valid numbers that gives."""
+    conn = create_connection()
+    if not conn:
+        return None
+    try:
+        seen = set()
+        summary = {"matched": 0, "invalid_numbers": 0, "duplicates": 0}
+        for rows in iter_recipient_pages(conn, where_sql, params):
+            summary["matched"] += len(rows)
+            for number in normalize_phone_numbers([row["phone"] for row in rows]):
+                if number is None:
+                    summary["invalid_numbers"] += 1
+                elif number in seen:
+                    summary["duplicates"] += 1
+                else:
+                    seen.add(number)
+        summary["recipients"] = len(seen)
+        summary["estimated_seconds"] = round(len(seen) / RATE_PER_SECOND) if RATE_PER_SECOND else None
+        return summary
+    finally:
+        conn.close()
+
+
+def start_broadcast(message, where_sql, params, filters=None, created_by=None):
+    """
+    Record a broadcast and queue its recipients in a background thread.
+    Returns the broadcast_id (None if the broadcast could not be created).
+    """
+    message = (message or "").strip()
+    if not message or len(message) > MAX_MESSAGE_LENGTH:
+        raise ValueError(f"Message must be 1-{MAX_MESSAGE_LENGTH} characters")
+
+    conn = create_connection()
+    if not conn:
+        return None
+    try:
+        ensure_broadcast_tables(conn)
+        cursor = conn.cursor()
+        cursor.execute("""
+            INSERT INTO sms_broadcasts (message, filters, created_by)
+            VALUES (%s, %s, %s)
+        """, (message, json.dumps(filters or {}, default=str), created_by))
+        broadcast_id = cursor.lastrowid
+        cursor.close()
+        conn.commit()
+    finally:
+        conn.close()
+
+    threading.Thread(
+        target=_queue_recipients,
+        args=(broadcast_id, message, where_sql, tuple(params)),
+        name=f"sms-broadcast-{broadcast_id}",
+        daemon=True,
+    ).start()
+    print(f"[v0] SMS broadcast {broadcast_id} started")
+    return broadcast_id
+
+
+def _update_broadcast(conn, broadcast_id, **fields):
+    assignments = ", ".join(f"{name} = %s" for name in fields)
+    run_query(conn, f"UPDATE sms_broadcasts SET {assignments} WHERE broadcast_id = %s",
+              (*fields.values(), broadcast_id))
+
+
+def _queue_recipients(broadcast_id, message, where_sql, params):
+    conn = create_connection()
+    if not conn:
+        print(f"[v0] SMS broadcast {broadcast_id}: DB connection failed")
+        return
+
+    started = time.monotonic()
+    counts = {"matched": 0, "invalid_numbers": 0, "duplicates": 0, "queued": 0}
+    seen = set()
+    try:
+        _update_broadcast(conn, broadcast_id, status="queueing", started_at=datetime.now())
+
+        for rows in iter_recipient_pages(conn, where_sql, params):
+            # Lock the broadcast row until this page is committed: a cancel
+            # waits for the page and then drops it with the rest, or lands
+            # first and is seen here
+            state = run_query(conn, "SELECT status FROM sms_broadcasts WHERE broadcast_id = %s FOR UPDATE",
+                              (broadcast_id,), fetch="one")
+            if not state or state["status"] == "cancelled":
+                conn.rollback()
+                print(f"[v0] SMS broadcast {broadcast_id} cancelled while queueing")
+                return
+
+            counts["matched"] += len(rows)
+            batch = []
+            for number in normalize_phone_numbers([row["phone"] for row in rows]):
+                if number is None:
+                    counts["invalid_numbers"] += 1
+                elif number in seen:
+                    counts["duplicates"] += 1
+                else:
+                    seen.add(number)
+                    batch.append(number)
+
+            room = MAX_RECIPIENTS - counts["queued"]
+            # Commits, which releases the lock
+            counts["queued"] += queue_sms_batch(conn, batch[:room], message, broadcast_id)
+            conn.commit()
+            _update_broadcast(conn, broadcast_id, **counts)
+            if counts["queued"] >= MAX_RECIPIENTS:
+                print(f"[v0] SMS broadcast {broadcast_id} capped at {MAX_RECIPIENTS} recipients")
+                break
+
+        # Conditional so a cancel that raced the last page is not overwritten
+        run_query(conn, """
+            UPDATE sms_broadcasts
+            SET status = 'queued', queued_at = NOW(), matched = %s,
+                invalid_numbers = %s, duplicates = %s, queued = %s
+            WHERE broadcast_id = %s AND status = 'queueing'
+        """, (counts["matched"], counts["invalid_numbers"], counts["duplicates"],
+              counts["queued"], broadcast_id))
+        print(f"[v0] SMS broadcast {broadcast_id}: queued {counts['queued']} of {counts['matched']} "
+              f"matched in {time.monotonic() - started:.1f}s "
+              f"({counts['invalid_numbers']} invalid, {counts['duplicates']} duplicate)")
+    except Exception as e:
+        traceback.print_exc()
+        _update_broadcast(conn, broadcast_id, status="failed", error=str(e)[:2000], **counts)
+    finally:
+        conn.close()
+
+
+def cancel_broadcast(broadcast_id):
+    """Stop queueing and drop the broadcast's messages that have not been sent yet."""
+    conn = create_connection()
+    if not conn:
+        return None
+    try:
+        cursor = conn.cursor()
+        # Waits for a page being queued (it holds the row lock), so that
+        # page's rows are already in the outbox for the drop below
+        cursor.execute("""
+            UPDATE sms_broadcasts SET status = 'cancelled'
+            WHERE broadcast_id = %s AND status IN ('pending', 'queueing', 'queued')
+        """, (broadcast_id,))
+        cursor.execute("""
+            UPDATE sms_outbox SET status = 'failed', last_error = 'broadcast cancelled'
+            WHERE broadcast_id = %s AND status = 'queued'
+        """, (broadcast_id,))
+        dropped = cursor.rowcount
+        cursor.close()
+        conn.commit()
+        return dropped
+    finally:
+        conn.close()
+
+
+def _progress(conn, broadcast):
+    rows = run_query(conn, """
+        SELECT status, COUNT(*) AS total, MIN(sent_at) AS first_sent, MAX(sent_at) AS last_sent
+        FROM sms_outbox WHERE broadcast_id = %s GROUP BY status
+    """, (broadcast["broadcast_id"],), fetch="all") or []
+    by_status = {row["status"]: int(row["total"]) for row in rows}
+    sent_row = next((row for row in rows if row["status"] == "sent"), None)
+
+    sent = by_status.get("sent", 0)
+    remaining = by_status.get("queued", 0) + by_status.get("sending", 0)
+    done = sent + by_status.get("failed", 0)
+    progress = {
+        "by_status": by_status,
+        "percent_done": round(100.0 * done / broadcast["queued"], 1) if broadcast["queued"] else 0.0,
+        "messages_per_second": None,
+        "eta_seconds": None,
+    }
+    if sent_row and sent_row["first_sent"] and sent_row["last_sent"] and sent > 1:
+        elapsed = (sent_row["last_sent"] - sent_row["first_sent"]).total_seconds()
+        if elapsed > 0:
+            rate = sent / elapsed
+            progress["messages_per_second"] = round(rate, 2)
+            progress["eta_seconds"] = round(remaining / rate) if remaining else 0
+    return progress
+
+
+def _serialize(broadcast):
+    result = dict(broadcast)
+    for key in ("created_at", "started_at", "queued_at"):
+        if result.get(key):
+            result[key] = result[key].isoformat()
+    if result.get("filters"):
+        try:
+            result["filters"] = json.loads(result["filters"])
+        except ValueError:
+            pass
+    return result
+
+
+def get_broadcast(broadcast_id):
+    conn = create_connection()
+    if not conn:
+        return None
+    try:
+        broadcast = run_query(conn, "SELECT * FROM sms_broadcasts WHERE broadcast_id = %s",
+                              (broadcast_id,), fetch="one")
+        if not broadcast:
+            return None
+        result = _serialize(broadcast)
+        result["progress"] = _progress(conn, broadcast)
+        return result
+    finally:
+        conn.close()
+
+
+def list_broadcasts(limit=20):
+    conn = create_connection()
+    if not conn:
+        return []
+    try:
+        if not ensure_broadcast_tables(conn):
+            return []
+        rows = run_query(conn, """
+            SELECT broadcast_id, message, status, matched, invalid_numbers, duplicates,
+                   queued, created_by, created_at, started_at, queued_at, error
+            FROM sms_broadcasts ORDER BY broadcast_id DESC LIMIT %s
+        """, (limit,), fetch="all") or []
+        return [_serialize(row) for row in rows]
+    finally:
+        conn.close()
@@ -1,26 +1,284 @@
 import os
+import time
+import threading
+from collections import deque
+from contextlib import contextmanager
 import mysql.connector
 from mysql.connector import Error
+from mysql.connector.errors import InterfaceError
 from dotenv import load_dotenv
+from flask import g, has_app_context
 import logging
 
 # Load environment variables
 load_dotenv()
 
 
+class PoolTimeout(Error):
+    """Raised when no pooled connection frees up within the checkout timeout."""
+
+
+class PooledConnection:
+    """
+    Thin proxy around a pooled MySQL connection.
+
+    Behaves like the raw connection for every attribute (cursor, commit,
+    rollback, is_connected, ...) except close(), which hands the connection
+    back to the pool instead of tearing down the socket. close() is
+    idempotent so the existing "close in try and again in finally" callers
+    keep working.
+    """
+
+    def __init__(self, pool, raw, created_at):
+        self._pool = pool
+        self._raw = raw
+        self._created_at = created_at
+
+    def __getattr__(self, name):
+        raw = self.__dict__.get("_raw")
+        if raw is None:
+            raise InterfaceError(msg="Connection already returned to the pool")
+        return getattr(raw, name)
+
+    def is_connected(self):
+        return self._raw is not None and self._raw.is_connected()
+
+    def close(self):
+        raw, self._raw = self._raw, None
+        if raw is not None:
+            self._pool._release(raw, self._created_at)
+
+    def invalidate(self):
+        """Drop the underlying connection instead of returning it to the pool."""
+        raw, self._raw = self._raw, None
+        if raw is not None:
+            self._pool._release(raw, self._created_at, invalidate=True)
+
+    def __del__(self):
+        # Safety net for callers that forget to close().
+        try:
+            self.close()
+        except Exception:
+            pass
+
+
+class ConnectionPool:
+    """
+    Fixed-size MySQL connection pool with bounded overflow.
+
+    - size:          connections kept open between requests
+    - max_overflow:  extra short-lived connections allowed under burst load
+    - timeout:       seconds to wait for a free connection before giving up
+    - recycle:       connections older than this (seconds) are reopened
+    - ping_interval: connections idle longer than this are pinged on checkout
+    """
+
+    def __init__(self, connect_kwargs, size=5, max_overflow=10, timeout=10,
+                 recycle=1800, ping_interval=10):
+        self._connect_kwargs = connect_kwargs
+        self.size = size
+        self.max_overflow = max_overflow
+        self.timeout = timeout
+        self.recycle = recycle
+        self.ping_interval = ping_interval
+
+        self._idle = deque()  # (raw, created_at, last_used)
+        self._lock = threading.Condition()
+        self._open = 0        # connections currently owned by the pool (idle + in use)
+        self._in_use = 0
+
+        self._stats = {
+            "checkouts": 0,
+            "connections_created": 0,
+            "connections_recycled": 0,
+            "health_check_failures": 0,
+            "timeouts": 0,
+            "wait_time_total": 0.0,
+            "wait_time_max": 0.0,
+            "overflow_peak": 0,
+        }
+
+    # ----- checkout / checkin -----
+
+    def connect(self):
+        started = time.monotonic()
+        deadline = started + self.timeout
+
+        with self._lock:
+            while True:
+                if self._idle:
+                    raw, created_at, last_used = self._idle.pop()
+                    self._in_use += 1
+                    break
+                if self._open < self.size + self.max_overflow:
+                    raw = None
+                    self._open += 1
+                    self._in_use += 1
+                    overflow = max(0, self._open - self.size)
+                    if overflow > self._stats["overflow_peak"]:
+                        self._stats["overflow_peak"] = overflow
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._stats["timeouts"] += 1
+                    raise PoolTimeout(
+                        msg=f"No pooled connection available after {self.timeout}s")
+                self._lock.wait(remaining)
+
+        # Network work happens outside the lock
+        try:
+            if raw is not None:
+                raw, created_at = self._validate(raw, created_at, last_used)
+            if raw is None:
+                raw = mysql.connector.connect(**self._connect_kwargs)
+                created_at = time.monotonic()
+                with self._lock:
+                    self._stats["connections_created"] += 1
+        except Exception:
+            with self._lock:
+                self._open -= 1
+                self._in_use -= 1
+                self._lock.notify()
+            raise
+
+        waited = time.monotonic() - started
+        with self._lock:
+            self._stats["checkouts"] += 1
+            self._stats["wait_time_total"] += waited
+            if waited > self._stats["wait_time_max"]:
+                self._stats["wait_time_max"] = waited
+
+        return PooledConnection(self, raw, created_at)
+
+    def _validate(self, raw, created_at, last_used):
+        """Return (raw, created_at), or (None, None) if it must be reopened."""
+        now = time.monotonic()
+
+        if self.recycle and now - created_at > self.recycle:
+            self._close_quietly(raw)
+            with self._lock:
+                self._stats["connections_recycled"] += 1
+            return None, None
+
+        if now - last_used > self.ping_interval:
+            try:
+                raw.ping(reconnect=False)
+            except Exception:
+                self._close_quietly(raw)
+                with self._lock:
+                    self._stats["health_check_failures"] += 1
+                return None, None
+
+        return raw, created_at
+
+    def _release(self, raw, created_at, invalidate=False):
+        if not invalidate:
+            # Never hand a half-finished transaction to the next borrower
+            try:
+                if raw.in_transaction:
+                    raw.rollback()
+            except Exception:
+                invalidate = True
+
+        with self._lock:
+            self._in_use -= 1
+            keep = (not invalidate
+                    and self._open <= self.size
+                    and not (self.recycle and time.monotonic() - created_at > self.recycle))
+            if keep:
+                self._idle.append((raw, created_at, time.monotonic()))
+            else:
+                self._open -= 1
+            self._lock.notify()
+
+        if not keep:
+            self._close_quietly(raw)
+
+    @staticmethod
+    def _close_quietly(raw):
+        try:
+            raw.close()
+        except Exception:
+            pass
+
+    # ----- maintenance / metrics -----
+
+    def dispose(self):
+        """Close every idle connection (checked-out ones close on release)."""
+        with self._lock:
+            idle = list(self._idle)
+            self._idle.clear()
+            self._open -= len(idle)
+        for raw, _, _ in idle:
+            self._close_quietly(raw)
+
+    def stats(self):
+        with self._lock:
+            snapshot = dict(self._stats)
+            snapshot.update({
+                "size": self.size,
+                "max_overflow": self.max_overflow,
+                "open": self._open,
+                "idle": len(self._idle),
+                "in_use": self._in_use,
+                "overflow": max(0, self._open - self.size),
+            })
+        checkouts = snapshot["checkouts"]
+        snapshot["wait_time_avg"] = (
+            snapshot["wait_time_total"] / checkouts if checkouts else 0.0)
+        return snapshot
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _connect_kwargs():
+    return {
+        "host": os.getenv("DB_HOST", "localhost"),
+        "port": int(os.getenv("DB_PORT", 3306)),
+        "user": os.getenv("DB_USER", "root"),
+        "password": os.getenv("DB_PASSWORD", ""),
+        "database": os.getenv("DB_NAME", "peso_smarthire"),
+    }
+
+
+def get_pool():
+    """Return the process-wide connection pool, creating it on first use."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ConnectionPool(
+                    _connect_kwargs(),
+                    size=int(os.getenv("DB_POOL_SIZE", 5)),
+                    max_overflow=int(os.getenv("DB_POOL_MAX_OVERFLOW", 10)),
+                    timeout=float(os.getenv("DB_POOL_TIMEOUT", 10)),
+                    recycle=float(os.getenv("DB_POOL_RECYCLE", 1800)),
+                    ping_interval=float(os.getenv("DB_POOL_PING_INTERVAL", 10)),
+                )
+    return _pool
+
+
+def get_pool_stats():
+    """Pool metrics (wait time, in-use, overflow, ...) for monitoring endpoints."""
+    return get_pool().stats()
+
+
 def create_connection():
     """
-    Create a database connection using environment variables.
+    Borrow a database connection from the pool.
+
+    Callers use it exactly like a plain mysql.connector connection;
+    conn.close() returns it to the pool. Set DB_POOL_ENABLED=0 to fall back
+    to one fresh connection per call.
     """
     try:
-        connection = mysql.connector.connect(
-            host=os.getenv("DB_HOST", "localhost"),
-            port=int(os.getenv("DB_PORT", 3306)),
-            user=os.getenv("DB_USER", "root"),
-            password=os.getenv("DB_PASSWORD", ""),
-            database=os.getenv("DB_NAME", "peso_smarthire")
-        )
+        if os.getenv("DB_POOL_ENABLED", "1") != "0":
+            # Health-checked on checkout, no extra ping needed here
+            return get_pool().connect()
 
+        connection = mysql.connector.connect(**_connect_kwargs())
         if connection.is_connected():
             return connection
 
@@ -29,6 +287,120 @@ def create_connection():
         return None
 
 
+class ScopedConnection:
+    """
+    Request/app-context scoped handle returned by get_db().
+
+    Every helper that calls get_db() during the same request (or scheduler
+    app context) receives this same handle. close() is a no-op; the real
+    connection is committed or rolled back and returned to the pool by
+    close_db() at teardown. Inside db_transaction() commit() is deferred so
+    nested helpers join the caller's transaction.
+    """
+
+    def __init__(self, conn):
+        self._conn = conn
+        self._tx_depth = 0
+        self._rollback_only = False
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+    def close(self):
+        pass
+
+    def commit(self):
+        if self._tx_depth:
+            return
+        self._conn.commit()
+
+    def rollback(self):
+        if self._tx_depth:
+            # Let the outermost db_transaction() undo everything at once
+            self._rollback_only = True
+            return
+        self._conn.rollback()
+
+
+def get_db():
+    """
+    Return the connection shared by everything running in the current
+    app context, borrowing it from the pool on first use.
+    Outside an app context this behaves like create_connection().
+    """
+    if not has_app_context():
+        return create_connection()
+
+    scoped = g.get("_db_conn")
+    if scoped is None:
+        conn = create_connection()
+        if not conn:
+            return None
+        scoped = g._db_conn = ScopedConnection(conn)
+    return scoped
+
+
+@contextmanager
+def db_transaction():
+    """
+    Run a block (and every get_db() helper it calls) as one transaction.
+
+        with db_transaction() as conn:
+            run_query(conn, ...)
+            create_notification(...)   # joins the same transaction
+    """
+    owned = not has_app_context()
+    scoped = ScopedConnection(create_connection()) if owned else get_db()
+    if scoped is None or scoped._conn is None:
+        raise Error(msg="Database connection failed")
+
+    scoped._tx_depth += 1
+    try:
+        yield scoped
+    except Exception:
+        scoped._tx_depth -= 1
+        if scoped._tx_depth == 0:
+            scoped._rollback_only = False
+            scoped._conn.rollback()
+        else:
+            scoped._rollback_only = True
+        raise
+    else:
+        scoped._tx_depth -= 1
+        if scoped._tx_depth == 0:
+            if scoped._rollback_only:
+                scoped._rollback_only = False
+                scoped._conn.rollback()
+            else:
+                scoped._conn.commit()
+    finally:
+        if owned:
+            scoped._conn.close()
+
+
+def close_db(exc=None):
+    """Teardown hook: commit (or roll back on error) and release the shared connection."""
+    scoped = g.pop("_db_conn", None)
+    if scoped is None:
+        return
+
+    conn = scoped._conn
+    try:
+        if exc is None and not scoped._rollback_only:
+            conn.commit()
+        else:
+            conn.rollback()
+    except Error as e:
+        logging.error(f"Error finishing request transaction: {e}")
+    finally:
+        conn.close()
+
+
+def register_db_teardown(app):
+    """Release request-scoped connections when each app context ends."""
+    app.teardown_appcontext(close_db)
+
+
 def run_query(connection, query, params=None, fetch=None):
     """
     Execute a SQL query.
@@ -0,0 +1,140 @@
+"""
+Load test for the live update stream (backend/event_hub.py, backend/events.py).
+
+In-process (no server or database needed) - N subscribers block in
+EventHub.wait() like /api/events/stream does, a publisher sends events to
+random channels, and delivery latency is reported:
+
+    python scripts/sse_load_test.py --clients 500 --events 2000
+
+Against a running server - opens N real SSE connections with a logged-in
+session cookie and holds them, counting events, heartbeats and errors:
+
+    python scripts/sse_load_test.py --url http://localhost:5000/api/events/stream \
+        --cookie "session=..." --clients 300 --duration 60
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import threading
+import time
+import urllib.request
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend"))
+
+
+def _percentile(values, pct):
+    if not values:
+        return None
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+
+def run_in_process(clients, events, channels, rate):
+    from event_hub import EventHub
+
+    hub = EventHub()
+    stop = threading.Event()
+    lock = threading.Lock()
+    latencies = []
+    received = [0]
+    resyncs = [0]
+
+    def subscriber(channel):
+        cursor = hub.version
+        while not stop.is_set():
+            batch, cursor = hub.wait([channel], cursor, timeout=1)
+            now = time.perf_counter()
+            with lock:
+                for _, event, data in batch:
+                    if event == "resync":
+                        resyncs[0] += 1
+                    else:
+                        received[0] += 1
+                        latencies.append(now - data["sent"])
+
+    subscribers = [threading.Thread(target=subscriber, args=(f"applicant:{i % channels}",), daemon=True)
+                   for i in range(clients)]
+    for thread in subscribers:
+        thread.start()
+    while hub.stats()["waiting_clients"] < clients:
+        time.sleep(0.01)
+
+    expected = 0
+    started = time.perf_counter()
+    for _ in range(events):
+        channel = random.randrange(channels)
+        expected += sum(1 for i in range(clients) if i % channels == channel)
+        hub.publish(f"applicant:{channel}", "notification", {"sent": time.perf_counter()})
+        if rate:
+            time.sleep(1 / rate)
+    publish_seconds = time.perf_counter() - started
+
+    deadline = time.monotonic() + 10
+    while received[0] + resyncs[0] < expected and time.monotonic() < deadline:
+        time.sleep(0.05)
+    stop.set()
+
+    print(f"clients={clients} channels={channels} events={events} publish_seconds={publish_seconds:.2f}")
+    print(f"deliveries expected={expected} received={received[0]} resyncs={resyncs[0]}")
+    if latencies:
+        print("latency ms: p50={:.2f} p95={:.2f} p99={:.2f} max={:.2f} mean={:.2f}".format(
+            _percentile(latencies, 50) * 1000, _percentile(latencies, 95) * 1000,
+            _percentile(latencies, 99) * 1000, max(latencies) * 1000,
+            statistics.mean(latencies) * 1000))
+
+
+def run_http(url, cookie, clients, duration):
+    stats = {"connected": 0, "events": 0, "heartbeats": 0, "errors": 0}
+    lock = threading.Lock()
+    deadline = time.monotonic() + duration
+
+    def stream():
+        request = urllib.request.Request(url, headers={"Cookie": cookie, "Accept": "text/event-stream"})
+        try:
+            with urllib.request.urlopen(request, timeout=30) as response:
+                with lock:
+                    stats["connected"] += 1
+                for raw in response:
+                    line = raw.decode("utf-8", "replace")
+                    with lock:
+                        if line.startswith("event:"):
+                            stats["events"] += 1
+                        elif line.startswith(": keep-alive"):
+                            stats["heartbeats"] += 1
+                    if time.monotonic() >= deadline:
+                        return
+        except Exception as exc:
+            with lock:
+                stats["errors"] += 1
+            print(f"stream error: {exc}")
+
+    threads = [threading.Thread(target=stream, daemon=True) for _ in range(clients)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(max(0, deadline - time.monotonic()) + 30)
+    print(f"clients={clients} duration={duration}s {stats}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clients", type=int, default=500)
+    parser.add_argument("--events", type=int, default=2000)
+    parser.add_argument("--channels", type=int, default=100)
+    parser.add_argument("--rate", type=float, default=0, help="events per second (0 = as fast as possible)")
+    parser.add_argument("--url")
+    parser.add_argument("--cookie", default="")
+    parser.add_argument("--duration", type=int, default=60)
+    args = parser.parse_args()
+
+    if args.url:
+        run_http(args.url, args.cookie, args.clients, args.duration)
+    else:
+        run_in_process(args.clients, args.events, args.channels, args.rate)
+
+
+if __name__ == "__main__":
+    main()
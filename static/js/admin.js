@@ -1568,8 +1568,13 @@ function formatDateTime(value) {
 document.addEventListener("DOMContentLoaded", () => {
   // Check for unread chat messages
   checkUnreadChats();
-  // Poll every 15 seconds
-  setInterval(checkUnreadChats, 15000);
+  // Refresh on pushed chat messages; slow poll as a safety net
+  if (window.LiveEvents) {
+    window.LiveEvents.on("chat", checkUnreadChats);
+    window.LiveEvents.poll(checkUnreadChats, 15000);
+  } else {
+    setInterval(checkUnreadChats, 15000);
+  }
 });
 
 async function checkUnreadChats() {
@@ -1577,15 +1582,12 @@ async function checkUnreadChats() {
   if (!msgBadge) return; // Element doesn't exist on this page
 
   try {
-    const res = await fetch("/api/admin/conversations");
+    const res = await fetch("/api/admin/conversations/unread");
     if (!res.ok) return;
-    const convos = await res.json();
+    const data = await res.json();
 
     // Count total unread conversations
-    let unreadCount = 0;
-    convos.forEach((c) => {
-      if (c.unread_count > 0) unreadCount++;
-    });
+    const unreadCount = data.unread_conversations || 0;
 
     if (unreadCount > 0) {
       msgBadge.style.display = "inline-block";
@@ -7,32 +7,80 @@ document.addEventListener("DOMContentLoaded", () => {
 
   let activeConvoId = null;
   let pollingInterval = null;
+  // Highest message_id rendered for the open conversation (0 = nothing yet)
+  let lastMessageId = 0;
+  // First page is refreshed on events; older pages are appended by "Load more"
+  let firstPageConvos = [];
+  let olderConvos = [];
+  let convoNextCursor = null;
+  let olderCursor = null;
 
   // 1. Initial Load of Conversations
   loadConversations();
 
-  // 2. Poll Conversation List every 5 seconds (to check for new incoming chats)
-  setInterval(loadConversations, 5000);
-
-  // 3. Poll Active Chat every 3 seconds (if a chat is open)
-  setInterval(() => {
+  // 2. Refresh the list (and the open chat, if it changed) on pushed chat
+  //    events; without SSE poll every 5 / 3 seconds as before
+  const refreshActiveChat = () => {
     if (activeConvoId) loadAdminMessages();
-  }, 3000);
+  };
+  if (window.LiveEvents) {
+    window.LiveEvents.on("chat", (data) => {
+      loadConversations();
+      if (data.resync || data.conversation_id === activeConvoId) {
+        refreshActiveChat();
+      }
+    });
+    window.LiveEvents.poll(loadConversations, 5000);
+    window.LiveEvents.poll(refreshActiveChat, 3000);
+  } else {
+    setInterval(loadConversations, 5000);
+    setInterval(refreshActiveChat, 3000);
+  }
 
   // --- Functions ---
 
   async function loadConversations() {
     try {
-      const res = await fetch("/api/admin/conversations");
+      const res = await fetch("/api/admin/conversations/page");
+      if (!res.ok) return;
+      const data = await res.json();
+
+      firstPageConvos = data.conversations || [];
+      if (olderConvos.length === 0) convoNextCursor = data.next_cursor || null;
+      renderConversationList(mergedConversations());
+    } catch (e) {
+      console.error("Error loading conversations:", e);
+    }
+  }
+
+  async function loadOlderConversations() {
+    const cursor = olderCursor || convoNextCursor;
+    if (!cursor) return;
+
+    try {
+      const res = await fetch(
+        `/api/admin/conversations/page?cursor=${encodeURIComponent(cursor)}`
+      );
       if (!res.ok) return;
-      const convos = await res.json();
+      const data = await res.json();
 
-      renderConversationList(convos);
+      olderConvos = olderConvos.concat(data.conversations || []);
+      olderCursor = data.next_cursor || null;
+      convoNextCursor = olderCursor;
+      renderConversationList(mergedConversations());
     } catch (e) {
       console.error("Error loading conversations:", e);
     }
   }
 
+  // First page wins when a conversation moved up since the older pages loaded
+  function mergedConversations() {
+    const seen = new Set(firstPageConvos.map((c) => c.conversation_id));
+    return firstPageConvos.concat(
+      olderConvos.filter((c) => !seen.has(c.conversation_id))
+    );
+  }
+
   function renderConversationList(convos) {
     if (!convoList) return;
 
@@ -67,10 +115,23 @@ document.addEventListener("DOMContentLoaded", () => {
     // Simple check to avoid DOM trashing if list hasn't changed much
     // (Optional: You can implement smarter diffing here)
     convoList.innerHTML = html;
+
+    if (convoNextCursor) {
+      const moreBtn = document.createElement("button");
+      moreBtn.className = "load-more-btn";
+      moreBtn.textContent = "Load more";
+      moreBtn.addEventListener("click", () => {
+        moreBtn.disabled = true;
+        loadOlderConversations();
+      });
+      convoList.appendChild(moreBtn);
+    }
   }
 
   window.selectConversation = function (id, name, type) {
     activeConvoId = id;
+    lastMessageId = 0;
+    if (adminChatBody) adminChatBody.innerHTML = "";
     activeUserLabel.textContent = `${name} (${type})`;
 
     // Enable Inputs
@@ -84,22 +145,31 @@ document.addEventListener("DOMContentLoaded", () => {
     loadAdminMessages();
   };
 
+  // Fetch only messages newer than the last one rendered and append them
   async function loadAdminMessages() {
     if (!activeConvoId) return;
+    const convoId = activeConvoId;
 
     try {
-      const res = await fetch(`/api/admin/conversation/${activeConvoId}`);
+      const res = await fetch(
+        `/api/admin/conversation/${convoId}?after_id=${lastMessageId}`
+      );
       if (!res.ok) return;
       const messages = await res.json();
 
-      renderChatBody(messages);
+      // Ignore a late response for a conversation that is no longer open
+      if (convoId !== activeConvoId) return;
+      appendChatMessages(messages.filter((m) => m.message_id > lastMessageId));
     } catch (e) {
       console.error("Error loading messages:", e);
     }
   }
 
-  function renderChatBody(messages) {
-    if (!adminChatBody) return;
+  function appendChatMessages(messages) {
+    if (!adminChatBody || messages.length === 0) return;
+
+    // The stored copies replace the optimistic bubbles
+    adminChatBody.querySelectorAll(".msg.pending").forEach((el) => el.remove());
 
     const html = messages
       .map(
@@ -116,12 +186,9 @@ document.addEventListener("DOMContentLoaded", () => {
       )
       .join("");
 
-    // Only update if content changed (prevents scroll jumping)
-    // Checking length is a simple proxy for "has content changed"
-    if (adminChatBody.innerHTML.length !== html.length) {
-      adminChatBody.innerHTML = html;
-      adminChatBody.scrollTop = adminChatBody.scrollHeight;
-    }
+    adminChatBody.insertAdjacentHTML("beforeend", html);
+    lastMessageId = messages[messages.length - 1].message_id;
+    adminChatBody.scrollTop = adminChatBody.scrollHeight;
   }
 
   window.sendAdminReply = async function () {
@@ -130,9 +197,9 @@ document.addEventListener("DOMContentLoaded", () => {
 
     adminMsgInput.value = ""; // Clear immediately
 
-    // Optimistic Append
+    // Optimistic Append (replaced by the stored message on the next fetch)
     adminChatBody.innerHTML += `
-            <div class="msg admin">
+            <div class="msg admin pending">
                 ${escapeHtml(text)}
                 <div style="font-size:9px; opacity:0.7; margin-top:2px; text-align:right">Just now</div>
             </div>`;
@@ -577,78 +577,129 @@
     }
   }
 
-  function buildQuery(params = {}) {
-    const urlParams = new URLSearchParams();
-    Object.entries(params).forEach(([key, value]) => {
+  const APPLICANT_FILTERS = [
+    "date_from",
+    "date_to",
+    "quick_range",
+    "age_bracket",
+    "applicant_status",
+    "applicant_is_active",
+    "sex",
+    "education",
+    "is_pwd",
+    "pwd_type",
+    "has_work_exp",
+    "years_experience",
+    "registration_reason",
+    "applicant_province",
+    "applicant_city",
+    "applicant_barangay",
+  ];
+
+  const EMPLOYER_FILTERS = [
+    "date_from",
+    "date_to",
+    "quick_range",
+    "employer_status",
+    "employer_is_active",
+    "industry",
+    "recruitment_type",
+    "employer_province",
+    "employer_city",
+    "employer_barangay",
+  ];
+
+  const JOB_FILTERS = [
+    "date_from",
+    "date_to",
+    "quick_range",
+    "job_status",
+    "application_status",
+    "work_schedule",
+  ];
+
+  // Widgets of each module (ids from ANALYTICS_WIDGETS in backend/admin.py)
+  // and the filters sent with them; one bundle request loads a whole module
+  const MODULE_WIDGETS = {
+    applicants: {
+      filters: APPLICANT_FILTERS,
+      widgets: {
+        applicants_summary: (res) => renderApplicantsSummary(res),
+        applicants_trend: (res) => renderApplicantsTrend(res),
+        demographics: (res) => renderApplicantsDemographics(res),
+        location: (res) => renderApplicantsLocation(res),
+        experience: (res) => renderApplicantsExperience(res),
+        pwd: (res) => renderApplicantsPWD(res),
+      },
+    },
+    employers: {
+      filters: EMPLOYER_FILTERS,
+      widgets: {
+        employers_summary: (res) => renderEmployersSummary(res),
+        employers_business: (res) => renderEmployersBusiness(res),
+        employers_location: (res) => renderEmployersLocation(res),
+        employers_status: (res) => renderEmployersStatus(res),
+      },
+    },
+    jobs: {
+      filters: JOB_FILTERS,
+      widgets: {
+        jobs_summary: (res) => renderJobsSummary(res),
+        jobs_demand: (res) => renderJobsDemand(res),
+        applications_summary: (res) => renderApplicationsSummary(res),
+        applications_trend: (res) => renderApplicationsTrend(res),
+      },
+    },
+  };
+
+  function pickFilters(keys) {
+    // Same rules as the old query strings: skip empty values; lists are
+    // joined with '|' on the server so "Food, Travel" stays one value
+    const filters = {};
+    keys.forEach((key) => {
+      const value = currentFilters[key];
       if (value === null || value === undefined) return;
       if (Array.isArray(value) && value.length === 0) return;
-      if (Array.isArray(value)) {
-        // CHANGED: Use pipe '|' instead of comma ',' to avoid splitting "Food, Travel"
-        urlParams.set(key, value.join("|"));
-      } else {
-        urlParams.set(key, value);
-      }
+      filters[key] = value;
     });
-    return urlParams.toString();
+    return filters;
   }
 
   async function refreshModuleAnalytics() {
+    const module = MODULE_WIDGETS[activeModule];
+    if (!module) return;
     setStatusMessage("Loading analytics...");
-    try {
-      if (activeModule === "applicants") {
-        await Promise.allSettled([
-          loadApplicantsSummary(),
-          loadApplicantsTrend(),
-          loadApplicantsDemographics(),
-          loadApplicantsLocation(),
-          loadApplicantsExperience(),
-          loadApplicantsPWD(),
-        ]);
-      } else if (activeModule === "employers") {
-        await Promise.allSettled([
-          loadEmployersSummary(),
-          loadEmployersBusiness(),
-          loadEmployersLocation(),
-          loadEmployersStatus(),
-        ]);
-      } else if (activeModule === "jobs") {
-        await Promise.allSettled([
-          loadJobsSummary(),
-          loadJobsDemand(),
-          loadApplicationsSummary(),
-          loadApplicationsTrend(),
-        ]);
-      }
-      // TODO: add employers and jobs modules when their APIs are ready
-      setStatusMessage(`Last refreshed ${new Date().toLocaleString()}`);
-    } catch (e) {
-      console.error(e);
-      setStatusMessage("Failed to load some analytics", true);
-    }
-  }
-
-  async function loadApplicantsSummary() {
-    const qs = buildQuery({
-      date_from: currentFilters.date_from,
-      date_to: currentFilters.date_to,
-      quick_range: currentFilters.quick_range,
-      age_bracket: currentFilters.age_bracket,
-      applicant_status: currentFilters.applicant_status,
-      applicant_is_active: currentFilters.applicant_is_active,
-      sex: currentFilters.sex,
-      education: currentFilters.education,
-      is_pwd: currentFilters.is_pwd,
-      pwd_type: currentFilters.pwd_type,
-      has_work_exp: currentFilters.has_work_exp,
-      years_experience: currentFilters.years_experience,
-      registration_reason: currentFilters.registration_reason,
-      applicant_province: currentFilters.applicant_province,
-      applicant_city: currentFilters.applicant_city,
-      applicant_barangay: currentFilters.applicant_barangay,
-    });
-    const res = await fetchAnalytics(
-      `/admin/api/analytics/applicants/summary?${qs}`
+
+    const payload = await fetchAnalyticsBundle(
+      Object.keys(module.widgets),
+      pickFilters(module.filters)
     );
+    const data = payload?.data || {};
+    const errors = payload?.errors || {};
+
+    await Promise.allSettled(
+      Object.entries(module.widgets).map(async ([widget, render]) => {
+        try {
+          await render({ data: data[widget] });
+        } catch (e) {
+          console.error(`[admin-dashboard] ${widget} render failed`, e);
+          errors[widget] = errors[widget] || "Render failed";
+        }
+      })
+    );
+
+    if (!payload || Object.keys(errors).length) {
+      if (payload) console.error("[admin-dashboard] bundle errors", errors);
+      setStatusMessage(
+        "Some analytics failed to load. Please refresh the page.",
+        true
+      );
+    } else {
+      setStatusMessage(`Last refreshed ${new Date().toLocaleString()}`);
+    }
+  }
+
+  function renderApplicantsSummary(res) {
     const data = res?.data;
     if (!data) return;
     updateMetric("metricApplicantsTotal", data.total_registered);
@@ -656,27 +707,7 @@
     updateMetric("metricApplicantsNew", data.new_registrations);
   }
 
-  async function loadApplicantsTrend() {
-    const qs = buildQuery({
-      date_from: currentFilters.date_from,
-      date_to: currentFilters.date_to,
-      quick_range: currentFilters.quick_range,
-      age_bracket: currentFilters.age_bracket,
-      applicant_status: currentFilters.applicant_status,
-      sex: currentFilters.sex,
-      education: currentFilters.education,
-      is_pwd: currentFilters.is_pwd,
-      pwd_type: currentFilters.pwd_type,
-      has_work_exp: currentFilters.has_work_exp,
-      years_experience: currentFilters.years_experience,
-      registration_reason: currentFilters.registration_reason,
-      applicant_province: currentFilters.applicant_province,
-      applicant_city: currentFilters.applicant_city,
-      applicant_barangay: currentFilters.applicant_barangay,
-    });
-    const res = await fetchAnalytics(
-      `/admin/api/analytics/applicants-per-month?${qs}`
-    );
+  function renderApplicantsTrend(res) {
     const list = res?.data || [];
     // Check if we have meaningful data (at least one entry with count > 0)
     const hasData = list.length > 0 && list.some((i) => (i.count || 0) > 0);
@@ -694,27 +725,7 @@
     renderGenericChart("applicantsTrendChart", labels, values, "Applicants");
   }
 
-  async function loadApplicantsDemographics() {
-    const qs = buildQuery({
-      date_from: currentFilters.date_from,
-      date_to: currentFilters.date_to,
-      quick_range: currentFilters.quick_range,
-      age_bracket: currentFilters.age_bracket,
-      applicant_status: currentFilters.applicant_status,
-      sex: currentFilters.sex,
-      education: currentFilters.education,
-      is_pwd: currentFilters.is_pwd,
-      pwd_type: currentFilters.pwd_type,
-      has_work_exp: currentFilters.has_work_exp,
-      years_experience: currentFilters.years_experience,
-      registration_reason: currentFilters.registration_reason,
-      applicant_province: currentFilters.applicant_province,
-      applicant_city: currentFilters.applicant_city,
-      applicant_barangay: currentFilters.applicant_barangay,
-    });
-    const res = await fetchAnalytics(
-      `/admin/api/analytics/applicants/demographics?${qs}`
-    );
+  function renderApplicantsDemographics(res) {
     const data = res?.data;
     if (!data) return;
 
@@ -775,28 +786,7 @@
     }
   }
 
-  async function loadApplicantsLocation() {
-    const qs = buildQuery({
-      date_from: currentFilters.date_from,
-      date_to: currentFilters.date_to,
-      quick_range: currentFilters.quick_range,
-      age_bracket: currentFilters.age_bracket,
-      applicant_status: currentFilters.applicant_status,
-      applicant_is_active: currentFilters.applicant_is_active,
-      sex: currentFilters.sex,
-      education: currentFilters.education,
-      is_pwd: currentFilters.is_pwd,
-      pwd_type: currentFilters.pwd_type,
-      has_work_exp: currentFilters.has_work_exp,
-      years_experience: currentFilters.years_experience,
-      registration_reason: currentFilters.registration_reason,
-      applicant_province: currentFilters.applicant_province,
-      applicant_city: currentFilters.applicant_city,
-      applicant_barangay: currentFilters.applicant_barangay,
-    });
-    const res = await fetchAnalytics(
-      `/admin/api/analytics/applicants/location?${qs}`
-    );
+  function renderApplicantsLocation(res) {
     const data = res?.data;
     if (!data) return;
 
@@ -841,33 +831,11 @@
     }
   }
 
-  async function loadApplicantsExperience() {
-    const qs = buildQuery({
-      date_from: currentFilters.date_from,
-      date_to: currentFilters.date_to,
-      quick_range: currentFilters.quick_range,
-      age_bracket: currentFilters.age_bracket,
-      applicant_status: currentFilters.applicant_status,
-      applicant_is_active: currentFilters.applicant_is_active,
-      sex: currentFilters.sex,
-      education: currentFilters.education,
-      is_pwd: currentFilters.is_pwd,
-      pwd_type: currentFilters.pwd_type,
-      has_work_exp: currentFilters.has_work_exp,
-      years_experience: currentFilters.years_experience,
-      registration_reason: currentFilters.registration_reason,
-      applicant_province: currentFilters.applicant_province,
-      applicant_city: currentFilters.applicant_city,
-      applicant_barangay: currentFilters.applicant_barangay,
-    });
+  function renderApplicantsExperience(res) {
 
-    console.log("🔍 DEBUG loadApplicantsExperience:");
-    console.log("   Query:", qs);
+    console.log("🔍 DEBUG renderApplicantsExperience:");
     console.log("   Age bracket filter:", currentFilters.age_bracket);
 
-    const res = await fetchAnalytics(
-      `/admin/api/analytics/applicants/experience?${qs}`
-    );
 
     console.log("   API Response:", res);
 
@@ -911,28 +879,7 @@
     }
   }
 
-  async function loadApplicantsPWD() {
-    const qs = buildQuery({
-      date_from: currentFilters.date_from,
-      date_to: currentFilters.date_to,
-      quick_range: currentFilters.quick_range,
-      age_bracket: currentFilters.age_bracket,
-      applicant_status: currentFilters.applicant_status,
-      applicant_is_active: currentFilters.applicant_is_active,
-      sex: currentFilters.sex,
-      education: currentFilters.education,
-      is_pwd: currentFilters.is_pwd,
-      pwd_type: currentFilters.pwd_type,
-      has_work_exp: currentFilters.has_work_exp,
-      years_experience: currentFilters.years_experience,
-      registration_reason: currentFilters.registration_reason,
-      applicant_province: currentFilters.applicant_province,
-      applicant_city: currentFilters.applicant_city,
-      applicant_barangay: currentFilters.applicant_barangay,
-    });
-    const res = await fetchAnalytics(
-      `/admin/api/analytics/applicants/pwd?${qs}`
-    );
+  function renderApplicantsPWD(res) {
     const data = res?.data;
     if (!data) return;
 
@@ -956,22 +903,7 @@
     }
   }
 
-  async function loadEmployersSummary() {
-    const qs = buildQuery({
-      date_from: currentFilters.date_from,
-      date_to: currentFilters.date_to,
-      quick_range: currentFilters.quick_range,
-      employer_status: currentFilters.employer_status,
-      employer_is_active: currentFilters.employer_is_active,
-      industry: currentFilters.industry,
-      recruitment_type: currentFilters.recruitment_type,
-      employer_province: currentFilters.employer_province,
-      employer_city: currentFilters.employer_city,
-      employer_barangay: currentFilters.employer_barangay,
-    });
-    const res = await fetchAnalytics(
-      `/admin/api/analytics/employers/summary?${qs}`
-    );
+  function renderEmployersSummary(res) {
     const data = res?.data;
     if (!data) return;
     updateMetric("metricEmployersTotal", data.total_employers);
@@ -979,22 +911,7 @@
     updateMetric("metricEmployersPendingDocs", data.pending_documents);
   }
 
-  async function loadEmployersBusiness() {
-    const qs = buildQuery({
-      date_from: currentFilters.date_from,
-      date_to: currentFilters.date_to,
-      quick_range: currentFilters.quick_range,
-      employer_status: currentFilters.employer_status,
-      employer_is_active: currentFilters.employer_is_active,
-      industry: currentFilters.industry,
-      recruitment_type: currentFilters.recruitment_type,
-      employer_province: currentFilters.employer_province,
-      employer_city: currentFilters.employer_city,
-      employer_barangay: currentFilters.employer_barangay,
-    });
-    const res = await fetchAnalytics(
-      `/admin/api/analytics/employers/business?${qs}`
-    );
+  async function renderEmployersBusiness(res) {
     const data = res?.data;
     if (!data) return;
 
@@ -1141,22 +1058,7 @@
     populateIndustryFilterOptions();
   });
 
-  async function loadEmployersLocation() {
-    const qs = buildQuery({
-      date_from: currentFilters.date_from,
-      date_to: currentFilters.date_to,
-      quick_range: currentFilters.quick_range,
-      employer_status: currentFilters.employer_status,
-      employer_is_active: currentFilters.employer_is_active,
-      industry: currentFilters.industry,
-      recruitment_type: currentFilters.recruitment_type,
-      employer_province: currentFilters.employer_province,
-      employer_city: currentFilters.employer_city,
-      employer_barangay: currentFilters.employer_barangay,
-    });
-    const res = await fetchAnalytics(
-      `/admin/api/analytics/employers/location?${qs}`
-    );
+  function renderEmployersLocation(res) {
     const data = res?.data;
     if (!data) return;
 
@@ -1202,22 +1104,7 @@
     }
   }
 
-  async function loadEmployersStatus() {
-    const qs = buildQuery({
-      date_from: currentFilters.date_from,
-      date_to: currentFilters.date_to,
-      quick_range: currentFilters.quick_range,
-      employer_status: currentFilters.employer_status,
-      employer_is_active: currentFilters.employer_is_active,
-      industry: currentFilters.industry,
-      recruitment_type: currentFilters.recruitment_type,
-      employer_province: currentFilters.employer_province,
-      employer_city: currentFilters.employer_city,
-      employer_barangay: currentFilters.employer_barangay,
-    });
-    const res = await fetchAnalytics(
-      `/admin/api/analytics/employers/status?${qs}`
-    );
+  function renderEmployersStatus(res) {
     const data = res?.data;
     if (!data) return;
 
@@ -1241,29 +1128,13 @@
     }
   }
 
-  async function loadJobsSummary() {
-    const qs = buildQuery({
-      date_from: currentFilters.date_from,
-      date_to: currentFilters.date_to,
-      quick_range: currentFilters.quick_range,
-      job_status: currentFilters.job_status,
-      work_schedule: currentFilters.work_schedule,
-    });
-    const res = await fetchAnalytics(`/admin/api/analytics/jobs/summary?${qs}`);
+  function renderJobsSummary(res) {
     const data = res?.data;
     if (!data) return;
     updateMetric("metricJobsOpen", data.total_open_jobs);
   }
 
-  async function loadJobsDemand() {
-    const qs = buildQuery({
-      date_from: currentFilters.date_from,
-      date_to: currentFilters.date_to,
-      quick_range: currentFilters.quick_range,
-      job_status: currentFilters.job_status,
-      work_schedule: currentFilters.work_schedule,
-    });
-    const res = await fetchAnalytics(`/admin/api/analytics/jobs/demand?${qs}`);
+  function renderJobsDemand(res) {
     const data = res?.data;
     if (!data) return;
 
@@ -1311,17 +1182,7 @@
     }
   }
 
-  async function loadApplicationsSummary() {
-    const qs = buildQuery({
-      date_from: currentFilters.date_from,
-      date_to: currentFilters.date_to,
-      quick_range: currentFilters.quick_range,
-      application_status: currentFilters.application_status,
-      work_schedule: currentFilters.work_schedule,
-    });
-    const res = await fetchAnalytics(
-      `/admin/api/analytics/applications/summary?${qs}`
-    );
+  function renderApplicationsSummary(res) {
     const data = res?.data;
     if (!data) return;
     updateMetric("metricApplicationsTotal", data.total_applications);
@@ -1351,17 +1212,7 @@
     }
   }
 
-  async function loadApplicationsTrend() {
-    const qs = buildQuery({
-      date_from: currentFilters.date_from,
-      date_to: currentFilters.date_to,
-      quick_range: currentFilters.quick_range,
-      application_status: currentFilters.application_status,
-      work_schedule: currentFilters.work_schedule,
-    });
-    const res = await fetchAnalytics(
-      `/admin/api/analytics/applications/trend?${qs}`
-    );
+  function renderApplicationsTrend(res) {
     const list = res?.data || [];
     const chartId = "applicationsTrendChart";
 
@@ -1677,9 +1528,14 @@
     return mimeTypes[format] || "application/octet-stream";
   }
 
-  async function fetchAnalytics(endpoint) {
+  async function fetchAnalyticsBundle(widgets, filters) {
     try {
-      const res = await fetch(endpoint, { credentials: "same-origin" });
+      const res = await fetch("/admin/api/analytics/bundle", {
+        method: "POST",
+        headers: { "Content-Type": "application/json" },
+        credentials: "same-origin",
+        body: JSON.stringify({ widgets, filters, parallel: true }),
+      });
       if (!res.ok) throw new Error(`HTTP ${res.status}`);
       const payload = await res.json();
       if (payload.success === false || payload.error) {
@@ -1687,11 +1543,7 @@
       }
       return payload;
     } catch (error) {
-      console.error(`[admin-dashboard] ${endpoint} failed`, error);
-      setStatusMessage(
-        "Some analytics failed to load. Please refresh the page.",
-        true
-      );
+      console.error("[admin-dashboard] analytics bundle failed", error);
       return null;
     }
   }
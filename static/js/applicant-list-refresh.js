@@ -94,8 +94,17 @@ document.addEventListener("DOMContentLoaded", () => {
       );
   }
 
-  // Set up periodic refresh
-  setInterval(refreshApplicantList, REFRESH_INTERVAL);
+  // Refresh when one of this job's applications changes; slow poll as a safety net
+  if (window.LiveEvents) {
+    window.LiveEvents.on("application", (data) => {
+      if (data.resync || data.job_id === getJobIdFromCurrentPage()) {
+        refreshApplicantList();
+      }
+    });
+    window.LiveEvents.poll(refreshApplicantList, REFRESH_INTERVAL);
+  } else {
+    setInterval(refreshApplicantList, REFRESH_INTERVAL);
+  }
 
   document.addEventListener("visibilitychange", () => {
     if (!document.hidden) {
@@ -32,8 +32,13 @@ document.addEventListener("DOMContentLoaded", () => {
   // 2. Run immediately on load
   window.checkAndUpdateNotificationDot();
 
-  // 3. Keep checking every 30 seconds (polling)
-  setInterval(window.checkAndUpdateNotificationDot, 30000);
+  // 3. Refresh on pushed notifications; slow poll as a safety net
+  if (window.LiveEvents) {
+    window.LiveEvents.on("notification", window.checkAndUpdateNotificationDot);
+    window.LiveEvents.poll(window.checkAndUpdateNotificationDot, 30000);
+  } else {
+    setInterval(window.checkAndUpdateNotificationDot, 30000);
+  }
 
   // --- Existing Modal Logic Below (Kept from your original file) ---
   const modal = document.getElementById("notifModal");
@@ -5,6 +5,9 @@ let quickOptionsContainer = null;
 let showSecondaryNext = false;
 window.postChatShown = false;
 let chatSessionEnded = false;
+// Messages fetched so far; polls only ask for ids after lastMessageId
+let chatMessages = [];
+let lastMessageId = 0;
 
 document.addEventListener("DOMContentLoaded", () => {
     chatBody = document.getElementById("chat-body");
@@ -14,9 +17,15 @@ document.addEventListener("DOMContentLoaded", () => {
     // This ensures we catch messages and show the badge on page load
     loadMessages();
     
-    // Check for new messages every 3 seconds perpetually
+    // Reload when a message is pushed; poll every 3 seconds only without SSE
     if (!chatInterval) {
-        chatInterval = setInterval(loadMessages, 3000);
+        if (window.LiveEvents) {
+            chatInterval = true;
+            window.LiveEvents.on("chat", loadMessages);
+            window.LiveEvents.poll(loadMessages, 3000);
+        } else {
+            chatInterval = setInterval(loadMessages, 3000);
+        }
     }
 
     // Expose toggle function globally
@@ -36,7 +45,7 @@ document.addEventListener("DOMContentLoaded", () => {
             // 2. FORCE DATA LOAD IMMEDIATELY
             // This runs renderMessages(), which triggers the LocalStorage update
             // so the system knows you've "Seen" the message instantly.
-            loadMessages(); 
+            loadMessages(true); 
 
             // If chat session ended, show the fixed message
             if (chatSessionEnded) {
@@ -80,7 +89,8 @@ window.sendUserMessage = async function () {
 
     input.value = ""; // Clear input
 
-    appendMessage(text, "user");
+    // Optimistic bubble, replaced once the stored message comes back
+    appendMessage(text, "user").classList.add("pending");
     scrollToBottom();
 
     try {
@@ -96,20 +106,51 @@ window.sendUserMessage = async function () {
 };
 
 // ===== Load Messages =====
-async function loadMessages() {
+// Only messages newer than lastMessageId are fetched; they are appended to
+// the chat body. fullRender rebuilds the body from the cached messages.
+async function loadMessages(fullRender = false) {
     try {
-        const res = await fetch("/api/my_messages");
+        const res = await fetch(`/api/my_messages?after_id=${lastMessageId}`);
         if (!res.ok) return;
 
         const data = await res.json();
-        if (data.success) {
-            renderMessages(data.messages);
+        if (!data.success) return;
+
+        const newMessages = (data.messages || []).filter(
+            (m) => m.message_id > lastMessageId
+        );
+        chatMessages = chatMessages.concat(newMessages);
+        if (newMessages.length > 0) {
+            lastMessageId = newMessages[newMessages.length - 1].message_id;
+        }
+
+        if (fullRender) {
+            renderMessages(chatMessages);
+        } else if (newMessages.length > 0) {
+            appendMessages(newMessages);
+        } else {
+            updateChatState(chatMessages);
         }
     } catch (e) {
         console.error(e);
     }
 }
 
+// ===== Build one message bubble =====
+function buildMessageElement(m) {
+    const div = document.createElement("div");
+    div.className = `msg ${m.sender_type === "user" ? "user" : "admin"}`;
+    div.setAttribute("data-msg-id", m.message_id); // Helpful for debugging
+
+    div.innerHTML = `
+        ${escapeHtml(m.message)}
+        <div style="font-size:9px; opacity:0.7; text-align:${m.sender_type === "user" ? "right" : "left"}; margin-top:2px;">
+            ${formatTime(m.created_at)}
+        </div>
+    `;
+    return div;
+}
+
 // ===== Render Messages =====
 function renderMessages(messages) {
     if (!chatBody) return;
@@ -122,22 +163,33 @@ function renderMessages(messages) {
 
     // Append messages
     messages.forEach(m => {
-        const div = document.createElement("div");
-        div.className = `msg ${m.sender_type === "user" ? "user" : "admin"}`;
-        
-        // Ensure we have a valid ID or fallback to timestamp for tracking
-        const msgId = m.id || m.created_at;
-        div.setAttribute("data-msg-id", msgId); // Helpful for debugging
-
-        div.innerHTML = `
-            ${escapeHtml(m.message)}
-            <div style="font-size:9px; opacity:0.7; text-align:${m.sender_type === "user" ? "right" : "left"}; margin-top:2px;">
-                ${formatTime(m.created_at)}
-            </div>
-        `;
-        chatBody.insertBefore(div, existingQuickOptions);
+        chatBody.insertBefore(buildMessageElement(m), existingQuickOptions);
+    });
+
+    updateChatState(messages);
+}
+
+// ===== Append new messages (delta) =====
+function appendMessages(newMessages) {
+    if (!chatBody) return;
+
+    // The stored copies replace the optimistic bubbles
+    chatBody.querySelectorAll(".msg.pending").forEach((el) => el.remove());
+
+    const anchor = quickOptionsContainer && quickOptionsContainer.parentNode === chatBody
+        ? quickOptionsContainer
+        : null;
+    newMessages.forEach((m) => {
+        chatBody.insertBefore(buildMessageElement(m), anchor);
     });
 
+    updateChatState(chatMessages);
+}
+
+// ===== Quick options, post-chat prompts and badge =====
+function updateChatState(messages) {
+    if (!chatBody) return;
+
     // Initialize quick options container if missing
     if (!quickOptionsContainer) {
         quickOptionsContainer = document.createElement("div");
@@ -164,8 +216,8 @@ function renderMessages(messages) {
     const chatNotifBadge = document.getElementById("chatNotifBadge");
     const lastMsg = messages[messages.length - 1];
     
-    // Unique ID for the last message (prefer ID, fallback to timestamp)
-    const lastMsgId = lastMsg ? (lastMsg.id || lastMsg.created_at) : null;
+    // Unique ID for the last message
+    const lastMsgId = lastMsg ? lastMsg.message_id : null;
     
     // Get the last message ID that the user actually SAW
     const seenMsgId = localStorage.getItem("chat_last_seen_id");
@@ -203,6 +255,7 @@ function appendMessage(text, type) {
     div.textContent = text;
     chatBody.appendChild(div);
     scrollToBottom();
+    return div;
 }
 
 // ===== Escape HTML =====
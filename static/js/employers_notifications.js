@@ -1,10 +1,17 @@
 let currentFilter = "all";
+let loadedNotifications = [];
+let nextCursor = null;
 
 document.addEventListener("DOMContentLoaded", () => {
   console.log("[v0] Notifications page loaded");
   setupFilterButtons();
   loadNotifications();
-  setInterval(loadNotifications, 30000);
+  if (window.LiveEvents) {
+    window.LiveEvents.on("notification", () => loadNotifications());
+    window.LiveEvents.poll(() => loadNotifications(), 30000);
+  } else {
+    setInterval(() => loadNotifications(), 30000);
+  }
 
   // Modal Close Handlers
   const modal = document.getElementById("notifModal");
@@ -29,18 +36,26 @@ function setupFilterButtons() {
   });
 }
 
-async function loadNotifications() {
+// Without a cursor this reloads the first page; with one it appends the next page
+async function loadNotifications(cursor = null) {
   try {
+    const params = new URLSearchParams();
+    if (currentFilter !== "all") params.set("filter", currentFilter);
+    if (cursor) params.set("cursor", cursor);
+
     let url = "/employers/api/notifications";
-    if (currentFilter !== "all") {
-      url += `?filter=${currentFilter}`;
-    }
+    if (params.toString()) url += `?${params}`;
 
     const response = await fetch(url);
     if (!response.ok) throw new Error("Failed to fetch notifications");
 
     const data = await response.json();
-    displayNotifications(data.notifications);
+    loadedNotifications = cursor
+      ? loadedNotifications.concat(data.notifications || [])
+      : data.notifications || [];
+    nextCursor = data.next_cursor || null;
+    displayNotifications(loadedNotifications);
+    renderLoadMoreButton();
   } catch (error) {
     console.error("[v0] Error loading notifications:", error);
     const container = document.getElementById("notificationList");
@@ -49,6 +64,20 @@ async function loadNotifications() {
   }
 }
 
+function renderLoadMoreButton() {
+  const container = document.getElementById("notificationList");
+  if (!container || !nextCursor) return;
+
+  const btn = document.createElement("button");
+  btn.className = "view-btn load-more-btn";
+  btn.textContent = "Load more";
+  btn.addEventListener("click", () => {
+    btn.disabled = true;
+    loadNotifications(nextCursor);
+  });
+  container.appendChild(btn);
+}
+
 function displayNotifications(notifications) {
   const container = document.getElementById("notificationList");
 
@@ -0,0 +1,91 @@
+// Shared live-update channel (Server-Sent Events from /api/events/stream).
+// Pages register handlers with window.LiveEvents.on("notification", fn) and
+// keep a slow poll as a safety net via window.LiveEvents.poll(fn, ms).
+(function () {
+  if (window.LiveEvents) return;
+
+  const FALLBACK_INTERVAL = 120000; // safety-net poll while the stream is up
+  const handlers = {};
+  let source = null;
+
+  const LiveEvents = {
+    supported: typeof window.EventSource !== "undefined",
+    connected: false,
+
+    on(name, fn) {
+      (handlers[name] = handlers[name] || []).push(fn);
+      connect();
+    },
+
+    // Run fn every defaultMs without SSE, and only as a slow safety net with it
+    poll(fn, defaultMs) {
+      const tick = () => {
+        fn();
+        setTimeout(tick, interval(defaultMs));
+      };
+      setTimeout(tick, interval(defaultMs));
+    },
+  };
+
+  function interval(defaultMs) {
+    return LiveEvents.supported ? Math.max(defaultMs, FALLBACK_INTERVAL) : defaultMs;
+  }
+
+  function dispatch(name, data) {
+    (handlers[name] || []).forEach((fn) => {
+      try {
+        fn(data);
+      } catch (err) {
+        console.warn(`[v0] Live event handler for "${name}" failed:`, err);
+      }
+    });
+  }
+
+  // Missed events (buffer overflow or reconnect) -> every view refetches
+  function resyncAll() {
+    Object.keys(handlers).forEach((name) => dispatch(name, { resync: true }));
+  }
+
+  function connect() {
+    if (source || !LiveEvents.supported) return;
+
+    source = new EventSource("/api/events/stream");
+
+    let openedBefore = false;
+    source.addEventListener("ready", () => {
+      LiveEvents.connected = true;
+      // Reconnects resume from Last-Event-ID, but a long outage may still
+      // have skipped events, so refresh once
+      if (openedBefore) resyncAll();
+      openedBefore = true;
+    });
+
+    ["notification", "chat", "application"].forEach((name) => {
+      source.addEventListener(name, (e) => {
+        let data = {};
+        try {
+          data = JSON.parse(e.data);
+        } catch (err) {}
+        dispatch(name, data);
+      });
+    });
+
+    source.addEventListener("resync", resyncAll);
+
+    source.onerror = () => {
+      LiveEvents.connected = false;
+      // 401 / non-stream response: the browser gives up, fall back to polling
+      if (source.readyState === EventSource.CLOSED) {
+        LiveEvents.supported = false;
+        source = null;
+        resyncAll();
+      }
+    };
+  }
+
+  document.addEventListener("visibilitychange", () => {
+    if (!document.hidden && !LiveEvents.connected) resyncAll();
+  });
+
+  window.LiveEvents = LiveEvents;
+})();
@@ -32,6 +32,11 @@ document.addEventListener("DOMContentLoaded", () => {
   // 2. Run immediately on load
   window.checkAndUpdateEmployerDot();
 
-  // 3. Poll every 30 seconds to keep it updated
-  setInterval(window.checkAndUpdateEmployerDot, 30000);
+  // 3. Refresh on pushed notifications; slow poll as a safety net
+  if (window.LiveEvents) {
+    window.LiveEvents.on("notification", window.checkAndUpdateEmployerDot);
+    window.LiveEvents.poll(window.checkAndUpdateEmployerDot, 30000);
+  } else {
+    setInterval(window.checkAndUpdateEmployerDot, 30000);
+  }
 });
@@ -2,14 +2,48 @@
 if (typeof window.notifSystemInitialized === "undefined") {
   window.notifSystemInitialized = true;
   window.currentFilter = "all";
+  window.loadedNotifications = [];
+  window.notifNextCursor = null;
+}
+
+// Build the feed URL; a cursor asks for the page after the one already shown
+function notificationsUrl(filter, cursor) {
+  const params = new URLSearchParams({ filter });
+  if (cursor) params.set("cursor", cursor);
+  return `/admin/api/notifications?${params}`;
+}
+
+// Keep the loaded pages and return the list to render
+function mergeNotificationPage(data, cursor) {
+  const page = data.notifications || [];
+  window.loadedNotifications = cursor
+    ? window.loadedNotifications.concat(page)
+    : page;
+  window.notifNextCursor = data.next_cursor || null;
+  return window.loadedNotifications;
+}
+
+// Append a "Load more" button when the API says there is another page
+function renderLoadMoreButton(container, loadMore) {
+  if (!container || !window.notifNextCursor) return;
+
+  const btn = document.createElement("button");
+  btn.className = "view-btn load-more-btn";
+  btn.textContent = "Load more";
+  btn.addEventListener("click", (e) => {
+    e.stopPropagation();
+    btn.disabled = true;
+    loadMore(window.notifNextCursor);
+  });
+  container.appendChild(btn);
 }
 
 // Fetch and display notifications
-async function fetchNotifications(filter = "all") {
+async function fetchNotifications(filter = "all", cursor = null) {
   console.log("[v0] Fetching notifications with filter:", filter);
 
   try {
-    const response = await fetch(`/admin/api/notifications?filter=${filter}`);
+    const response = await fetch(notificationsUrl(filter, cursor));
 
     if (!response.ok) {
       throw new Error("Failed to fetch notifications");
@@ -18,7 +52,11 @@ async function fetchNotifications(filter = "all") {
     const data = await response.json();
     console.log("[v0] Notifications received:", data.notifications.length);
 
-    displayNotifications(data.notifications);
+    displayNotifications(mergeNotificationPage(data, cursor));
+    renderLoadMoreButton(
+      document.getElementById("notificationList"),
+      (next) => fetchNotifications(filter, next)
+    );
   } catch (error) {
     console.error("[v0] Error fetching notifications:", error);
     document.getElementById("notificationList").innerHTML =
@@ -164,13 +202,19 @@ function setupFilterButtons() {
   });
 }
 
-// Poll for new notifications every 30 seconds
+// Refresh on pushed notifications; fall back to polling every 30 seconds
 function startNotificationPolling() {
-  setInterval(() => {
-    console.log("[v0] Polling for new notifications");
+  const refresh = () => {
+    console.log("[v0] Refreshing notifications");
     fetchNotifications(window.currentFilter);
     updateNotifBadge(); // <--- ALSO check the badge when polling
-  }, 30000); // 30 seconds
+  };
+  if (window.LiveEvents) {
+    window.LiveEvents.on("notification", refresh);
+    window.LiveEvents.poll(refresh, 30000);
+  } else {
+    setInterval(refresh, 30000); // 30 seconds
+  }
 }
 
 // --- BADGE FUNCTION ---
@@ -209,11 +253,6 @@ document.addEventListener("DOMContentLoaded", () => {
   fetchNotifications("all");
   startNotificationPolling();
   updateNotifBadge(); // <--- also run immediately when page loads
-
-  // Global polling for notif badge (always updates every 30s)
-  setInterval(() => {
-    updateNotifBadge();
-  }, 30000);
 });
 
 if (typeof window.notifSystemInitialized === "undefined") {
@@ -225,17 +264,18 @@ document.addEventListener("DOMContentLoaded", () => {
   const notificationList = document.getElementById("notificationList");
   if (!notificationList) return console.warn("[v0] Notification container missing, aborting notifications.");
 
-  const fetchNotifications = async (filter = "all") => {
+  const fetchNotifications = async (filter = "all", cursor = null) => {
     console.log("[v0] Fetching notifications with filter:", filter);
 
     try {
-      const response = await fetch(`/admin/api/notifications?filter=${filter}`);
+      const response = await fetch(notificationsUrl(filter, cursor));
       if (!response.ok) throw new Error("Failed to fetch notifications");
 
       const data = await response.json();
       console.log("[v0] Notifications received:", data.notifications?.length || 0);
 
-      displayNotifications(data.notifications || []);
+      displayNotifications(mergeNotificationPage(data, cursor));
+      renderLoadMoreButton(notificationList, (next) => fetchNotifications(filter, next));
     } catch (err) {
       console.error("[v0] Error fetching notifications:", err);
       notificationList.innerHTML = `
@@ -365,5 +405,11 @@ console.log("[v0] Admin page loaded - modal setup skipped for reported posts vie
   setupFilterButtons();
   fetchNotifications(window.currentFilter);
   updateNotifBadge();
-  setInterval(() => { fetchNotifications(window.currentFilter); updateNotifBadge(); }, 30000);
+  const refresh = () => { fetchNotifications(window.currentFilter); updateNotifBadge(); };
+  if (window.LiveEvents) {
+    window.LiveEvents.on("notification", refresh);
+    window.LiveEvents.poll(refresh, 30000);
+  } else {
+    setInterval(refresh, 30000);
+  }
 });
@@ -0,0 +1,250 @@
+"""
+Parity between the columnar analytics snapshots (backend/analytics_columnar.py)
+and the SQL they stand in for (the _*_data functions in backend/admin.py).
+
+Every widget in COLUMNAR_WIDGETS is computed both ways on the same fixture
+rows, under each filter set in FILTER_SETS, and the results must match.
+
+Needs NumPy and a scratch MySQL database; the test creates and drops the
+applicants, employers, jobs and applications tables there:
+
+    ANALYTICS_PARITY_DB=peso_parity python -m pytest tests/test_analytics_parity.py
+
+Connection settings other than the database name come from the usual DB_*
+variables. Skipped when ANALYTICS_PARITY_DB is not set.
+"""
+import json
+import os
+import random
+import sys
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+PARITY_DB = os.getenv("ANALYTICS_PARITY_DB")
+if not PARITY_DB:
+    pytest.skip("ANALYTICS_PARITY_DB is not set", allow_module_level=True)
+pytest.importorskip("numpy")
+
+import db_connection  # noqa: E402  (loads .env)
+
+if PARITY_DB == os.getenv("DB_NAME", "peso_smarthire"):
+    pytest.skip("ANALYTICS_PARITY_DB must not be the application database", allow_module_level=True)
+
+os.environ["DB_NAME"] = PARITY_DB
+# Both sides read the raw fixture tables: no rollups, columnar switched on
+os.environ["ANALYTICS_ROLLUPS"] = "false"
+os.environ["ANALYTICS_COLUMNAR"] = "true"
+
+from werkzeug.datastructures import MultiDict  # noqa: E402
+
+from backend import admin, analytics_columnar  # noqa: E402
+from backend.analytics_columnar import COLUMNAR_WIDGETS, columnar_widget, refresh_columnar  # noqa: E402
+
+TODAY = datetime.now().replace(microsecond=0)
+
+FIXTURE_TABLES = {
+    "applicants": """
+        CREATE TABLE applicants (
+            applicant_id INT AUTO_INCREMENT PRIMARY KEY,
+            created_at DATETIME NULL, updated_at DATETIME NULL,
+            status VARCHAR(32) NULL, is_active TINYINT NULL,
+            sex VARCHAR(16) NULL, education VARCHAR(64) NULL,
+            is_pwd TINYINT NULL, pwd_type VARCHAR(64) NULL,
+            has_work_exp TINYINT NULL, years_experience VARCHAR(32) NULL,
+            province VARCHAR(64) NULL, city VARCHAR(64) NULL, barangay VARCHAR(64) NULL,
+            is_from_lipa TINYINT NULL, age INT NULL
+        )
+    """,
+    "employers": """
+        CREATE TABLE employers (
+            employer_id INT AUTO_INCREMENT PRIMARY KEY,
+            created_at DATETIME NULL, updated_at DATETIME NULL,
+            status VARCHAR(32) NULL, is_active TINYINT NULL,
+            industry VARCHAR(64) NULL, recruitment_type VARCHAR(32) NULL,
+            province VARCHAR(64) NULL, city VARCHAR(64) NULL, barangay VARCHAR(64) NULL
+        )
+    """,
+    "jobs": """
+        CREATE TABLE jobs (
+            job_id INT AUTO_INCREMENT PRIMARY KEY,
+            created_at DATETIME NULL, updated_at DATETIME NULL,
+            job_expiration_date DATE NULL, status VARCHAR(32) NULL,
+            work_schedule VARCHAR(32) NULL, job_position VARCHAR(64) NULL
+        )
+    """,
+    "applications": """
+        CREATE TABLE applications (
+            id INT AUTO_INCREMENT PRIMARY KEY,
+            job_id INT NULL, applied_at DATETIME NULL, created_at DATETIME NULL,
+            status VARCHAR(32) NULL
+        )
+    """,
+}
+
+# Fewer distinct values per column than any widget's top-N limit, so ties at
+# the cut-off can't make the two sides pick different rows
+FILTER_SETS = [
+    {},
+    {"quick_range": "last_30"},
+    {"quick_range": "ytd"},
+    {"quick_range": "qtd"},
+    {"date_from": (TODAY - timedelta(days=400)).date().isoformat(),
+     "date_to": (TODAY - timedelta(days=30)).date().isoformat()},
+    {"year": str(TODAY.year)},
+    # Applicants
+    {"sex": "Male|Female"},
+    {"applicant_status": "Approved", "applicant_is_active": "1"},
+    {"age_bracket": "18-24|60+"},
+    {"age_bracket": "bogus"},
+    {"is_pwd": "1", "education": "College"},
+    {"has_work_exp": "0", "quick_range": "ytd"},
+    {"applicant_province": "BATANGAS", "applicant_city": "lipa city"},
+    # Employers, including the Manila rule
+    {"employer_province": "NCR"},
+    {"employer_province": "Batangas"},
+    {"industry": "Food|Travel", "employer_is_active": "1"},
+    {"employer_city": "lipa city", "employer_status": "Approved"},
+    {"recruitment_type": "International"},
+    # Jobs and applications, through the label mappings
+    {"job_status": "Active|Suspended"},
+    {"work_schedule": "Full-Time|Contract"},
+    {"application_status": "Hired|Pending"},
+    {"work_schedule": "Part-Time", "application_status": "hired"},
+]
+
+
+def _when(rng, days=800):
+    return TODAY - timedelta(days=rng.randint(0, days), seconds=rng.randint(0, 86399))
+
+
+def _fixture_rows(rng):
+    pick = rng.choice
+    applicants = [(
+        _when(rng), TODAY,
+        pick(["Approved", "Pending", "Rejected", "Reupload", None]),
+        pick([0, 1, 1, None]),
+        pick(["Male", "Female", "", None]),
+        pick(["High School", "College", "Vocational", "", None]),
+        pick([0, 0, 1, None]),
+        pick(["Visual", "Hearing", "Physical", "", None]),
+        pick([0, 1]),
+        pick(["0", "1-2", "3-5", "6-10", "10+", "5", "none", "abc", "", None]),
+        pick(["BATANGAS", "LAGUNA", "CAVITE", "", None]),
+        pick(["LIPA CITY", "BATANGAS CITY", "TANAUAN", "CALAMBA", "", None]),
+        pick(["POBLACION", "SABANG", "MARAUOY", "", None]),
+        pick([0, 1, None]),
+        pick([None, 0, rng.randint(15, 75)]),
+    ) for _ in range(400)]
+
+    employers = [(
+        _when(rng), TODAY,
+        pick(["Approved", "Pending", "Rejected", "Reupload", None]),
+        pick([0, 1, None]),
+        pick(["IT", "Food", "Travel", "Construction", "", None]),
+        pick(["Local", "International", None]),
+        pick(["BATANGAS", "METRO MANILA", "NCR", "LAGUNA", "", None]),
+        pick(["LIPA CITY", "MANILA", "CALAMBA", "", None]),
+        pick(["POBLACION", "SABANG", "", None]),
+    ) for _ in range(200)]
+
+    jobs = [(
+        _when(rng), TODAY,
+        pick([None, (TODAY - timedelta(days=rng.randint(1, 90))).date(),
+              (TODAY + timedelta(days=rng.randint(0, 90))).date()]),
+        pick(["active", "inactive", "archived", "suspended", None]),
+        pick(["full-time", "part-time", "contract", "freelance", "", None]),
+        pick(["Cook", "Driver", "Clerk", "Welder", "", None]),
+    ) for _ in range(150)]
+
+    # Some applications point at no job, or at a job that does not exist
+    applications = []
+    for _ in range(500):
+        applied_at = _when(rng)
+        applications.append((
+            pick([None, rng.randint(1, len(jobs) + 10)]),
+            pick([applied_at, applied_at, None]),
+            applied_at,
+            pick(["Pending", "Hired", "Rejected", "For Interview", "", None]),
+        ))
+    return applicants, employers, jobs, applications
+
+
+@pytest.fixture(scope="module")
+def conn():
+    conn = db_connection.create_connection()
+    if not conn:
+        pytest.skip(f"cannot connect to MySQL database {PARITY_DB}")
+
+    applicants, employers, jobs, applications = _fixture_rows(random.Random(2026))
+    cursor = conn.cursor()
+    for table, ddl in FIXTURE_TABLES.items():
+        cursor.execute(f"DROP TABLE IF EXISTS {table}")
+        cursor.execute(ddl)
+    cursor.executemany("""
+        INSERT INTO applicants (created_at, updated_at, status, is_active, sex, education,
+            is_pwd, pwd_type, has_work_exp, years_experience, province, city, barangay,
+            is_from_lipa, age)
+        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+    """, applicants)
+    cursor.executemany("""
+        INSERT INTO employers (created_at, updated_at, status, is_active, industry,
+            recruitment_type, province, city, barangay)
+        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
+    """, employers)
+    cursor.executemany("""
+        INSERT INTO jobs (created_at, updated_at, job_expiration_date, status, work_schedule, job_position)
+        VALUES (%s, %s, %s, %s, %s, %s)
+    """, jobs)
+    cursor.executemany("""
+        INSERT INTO applications (job_id, applied_at, created_at, status)
+        VALUES (%s, %s, %s, %s)
+    """, applications)
+    conn.commit()
+    cursor.close()
+
+    loaded = refresh_columnar()
+    assert loaded and all(loaded.values()), f"columnar snapshots did not load: {loaded}"
+
+    yield conn
+
+    cursor = conn.cursor()
+    for table in FIXTURE_TABLES:
+        cursor.execute(f"DROP TABLE IF EXISTS {table}")
+    cursor.close()
+    conn.commit()
+    conn.close()
+
+
+def _normalize(value):
+    """JSON-comparable form: numbers as rounded floats, lists in a stable order."""
+    if isinstance(value, dict):
+        return {key: _normalize(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return sorted((_normalize(item) for item in value), key=lambda item: json.dumps(item, sort_keys=True))
+    if isinstance(value, bool) or value is None or isinstance(value, str):
+        return value
+    if isinstance(value, (int, float, Decimal)):
+        return round(float(value), 6)
+    if hasattr(value, "item"):  # NumPy scalar
+        return _normalize(value.item())
+    return str(value)
+
+
+@pytest.mark.parametrize("widget", sorted(COLUMNAR_WIDGETS))
+def test_columnar_matches_sql(conn, widget, monkeypatch):
+    compute = admin.ANALYTICS_WIDGETS[widget][0]
+
+    for filters in FILTER_SETS:
+        args = MultiDict(filters)
+
+        monkeypatch.setattr(analytics_columnar, "COLUMNAR_ENABLED", False)
+        expected = compute(conn, args)
+        monkeypatch.setattr(analytics_columnar, "COLUMNAR_ENABLED", True)
+
+        actual = columnar_widget(widget, args)
+        assert actual is not None, f"{widget} fell back to SQL for {filters}"
+        assert _normalize(actual) == _normalize(expected), f"{widget} differs for {filters}"
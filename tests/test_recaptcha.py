@@ -0,0 +1,123 @@
+"""
+reCAPTCHA verification (backend/recaptcha.py) against fake sessions: no
+network and no real secret needed.
+"""
+import os
+import sys
+import threading
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+pytest.importorskip("requests")
+
+from backend import recaptcha  # noqa: E402
+
+
+class FailingSession:
+    def __init__(self):
+        self.calls = 0
+
+    def post(self, *args, **kwargs):
+        self.calls += 1
+        raise ConnectionError("siteverify unreachable")
+
+
+class Reply:
+    def __init__(self, payload):
+        self.payload = payload
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self.payload
+
+
+class PassOnceSession:
+    """Like Google: a token verifies once, then it is a duplicate."""
+
+    def __init__(self):
+        self.calls = 0
+        self.used = set()
+
+    def post(self, url, data=None, timeout=None):
+        self.calls += 1
+        token = data["response"]
+        if token in self.used:
+            return Reply({"success": False, "error-codes": ["timeout-or-duplicate"]})
+        self.used.add(token)
+        return Reply({"success": True})
+
+
+@pytest.fixture(autouse=True)
+def fake_secret(monkeypatch):
+    monkeypatch.setattr(recaptcha, "RECAPTCHA_SECRET_KEY", "test-secret")
+    monkeypatch.setattr(recaptcha, "FAIL_OPEN", False)
+    recaptcha._cache.clear()
+    recaptcha._inflight.clear()
+
+
+def _run_with_deadline(target, seconds=10):
+    thread = threading.Thread(target=target, daemon=True)
+    thread.start()
+    thread.join(seconds)
+    return not thread.is_alive()
+
+
+class DescheduledExecutor:
+    """
+    Real executor, but submit() returns only after the task had a chance to
+    finish: the submitting thread losing the CPU right after submit, as a
+    request that fails fast makes likely.
+    """
+
+    def __init__(self, executor):
+        self.executor = executor
+
+    def submit(self, fn, *args):
+        future = self.executor.submit(fn, *args)
+        try:
+            future.exception(timeout=0.2)
+        except Exception:
+            pass
+        return future
+
+
+def test_fast_failures_do_not_deadlock(monkeypatch):
+    session = FailingSession()
+    monkeypatch.setattr(recaptcha, "_session", session)
+    monkeypatch.setattr(recaptcha, "_executor", DescheduledExecutor(recaptcha._executor))
+    results = []
+
+    finished = _run_with_deadline(lambda: results.extend(
+        recaptcha.verify_recaptcha(f"token-{i}", "10.0.0.1", budget=5) for i in range(5)))
+
+    assert finished, "verify_recaptcha deadlocked"
+    assert not recaptcha._lock.locked()
+    assert [result["success"] for result in results] == [False] * 5
+    assert session.calls == 5
+    assert not recaptcha._inflight
+    assert not recaptcha._cache
+
+
+def test_failure_is_not_cached(monkeypatch):
+    session = FailingSession()
+    monkeypatch.setattr(recaptcha, "_session", session)
+    for _ in range(3):
+        assert recaptcha.verify_recaptcha("token", "10.0.0.1", budget=5)["success"] is False
+    assert session.calls == 3
+
+
+def test_success_is_handed_out_once(monkeypatch):
+    session = PassOnceSession()
+    monkeypatch.setattr(recaptcha, "_session", session)
+
+    assert recaptcha.verify_recaptcha("pass-1", "10.0.0.1", budget=5)["success"] is True
+    # A late duplicate gets the kept success, once
+    assert recaptcha.verify_recaptcha("pass-1", "10.0.0.1", budget=5)["success"] is True
+    assert recaptcha.verify_recaptcha("pass-1", "10.0.0.1", budget=5)["success"] is False
+    assert session.calls == 2
+    # Another IP never shares the verdict
+    assert recaptcha.verify_recaptcha("pass-1", "10.0.0.2", budget=5)["success"] is False